@@ -25,14 +25,23 @@ import collections
 import functools
 import gzip
 import logging
+import mmap
 import os
-import struct
 import pathlib
 import shutil
 import tempfile
+import threading
 import typing
 
-from . import exceptions, dna, header, magic_compression
+from . import (
+    block_table,
+    decompressed_cache,
+    exceptions,
+    dna,
+    dna_cache,
+    header,
+    magic_compression,
+)
 from .. import bpathlib
 
 log = logging.getLogger(__name__)
@@ -42,11 +51,34 @@ BFBList = typing.List["BlendFileBlock"]
 
 _cached_bfiles = {}  # type: typing.Dict[pathlib.Path, BlendFile]
 
+# Default for set_max_open_files().
+DEFAULT_MAX_OPEN_FILES = 256
+_max_open_files = DEFAULT_MAX_OPEN_FILES
+
+# Cached blend files that have their file open, least recently used first.
+_open_bfiles = (
+    collections.OrderedDict()
+)  # type: collections.OrderedDict[BlendFile, None]
+_open_bfiles_lock = threading.RLock()
+
+open_file_stats = {"suspended": 0, "reopened": 0}
+"""Number of times cached files were closed by the LRU, and opened again."""
+
 
 def open_cached(
-    path: pathlib.Path, mode="rb", assert_cached: typing.Optional[bool] = None
+    path: pathlib.Path,
+    mode="rb",
+    assert_cached: typing.Optional[bool] = None,
+    track_open: bool = True,
 ) -> "BlendFile":
-    """Open a blend file, ensuring it is only opened once."""
+    """Open a blend file, ensuring it is only opened once.
+
+    :param track_open: count a newly opened file as the most recently used
+        one, which may close the least recently used files, see
+        set_max_open_files(). Threads other than the one reading the blend
+        files pass False, and the reading thread calls mark_used() once it
+        uses the file, so that no file is closed while it is being read.
+    """
     my_log = log.getChild("open_cached")
     bfile_path = bpathlib.make_absolute(path)
 
@@ -57,40 +89,143 @@ def open_cached(
         elif not assert_cached and is_cached:
             raise AssertionError("File %s was cached" % bfile_path)
 
-    try:
-        bfile = _cached_bfiles[bfile_path]
-    except KeyError:
-        my_log.debug("Opening non-cached %s", path)
-        bfile = BlendFile(path, mode=mode)
-        _cached_bfiles[bfile_path] = bfile
-    else:
-        my_log.debug("Returning cached %s", path)
-
+    with _open_bfiles_lock:
+        bfile = _cached_bfiles.get(bfile_path)
+        if bfile is not None:
+            my_log.debug("Returning cached %s", path)
+            if track_open and not isinstance(bfile.fileobj, _SuspendedFile):
+                _mark_used(bfile)
+            return bfile
+
+    my_log.debug("Opening non-cached %s", path)
+    opened = BlendFile(path, mode=mode)
+    with _open_bfiles_lock:
+        bfile = _cached_bfiles.setdefault(bfile_path, opened)
+        if bfile is opened and track_open:
+            _mark_used(bfile)
+    if bfile is not opened:
+        # Another thread opened the same file first.
+        opened.close()
     return bfile
 
 
+def is_cached(path: pathlib.Path) -> bool:
+    """Return whether open_cached() has this blend file open already."""
+    return bpathlib.make_absolute(path) in _cached_bfiles
+
+
+def cached_paths() -> typing.Set[pathlib.Path]:
+    """Return the absolute paths of the blend files open_cached() has open."""
+    with _open_bfiles_lock:
+        return set(_cached_bfiles)
+
+
+def close_cached(paths: typing.Iterable[pathlib.Path]) -> None:
+    """Close the given blend files, if open_cached() has them open."""
+    with _open_bfiles_lock:
+        bfiles = [
+            _cached_bfiles[path]
+            for path in {bpathlib.make_absolute(path) for path in paths}
+            if path in _cached_bfiles
+        ]
+    log.debug("Closing %d cached blend files", len(bfiles))
+    for bfile in bfiles:
+        bfile.close()
+
+
 @atexit.register
 def close_all_cached() -> None:
     if not _cached_bfiles:
         # Don't even log anything when there is nothing to close
         return
 
-    log.debug("Closing %d cached blend files", len(_cached_bfiles))
-    for bfile in list(_cached_bfiles.values()):
+    with _open_bfiles_lock:
+        bfiles = list(_cached_bfiles.values())
+    log.debug("Closing %d cached blend files", len(bfiles))
+    for bfile in bfiles:
         bfile.close()
-    _cached_bfiles.clear()
+    with _open_bfiles_lock:
+        _cached_bfiles.clear()
 
 
 def _cache(path: pathlib.Path, bfile: "BlendFile"):
     """Add a BlendFile to the cache."""
     bfile_path = bpathlib.make_absolute(path)
-    _cached_bfiles[bfile_path] = bfile
+    with _open_bfiles_lock:
+        _cached_bfiles[bfile_path] = bfile
+        _mark_used(bfile)
+
+
+def mark_used(bfile: "BlendFile") -> None:
+    """Count a file opened with open_cached(track_open=False) as used."""
+    _mark_used(bfile)
+
+
+def _mark_used(bfile: "BlendFile") -> None:
+    """Mark a cached file as most recently used.
+
+    When more cached files are open than allowed by set_max_open_files(), the
+    least recently used ones are closed until they are accessed again.
+    """
+    with _open_bfiles_lock:
+        _open_bfiles[bfile] = None
+        _open_bfiles.move_to_end(bfile)
+        if not _max_open_files:
+            return
+
+        excess = len(_open_bfiles) - _max_open_files
+        for candidate in list(_open_bfiles):
+            if excess <= 0:
+                break
+            if candidate is bfile or not candidate.can_suspend:
+                continue
+            candidate._suspend()
+            excess -= 1
 
 
 def _uncache(path: pathlib.Path):
     """Remove a BlendFile object from the cache."""
     bfile_path = bpathlib.make_absolute(path)
-    _cached_bfiles.pop(bfile_path, None)
+    with _open_bfiles_lock:
+        _cached_bfiles.pop(bfile_path, None)
+
+
+def _stat_key(path: pathlib.Path) -> typing.Optional[typing.Tuple[int, int]]:
+    """Return (size, mtime) of the file, to detect changes on disk."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class _SuspendedFile:
+    """Stand-in for the file object of a BlendFile closed by the LRU.
+
+    Any use of the file object opens the blend file again, after which the
+    BlendFile uses the real file object directly.
+    """
+
+    closed = True
+
+    def __init__(self, bfile: "BlendFile") -> None:
+        self._bfile = bfile
+        self.closed_for_good = False
+        """Set when the BlendFile itself is closed; it then stays closed."""
+
+    def __getattr__(self, name: str) -> typing.Any:
+        return getattr(self._bfile._resume(), name)
+
+    def as_file(self) -> typing.IO[bytes]:
+        """Return this stand-in typed as the file object it stands in for.
+
+        Every attribute it does not have itself is taken from the reopened
+        file, so it can be used wherever the file object is.
+        """
+        return typing.cast(typing.IO[bytes], self)
+
+    def __repr__(self) -> str:
+        return "<%s of %r>" % (self.__class__.__qualname__, self._bfile.filepath)
 
 
 class BlendFile:
@@ -98,8 +233,11 @@ class BlendFile:
 
     :ivar filepath: which file this object represents.
     :ivar raw_filepath: which file is accessed; same as filepath for
-        uncompressed files, but a temporary file for compressed files.
+        uncompressed files and for ZStandard files that are decompressed on
+        demand, but a temporary file for other compressed files.
     :ivar fileobj: the file object that's being accessed.
+    :ivar mapping: read-only memory map of raw_filepath, or None when data is
+        read through fileobj. See BlendFile.use_mmap.
     """
 
     log = log.getChild("BlendFile")
@@ -110,6 +248,37 @@ class BlendFile:
     Set to False to disable this exception, and to return None instead.
     """
 
+    use_mmap = True
+    """Memory-map blend files that are opened read-only.
+
+    Fields of mapped files are decoded directly from the mapping, instead of
+    seeking and reading through the file object for every access. Files opened
+    for writing are never mapped. Set to False to always use the file object.
+    """
+
+    use_seekable_zstd = True
+    """Read multi-frame ZStandard files without decompressing them up front.
+
+    Blender writes ZStandard files as independent frames with a seek table,
+    so for read-only access only the frames that are actually read need to be
+    decompressed. Such files are read through their file object instead of a
+    memory map. Set to False to always decompress to a temporary file.
+    """
+
+    dna_cache_dir = None  # type: typing.Optional[pathlib.Path]
+    """Directory to store parsed DNA catalogs in, see dna_cache.
+
+    Catalogs are always shared between files within the same process. When
+    this is set, they are also stored on disk for use by other processes.
+    """
+
+    decompression_cache = None  # type: typing.Optional[decompressed_cache.DecompressedCache]
+    """Cache of decompressed copies of compressed blend files.
+
+    When this is None, compressed files opened read-only are decompressed to
+    a temporary file every time. See set_decompressed_cache_dir().
+    """
+
     def __init__(self, path: pathlib.Path, mode="rb") -> None:
         """Create a BlendFile instance for the blend file at the path.
 
@@ -122,18 +291,28 @@ class BlendFile:
         self.filepath = path
         self.raw_filepath = path
         self._is_modified = False
+        self._mode = mode
+        self._source_stat = None  # type: typing.Optional[typing.Tuple[int, int]]
         self.file_subversion = 0
         self.fileobj = self._open_file(path, mode)
+        self.mapping = self._map_file(mode)
 
-        self.blocks = []  # type: BFBList
+        self.block_table = block_table.BlockTable()
+        """Header fields of all blocks, see block_table.BlockTable."""
+        self._blocks_by_row = {}  # type: typing.Dict[int, BlendFileBlock]
+        self._id_name_index = (
+            {}
+        )  # type: typing.Dict[bytes, typing.Dict[bytes, BFBList]]
+
+        self.blocks = block_table.BlockList(self.block_table, self._block_at)
         """BlendFileBlocks of this file, in disk order."""
 
-        self.code_index = collections.defaultdict(
-            list
-        )  # type: typing.Dict[bytes, BFBList]
+        self.code_index = block_table.CodeIndex(self.block_table, self._block_at)
         self.structs = []  # type: typing.List[dna.Struct]
         self.sdna_index_from_id = {}  # type: typing.Dict[bytes, int]
-        self.block_from_addr = {}  # type: typing.Dict[int, BlendFileBlock]
+        self.block_from_addr = block_table.AddressIndex(
+            self.block_table, self._block_at
+        )
 
         self.header = header.BlendFileHeader(self.fileobj, self.raw_filepath)
         self.block_header_struct, self.block_header_fields = self.header.create_block_header_struct()
@@ -150,40 +329,84 @@ class BlendFile:
             correct magic bytes.
         """
 
-        decompressed = magic_compression.open(path, mode, FILE_BUFFER_SIZE)
+        decompressed = magic_compression.open(
+            path,
+            mode,
+            FILE_BUFFER_SIZE,
+            cache=self.decompression_cache,
+            seekable=self.use_seekable_zstd,
+        )
 
         self.filepath = path
         self.is_compressed = decompressed.is_compressed
         self.raw_filepath = decompressed.path
+        self._source_stat = _stat_key(path)
 
         return decompressed.fileobj
 
+    def _map_file(self, mode: str) -> typing.Optional[mmap.mmap]:
+        """Memory-map self.fileobj when it is opened read-only.
+
+        :returns: the mapping, or None when the file should be accessed
+            through self.fileobj instead.
+        """
+        if not self.use_mmap or not set(mode) <= {"r", "b"}:
+            return None
+
+        try:
+            # Decompressed files are still in the write buffer of their
+            # temporary file.
+            self.fileobj.flush()
+            return mmap.mmap(self.fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as ex:
+            # Not every file can be mapped, for example empty files or files
+            # on some network filesystems.
+            self.log.debug("Not memory-mapping %s: %s", self.raw_filepath, ex)
+            return None
+
     def _load_blocks(self) -> None:
-        """Read the blend file to load its DNA structure to memory."""
+        """Read the blend file to load its DNA structure to memory.
+
+        Only the block headers are read; BlendFileBlock objects are created
+        when they are accessed via self.blocks, self.code_index, or
+        self.block_from_addr.
+        """
 
         self.structs.clear()
         self.sdna_index_from_id.clear()
-        while True:
-            block = BlendFileBlock(self)
-            if block.code == b"ENDB":
-                break
-
-            if block.code == b"DNA1":
-                self.decode_structs(block)
-            elif block.code == b"GLOB":
-                self.decode_glob(block)
-            else:
-                self.fileobj.seek(block.size, os.SEEK_CUR)
+        self.block_table.scan(
+            self.fileobj,
+            self.mapping,
+            self.block_header_struct,
+            self.block_header_fields,
+            self.header.endian,
+            self.filepath,
+        )
 
-            self.blocks.append(block)
-            self.code_index[block.code].append(block)
-            self.block_from_addr[block.addr_old] = block
+        for block in self.code_index[b"GLOB"]:
+            self.decode_glob(block)
+        for block in self.code_index[b"DNA1"]:
+            self.decode_structs(block)
 
         if not self.structs:
             raise exceptions.NoDNA1Block(
                 "No DNA1 block in file, not a valid .blend file", self.filepath
             )
 
+    def _block_at(self, row: int) -> "BlendFileBlock":
+        """Return the block at this row of the block table.
+
+        Blocks are created on first access and reused afterwards, so that
+        changes like BlendFileBlock.refine_type() persist.
+        """
+        try:
+            return self._blocks_by_row[row]
+        except KeyError:
+            pass
+        block = BlendFileBlock(self, row)
+        self._blocks_by_row[row] = block
+        return block
+
     def __repr__(self) -> str:
         clsname = self.__class__.__qualname__
         if self.filepath == self.raw_filepath:
@@ -242,7 +465,9 @@ class BlendFile:
             shutil.copyfile(str(previous_path), str(path))
         _uncache(previous_path)
 
+        self._mode = mode
         self.fileobj = self._open_file(path, mode=mode)
+        self.mapping = self._map_file(mode)
         _cache(path, self)
 
     @property
@@ -258,6 +483,24 @@ class BlendFile:
         assert isinstance(code, bytes)
         return self.code_index[code]
 
+    def find_blocks_from_id_name(
+        self, code: bytes, id_name: bytes
+    ) -> typing.List["BlendFileBlock"]:
+        """Return the blocks with this code and ID name, in disk order.
+
+        The index for a code is built when it is first requested, so finding
+        many IDs in a big library costs a single pass over its blocks.
+        """
+        assert isinstance(code, bytes)
+        try:
+            index = self._id_name_index[code]
+        except KeyError:
+            index = {}
+            for block in self.code_index[code]:
+                index.setdefault(block.id_name, []).append(block)
+            self._id_name_index[code] = index
+        return index.get(id_name, [])
+
     def close(self) -> None:
         """Close the blend file.
 
@@ -266,6 +509,14 @@ class BlendFile:
         if not self.fileobj:
             return
 
+        with _open_bfiles_lock:
+            _open_bfiles.pop(self, None)
+        if isinstance(self.fileobj, _SuspendedFile):
+            # The file itself was already closed by the LRU.
+            self.fileobj.closed_for_good = True
+            self._uncache_self()
+            return
+
         if self._is_modified:
             log.debug("closing blend file %s after it was modified", self.raw_filepath)
 
@@ -281,15 +532,72 @@ class BlendFile:
                     gzfile.write(data)
             log.debug("GZip-compression to %s finished", self.filepath)
 
+        # The mapping has to be released before its file can be closed.
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
+
         # Close the file object after recompressing, as it may be a temporary
         # file that'll disappear as soon as we close it.
         self.fileobj.close()
         self._is_modified = False
+        self._uncache_self()
 
-        try:
-            del _cached_bfiles[self.filepath]
-        except KeyError:
-            pass
+    def _uncache_self(self) -> None:
+        with _open_bfiles_lock:
+            if _cached_bfiles.get(self.filepath) is self:
+                del _cached_bfiles[self.filepath]
+
+    @property
+    def can_suspend(self) -> bool:
+        """Whether the LRU of open files may close this file for now.
+
+        Only unmodified files that are open for reading can be reopened
+        without losing anything.
+        """
+        return (
+            set(self._mode) <= {"r", "b"}
+            and not self._is_modified
+            and not isinstance(self.fileobj, _SuspendedFile)
+            and not self.fileobj.closed
+        )
+
+    def _suspend(self) -> None:
+        """Close the file until it is accessed again.
+
+        Everything read from the file so far, including its blocks, stays
+        available; reading block data opens the file again.
+        """
+        self.log.debug("Closing %s until it is accessed again", self.filepath)
+        with _open_bfiles_lock:
+            if self.mapping is not None:
+                self.mapping.close()
+                self.mapping = None
+            self.fileobj.close()
+            self.fileobj = _SuspendedFile(self).as_file()
+            _open_bfiles.pop(self, None)
+            open_file_stats["suspended"] += 1
+
+    def _resume(self) -> typing.IO[bytes]:
+        """Open the file again after _suspend(), returning the file object."""
+        with _open_bfiles_lock:
+            if not isinstance(self.fileobj, _SuspendedFile):
+                # Another thread was first.
+                return self.fileobj
+            if self.fileobj.closed_for_good:
+                raise ValueError("I/O operation on closed file %s" % self.filepath)
+
+            if _stat_key(self.filepath) != self._source_stat:
+                raise exceptions.BlendFileError(
+                    "File changed on disk since it was opened", self.filepath
+                )
+            self.log.debug("Reopening %s", self.filepath)
+            fileobj = self._open_file(self.filepath, self._mode)
+            self.fileobj = fileobj
+            self.mapping = self._map_file(self._mode)
+            open_file_stats["reopened"] += 1
+            _mark_used(self)
+            return fileobj
 
     def ensure_subtype_smaller(self, sdna_index_curr, sdna_index_next) -> None:
         # never refine to a smaller type
@@ -307,12 +615,29 @@ class BlendFile:
     def decode_structs(self, block: "BlendFileBlock"):
         """
         DNACatalog is a catalog of all information in the DNA1 file-block
+
+        Files with the same DNA share the parsed catalog, see dna_cache.
+        """
+        catalog = dna_cache.catalog_for(
+            block.raw_data(),
+            self.header.pointer_size,
+            self.header.endian_str,
+            self._parse_dna_catalog,
+            cache_dir=self.dna_cache_dir,
+        )
+        self.structs.extend(catalog.structs)
+        self.sdna_index_from_id.update(catalog.sdna_index_from_id)
+
+    def _parse_dna_catalog(self, data) -> dna_cache.Catalog:
+        """Parse the contents of a DNA1 block.
+
+        Field offsets and sizes are computed here, once per catalog.
         """
         self.log.debug("building DNA catalog")
 
         # Get some names in the local scope for faster access.
-        structs = self.structs
-        sdna_index_from_id = self.sdna_index_from_id
+        structs = []  # type: typing.List[dna.Struct]
+        sdna_index_from_id = {}  # type: typing.Dict[bytes, int]
         endian = self.header.endian
         shortstruct = endian.USHORT
         shortstruct2 = endian.USHORT2
@@ -322,7 +647,6 @@ class BlendFile:
         def pad_up_4(off: int) -> int:
             return (off + 3) & ~3
 
-        data = self.fileobj.read(block.size)
         types = []
         typenames = []
 
@@ -389,6 +713,8 @@ class BlendFile:
                 dna_struct.append_field(field)
                 dna_offset += dna_size
 
+        return dna_cache.Catalog(structs, sdna_index_from_id)
+
     def decode_glob(self, block: "BlendFileBlock") -> None:
         """Partially decode the GLOB block to get the file sub-version."""
         # Before this, the subversion didn't exist in 'FileGlobal'.
@@ -402,12 +728,9 @@ class BlendFile:
         # The subversion is always the `short` at offset 4.
         # block_data = io.BytesIO(block.raw_data())
         endian = self.header.endian
-        self.fileobj.seek(4, os.SEEK_CUR)  # Skip the next 4 bytes.
+        self.fileobj.seek(block.file_offset + 4, os.SEEK_SET)
         self.file_subversion = endian.read_short(self.fileobj)
 
-        # Skip to the next block.
-        self.fileobj.seek(block.file_offset + block.size, os.SEEK_SET)
-
     def abspath(self, relpath: bpathlib.BlendPath) -> bpathlib.BlendPath:
         """Construct an absolute path from a blendfile-relative path."""
 
@@ -474,8 +797,6 @@ class BlendFileBlock:
     )
 
     log = log.getChild("BlendFileBlock")
-    old_structure = struct.Struct(b"4sI")
-    """old blend files ENDB block structure"""
 
     # Explicitly annotate to avoid `Any` from `.unpack()`.
     size: int
@@ -483,16 +804,21 @@ class BlendFileBlock:
     sdna_index: int
     count: int
 
-    def __init__(self, bfile: BlendFile) -> None:
+    def __init__(self, bfile: BlendFile, row: int) -> None:
+        """Create the block from a row of the file's block table.
+
+        Use the BlendFile's blocks, code_index, or block_from_addr to obtain
+        blocks, rather than constructing them directly.
+        """
         self.bfile = bfile
 
-        # Defaults; actual values are set by interpreting the block header.
-        self.code = b""
-        self.size = 0
-        self.addr_old = 0
-        self.sdna_index = 0
-        self.count = 0
-        self.file_offset = 0
+        table = bfile.block_table
+        self.code = table.code(row)
+        self.size = table.size[row]
+        self.addr_old = table.addr_old[row]
+        self.sdna_index = table.sdna_index[row]
+        self.count = table.count[row]
+        self.file_offset = table.file_offset[row]
         """Offset in bytes from start of file to beginning of the data block.
 
         Points to the data after the block header.
@@ -500,28 +826,6 @@ class BlendFileBlock:
         self.endian = bfile.header.endian
         self._id_name = ...  # type: typing.Union[None, ellipsis, bytes]
 
-        header_struct = bfile.block_header_struct
-        data = bfile.fileobj.read(header_struct.size)
-        if len(data) != header_struct.size:
-            self.log.warning(
-                "Blend file %s seems to be truncated, "
-                "expected %d bytes but could read only %d",
-                bfile.filepath,
-                header_struct.size,
-                len(data),
-            )
-            self.code = b"ENDB"
-            return
-
-        blockheader = bfile.block_header_fields(*header_struct.unpack(data))
-        self.code = self.endian.read_data0(blockheader.code)
-        if self.code != b"ENDB":
-            self.size = blockheader.len
-            self.addr_old = blockheader.old
-            self.sdna_index = blockheader.SDNAnr
-            self.count = blockheader.nr
-            self.file_offset = bfile.fileobj.tell()
-
     def __repr__(self) -> str:
         return "<%s.%s (%s), size=%d at %s>" % (
             self.__class__.__name__,
@@ -656,23 +960,37 @@ class BlendFileBlock:
                 )
             file_offset += array_index * self.dna_type.size
 
-        self.bfile.fileobj.seek(file_offset, os.SEEK_SET)
-
-        dna_struct = self.bfile.structs[self.sdna_index]
-        field, value = dna_struct.field_get(
-            self.bfile.header,
-            self.bfile.fileobj,
-            path,
-            default=default,
-            null_terminated=null_terminated,
-            as_str=as_str,
-        )
+        bfile = self.bfile
+        dna_struct = bfile.structs[self.sdna_index]
+        if bfile.mapping is not None:
+            field, value = dna_struct.field_unpack(
+                bfile.header,
+                bfile.mapping,
+                file_offset,
+                path,
+                default=default,
+                null_terminated=null_terminated,
+                as_str=as_str,
+            )
+        else:
+            bfile.fileobj.seek(file_offset, os.SEEK_SET)
+            field, value = dna_struct.field_get(
+                bfile.header,
+                bfile.fileobj,
+                path,
+                default=default,
+                null_terminated=null_terminated,
+                as_str=as_str,
+            )
         if return_field:
             return value, field
         return value
 
     def raw_data(self) -> bytes:
         """Read low-level raw data of this datablock."""
+        mapping = self.bfile.mapping
+        if mapping is not None:
+            return mapping[self.file_offset : self.file_offset + self.size]
         self.bfile.fileobj.seek(self.file_offset, os.SEEK_SET)
         return self.bfile.fileobj.read(self.size)
 
@@ -813,11 +1131,15 @@ class BlendFileBlock:
 
         endian = self.bfile.header.endian
         ps = self.bfile.header.pointer_size
+        mapping = self.bfile.mapping
 
         for i in range(array_size):
-            fileobj = self.bfile.fileobj
-            fileobj.seek(file_offset + ps * i, os.SEEK_SET)
-            address = endian.read_pointer(fileobj, ps)
+            if mapping is not None:
+                address = endian.unpack_pointer(mapping, file_offset + ps * i, ps)
+            else:
+                fileobj = self.bfile.fileobj
+                fileobj.seek(file_offset + ps * i, os.SEEK_SET)
+                address = endian.read_pointer(fileobj, ps)
             if address == 0:
                 continue
             dereferenced = self.bfile.dereference_pointer(address)
@@ -845,13 +1167,18 @@ class BlendFileBlock:
         ps = self.bfile.header.pointer_size
         endian = self.bfile.header.endian
         fileobj = self.bfile.fileobj
+        mapping = self.bfile.mapping
 
         field, offset_in_struct = dna_struct.field_from_path(ps, path)
         array_size = field.size // ps
 
         for i in range(array_size):
-            fileobj.seek(self.file_offset + offset_in_struct + ps * i, os.SEEK_SET)
-            address = endian.read_pointer(fileobj, ps)
+            item_offset = self.file_offset + offset_in_struct + ps * i
+            if mapping is not None:
+                address = endian.unpack_pointer(mapping, item_offset, ps)
+            else:
+                fileobj.seek(item_offset, os.SEEK_SET)
+                address = endian.read_pointer(fileobj, ps)
             if not address:
                 # Fixed-size arrays contain 0-pointers.
                 continue
@@ -910,3 +1237,75 @@ def set_strict_pointer_mode(strict_pointers: bool) -> None:
     """
 
     BlendFile.strict_pointer_mode = strict_pointers
+
+
+def set_mmap_mode(use_mmap: bool) -> None:
+    """Control whether read-only blend files are memory-mapped.
+
+    Memory mapping is the default, and makes field access considerably cheaper
+    as values are decoded straight from the mapping. Set to False to read every
+    field through the file object instead. This only affects files opened
+    after the call.
+    """
+
+    BlendFile.use_mmap = use_mmap
+
+
+def set_seekable_zstd_mode(use_seekable_zstd: bool) -> None:
+    """Control whether multi-frame ZStandard files are decompressed on demand.
+
+    This is the default for files opened read-only. Set to False to decompress
+    every compressed file to a temporary file when it is opened. This only
+    affects files opened after the call.
+    """
+
+    BlendFile.use_seekable_zstd = use_seekable_zstd
+
+
+def set_max_open_files(max_open_files: int) -> None:
+    """Limit the number of blend files that open_cached() keeps open.
+
+    When more files are open, the least recently used ones are closed. They
+    stay in the cache, and are opened again when their data is accessed, so
+    blocks obtained earlier remain usable. Only files that are opened
+    read-only and are unmodified are closed this way. Pass 0 for no limit.
+    """
+
+    global _max_open_files
+    _max_open_files = max(0, max_open_files)
+
+    with _open_bfiles_lock:
+        if not _open_bfiles:
+            return
+        # Apply the new limit to the files that are open already.
+        _mark_used(next(reversed(_open_bfiles)))
+
+
+def set_dna_cache_dir(cache_dir: typing.Optional[pathlib.Path]) -> None:
+    """Store parsed DNA catalogs in this directory, or None to disable.
+
+    Parsed catalogs are always shared within the process; the on-disk cache
+    lets other processes, like the next submission, skip parsing as well.
+    """
+
+    BlendFile.dna_cache_dir = cache_dir
+
+
+def set_decompressed_cache_dir(
+    cache_dir: typing.Optional[pathlib.Path],
+    max_bytes: int = decompressed_cache.DEFAULT_MAX_BYTES,
+) -> None:
+    """Keep decompressed copies of compressed blend files in this directory.
+
+    Compressed files that are opened read-only are then only decompressed
+    when they changed since they were last opened, also by other processes.
+    The least recently used copies are removed when the directory grows
+    beyond max_bytes. Pass None to disable the cache.
+    """
+
+    if cache_dir is None:
+        BlendFile.decompression_cache = None
+    else:
+        BlendFile.decompression_cache = decompressed_cache.DecompressedCache(
+            cache_dir, max_bytes
+        )
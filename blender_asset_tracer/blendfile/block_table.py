@@ -0,0 +1,321 @@
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# ***** END GPL LICENCE BLOCK *****
+"""Compact storage of the block headers of a blend file.
+
+Production blend files can contain millions of DATA blocks, of which only a
+small fraction is ever looked at when tracing dependencies. Instead of creating
+a BlendFileBlock for each of them, the block headers are scanned into packed
+arrays, and blocks are only created when they are accessed through one of the
+views in this module.
+"""
+
+import array
+import bisect
+import collections.abc
+import dataclasses
+import logging
+import os
+import pathlib
+import struct
+import typing
+
+from . import dna_io
+
+log = logging.getLogger(__name__)
+
+# Creates (and caches) the block object for a row of the table.
+BlockFactory = typing.Callable[[int], typing.Any]
+
+
+class BlockTable:
+    """Header fields of all blocks in a blend file, in disk order.
+
+    Every column is an array indexed by row number, where the row number is
+    the index of the block in the file. The ENDB block is not included.
+    """
+
+    def __init__(self) -> None:
+        self.codes = []  # type: typing.List[bytes]
+        """Distinct block codes; code_ids refers to this list."""
+
+        self.code_ids = array.array("H")
+        self.size = array.array("q")
+        self.addr_old = array.array("Q")
+        self.sdna_index = array.array("i")
+        self.count = array.array("q")
+        self.file_offset = array.array("Q")
+
+        self.rows_by_code = {}  # type: typing.Dict[bytes, array.array]
+        """Row numbers of the blocks with a certain code, in disk order."""
+
+    def __len__(self) -> int:
+        return len(self.code_ids)
+
+    def code(self, row: int) -> bytes:
+        return self.codes[self.code_ids[row]]
+
+    def scan(
+        self,
+        fileobj: typing.IO[bytes],
+        mapping: typing.Optional[typing.Any],
+        header_struct: struct.Struct,
+        header_fields: type,
+        endian: typing.Type[dna_io.EndianIO],
+        filepath: pathlib.Path,
+    ) -> None:
+        """Read all block headers, starting at the current file position.
+
+        Block data is skipped; when a memory map of the file is given, the
+        headers are decoded from that instead of read from fileobj.
+        """
+
+        names = [field.name for field in dataclasses.fields(header_fields)]
+        i_code = names.index("code")
+        i_size = names.index("len")
+        i_addr = names.index("old")
+        i_sdna = names.index("SDNAnr")
+        i_count = names.index("nr")
+
+        header_size = header_struct.size
+        unpack_from = header_struct.unpack_from
+
+        # Get some names in the local scope for faster access.
+        append_code_id = self.code_ids.append
+        append_size = self.size.append
+        append_addr = self.addr_old.append
+        append_sdna = self.sdna_index.append
+        append_count = self.count.append
+        append_offset = self.file_offset.append
+        code_id_from_raw = {}  # type: typing.Dict[bytes, int]
+        rows_per_code_id = []  # type: typing.List[array.array]
+
+        if mapping is not None:
+            data = mapping
+            data_len = len(mapping)
+        else:
+            data = b""
+            data_len = 0
+        offset = fileobj.tell()
+        row = 0
+
+        while True:
+            if mapping is None:
+                fileobj.seek(offset, os.SEEK_SET)
+                data = fileobj.read(header_size)
+                data_len = len(data)
+                header_offset = 0
+            else:
+                header_offset = offset
+
+            available = data_len - header_offset
+            if available < header_size:
+                log.warning(
+                    "Blend file %s seems to be truncated, "
+                    "expected %d bytes but could read only %d",
+                    filepath,
+                    header_size,
+                    max(available, 0),
+                )
+                break
+
+            values = unpack_from(data, header_offset)
+            raw_code = values[i_code]
+            code_id = code_id_from_raw.get(raw_code)
+            if code_id is None:
+                code = endian.read_data0(raw_code)
+                if code == b"ENDB":
+                    break
+                code_id = len(self.codes)
+                code_id_from_raw[raw_code] = code_id
+                self.codes.append(code)
+                rows_per_code_id.append(array.array("L"))
+
+            size = values[i_size]
+            offset += header_size
+
+            append_code_id(code_id)
+            append_size(size)
+            append_addr(values[i_addr])
+            append_sdna(values[i_sdna])
+            append_count(values[i_count])
+            append_offset(offset)
+            rows_per_code_id[code_id].append(row)
+
+            offset += size
+            row += 1
+
+        self.rows_by_code = dict(zip(self.codes, rows_per_code_id))
+
+        # Leave the file positioned after the last block header, just like
+        # reading the blocks one by one would.
+        fileobj.seek(offset + header_size, os.SEEK_SET)
+
+
+class BlockList(collections.abc.Sequence):
+    """All blocks of a blend file in disk order, created on access."""
+
+    def __init__(self, table: BlockTable, block_at: BlockFactory) -> None:
+        self._table = table
+        self._block_at = block_at
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __getitem__(self, index):
+        rows = range(len(self._table))
+        if isinstance(index, slice):
+            return [self._block_at(row) for row in rows[index]]
+        return self._block_at(rows[index])
+
+    def __iter__(self):
+        block_at = self._block_at
+        for row in range(len(self._table)):
+            yield block_at(row)
+
+    def __repr__(self) -> str:
+        return "<%s of %d blocks>" % (type(self).__qualname__, len(self))
+
+
+class CodeIndex(collections.abc.Mapping):
+    """Mapping from block code to the list of blocks with that code.
+
+    Like the defaultdict(list) it replaces, looking up an unknown code
+    produces an empty list. The lists are created on first access.
+    """
+
+    def __init__(self, table: BlockTable, block_at: BlockFactory) -> None:
+        self._table = table
+        self._block_at = block_at
+        self._lists = {}  # type: typing.Dict[bytes, list]
+
+    def __getitem__(self, code: bytes) -> list:
+        try:
+            return self._lists[code]
+        except KeyError:
+            pass
+
+        rows = self._table.rows_by_code.get(code, ())
+        blocks = [self._block_at(row) for row in rows]
+        self._lists[code] = blocks
+        return blocks
+
+    def __contains__(self, code: object) -> bool:
+        return code in self._table.rows_by_code or code in self._lists
+
+    def __iter__(self) -> typing.Iterator[bytes]:
+        yield from self._table.rows_by_code
+        for code in self._lists:
+            if code not in self._table.rows_by_code:
+                yield code
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def count(self, code: bytes) -> int:
+        """Return the number of blocks with this code, without creating them."""
+        if code in self._lists:
+            return len(self._lists[code])
+        return len(self._table.rows_by_code.get(code, ()))
+
+
+class AddressIndex(collections.abc.MutableMapping):
+    """Mapping from old memory address to block.
+
+    When multiple blocks share an address, the last one in the file wins.
+    The address lookup table is sorted on first use; blocks that have been
+    looked up are remembered, so repeated dereferencing is a dict lookup.
+    """
+
+    def __init__(self, table: BlockTable, block_at: BlockFactory) -> None:
+        self._table = table
+        self._block_at = block_at
+        self._sorted_addrs = None  # type: typing.Optional[array.array]
+        self._sorted_rows = None  # type: typing.Optional[array.array]
+        self._blocks = {}  # type: typing.Dict[int, typing.Any]
+        self._deleted = set()  # type: typing.Set[int]
+
+    def _ensure_sorted(self) -> None:
+        if self._sorted_addrs is not None:
+            return
+
+        addr_old = self._table.addr_old
+        # sorted() is stable, so of duplicate addresses the last row ends up
+        # last, which is the one _find_row() returns.
+        order = sorted(range(len(addr_old)), key=addr_old.__getitem__)
+        self._sorted_rows = array.array("L", order)
+        self._sorted_addrs = array.array("Q", map(addr_old.__getitem__, order))
+
+    def _find_row(self, address: int) -> int:
+        """Return the row of the block at this address, or -1."""
+        if address < 0:
+            return -1
+        self._ensure_sorted()
+        assert self._sorted_addrs is not None and self._sorted_rows is not None
+        index = bisect.bisect_right(self._sorted_addrs, address) - 1
+        if index < 0 or self._sorted_addrs[index] != address:
+            return -1
+        return self._sorted_rows[index]
+
+    def __getitem__(self, address: int):
+        try:
+            return self._blocks[address]
+        except KeyError:
+            pass
+
+        if address in self._deleted:
+            raise KeyError(address)
+        row = self._find_row(address)
+        if row < 0:
+            raise KeyError(address)
+
+        block = self._block_at(row)
+        self._blocks[address] = block
+        return block
+
+    def __contains__(self, address: object) -> bool:
+        if address in self._blocks:
+            return True
+        if not isinstance(address, int) or address in self._deleted:
+            return False
+        return self._find_row(address) >= 0
+
+    def __setitem__(self, address: int, block) -> None:
+        self._blocks[address] = block
+        self._deleted.discard(address)
+
+    def __delitem__(self, address: int) -> None:
+        if address not in self:
+            raise KeyError(address)
+        self._blocks.pop(address, None)
+        self._deleted.add(address)
+
+    def __iter__(self) -> typing.Iterator[int]:
+        self._ensure_sorted()
+        assert self._sorted_addrs is not None
+
+        previous = None
+        for address in self._sorted_addrs:
+            if address == previous:
+                continue
+            previous = address
+            if address not in self._deleted and address not in self._blocks:
+                yield address
+        yield from list(self._blocks)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
@@ -0,0 +1,170 @@
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# ***** END GPL LICENCE BLOCK *****
+"""Cache of decompressed blend files.
+
+Compressed blend files are decompressed to a temporary file every time they
+are opened. For libraries that do not change between runs, that work can be
+skipped by keeping the decompressed copies in a cache directory. Entries are
+keyed by the path, size, and modification time of the compressed file, so
+a changed file is simply decompressed into a new entry. When the cache grows
+beyond its size limit, the least recently used entries are removed.
+
+Cached copies are only used for read-only access; a file that is opened for
+writing is always decompressed to a private temporary file.
+"""
+
+import hashlib
+import logging
+import os
+import pathlib
+import tempfile
+import threading
+import typing
+
+from .. import bpathlib
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 10 * 1024**3
+
+stats = {"hits": 0, "misses": 0, "evicted": 0}
+"""Number of cache lookups per outcome, and of removed entries."""
+_stats_lock = threading.Lock()
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        for name in stats:
+            stats[name] = 0
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _stats_lock:
+        stats[name] += amount
+
+
+class DecompressedCache:
+    """Directory of decompressed blend files, limited in total size."""
+
+    def __init__(
+        self, directory: pathlib.Path, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def entry_path(self, path: pathlib.Path) -> pathlib.Path:
+        """Return the path of the cache entry for this compressed file."""
+        abspath = bpathlib.make_absolute(path)
+        stat = abspath.stat()
+        key = "%s\0%d\0%d" % (abspath, stat.st_size, stat.st_mtime_ns)
+        digest = hashlib.blake2b(key.encode("utf-8", "surrogateescape"), digest_size=20)
+        return self.directory / ("%s.blend" % digest.hexdigest())
+
+    def open(
+        self,
+        path: pathlib.Path,
+        decompress: typing.Callable[[typing.IO[bytes]], None],
+        buffer_size: int = -1,
+    ) -> typing.Optional[typing.Tuple[pathlib.Path, typing.IO[bytes]]]:
+        """Open the decompressed copy of the file, creating it when necessary.
+
+        :param decompress: function that writes the decompressed file to the
+            given file object.
+        :returns: the path and read-only file object of the decompressed
+            copy, or None when the cache directory cannot be used.
+        """
+        try:
+            entry = self.entry_path(path)
+        except OSError as ex:
+            log.debug("Not caching decompressed %s: %s", path, ex)
+            return None
+
+        try:
+            fileobj = entry.open("rb", buffering=buffer_size)
+        except FileNotFoundError:
+            pass
+        except OSError as ex:
+            log.warning("Unable to open cached decompressed file %s: %s", entry, ex)
+            return None
+        else:
+            _count("hits")
+            log.debug("Using cached decompressed %s for %s", entry, path)
+            try:
+                # Mark the entry as recently used, for prune().
+                os.utime(str(entry))
+            except OSError:
+                pass
+            return entry, fileobj
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Decompress to a temporary file first, so that concurrent readers
+            # never see a partially written file.
+            fd, tmpname = tempfile.mkstemp(
+                prefix=entry.stem + "-", suffix=".tmp", dir=str(self.directory)
+            )
+        except OSError as ex:
+            log.warning("Unable to write to decompressed cache %s: %s", self.directory, ex)
+            return None
+
+        _count("misses")
+        try:
+            with os.fdopen(fd, "wb") as outfile:
+                decompress(outfile)
+            os.replace(tmpname, str(entry))
+        except BaseException:
+            os.unlink(tmpname)
+            raise
+        log.debug("Cached decompressed %s as %s", path, entry)
+
+        fileobj = entry.open("rb", buffering=buffer_size)
+        self.prune(keep=entry)
+        return entry, fileobj
+
+    def prune(self, keep: typing.Optional[pathlib.Path] = None) -> None:
+        """Remove the least recently used entries until the cache fits.
+
+        :param keep: entry that must not be removed, because it is in use.
+        """
+        try:
+            entries = []
+            for entry in os.scandir(str(self.directory)):
+                if not entry.name.endswith(".blend"):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        except OSError as ex:
+            log.warning("Unable to inspect decompressed cache %s: %s", self.directory, ex)
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if keep is not None and entry_path == str(keep):
+                continue
+            try:
+                os.unlink(entry_path)
+            except FileNotFoundError:
+                pass
+            except OSError as ex:
+                # On Windows, files that are open elsewhere cannot be removed.
+                log.debug("Unable to remove decompressed %s: %s", entry_path, ex)
+                continue
+            total -= size
+            _count("evicted")
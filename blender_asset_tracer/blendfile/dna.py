@@ -21,6 +21,7 @@
 # (c) 2018, Blender Foundation - Sybren A. Stüvel
 import logging
 import os
+import struct
 import typing
 from typing import Optional
 
@@ -100,6 +101,16 @@ class Field:
         return "<%r %r (%s)>" % (type(self).__qualname__, self.name, self.dna_type)
 
 
+class FieldAccessor(typing.NamedTuple):
+    """Precompiled way to read a field, see Struct.field_accessor()."""
+
+    field: Field
+    offset: int
+    """Offset of the value relative to the start of the struct."""
+    decode: typing.Callable[[typing.Any, int], typing.Any]
+    """Function (buffer, absolute offset) -> value."""
+
+
 class Struct:
     """dna.Struct is a C-type structure stored in the DNA."""
 
@@ -116,6 +127,20 @@ class Struct:
         self._size = size
         self._fields = []  # type: typing.List[Field]
         self._fields_by_name = {}  # type: typing.Dict[bytes, Field]
+        self._accessors = (
+            {}
+        )  # type: typing.Dict[tuple, typing.Union[FieldAccessor, KeyError]]
+
+    def __getstate__(self) -> dict:
+        # Accessors contain closures, which cannot be pickled. They are cheap
+        # to rebuild, so just leave them out.
+        state = self.__dict__.copy()
+        state["_accessors"] = {}
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._accessors = {}
 
     def __repr__(self):
         return "%s(%r)" % (type(self).__qualname__, self.dna_type_id)
@@ -307,6 +332,173 @@ class Struct:
             return data.decode("utf8")
         return data
 
+    def field_unpack(
+        self,
+        file_header: header.BlendFileHeader,
+        data,
+        struct_offset: int,
+        path: FieldPath,
+        default=...,
+        null_terminated=True,
+        as_str=True,
+    ) -> typing.Tuple[typing.Optional[Field], typing.Any]:
+        """Decode the value of the field from an in-memory buffer.
+
+        This is the counterpart of field_get() for objects supporting the
+        buffer protocol, such as a memory-mapped blend file. The value is
+        decoded by the field's accessor, see field_accessor(), so no seeking
+        or intermediate reads are necessary.
+
+        :param data: the buffer to decode from.
+        :param struct_offset: offset in `data` of the start of the struct,
+            e.g. the file offset of the BlendFileBlock containing the data.
+        :returns: The field instance and the value. If a default value was passed
+            and the field was not found, (None, default) is returned.
+        """
+        try:
+            accessor = self.field_accessor(file_header, path, null_terminated, as_str)
+        except KeyError:
+            if default is ...:
+                raise
+            return None, default
+
+        return accessor.field, accessor.decode(data, struct_offset + accessor.offset)
+
+    def field_accessor(
+        self,
+        file_header: header.BlendFileHeader,
+        path: FieldPath,
+        null_terminated=True,
+        as_str=True,
+    ) -> FieldAccessor:
+        """Return the memoized accessor for this field.
+
+        Resolving a field path and choosing how to decode it is much more work
+        than the decoding itself, and the tracer reads the same few fields of
+        the same structs over and over again. This does that work only once
+        per (struct, path) and decoding options.
+
+        :raises KeyError: if the field does not exist.
+        :raises exceptions.NoReaderImplemented: if the field cannot be decoded.
+        """
+        key = (
+            path,
+            file_header.pointer_size,
+            file_header.endian,
+            null_terminated,
+            as_str,
+        )
+        try:
+            accessor = self._accessors[key]
+        except KeyError:
+            pass
+        else:
+            if isinstance(accessor, KeyError):
+                # Raise the same KeyError as the first time, without
+                # resolving the path again.
+                raise KeyError(*accessor.args)
+            return accessor
+
+        try:
+            field, offset = self.field_from_path(file_header.pointer_size, path)
+        except KeyError as ex:
+            # Remember the message, not the exception with its traceback.
+            self._accessors[key] = KeyError(*ex.args)
+            raise
+
+        decode = self._compile_decoder(
+            file_header, path, field, null_terminated, as_str
+        )
+        accessor = FieldAccessor(field, offset, decode)
+        self._accessors[key] = accessor
+        return accessor
+
+    def _compile_decoder(
+        self,
+        file_header: header.BlendFileHeader,
+        path: FieldPath,
+        field: Field,
+        null_terminated: typing.Optional[bool],
+        as_str: bool,
+    ) -> typing.Callable[[typing.Any, int], typing.Any]:
+        """Construct a function that decodes the field from a buffer.
+
+        The decoded values are the same as what field_get() returns.
+        """
+        dna_type = field.dna_type
+        dna_name = field.name
+        endian = file_header.endian
+
+        # Some special cases (pointers, strings/bytes)
+        if dna_name.is_pointer:
+            if file_header.pointer_size == 4:
+                unpack_pointer = endian.UINT.unpack_from
+            elif file_header.pointer_size == 8:
+                unpack_pointer = endian.ULONG.unpack_from
+            else:
+                raise ValueError(
+                    "unsupported pointer size %d" % file_header.pointer_size
+                )
+            return lambda data, offset: unpack_pointer(data, offset)[0]
+
+        if dna_type.dna_type_id == b"char":
+            return self._compile_char_decoder(
+                file_header, field, null_terminated, as_str
+            )
+
+        try:
+            simple_struct = endian.simple_types()[dna_type.dna_type_id]
+        except KeyError:
+            raise exceptions.NoReaderImplemented(
+                "%r exists but not simple type (%r), can't resolve field %r"
+                % (path, dna_type.dna_type_id.decode(), dna_name.name_only),
+                dna_name,
+                dna_type,
+            ) from None
+
+        # A path ending in an index gets a single item from an array, see
+        # field_get(); only whole arrays are returned as list.
+        is_item = isinstance(path, tuple) and len(path) > 1 and isinstance(path[-1], int)
+        if is_item or dna_name.array_size <= 1:
+            unpack_item = simple_struct.unpack_from
+            return lambda data, offset: unpack_item(data, offset)[0]
+
+        fmt = simple_struct.format
+        array_struct = struct.Struct(
+            "%s%d%s" % (fmt[0], dna_name.array_size, fmt[1:])
+        )
+        unpack_array = array_struct.unpack_from
+        return lambda data, offset: list(unpack_array(data, offset))
+
+    def _compile_char_decoder(
+        self,
+        file_header: header.BlendFileHeader,
+        field: Field,
+        null_terminated: typing.Optional[bool],
+        as_str: bool,
+    ) -> typing.Callable[[typing.Any, int], typing.Any]:
+        endian = file_header.endian
+
+        if field.size == 1:
+            # Single char, assume it's bitflag or int value, and not a string/bytes data...
+            unpack_char = endian.UCHAR.unpack_from
+            return lambda data, offset: unpack_char(data, offset)[0]
+
+        length = field.name.array_size
+        if null_terminated or (null_terminated is None and as_str):
+            unpack_bytes0 = endian.unpack_bytes0
+            if as_str:
+                return lambda data, offset: unpack_bytes0(data, offset, length).decode(
+                    "utf8"
+                )
+            return lambda data, offset: unpack_bytes0(data, offset, length)
+
+        if as_str:
+            return lambda data, offset: bytes(data[offset : offset + length]).decode(
+                "utf8"
+            )
+        return lambda data, offset: bytes(data[offset : offset + length])
+
     def field_set(
         self,
         file_header: header.BlendFileHeader,
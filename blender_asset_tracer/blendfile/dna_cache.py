@@ -0,0 +1,164 @@
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# ***** END GPL LICENCE BLOCK *****
+"""Cache of parsed DNA catalogs.
+
+All blend files saved by the same Blender build carry a byte-identical DNA1
+block. Parsing it is one of the more expensive parts of opening a file, so
+parsed catalogs are shared between BlendFile instances, keyed by a digest of
+the DNA1 data. Optionally the catalogs are also stored on disk, so that other
+processes can skip parsing too.
+
+The cached dna.Struct instances are shared between all files that use them,
+and must be treated as read-only after parsing.
+"""
+
+import dataclasses
+import hashlib
+import logging
+import os
+import pathlib
+import pickle
+import tempfile
+import threading
+import typing
+
+from . import dna
+
+log = logging.getLogger(__name__)
+
+# Bump this whenever the pickled classes in dna.py change in an incompatible way.
+DISK_FORMAT_VERSION = 1
+
+
+@dataclasses.dataclass
+class Catalog:
+    """Parsed contents of a DNA1 block."""
+
+    structs: typing.List[dna.Struct]
+    sdna_index_from_id: typing.Dict[bytes, int]
+
+
+CatalogKey = typing.Tuple[str, int, bytes]
+"""(digest of the DNA1 data, pointer size, endianness)."""
+
+_catalogs = {}  # type: typing.Dict[CatalogKey, Catalog]
+_lock = threading.Lock()
+
+stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+"""Number of cache lookups per outcome, for diagnostics."""
+
+
+def digest(data) -> str:
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def catalog_for(
+    data,
+    pointer_size: int,
+    endian_str: bytes,
+    parse: typing.Callable[[typing.Any], Catalog],
+    cache_dir: typing.Optional[pathlib.Path] = None,
+) -> Catalog:
+    """Return the catalog of this DNA1 data, parsing it only when necessary.
+
+    :param data: the contents of the DNA1 block.
+    :param parse: function that parses `data` into a Catalog.
+    :param cache_dir: directory for the on-disk cache, or None to only cache
+        in memory.
+    """
+    key = (digest(data), pointer_size, endian_str)
+
+    with _lock:
+        catalog = _catalogs.get(key)
+        if catalog is not None:
+            stats["hits"] += 1
+            return catalog
+
+    if cache_dir is not None:
+        catalog = _load(cache_dir, key)
+        if catalog is not None:
+            stats["disk_hits"] += 1
+
+    if catalog is None:
+        stats["misses"] += 1
+        catalog = parse(data)
+        if cache_dir is not None:
+            _save(cache_dir, key, catalog)
+
+    with _lock:
+        # Another thread may have parsed the same catalog in the meantime.
+        # Keep the first one, so that all files share the same instances.
+        return _catalogs.setdefault(key, catalog)
+
+
+def clear() -> None:
+    """Forget all in-memory catalogs, and reset the statistics."""
+    with _lock:
+        _catalogs.clear()
+        for name in stats:
+            stats[name] = 0
+
+
+def _disk_path(cache_dir: pathlib.Path, key: CatalogKey) -> pathlib.Path:
+    hexdigest, pointer_size, endian_str = key
+    endian = "le" if endian_str == b"<" else "be"
+    return cache_dir / (
+        "dna-v%d-%s-%d%s.pickle"
+        % (DISK_FORMAT_VERSION, hexdigest, pointer_size * 8, endian)
+    )
+
+
+def _load(cache_dir: pathlib.Path, key: CatalogKey) -> typing.Optional[Catalog]:
+    path = _disk_path(cache_dir, key)
+    try:
+        with path.open("rb") as infile:
+            catalog = pickle.load(infile)
+    except FileNotFoundError:
+        return None
+    except Exception as ex:
+        # A broken cache file is not a reason to fail; parse the DNA instead.
+        log.warning("Ignoring unreadable DNA cache file %s: %s", path, ex)
+        return None
+
+    if not isinstance(catalog, Catalog):
+        log.warning("Ignoring DNA cache file %s with unexpected contents", path)
+        return None
+    log.debug("Loaded DNA catalog from %s", path)
+    return catalog
+
+
+def _save(cache_dir: pathlib.Path, key: CatalogKey, catalog: Catalog) -> None:
+    path = _disk_path(cache_dir, key)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, so that concurrent readers never
+        # see a partially written catalog.
+        fd, tmpname = tempfile.mkstemp(
+            prefix=path.stem + "-", suffix=".tmp", dir=str(cache_dir)
+        )
+        try:
+            with os.fdopen(fd, "wb") as outfile:
+                pickle.dump(catalog, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpname, str(path))
+        except BaseException:
+            os.unlink(tmpname)
+            raise
+    except OSError as ex:
+        log.warning("Unable to write DNA cache file %s: %s", path, ex)
+        return
+    log.debug("Saved DNA catalog to %s", path)
@@ -129,6 +129,16 @@ class EndianIO:
             return cls.read_ulong(fileobj)
         raise ValueError("unsupported pointer size %d" % pointer_size)
 
+    @classmethod
+    def unpack_pointer(cls, data, offset: int, pointer_size: int):
+        """Decode a pointer from a buffer, without copying it."""
+
+        if pointer_size == 4:
+            return cls.UINT.unpack_from(data, offset)[0]
+        if pointer_size == 8:
+            return cls.ULONG.unpack_from(data, offset)[0]
+        raise ValueError("unsupported pointer size %d" % pointer_size)
+
     @classmethod
     def parse_pointer(cls, pointer_data: bytes):
         """Parse bytes as a pointer value."""
@@ -208,6 +218,11 @@ class EndianIO:
         data = fileobj.read(length)
         return cls.read_data0(data)
 
+    @classmethod
+    def unpack_bytes0(cls, data, offset: int, length: int) -> bytes:
+        """Like read_bytes0(), but reads from a buffer at the given offset."""
+        return cls.read_data0(data[offset : offset + length])
+
     @classmethod
     def read_data0_offset(cls, data: bytes, offset: int) -> bytes:
         add = data.find(b"\0", offset) - offset
@@ -220,6 +235,23 @@ class EndianIO:
             return data
         return data[:add]
 
+    @classmethod
+    def simple_types(cls) -> typing.Dict[bytes, struct.Struct]:
+        """Return a mapping from DNA type name to the Struct that decodes it.
+
+        This is the buffer-based counterpart of the simple readers used by
+        dna.Struct.field_get(), for use with struct.unpack_from().
+        """
+        return {
+            b"uchar": cls.UCHAR,
+            b"int": cls.SINT,
+            b"short": cls.SSHORT,
+            b"ushort": cls.USHORT,
+            b"uint64_t": cls.ULONG,
+            b"float": cls.FLOAT,
+            b"int8_t": cls.SINT8,
+        }
+
     @classmethod
     def accepted_types(cls):
         """Return a mapping from type name to writer function.
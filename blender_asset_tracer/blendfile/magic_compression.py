@@ -37,7 +37,7 @@ try:
 except ImportError:
     has_zstandard = False
 
-from . import exceptions
+from . import decompressed_cache, exceptions, zstd_seekable
 
 # Magic numbers, see https://en.wikipedia.org/wiki/List_of_file_signatures
 BLENDFILE_MAGIC = b"BLENDER"
@@ -70,8 +70,23 @@ class Compression(enum.Enum):
     ZSTD = 2
 
 
-def open(path: pathlib.Path, mode: str, buffer_size: int) -> DecompressedFileInfo:
-    """Open the file, decompressing it into a temporary file if necesssary."""
+def open(
+    path: pathlib.Path,
+    mode: str,
+    buffer_size: int,
+    cache: typing.Optional["decompressed_cache.DecompressedCache"] = None,
+    seekable: bool = False,
+) -> DecompressedFileInfo:
+    """Open the file, decompressing it into a temporary file if necesssary.
+
+    :param cache: when given, and the file is opened read-only, compressed
+        files are decompressed into this cache instead of a temporary file,
+        and earlier decompressed copies are reused.
+    :param seekable: when True, and the file is opened read-only, multi-frame
+        ZStandard files are not decompressed up front. Instead, the returned
+        file object decompresses the frames that are read from, and the
+        returned path is the compressed file itself. See zstd_seekable.
+    """
     fileobj = path.open(mode, buffering=buffer_size)  # typing.IO[bytes]
     compression = find_compression_type(fileobj)
 
@@ -88,10 +103,63 @@ def open(path: pathlib.Path, mode: str, buffer_size: int) -> DecompressedFileInf
 
     log.debug("%s-compressed blendfile detected: %s", compression.name, path)
 
+    read_only = set(mode) <= {"r", "b"}
+    if seekable and read_only and compression == Compression.ZSTD:
+        reader = zstd_seekable.open_seekable(fileobj)
+        if reader is not None:
+            if reader.read(len(BLENDFILE_MAGIC)) != BLENDFILE_MAGIC:
+                reader.close()
+                raise exceptions.BlendFileError(
+                    "Compressed file is not a blend file", path
+                )
+            reader.seek(0, os.SEEK_SET)
+            log.debug("Reading %d zstd frames on demand", reader.frame_count)
+            return DecompressedFileInfo(
+                is_compressed=True,
+                path=path,
+                fileobj=typing.cast(typing.IO[bytes], reader),
+            )
+
+    def decompress(outfile: typing.IO[bytes]) -> None:
+        _decompress_into(fileobj, mode, compression, path, outfile, buffer_size)
+
+    if cache is not None and read_only:
+        try:
+            cached = cache.open(path, decompress, buffer_size)
+        except BaseException:
+            fileobj.close()
+            raise
+        if cached is not None:
+            fileobj.close()
+            cached_path, cached_fileobj = cached
+            return DecompressedFileInfo(
+                is_compressed=True,
+                path=cached_path,
+                fileobj=cached_fileobj,
+            )
+
     # Decompress to a temporary file.
     tmpfile = tempfile.NamedTemporaryFile()
-    fileobj.seek(0, os.SEEK_SET)
+    decompress(typing.cast(typing.IO[bytes], tmpfile))
 
+    # Further interaction should be done with the uncompressed file.
+    fileobj.close()
+    return DecompressedFileInfo(
+        is_compressed=True,
+        path=pathlib.Path(tmpfile.name),
+        fileobj=tmpfile,
+    )
+
+
+def _decompress_into(
+    fileobj: typing.IO[bytes],
+    mode: str,
+    compression: Compression,
+    path: pathlib.Path,
+    outfile: typing.IO[bytes],
+    buffer_size: int,
+) -> None:
+    fileobj.seek(0, os.SEEK_SET)
     decompressor = _decompressor(fileobj, mode, compression)
 
     with decompressor as compressed_file:
@@ -101,17 +169,9 @@ def open(path: pathlib.Path, mode: str, buffer_size: int) -> DecompressedFileInf
 
         data = magic
         while data:
-            tmpfile.write(data)
+            outfile.write(data)
             data = compressed_file.read(buffer_size)
 
-    # Further interaction should be done with the uncompressed file.
-    fileobj.close()
-    return DecompressedFileInfo(
-        is_compressed=True,
-        path=pathlib.Path(tmpfile.name),
-        fileobj=tmpfile,
-    )
-
 
 def find_compression_type(fileobj: typing.IO[bytes]) -> Compression:
     fileobj.seek(0, os.SEEK_SET)
@@ -0,0 +1,342 @@
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# ***** END GPL LICENCE BLOCK *****
+"""Random access to ZStandard-compressed blend files.
+
+Blender writes ZStandard-compressed blend files as a sequence of independent
+frames, followed by a seek table in the "seekable format" of the ZStandard
+contrib code. This makes it possible to read any part of the file by only
+decompressing the frames that contain it, instead of decompressing the entire
+file before reading its first block header.
+
+The frame index is taken from the seek table. Files without one are indexed
+by walking the frame headers, which only works when every frame records its
+decompressed size.
+"""
+
+import bisect
+import collections
+import dataclasses
+import io
+import logging
+import os
+import struct
+import typing
+
+try:
+    import zstandard
+
+    has_zstandard = True
+except ImportError:
+    has_zstandard = False
+
+log = logging.getLogger(__name__)
+
+ZSTD_FRAME_MAGIC = 0xFD2FB528
+SKIPPABLE_MAGIC_MIN = 0x184D2A50
+SKIPPABLE_MAGIC_MAX = 0x184D2A5F
+SEEK_TABLE_MAGIC = 0x184D2A5E
+SEEKABLE_FOOTER_MAGIC = 0x8F92EAB1
+
+_footer = struct.Struct("<IBI")  # Number_Of_Frames, Descriptor, Seekable_Magic
+_skippable_header = struct.Struct("<II")  # Magic, Frame_Size
+_block_header_size = 3
+
+# Upper limit of the frame header size, see the ZStandard format spec.
+_MAX_FRAME_HEADER_SIZE = 18
+
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+
+
+@dataclasses.dataclass(frozen=True)
+class Frame:
+    compressed_offset: int
+    compressed_size: int
+    offset: int
+    """Offset of the first decompressed byte of this frame."""
+    size: int
+    """Decompressed size of this frame."""
+
+
+def read_frame_index(fileobj: typing.IO[bytes]) -> typing.Optional[typing.List[Frame]]:
+    """Return the frames of a ZStandard-compressed file.
+
+    :returns: the frames in file order, or None if the file cannot be
+        indexed. In that case it has to be decompressed as a stream.
+    """
+    fileobj.seek(0, os.SEEK_END)
+    file_size = fileobj.tell()
+
+    sizes = _read_seek_table(fileobj, file_size)
+    if sizes is None:
+        sizes = _scan_frame_headers(fileobj, file_size)
+    if sizes is None:
+        return None
+
+    frames = []
+    compressed_offset = offset = 0
+    for compressed_size, size in sizes:
+        frames.append(Frame(compressed_offset, compressed_size, offset, size))
+        compressed_offset += compressed_size
+        offset += size
+    return frames
+
+
+def _read_seek_table(
+    fileobj: typing.IO[bytes], file_size: int
+) -> typing.Optional[typing.List[typing.Tuple[int, int]]]:
+    """Return (compressed size, decompressed size) from the seek table."""
+    if file_size < _skippable_header.size + _footer.size:
+        return None
+    fileobj.seek(file_size - _footer.size)
+    num_frames, descriptor, magic = _footer.unpack(fileobj.read(_footer.size))
+    if magic != SEEKABLE_FOOTER_MAGIC or descriptor & 0x7C:
+        # No seek table, or reserved bits are set.
+        return None
+
+    entry_size = 12 if descriptor & 0x80 else 8
+    table_size = num_frames * entry_size
+    frame_size = table_size + _footer.size
+    table_start = file_size - frame_size - _skippable_header.size
+    if table_start < 0:
+        return None
+
+    fileobj.seek(table_start)
+    data = fileobj.read(_skippable_header.size + table_size)
+    skippable_magic, skippable_size = _skippable_header.unpack_from(data)
+    if skippable_magic != SEEK_TABLE_MAGIC or skippable_size != frame_size:
+        return None
+
+    sizes = [
+        struct.unpack_from("<II", data, _skippable_header.size + index * entry_size)
+        for index in range(num_frames)
+    ]
+    if sum(compressed for compressed, _ in sizes) != table_start:
+        log.debug("Seek table does not match the file size, ignoring it")
+        return None
+    return sizes
+
+
+def _scan_frame_headers(
+    fileobj: typing.IO[bytes], file_size: int
+) -> typing.Optional[typing.List[typing.Tuple[int, int]]]:
+    """Return (compressed size, decompressed size) by walking the frames.
+
+    Skippable frames are included with a decompressed size of 0.
+    """
+    sizes = []
+    offset = 0
+    while offset < file_size:
+        fileobj.seek(offset)
+        header = fileobj.read(_MAX_FRAME_HEADER_SIZE)
+        if len(header) < 4:
+            return None
+        (magic,) = struct.unpack_from("<I", header)
+
+        if SKIPPABLE_MAGIC_MIN <= magic <= SKIPPABLE_MAGIC_MAX:
+            if len(header) < _skippable_header.size:
+                return None
+            _, frame_size = _skippable_header.unpack_from(header)
+            compressed_size = _skippable_header.size + frame_size
+            sizes.append((compressed_size, 0))
+            offset += compressed_size
+            continue
+
+        if magic != ZSTD_FRAME_MAGIC:
+            return None
+
+        try:
+            params = zstandard.get_frame_parameters(header)
+            header_size = zstandard.frame_header_size(header)
+        except zstandard.ZstdError:
+            return None
+        if params.content_size == zstandard.CONTENTSIZE_UNKNOWN:
+            return None
+
+        # Walk the blocks to find where the frame ends.
+        position = offset + header_size
+        while True:
+            fileobj.seek(position)
+            block_header = fileobj.read(_block_header_size)
+            if len(block_header) < _block_header_size:
+                return None
+            value = int.from_bytes(block_header, "little")
+            is_last = value & 1
+            block_type = (value >> 1) & 3
+            block_size = value >> 3
+            if block_type == 3:
+                # Reserved block type.
+                return None
+            # RLE blocks store a single byte, regardless of their size.
+            position += _block_header_size + (1 if block_type == 1 else block_size)
+            if is_last:
+                break
+        if params.has_checksum:
+            position += 4
+
+        sizes.append((position - offset, params.content_size))
+        offset = position
+
+    return sizes
+
+
+class SeekableZstdReader(io.RawIOBase):
+    """Read-only, seekable file object of a multi-frame ZStandard file.
+
+    Only the frames that contain requested bytes are decompressed. The most
+    recently used decompressed frames are kept in memory, up to cache_bytes.
+    """
+
+    def __init__(
+        self,
+        fileobj: typing.IO[bytes],
+        frames: typing.List[Frame],
+        cache_bytes: int = DEFAULT_CACHE_BYTES,
+    ) -> None:
+        super().__init__()
+        self._fileobj = fileobj
+        self._frames = [frame for frame in frames if frame.size]
+        self._frame_offsets = [frame.offset for frame in self._frames]
+        self._size = frames[-1].offset + frames[-1].size if frames else 0
+        self._position = 0
+        self._dctx = zstandard.ZstdDecompressor()
+
+        self.cache_bytes = cache_bytes
+        self._cache = (
+            collections.OrderedDict()
+        )  # type: collections.OrderedDict[int, bytes]
+        self._cached_bytes = 0
+
+        self.frames_decompressed = 0
+        """Number of times a frame was decompressed, for diagnostics."""
+
+    @property
+    def frame_count(self) -> int:
+        return len(self._frames)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            position = offset
+        elif whence == os.SEEK_CUR:
+            position = self._position + offset
+        elif whence == os.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError("invalid whence (%r)" % whence)
+        if position < 0:
+            raise ValueError("negative seek position %d" % position)
+        self._position = position
+        return position
+
+    def read(self, size: typing.Optional[int] = -1) -> bytes:
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        start = self._position
+        if size is None or size < 0:
+            end = self._size
+        else:
+            end = min(start + size, self._size)
+        if start >= end:
+            return b""
+
+        index = bisect.bisect_right(self._frame_offsets, start) - 1
+        frame = self._frames[index]
+        data = self._frame_data(index)
+        if end <= frame.offset + frame.size:
+            # The common case: the read is contained in a single frame.
+            result = data[start - frame.offset : end - frame.offset]
+        else:
+            parts = [data[start - frame.offset :]]
+            while frame.offset + frame.size < end:
+                index += 1
+                frame = self._frames[index]
+                data = self._frame_data(index)
+                parts.append(data[: end - frame.offset])
+            result = b"".join(parts)
+
+        self._position = end
+        return result
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def readall(self) -> bytes:
+        return self.read(-1)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._fileobj.close()
+            self._cache.clear()
+            self._cached_bytes = 0
+        super().close()
+
+    def _frame_data(self, index: int) -> bytes:
+        try:
+            data = self._cache[index]
+        except KeyError:
+            pass
+        else:
+            self._cache.move_to_end(index)
+            return data
+
+        frame = self._frames[index]
+        self._fileobj.seek(frame.compressed_offset)
+        compressed = self._fileobj.read(frame.compressed_size)
+        data = self._dctx.decompress(compressed, max_output_size=frame.size)
+        if len(data) != frame.size:
+            raise IOError(
+                "Frame at offset %d decompressed to %d bytes instead of %d"
+                % (frame.compressed_offset, len(data), frame.size)
+            )
+        self.frames_decompressed += 1
+
+        self._cache[index] = data
+        self._cached_bytes += len(data)
+        # Always keep the frame that was just decompressed.
+        while self._cached_bytes > self.cache_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+        return data
+
+
+def open_seekable(
+    fileobj: typing.IO[bytes], cache_bytes: int = DEFAULT_CACHE_BYTES
+) -> typing.Optional[SeekableZstdReader]:
+    """Return a seekable reader for the file, or None if not possible.
+
+    Single-frame files are not worth indexing, as reading any part of them
+    requires decompressing everything before it anyway.
+    """
+    if not has_zstandard:
+        return None
+    frames = read_frame_index(fileobj)
+    if frames is None:
+        return None
+    if sum(1 for frame in frames if frame.size) < 2:
+        return None
+    return SeekableZstdReader(fileobj, frames, cache_bytes)
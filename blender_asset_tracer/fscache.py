@@ -0,0 +1,411 @@
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# ***** END GPL LICENCE BLOCK *****
+"""Memoized filesystem metadata.
+
+Tracing, packing and building an upload manifest inspect the same files
+several times: whether they are directories, whether they can be opened,
+and how large they are. On network shares and cloud drives every one of
+those checks is a round trip.
+
+While a FilesystemCache is enabled with enable(), the functions of this
+module answer those questions from memory. Each directory is listed once
+with os.scandir(), and the type and stat result of its entries are kept.
+Paths that are not in the listing of their directory, such as cloud
+placeholders that are not listed yet, are stat'ed individually. Without
+an enabled cache, the functions just ask the filesystem.
+
+The cache does not notice changes on disk, so it should only be enabled
+for as long as the files are not expected to change.
+
+A cache can be given a missing_cache.MissingPathCache, which outlives it.
+Files that could not be opened because they do not exist are then
+recorded there, and are reported missing without touching the filesystem
+by later caches, for as long as their directory does not change. The same
+goes for everything below an unreachable drive or network share, which
+each cache checks once with os.stat() before trusting the entry.
+"""
+
+import dataclasses
+import errno
+import logging
+import os
+import stat
+import threading
+import typing
+
+from . import missing_cache
+
+log = logging.getLogger(__name__)
+
+PathLike = typing.Union[str, "os.PathLike[str]"]
+Listing = typing.Dict[str, os.DirEntry]
+ProbeResult = typing.Tuple[bool, typing.Optional[Exception]]
+"""(whether the entire file was read, exception raised while reading)"""
+
+
+@dataclasses.dataclass
+class FilesystemCacheStats:
+    lookups: int = 0
+    """Number of questions answered, from memory or from the filesystem."""
+    scandir_calls: int = 0
+    stat_calls: int = 0
+    open_calls: int = 0
+    primed_directories: int = 0
+
+    @property
+    def syscalls(self) -> int:
+        return self.scandir_calls + self.stat_calls + self.open_calls
+
+    def as_dict(self) -> typing.Dict[str, int]:
+        return {**dataclasses.asdict(self), "syscalls": self.syscalls}
+
+
+Primer = typing.Callable[[str], None]
+
+
+class FilesystemCache:
+    """Directory listings, stat results and open() outcomes by path."""
+
+    def __init__(self, missing: typing.Optional[missing_cache.MissingPathCache] = None) -> None:
+        self.stats = FilesystemCacheStats()
+        self.missing = missing
+        self._listings = {}  # type: typing.Dict[str, typing.Optional[Listing]]
+        self._listing_locks = {}  # type: typing.Dict[str, threading.Lock]
+        self._stat_results = {}  # type: typing.Dict[str, typing.Optional[os.stat_result]]
+        self._probes = {}  # type: typing.Dict[str, ProbeResult]
+        self._primed = set()  # type: typing.Set[str]
+        self._reachable_roots = {}  # type: typing.Dict[str, bool]
+        self._lock = threading.Lock()
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self.stats, field, getattr(self.stats, field) + 1)
+
+    def listdir(self, directory: PathLike) -> typing.Optional[Listing]:
+        """Return the entries of the directory by name, or None if it cannot be listed."""
+        key = os.fspath(directory)
+        self._count("lookups")
+        return self._listing(key)
+
+    def _listing(self, key: str) -> typing.Optional[Listing]:
+        try:
+            return self._listings[key]
+        except KeyError:
+            pass
+
+        # Threads asking for the same directory wait for one listing.
+        with self._listing_locks.setdefault(key, threading.Lock()):
+            if key in self._listings:
+                return self._listings[key]
+            if self._known_missing(key):
+                self._listings[key] = None
+                return None
+            self._count("scandir_calls")
+            try:
+                with os.scandir(key) as it:
+                    listing = {
+                        entry.name: entry for entry in it
+                    }  # type: typing.Optional[Listing]
+            except OSError as ex:
+                log.debug("Unable to list %s: %s", key, ex)
+                listing = None
+            self._listings[key] = listing
+            return listing
+
+    def prime_once(self, directory: PathLike, primer: Primer) -> None:
+        """Call primer(directory) the first time the directory is primed.
+
+        Priming wakes up a cloud-mounted directory, after which it may list
+        more files than before. A listing made before priming is dropped, so
+        that the next listing shows the woken directory.
+        """
+        key = os.fspath(directory)
+        with self._lock:
+            if key in self._primed:
+                return
+            self._primed.add(key)
+            self.stats.primed_directories += 1
+        primer(key)
+        with self._listing_locks.setdefault(key, threading.Lock()):
+            self._listings.pop(key, None)
+
+    def _entry(self, key: str) -> typing.Optional[os.DirEntry]:
+        parent, name = os.path.split(key)
+        if not name:
+            return None
+        listing = self._listing(parent or os.curdir)
+        if listing is None:
+            return None
+        return listing.get(name)
+
+    def stat(self, path: PathLike) -> typing.Optional[os.stat_result]:
+        """Return the stat result of the path, following symlinks, or None."""
+        key = os.fspath(path)
+        self._count("lookups")
+        return self._stat(key)
+
+    def _stat(self, key: str) -> typing.Optional[os.stat_result]:
+        try:
+            return self._stat_results[key]
+        except KeyError:
+            pass
+
+        if self._known_missing(key):
+            self._stat_results[key] = None
+            return None
+        entry = self._entry(key)
+        self._count("stat_calls")
+        result = None  # type: typing.Optional[os.stat_result]
+        try:
+            result = entry.stat() if entry is not None else os.stat(key)
+        except OSError:
+            pass
+        self._stat_results[key] = result
+        return result
+
+    def is_dir(self, path: PathLike) -> bool:
+        key = os.fspath(path)
+        self._count("lookups")
+        entry = self._entry(key)
+        if entry is not None and key not in self._stat_results:
+            try:
+                return entry.is_dir()
+            except OSError:
+                pass
+        result = self._stat(key)
+        return result is not None and stat.S_ISDIR(result.st_mode)
+
+    def is_file(self, path: PathLike) -> bool:
+        key = os.fspath(path)
+        self._count("lookups")
+        entry = self._entry(key)
+        if entry is not None and key not in self._stat_results:
+            try:
+                return entry.is_file()
+            except OSError:
+                pass
+        result = self._stat(key)
+        return result is not None and stat.S_ISREG(result.st_mode)
+
+    def exists(self, path: PathLike) -> bool:
+        key = os.fspath(path)
+        self._count("lookups")
+        if self._entry(key) is not None:
+            return True
+        return self._stat(key) is not None
+
+    def getsize(self, path: PathLike) -> int:
+        """Return the size of the file, raising FileNotFoundError if it does not exist."""
+        result = self.stat(path)
+        if result is None:
+            raise FileNotFoundError(2, "No such file or directory", os.fspath(path))
+        return result.st_size
+
+    def probe(self, path: PathLike, read_all: bool = False) -> typing.Optional[Exception]:
+        """Open the file and read from it, returning the exception that occurred.
+
+        :param read_all: read the entire file instead of only the first byte.
+            On cloud drives this downloads files that are not available
+            locally. A successful read of the entire file also answers later
+            probes that only read the first byte.
+        :returns: None if the file could be read.
+        """
+        key = os.fspath(path)
+        self._count("lookups")
+        try:
+            was_read_all, error = self._probes[key]
+        except KeyError:
+            pass
+        else:
+            if error is not None or was_read_all or not read_all:
+                return error
+
+        if self._known_missing(key):
+            error = FileNotFoundError(errno.ENOENT, "No such file or directory", key)
+            self._probes[key] = (read_all, error)
+            return error
+
+        self._count("open_calls")
+        error = _read(key, read_all)
+        self._probes[key] = (read_all, error)
+        self._note_missing(key, error)
+        return error
+
+    def record_probe(
+        self, path: PathLike, error: typing.Optional[Exception], read_all: bool
+    ) -> None:
+        """Remember the outcome of reading the file elsewhere, see probe()."""
+        key = os.fspath(path)
+        self._probes[key] = (read_all, error)
+        self._note_missing(key, error)
+
+    def _known_missing(self, key: str) -> bool:
+        """Return whether the missing-path cache knows the path does not exist."""
+        if self.missing is None:
+            return False
+        return self.missing.is_missing(
+            key, lambda: self._parent_mtime(key), self._root_reachable
+        )
+
+    def _parent_mtime(self, key: str) -> missing_cache.ParentMtime:
+        result = self._stat(os.path.dirname(key) or os.curdir)
+        return None if result is None else result.st_mtime_ns
+
+    def _note_missing(self, key: str, error: typing.Optional[Exception]) -> None:
+        """Record a file that could not be opened in the missing-path cache.
+
+        Files that do not exist are recorded with the modification time of
+        their directory. When the directory does not exist either, or the
+        file could not be opened for another reason, the drive or share it
+        is on is checked, and recorded when it cannot be reached at all.
+        """
+        if self.missing is None or not isinstance(error, OSError):
+            return
+        if isinstance(error, PermissionError):
+            return
+        parent_mtime = self._parent_mtime(key)
+        if isinstance(error, FileNotFoundError):
+            self.missing.record(key, parent_mtime)
+        if parent_mtime is not None:
+            return
+        root = missing_cache.path_root(key)
+        if root is not None and not self._root_reachable(root):
+            self.missing.record_unreachable_root(root)
+
+    def _root_reachable(self, root: str) -> bool:
+        with self._lock:
+            reachable = self._reachable_roots.get(root)
+        if reachable is None:
+            self._count("stat_calls")
+            try:
+                os.stat(root)
+            except OSError:
+                reachable = False
+            else:
+                reachable = True
+            with self._lock:
+                self._reachable_roots[root] = reachable
+        return reachable
+
+
+def _read(path: str, read_all: bool) -> typing.Optional[Exception]:
+    try:
+        with open(path, "rb") as infile:
+            if read_all:
+                while infile.read(1024 * 1024):
+                    pass
+            else:
+                infile.read(1)
+    except Exception as ex:
+        return ex
+    return None
+
+
+_current = None  # type: typing.Optional[FilesystemCache]
+
+
+def enable(missing: typing.Optional[missing_cache.MissingPathCache] = None) -> FilesystemCache:
+    """Start answering filesystem questions from a new, empty cache.
+
+    :param missing: remembers missing files across caches, see the module
+        docstring.
+    """
+    global _current
+    _current = FilesystemCache(missing)
+    return _current
+
+
+def disable() -> typing.Optional[FilesystemCache]:
+    """Stop using the cache, and return it so its statistics can be inspected."""
+    global _current
+    cache, _current = _current, None
+    return cache
+
+
+def current() -> typing.Optional[FilesystemCache]:
+    return _current
+
+
+def listdir(directory: PathLike) -> typing.Optional[Listing]:
+    """Return the entries of the directory by name, or None if it cannot be listed."""
+    cache = _current
+    if cache is not None:
+        return cache.listdir(directory)
+    try:
+        with os.scandir(directory) as it:
+            return {entry.name: entry for entry in it}
+    except OSError as ex:
+        log.debug("Unable to list %s: %s", directory, ex)
+        return None
+
+
+def prime_once(directory: PathLike, primer: Primer) -> None:
+    """Prime the directory, see FilesystemCache.prime_once().
+
+    Without an enabled cache the directory is primed on every call.
+    """
+    cache = _current
+    if cache is None:
+        primer(os.fspath(directory))
+        return
+    cache.prime_once(directory, primer)
+
+
+def record_probe(
+    path: PathLike, error: typing.Optional[Exception], read_all: bool = False
+) -> None:
+    """Remember the outcome of reading the file, if a cache is enabled."""
+    cache = _current
+    if cache is not None:
+        cache.record_probe(path, error, read_all)
+
+
+def is_dir(path: PathLike) -> bool:
+    cache = _current
+    if cache is None:
+        return os.path.isdir(path)
+    return cache.is_dir(path)
+
+
+def is_file(path: PathLike) -> bool:
+    cache = _current
+    if cache is None:
+        return os.path.isfile(path)
+    return cache.is_file(path)
+
+
+def exists(path: PathLike) -> bool:
+    cache = _current
+    if cache is None:
+        return os.path.exists(path)
+    return cache.exists(path)
+
+
+def getsize(path: PathLike) -> int:
+    cache = _current
+    if cache is None:
+        return os.path.getsize(path)
+    return cache.getsize(path)
+
+
+def probe(path: PathLike, read_all: bool = False) -> typing.Optional[Exception]:
+    """Open the file and read from it, see FilesystemCache.probe()."""
+    cache = _current
+    if cache is None:
+        return _read(os.fspath(path), read_all)
+    return cache.probe(path, read_all)
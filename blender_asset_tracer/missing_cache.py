@@ -0,0 +1,263 @@
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# ***** END GPL LICENCE BLOCK *****
+"""Persistent, short-lived memory of missing files and unreachable roots.
+
+Broken links keep pointing at the same missing files from one packing run
+to the next, and probing them again can be slow: on Windows, each attempt
+to open a file on an offline network share can block for seconds.
+
+A MissingPathCache remembers two things for a limited time:
+
+- Missing files, together with the modification time of their directory.
+  The entry is only trusted while that directory is unchanged, so adding
+  the file, or any other change to its directory, makes it be probed again.
+- Roots (drives, network shares, mounted volumes) that could not be reached
+  at all. Everything below such a root is considered missing without
+  touching the filesystem, until the entry expires or the root is found
+  to be reachable again.
+
+It is used through fscache.enable(missing=...).
+"""
+
+import dataclasses
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import threading
+import time
+import typing
+
+log = logging.getLogger(__name__)
+
+# Bump this whenever the stored entries change meaning.
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_TTL = 15 * 60.0
+"""Seconds for which an entry is trusted."""
+
+_MOUNT_PREFIXES = (("/Volumes/", 1), ("/media/", 2), ("/mnt/", 1))
+
+
+def path_root(path: str) -> typing.Optional[str]:
+    """Return the drive, network share or mounted volume of an absolute path.
+
+    Returns None for paths on the root filesystem of a POSIX system, which
+    is always reachable.
+    """
+    p = path.replace("\\", "/")
+    if p.startswith("//"):
+        parts = p[2:].split("/")
+        if len(parts) >= 2 and parts[0] and parts[1]:
+            return "//%s/%s" % (parts[0], parts[1])
+        return None
+    if len(p) >= 2 and p[1] == ":" and p[0].isalpha():
+        return p[0].upper() + ":/"
+    for prefix, depth in _MOUNT_PREFIXES:
+        if p.startswith(prefix):
+            parts = p[len(prefix) :].split("/")
+            if len(parts) > depth and all(parts[:depth]):
+                return prefix + "/".join(parts[:depth])
+            return None
+    return None
+
+
+@dataclasses.dataclass
+class MissingCacheStats:
+    hits: int = 0
+    """Lookups answered as missing from the cache."""
+    root_hits: int = 0
+    """Of those, the lookups below an unreachable root."""
+    invalidated: int = 0
+    """Entries dropped because their directory changed."""
+    recorded: int = 0
+    recorded_roots: int = 0
+    reconnected_roots: int = 0
+    """Unreachable roots dropped because they could be reached again."""
+
+    def as_dict(self) -> typing.Dict[str, int]:
+        return dataclasses.asdict(self)
+
+
+ParentMtime = typing.Optional[int]
+"""Modification time of the parent directory in nanoseconds, None if it was missing."""
+
+
+class MissingPathCache:
+    """Missing paths and unreachable roots, stored as JSON in a file."""
+
+    def __init__(
+        self,
+        filepath: pathlib.Path,
+        ttl: float = DEFAULT_TTL,
+        refresh: bool = False,
+    ) -> None:
+        """
+        :param refresh: start empty, ignoring what was stored earlier. The
+            entries recorded from now on are still stored by save().
+        """
+        self.filepath = filepath
+        self.ttl = ttl
+        self.stats = MissingCacheStats()
+        self._lock = threading.Lock()
+        # Path -> (parent mtime, time recorded)
+        self._paths = {}  # type: typing.Dict[str, typing.Tuple[ParentMtime, float]]
+        # Root -> time recorded
+        self._roots = {}  # type: typing.Dict[str, float]
+        if not refresh:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with self.filepath.open("r", encoding="utf-8") as infile:
+                stored = json.load(infile)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as ex:
+            log.warning("Ignoring unreadable missing-file cache %s: %s", self.filepath, ex)
+            return
+        if not isinstance(stored, dict) or stored.get("version") != CACHE_FORMAT_VERSION:
+            return
+
+        now = time.time()
+        try:
+            for path, (parent_mtime, recorded) in stored.get("paths", {}).items():
+                if now - recorded < self.ttl:
+                    self._paths[path] = (parent_mtime, recorded)
+            for root, recorded in stored.get("roots", {}).items():
+                if now - recorded < self.ttl:
+                    self._roots[root] = recorded
+        except (TypeError, ValueError) as ex:
+            log.warning("Ignoring broken missing-file cache %s: %s", self.filepath, ex)
+            self._paths.clear()
+            self._roots.clear()
+
+    def save(self) -> None:
+        """Store the entries that have not expired."""
+        now = time.time()
+        with self._lock:
+            stored = {
+                "version": CACHE_FORMAT_VERSION,
+                "paths": {
+                    path: list(entry)
+                    for path, entry in self._paths.items()
+                    if now - entry[1] < self.ttl
+                },
+                "roots": {
+                    root: recorded
+                    for root, recorded in self._roots.items()
+                    if now - recorded < self.ttl
+                },
+            }
+        directory = self.filepath.parent
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            fd, tmpname = tempfile.mkstemp(
+                prefix=self.filepath.stem + "-", suffix=".tmp", dir=str(directory)
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as outfile:
+                    json.dump(stored, outfile)
+                os.replace(tmpname, str(self.filepath))
+            except BaseException:
+                os.unlink(tmpname)
+                raise
+        except OSError as ex:
+            log.warning("Unable to write missing-file cache %s: %s", self.filepath, ex)
+
+    def unreachable_root(
+        self,
+        path: str,
+        reachable: typing.Optional[typing.Callable[[str], bool]] = None,
+    ) -> typing.Optional[str]:
+        """Return the root of the path if it was recorded as unreachable.
+
+        :param reachable: checks whether a recorded root can be reached now.
+            A root that can is forgotten, so that a reconnected drive or
+            share is used again.
+        """
+        root = path_root(path)
+        if root is None:
+            return None
+        with self._lock:
+            recorded = self._roots.get(root)
+            if recorded is None:
+                return None
+            if time.time() - recorded >= self.ttl:
+                del self._roots[root]
+                return None
+        if reachable is not None and reachable(root):
+            with self._lock:
+                self._roots.pop(root, None)
+                self.stats.reconnected_roots += 1
+            return None
+        return root
+
+    def is_missing(
+        self,
+        path: str,
+        parent_mtime: typing.Callable[[], ParentMtime],
+        root_reachable: typing.Optional[typing.Callable[[str], bool]] = None,
+    ) -> bool:
+        """Return whether the path is known to be missing.
+
+        :param parent_mtime: returns the current modification time of the
+            directory of the path. It is only called for recorded paths.
+        :param root_reachable: see unreachable_root().
+        """
+        if self.unreachable_root(path, root_reachable) is not None:
+            with self._lock:
+                self.stats.hits += 1
+                self.stats.root_hits += 1
+            return True
+
+        with self._lock:
+            entry = self._paths.get(path)
+        if entry is None:
+            return False
+
+        stored_mtime, recorded = entry
+        current_mtime = parent_mtime()
+        with self._lock:
+            if time.time() - recorded >= self.ttl:
+                self._paths.pop(path, None)
+                return False
+            if current_mtime != stored_mtime:
+                self._paths.pop(path, None)
+                self.stats.invalidated += 1
+                return False
+            self.stats.hits += 1
+        return True
+
+    def record(self, path: str, parent_mtime: ParentMtime) -> None:
+        """Remember that the path is missing from its directory."""
+        with self._lock:
+            self._paths[path] = (parent_mtime, time.time())
+            self.stats.recorded += 1
+
+    def record_unreachable_root(self, root: str) -> None:
+        """Remember that nothing below the root can be reached."""
+        with self._lock:
+            self._roots[root] = time.time()
+            self.stats.recorded_roots += 1
+
+    def forget(self, path: str) -> None:
+        """Forget that the path was missing, because it was found after all."""
+        with self._lock:
+            self._paths.pop(path, None)
@@ -33,7 +33,7 @@ import threading
 import typing
 import unicodedata
 
-from .. import trace, bpathlib, blendfile
+from .. import trace, bpathlib, blendfile, fscache
 from ..trace import file_sequence, result
 
 from . import filesystem, transfer, progress
@@ -95,6 +95,7 @@ _UDIM_TOKEN_RE = re.compile(r"(?<!\d)(\d{4})(?!\d)")
 _UDIM_MARKER = "<UDIM>"
 
 
+@functools.lru_cache(maxsize=65536)
 def _nfc(s: str) -> str:
     """Normalize unicode strings to NFC for cross-platform stability."""
     return unicodedata.normalize("NFC", str(s))
@@ -307,6 +308,10 @@ class Packer:
         self._udim_tiles_cache = (
             {}
         )  # type: typing.Dict[typing.Tuple[pathlib.Path, str], typing.List[pathlib.Path]]
+        self._absolute_paths = {}  # type: typing.Dict[pathlib.PurePath, pathlib.Path]
+        self._udim_tilesets_by_dir = (
+            {}
+        )  # type: typing.Dict[pathlib.Path, typing.Dict[str, typing.List[pathlib.Path]]]
 
         # Filled by execute()
         self._file_transferer = None  # type: typing.Optional[transfer.FileTransferer]
@@ -423,6 +428,16 @@ class Packer:
         else:
             log.warning("Unreadable file: %s (%s)", path, err)
 
+    def _make_absolute(self, path: pathlib.PurePath) -> pathlib.Path:
+        """bpathlib.make_absolute(), memoized for as long as the packer lives."""
+        try:
+            return self._absolute_paths[path]
+        except KeyError:
+            pass
+        abs_path = bpathlib.make_absolute(path)
+        self._absolute_paths[path] = abs_path
+        return abs_path
+
     def _check_readable(self, path: pathlib.Path) -> bool:
         """Return True if the path exists and can be opened for reading.
 
@@ -435,7 +450,7 @@ class Packer:
         """
         # Normalize to an absolute path for cache stability.
         try:
-            abs_path = bpathlib.make_absolute(path)
+            abs_path = self._make_absolute(path)
         except Exception:
             abs_path = pathlib.Path(path)
 
@@ -447,7 +462,7 @@ class Packer:
         # Directories are "readable enough" for our purposes here; the packer
         # expands them later into files.
         try:
-            if abs_path.is_dir():
+            if fscache.is_dir(abs_path):
                 self._readability_cache[abs_path] = (True, "")
                 return True
         except Exception:
@@ -459,25 +474,19 @@ class Packer:
 
         # Try to open the file directly - this can trigger cloud sync for
         # dehydrated placeholders that might fail exists() checks.
-        try:
-            with abs_path.open("rb") as f:
-                f.read(1)
+        # The outcome is shared with earlier probes of the tracer through fscache.
+        exc = fscache.probe(abs_path)
+        if exc is None:
             self._readability_cache[abs_path] = (True, "")
             return True
-        except FileNotFoundError:
+        if isinstance(exc, FileNotFoundError):
             self._readability_cache[abs_path] = (False, "missing")
             self._record_missing(abs_path)
             return False
-        except (PermissionError, OSError) as exc:
-            err = f"{type(exc).__name__}: {exc}"
-            self._readability_cache[abs_path] = (False, err)
-            self._record_unreadable(abs_path, err)
-            return False
-        except Exception as exc:
-            err = f"{type(exc).__name__}: {exc}"
-            self._readability_cache[abs_path] = (False, err)
-            self._record_unreadable(abs_path, err)
-            return False
+        err = f"{type(exc).__name__}: {exc}"
+        self._readability_cache[abs_path] = (False, err)
+        self._record_unreadable(abs_path, err)
+        return False
 
     def _find_udim_tiles(self, asset_path: pathlib.Path) -> typing.List[pathlib.Path]:
         """Return UDIM tile files for a given path.
@@ -501,7 +510,9 @@ class Packer:
             glob_path = asset_path.with_name(glob_name)
             try:
                 tiles = [
-                    p for p in file_sequence.expand_sequence(glob_path) if p.is_file()
+                    p
+                    for p in file_sequence.expand_sequence(glob_path)
+                    if fscache.is_file(p)
                 ]
             except Exception:
                 tiles = []
@@ -516,37 +527,37 @@ class Packer:
             return []
         glob_name, _tile = tpl
 
-        key = (asset_path.parent, glob_name)
-        cached = self._udim_tiles_cache.get(key)
-        if cached is not None:
-            return list(cached)
+        tiles = self._udim_tilesets(asset_path.parent).get(glob_name, [])
 
-        tiles = []
+        # Only treat as a “tileset” if it’s clearly multi-file.
+        if len(tiles) >= 2:
+            return list(tiles)
+        return []
+
+    def _udim_tilesets(
+        self, directory: pathlib.Path
+    ) -> typing.Dict[str, typing.List[pathlib.Path]]:
+        """Return the UDIM tiles in the directory, grouped by glob template.
+
+        The directory is listed once, however many tilesets refer to it.
+        """
         try:
-            for cand in sorted(asset_path.parent.glob(glob_name)):
-                if not cand.is_file():
-                    continue
+            return self._udim_tilesets_by_dir[directory]
+        except KeyError:
+            pass
+
+        tilesets = {}  # type: typing.Dict[str, typing.List[pathlib.Path]]
+        try:
+            for cand in file_sequence.match_names(directory, "*"):
                 cand_tpl = _udim_template_from_name(cand.name)
-                if not cand_tpl:
-                    continue
-                cand_glob_name, cand_tile = cand_tpl
-                if cand_glob_name != glob_name:
-                    continue
-                if cand_tile < 1001:
+                if not cand_tpl or not fscache.is_file(cand):
                     continue
-                tiles.append(cand)
+                tilesets.setdefault(cand_tpl[0], []).append(cand)
         except Exception:
-            tiles = []
+            tilesets = {}
 
-        tiles = sorted(set(tiles))
-
-        # Only treat as a “tileset” if it’s clearly multi-file.
-        if len(tiles) >= 2:
-            self._udim_tiles_cache[key] = tiles
-            return list(tiles)
-
-        self._udim_tiles_cache[key] = []
-        return []
+        self._udim_tilesets_by_dir[directory] = tilesets
+        return tilesets
 
     def strategise(self) -> None:
         """Determine what to do with the assets.
@@ -561,9 +572,9 @@ class Packer:
         """
         # The blendfile that we pack is generally not its own dependency, so
         # we have to explicitly add it to the _packed_paths.
-        bfile_path = bpathlib.make_absolute(self.blendfile)
+        bfile_path = self._make_absolute(self.blendfile)
 
-        project_abs = bpathlib.make_absolute(self.project)
+        project_abs = self._make_absolute(self.project)
 
         # Both paths have to be resolved first, because this also translates
         # network shares mapped to Windows drive letters back to their UNC
@@ -693,7 +704,7 @@ class Packer:
                     if t != asset_path:
                         act.extra_files.add(t)
 
-        project_abs = bpathlib.make_absolute(self.project)
+        project_abs = self._make_absolute(self.project)
 
         # PATCH: Always pack physically-in-project assets into the project layout,
         # even if referenced with absolute paths (those will just be rewritten).
@@ -749,7 +760,7 @@ class Packer:
                 continue
 
             for usage in action.usages:
-                bfile_path = bpathlib.make_absolute(usage.block.bfile.filepath)
+                bfile_path = self._make_absolute(usage.block.bfile.filepath)
                 insert_new_action = bfile_path not in self._actions
 
                 self._actions[bfile_path].rewrites.append(usage)
@@ -758,8 +769,8 @@ class Packer:
                     actions.add(self._actions[bfile_path])
 
     def _path_in_project(self, path: pathlib.Path) -> bool:
-        abs_path = bpathlib.make_absolute(path)
-        abs_project = bpathlib.make_absolute(self.project)
+        abs_path = self._make_absolute(path)
+        abs_project = self._make_absolute(self.project)
         try:
             abs_path.relative_to(abs_project)
         except ValueError:
@@ -973,7 +984,7 @@ class Packer:
         # This also ensures sequence files & UDIM tiles are validated.
         try:
             # Only check files; for dirs we rely on later expansion to files.
-            if asset_path.exists() and asset_path.is_dir():
+            if fscache.is_dir(asset_path):
                 ok = True
             else:
                 ok = self._check_readable(asset_path)
@@ -39,6 +39,7 @@ except Exception:  # pragma: no cover
     zstd = None  # type: ignore[assignment]
 
 from . import Packer, transfer
+from ..envvars import env_bool, env_float, env_int
 
 log = logging.getLogger(__name__)
 
@@ -63,29 +64,6 @@ def shorten_path(path: str) -> str:
     return f"{path[:left]}{dots}{path[-right:]}"
 
 
-def _env_int(name: str, default: int) -> int:
-    try:
-        v = os.environ.get(name, "").strip()
-        return int(v) if v else int(default)
-    except Exception:
-        return int(default)
-
-
-def _env_float(name: str, default: float) -> float:
-    try:
-        v = os.environ.get(name, "").strip()
-        return float(v) if v else float(default)
-    except Exception:
-        return float(default)
-
-
-def _env_bool(name: str, default: bool = False) -> bool:
-    v = os.environ.get(name)
-    if v is None:
-        return bool(default)
-    return str(v).strip().lower() in ("1", "true", "yes", "y", "on")
-
-
 def _human_bytes(n: int) -> str:
     try:
         n = int(n)
@@ -175,19 +153,19 @@ DEFAULT_BLEND_ZSTD_LEVEL = 1
 
 ZIP_COMPRESSLEVEL = max(
     0,
-    min(_env_int("SULU_ZIP_COMPRESSLEVEL", DEFAULT_ZIP_COMPRESSLEVEL), 9),
+    min(env_int("SULU_ZIP_COMPRESSLEVEL", DEFAULT_ZIP_COMPRESSLEVEL), 9),
 )
-ZIP_IO_BUFSIZE = max(64 * 1024, _env_int("SULU_ZIP_IO_BUFSIZE", 1024 * 1024))
-ZIP_VERBOSE = _env_bool("SULU_ZIP_VERBOSE", False)
-ZIP_NO_COMPRESS = _env_bool("SULU_ZIP_NO_COMPRESS", False)
-ZIP_PRINT_INTERVAL = max(0.05, _env_float("SULU_ZIP_PRINT_INTERVAL", 0.2))
+ZIP_IO_BUFSIZE = max(64 * 1024, env_int("SULU_ZIP_IO_BUFSIZE", 1024 * 1024))
+ZIP_VERBOSE = env_bool("SULU_ZIP_VERBOSE", False)
+ZIP_NO_COMPRESS = env_bool("SULU_ZIP_NO_COMPRESS", False)
+ZIP_PRINT_INTERVAL = max(0.05, env_float("SULU_ZIP_PRINT_INTERVAL", 0.2))
 BLEND_ZSTD_LEVEL = max(
     1,
-    min(_env_int("SULU_BLEND_ZSTD_LEVEL", DEFAULT_BLEND_ZSTD_LEVEL), 22),
+    min(env_int("SULU_BLEND_ZSTD_LEVEL", DEFAULT_BLEND_ZSTD_LEVEL), 22),
 )
-BLEND_ZSTD_THREADS = max(-1, _env_int("SULU_BLEND_ZSTD_THREADS", -1))
+BLEND_ZSTD_THREADS = max(-1, env_int("SULU_BLEND_ZSTD_THREADS", -1))
 
-_store_big_mb = _env_int("SULU_ZIP_STORE_BIG_FILES_MB", 256)
+_store_big_mb = env_int("SULU_ZIP_STORE_BIG_FILES_MB", 256)
 ZIP_STORE_BIG_FILES_BYTES = 0 if _store_big_mb <= 0 else int(_store_big_mb) * 1024 * 1024
 
 # Formats that are typically already compressed / incompressible.
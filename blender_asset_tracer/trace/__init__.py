@@ -21,8 +21,8 @@ import logging
 import pathlib
 import typing
 
-from .. import blendfile
-from . import result, blocks2assets, file2blocks, progress
+from .. import blendfile, bpathlib
+from . import result, blocks2assets, file2blocks, progress, trace_cache
 
 log = logging.getLogger(__name__)
 
@@ -41,29 +41,130 @@ codes_to_skip = {
 
 
 def deps(
-    bfilepath: pathlib.Path, progress_cb: typing.Optional[progress.Callback] = None
+    bfilepath: pathlib.Path,
+    progress_cb: typing.Optional[progress.Callback] = None,
+    *,
+    library_workers: int = 0,
+    library_stats: typing.Optional[file2blocks.LibraryStats] = None,
+    cache: typing.Optional[trace_cache.TraceCache] = None,
+    render_only: bool = False,
+    scenes: typing.Optional[typing.Collection[str]] = None,
+    unreachable: typing.Optional[typing.List[result.BlockUsage]] = None,
 ) -> typing.Iterator[result.BlockUsage]:
     """Open the blend file and report its dependencies.
 
     :param bfilepath: File to open.
     :param progress_cb: Progress callback object.
+    :param library_workers: Number of threads that open linked libraries
+        ahead of the tracer; 0 opens them when they are needed. The reported
+        dependencies and their order do not depend on this.
+    :param library_stats: When given, this is updated with statistics about
+        opening the linked libraries.
+    :param cache: When given, unchanged blend files are not parsed, but
+        their visits are replayed from this cache. The reported usages are
+        then CachedBlockUsage objects, which cannot be used for rewriting
+        paths.
+    :param render_only: Only report the dependencies that can be reached
+        from the rendered scenes, instead of those of every data block in
+        the file. Libraries are always limited to the linked-in blocks.
+    :param scenes: Names of the rendered scenes, for render_only. None
+        means the scene that was active when the file was saved.
+    :param unreachable: When given with render_only, the asset usages of
+        the blocks of the file that cannot be reached from the rendered
+        scenes, and whose assets are not reported otherwise, are appended to
+        this list once all dependencies have been reported.
     """
 
-    bi = file2blocks.BlockIterator()
+    bi = file2blocks.BlockIterator(library_workers=library_workers)
+    if library_stats is not None:
+        library_stats.workers = bi.library_workers
+        bi.library_stats = library_stats
     if progress_cb:
         bi.progress_cb = progress_cb
-    bfile = bi.open_blendfile(bfilepath)
+
+    root_names = None  # type: typing.Optional[typing.List[bytes]]
+    if render_only:
+        root_names = file2blocks.render_scene_names(
+            blendfile.open_cached(bfilepath), scenes
+        )
+        if not root_names:
+            log.warning("No scene to render in %s, tracing all blocks", bfilepath)
+            root_names = None
+
+    block_usages: typing.Iterator[result.BlockUsage]
+    if cache is None:
+        bfile = bi.open_blendfile(bfilepath)
+        if root_names is None:
+            blocks = bi.iter_blocks(bfile)
+        else:
+            blocks = bi.iter_reachable_blocks(bfile, root_names)
+        block_usages = (
+            block_usage
+            for block in asset_holding_blocks(blocks)
+            for block_usage in blocks2assets.iter_assets(block)
+        )
+    else:
+        tracer = trace_cache.CachingTracer(bi, cache, _asset_usages)
+        block_usages = tracer.usages(bfilepath, root_names)
 
     # Remember which block usages we've reported already, without keeping the
     # blocks themselves in memory.
     seen_hashes = set()  # type: typing.Set[int]
+    list_unreachable = unreachable is not None and root_names is not None
+    reported_paths = set()  # type: typing.Set[pathlib.Path]
 
-    for block in asset_holding_blocks(bi.iter_blocks(bfile)):
-        for block_usage in blocks2assets.iter_assets(block):
+    try:
+        for block_usage in block_usages:
             usage_hash = hash(block_usage)
             if usage_hash in seen_hashes:
                 continue
             seen_hashes.add(usage_hash)
+            if list_unreachable:
+                reported_paths.add(block_usage.abspath)
+            yield block_usage
+
+        if list_unreachable:
+            assert unreachable is not None
+            unreachable.extend(_unreachable_usages(bi, bfilepath, reported_paths))
+    finally:
+        bi.close()
+        if cache is not None:
+            cache.prune()
+
+
+def _asset_usages(
+    block: blendfile.BlendFileBlock,
+) -> typing.Iterator[result.BlockUsage]:
+    for asset_block in asset_holding_blocks((block,)):
+        yield from blocks2assets.iter_assets(asset_block)
+
+
+def _unreachable_usages(
+    bi: file2blocks.BlockIterator,
+    bfilepath: pathlib.Path,
+    reported_paths: typing.Set[pathlib.Path],
+) -> typing.Iterator[result.BlockUsage]:
+    """Yield the asset usages of the blocks that were not visited.
+
+    Usages of assets that were reported through other blocks are skipped.
+    """
+    bfile = blendfile.open_cached(bfilepath)
+    bpath = bpathlib.make_absolute(bfile.filepath)
+    seen_paths = set(reported_paths)
+
+    unvisited = (
+        block
+        for code in bfile.code_index
+        if code != b"DATA"
+        for block in bfile.code_index[code]
+        if (bpath, block.addr_old) not in bi.blocks_yielded
+    )
+    for asset_block in asset_holding_blocks(unvisited):
+        for block_usage in blocks2assets.iter_assets(asset_block):
+            abspath = block_usage.abspath
+            if abspath in seen_paths:
+                continue
+            seen_paths.add(abspath)
             yield block_usage
 
 
@@ -362,6 +362,21 @@ def _expand_scene(block: blendfile.BlendFileBlock):
     for base in iterators.listbase(bases):
         yield base.get_pointer(b"object")
 
+    # Since Blender 2.80, objects are found via the scene's master collection.
+    master_collection = block.get_pointer(b"master_collection", default=None)
+    if master_collection is not None:
+        yield from _expand_group(master_collection)
+
+    view_layers = block.get_pointer((b"view_layers", b"first"), default=None)
+    for view_layer in iterators.listbase(view_layers):
+        yield view_layer.get_pointer(b"mat_override", default=None)
+        yield view_layer.get_pointer(b"world_override", default=None)
+
+    # Markers can switch to another camera during the animation.
+    markers = block.get_pointer((b"markers", b"first"))
+    for marker in iterators.listbase(markers):
+        yield marker.get_pointer(b"camera", default=None)
+
     # Sequence Editor
     block_ed = block.get_pointer(b"ed")
     if not block_ed:
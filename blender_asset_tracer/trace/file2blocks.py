@@ -25,9 +25,12 @@ initial blend file, and all *actually linked-to* data blocks in linked
 blend files.
 """
 import collections
+import concurrent.futures
+import dataclasses
+import heapq
 import logging
 import pathlib
-import queue
+import time
 import typing
 
 from .. import blendfile, bpathlib
@@ -36,17 +39,94 @@ from . import expanders, progress
 _funcs_for_code = {}  # type: typing.Dict[bytes, typing.Callable]
 log = logging.getLogger(__name__)
 
+# Upper limit for BlockIterator(library_workers=N).
+MAX_LIBRARY_WORKERS = 16
 
-# noinspection PyProtectedMember
-class BlockQueue(queue.PriorityQueue):
-    """PriorityQueue that sorts by filepath and file offset"""
 
-    def _put(self, item: blendfile.BlendFileBlock):
-        super()._put((item.bfile.filepath, item.file_offset, item))
+@dataclasses.dataclass
+class LibraryStats:
+    """Statistics about opening the linked libraries of a blend file."""
 
-    def _get(self) -> blendfile.BlendFileBlock:
-        _, _, item = super()._get()
-        return item
+    workers: int = 0
+    """Number of threads opening libraries; 0 means on the tracing thread."""
+    library_paths: typing.Set[pathlib.Path] = dataclasses.field(default_factory=set)
+    """Absolute paths of the libraries that were opened."""
+    open_seconds: float = 0.0
+    """Total time spent opening libraries, summed over all threads."""
+    wait_seconds: float = 0.0
+    """Time the tracer spent waiting for libraries to be opened."""
+
+    @property
+    def libraries(self) -> int:
+        """Number of distinct libraries that were opened.
+
+        A library is visited again for every file that links from it, but is
+        only counted once.
+        """
+        return len(self.library_paths)
+
+    @property
+    def saved_seconds(self) -> float:
+        """Time saved by opening libraries in parallel with tracing."""
+        return max(0.0, self.open_seconds - self.wait_seconds)
+
+    def as_dict(self) -> typing.Dict[str, typing.Union[int, float]]:
+        return {
+            "workers": self.workers,
+            "libraries": self.libraries,
+            "open_seconds": round(self.open_seconds, 3),
+            "wait_seconds": round(self.wait_seconds, 3),
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
+
+
+class BlockQueue:
+    """Blocks to visit, sorted by file path and file offset.
+
+    Each block is queued only once per round, where a round ends when the
+    queue runs empty. Blocks referenced from many places, such as node groups
+    used by many node trees, are thus not queued again for every reference.
+
+    This queue is not thread-safe; it is only used from the tracing thread.
+    """
+
+    def __init__(self) -> None:
+        self._heap = (
+            []
+        )  # type: typing.List[typing.Tuple[pathlib.Path, int, blendfile.BlendFileBlock]]
+        # (blend file, block address) of the blocks queued in this round.
+        self._queued = (
+            set()
+        )  # type: typing.Set[typing.Tuple[blendfile.BlendFile, int]]
+        self.duplicates = 0
+        """Number of put() calls ignored because the block was already queued."""
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def qsize(self) -> int:
+        return len(self._heap)
+
+    def empty(self) -> bool:
+        return not self._heap
+
+    def put(self, block: blendfile.BlendFileBlock) -> None:
+        key = (block.bfile, block.addr_old)
+        if key in self._queued:
+            self.duplicates += 1
+            return
+        self._queued.add(key)
+        heapq.heappush(self._heap, (block.bfile.filepath, block.file_offset, block))
+
+    def get(self) -> blendfile.BlendFileBlock:
+        """Remove and return the first block.
+
+        :raises IndexError: when the queue is empty.
+        """
+        _, _, block = heapq.heappop(self._heap)
+        if not self._heap:
+            self._queued.clear()
+        return block
 
 
 class BlockIterator:
@@ -56,7 +136,13 @@ class BlockIterator:
     without having to pass those variables to each recursive call.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, library_workers: int = 0) -> None:
+        """
+        :param library_workers: when larger than zero, linked libraries are
+            opened, decompressed, and indexed by this many threads, while the
+            tracer works on the previous library. Blocks are still visited on
+            the calling thread in the same order, so the results are identical.
+        """
         # Set of (blend file Path, block address) of already-reported blocks.
         self.blocks_yielded = set()  # type: typing.Set[typing.Tuple[pathlib.Path, int]]
 
@@ -65,6 +151,14 @@ class BlockIterator:
 
         self.progress_cb = progress.Callback()
 
+        self.library_workers = min(max(0, library_workers), MAX_LIBRARY_WORKERS)
+        self.library_stats = LibraryStats(workers=self.library_workers)
+        self._executor = None  # type: typing.Optional[concurrent.futures.Executor]
+        # Libraries being opened by the executor, and not yet visited.
+        self._prefetched = (
+            {}
+        )  # type: typing.Dict[pathlib.Path, concurrent.futures.Future]
+
     def open_blendfile(self, bfilepath: pathlib.Path) -> blendfile.BlendFile:
         """Open a blend file, sending notification about this to the progress callback."""
 
@@ -72,6 +166,63 @@ class BlockIterator:
         self.progress_cb.trace_blendfile(bfilepath)
         return blendfile.open_cached(bfilepath)
 
+    def close(self) -> None:
+        """Stop opening libraries in the background.
+
+        Libraries that are already being opened are waited for, so that they
+        end up in the blendfile cache instead of being abandoned half-way.
+        """
+        if self._executor is None:
+            return
+        for future in self._prefetched.values():
+            future.cancel()
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        self._prefetched.clear()
+
+    def _prefetch_libraries(self, lib_paths: typing.Iterable[pathlib.Path]) -> None:
+        """Start opening these libraries on the worker threads."""
+        if not self.library_workers:
+            return
+
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.library_workers,
+                thread_name_prefix="bat-library",
+            )
+
+        for lib_path in lib_paths:
+            if lib_path in self._prefetched or blendfile.is_cached(lib_path):
+                continue
+            self._prefetched[lib_path] = self._executor.submit(_timed_open, lib_path)
+
+    def _open_library(self, lib_path: pathlib.Path) -> blendfile.BlendFile:
+        """Open a library, using the prefetched one if available."""
+        stats = self.library_stats
+        stats.library_paths.add(lib_path)
+
+        future = self._prefetched.pop(lib_path, None)
+        if future is None:
+            start = time.perf_counter()
+            libfile = self.open_blendfile(lib_path)
+            duration = time.perf_counter() - start
+            stats.open_seconds += duration
+            stats.wait_seconds += duration
+            return libfile
+
+        log.info("opening: %s", lib_path)
+        self.progress_cb.trace_blendfile(lib_path)
+        start = time.perf_counter()
+        try:
+            libfile, open_seconds = future.result()
+        finally:
+            stats.wait_seconds += time.perf_counter() - start
+        stats.open_seconds += open_seconds
+        # Only this thread closes files to stay under the open-file limit, so
+        # the worker left that to us.
+        blendfile.mark_used(libfile)
+        return libfile
+
     def iter_blocks(
         self,
         bfile: blendfile.BlendFile,
@@ -88,6 +239,21 @@ class BlockIterator:
         blocks_per_lib = yield from self._visit_blocks(bfile, limit_to)
         yield from self._visit_linked_blocks(blocks_per_lib)
 
+    def iter_reachable_blocks(
+        self, bfile: blendfile.BlendFile, root_names: typing.Collection[bytes]
+    ) -> typing.Iterator[blendfile.BlendFileBlock]:
+        """Expand only the blocks that can be reached from the named blocks.
+
+        :param root_names: ID names, including their code prefix, of the
+            blocks to start from. See render_scene_names().
+        """
+
+        log.info("inspecting: %s, starting at %s", bfile.filepath, sorted(root_names))
+        self._queue_blocks_by_name(bfile, root_names)
+
+        blocks_per_lib = yield from self._visit_blocks(bfile, root_names)
+        yield from self._visit_linked_blocks(blocks_per_lib)
+
     def _visit_blocks(self, bfile, limit_to):
         bpath = bpathlib.make_absolute(bfile.filepath)
         root_dir = bpathlib.BlendPath(bpath.parent)
@@ -122,28 +288,44 @@ class BlockIterator:
 
         return blocks_per_lib
 
-    def _visit_linked_blocks(self, blocks_per_lib):
+    def _visit_linked_blocks(
+        self,
+        blocks_per_lib: typing.Mapping[
+            bpathlib.BlendPath, typing.Set[blendfile.BlendFileBlock]
+        ],
+    ) -> typing.Iterator[blendfile.BlendFileBlock]:
         # We've gone through all the blocks in this file, now open the libraries
         # and iterate over the blocks referred there.
-        for lib_bpath, idblocks in blocks_per_lib.items():
-            lib_path = bpathlib.make_absolute(lib_bpath.to_path())
+        lib_paths = {}  # type: typing.Dict[bpathlib.BlendPath, pathlib.Path]
+        for lib_bpath in blocks_per_lib:
+            lib_abspath = bpathlib.make_absolute(lib_bpath.to_path())
+            if lib_abspath.exists():
+                lib_paths[lib_bpath] = lib_abspath
+        self._prefetch_libraries(lib_paths.values())
 
-            if not lib_path.exists():
-                log.warning("Library %s does not exist", lib_path)
+        for lib_bpath, idblocks in blocks_per_lib.items():
+            lib_path = lib_paths.get(lib_bpath)
+            if lib_path is None:
+                log.warning(
+                    "Library %s does not exist",
+                    bpathlib.make_absolute(lib_bpath.to_path()),
+                )
                 continue
 
             log.debug("Expanding %d blocks in %s", len(idblocks), lib_path)
-            libfile = self.open_blendfile(lib_path)
+            libfile = self._open_library(lib_path)
             yield from self.iter_blocks(libfile, idblocks)
 
     def _queue_all_blocks(self, bfile: blendfile.BlendFile):
         log.debug("Queueing all blocks from file %s", bfile.filepath)
-        for block in bfile.blocks:
+        for code in bfile.code_index:
             # Don't bother visiting DATA blocks, as we won't know what
-            # to do with them anyway.
-            if block.code == b"DATA":
+            # to do with them anyway. Skipping the code entirely also avoids
+            # creating block objects for them.
+            if code == b"DATA":
                 continue
-            self.to_visit.put(block)
+            for block in bfile.code_index[code]:
+                self.to_visit.put(block)
 
     def _queue_named_blocks(
         self, bfile: blendfile.BlendFile, limit_to: typing.Set[blendfile.BlendFileBlock]
@@ -158,14 +340,19 @@ class BlockIterator:
 
         for to_find in limit_to:
             assert to_find.code == b"ID"
-            name_to_find = to_find[b"name"]
+        self._queue_blocks_by_name(bfile, (to_find[b"name"] for to_find in limit_to))
+
+    def _queue_blocks_by_name(
+        self, bfile: blendfile.BlendFile, names: typing.Iterable[bytes]
+    ):
+        """Queue the blocks with these ID names, including their code prefix."""
+
+        for name_to_find in names:
             code = name_to_find[:2]
             log.debug("Finding block %r with code %r", name_to_find, code)
-            same_code = bfile.find_blocks_from_code(code)
-            for block in same_code:
-                if block.id_name == name_to_find:
-                    log.debug("Queueing %r from file %s", block, bfile.filepath)
-                    self.to_visit.put(block)
+            for block in bfile.find_blocks_from_id_name(code, name_to_find):
+                log.debug("Queueing %r from file %s", block, bfile.filepath)
+                self.to_visit.put(block)
 
     def _queue_dependencies(self, block: blendfile.BlendFileBlock):
         for block in expanders.expand_block(block):
@@ -173,6 +360,42 @@ class BlockIterator:
             self.to_visit.put(block)
 
 
+def _timed_open(
+    bfilepath: pathlib.Path,
+) -> typing.Tuple[blendfile.BlendFile, float]:
+    """Open a blend file, returning it and how long that took."""
+    start = time.perf_counter()
+    bfile = blendfile.open_cached(bfilepath, track_open=False)
+    return bfile, time.perf_counter() - start
+
+
+def render_scene_names(
+    bfile: blendfile.BlendFile, scenes: typing.Optional[typing.Iterable[str]] = None
+) -> typing.List[bytes]:
+    """Return the ID names of the scenes to render.
+
+    :param scenes: names of the scenes, without their "SC" prefix. None
+        means the scene that was active when the file was saved.
+    :returns: the ID names of the scenes that exist in the file.
+    """
+    if scenes is None:
+        names = []
+        for glob in bfile.code_index[b"GLOB"]:
+            scene = glob.get_pointer(b"curscene", default=None)
+            if scene is not None and scene.id_name:
+                names.append(scene.id_name)
+        return names
+
+    names = []
+    for scene in scenes:
+        id_name = b"SC" + scene.encode("utf-8")
+        if not bfile.find_blocks_from_id_name(b"SC", id_name):
+            log.warning("Scene %r does not exist in %s", scene, bfile.filepath)
+            continue
+        names.append(id_name)
+    return names
+
+
 def iter_blocks(
     bfile: blendfile.BlendFile,
 ) -> typing.Iterator[blendfile.BlendFileBlock]:
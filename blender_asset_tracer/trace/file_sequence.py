@@ -17,13 +17,22 @@
 # ***** END GPL LICENCE BLOCK *****
 #
 # (c) 2018, Blender Foundation - Sybren A. Stüvel
+import fnmatch
+import functools
+import glob
 import logging
 import os
 import pathlib
+import re
+import string
 import typing
 
+from .. import fscache
+
 log = logging.getLogger(__name__)
 
+NameMatcher = typing.Callable[[str], bool]
+
 
 class DoesNotExist(OSError):
     """Indicates a path does not exist on the filesystem."""
@@ -33,7 +42,7 @@ class DoesNotExist(OSError):
         self.path = path
 
 
-def _prime_cloud_directory(directory: pathlib.Path) -> None:
+def _prime_cloud_directory(directory: str) -> None:
     """
     Attempt to 'wake up' a cloud-mounted directory.
 
@@ -46,11 +55,9 @@ def _prime_cloud_directory(directory: pathlib.Path) -> None:
     This is a best-effort operation - it may not work for all cloud providers.
     """
     try:
-        if not directory.is_dir():
-            return
-
         # List directory contents - this often triggers cloud sync
-        entries = list(directory.iterdir())
+        with os.scandir(directory) as it:
+            entries = list(it)
 
         # Try to stat a few entries to further trigger sync
         for entry in entries[:5]:
@@ -64,19 +71,59 @@ def _prime_cloud_directory(directory: pathlib.Path) -> None:
         pass
 
 
-def _try_open_file(path: pathlib.Path) -> bool:
+def _list_directory(directory: pathlib.Path) -> typing.List[str]:
+    """Return the sorted names in the directory, priming it for cloud sync.
+
+    While a filesystem cache is enabled, the directory is primed and listed
+    only once, and every later sequence in it is matched against that
+    listing.
     """
-    Try to open a file for reading.
+    fscache.prime_once(directory, _prime_cloud_directory)
+    listing = fscache.listdir(directory)
+    if not listing:
+        return []
+    return sorted(listing)
+
 
-    Returns True if the file can be opened, False otherwise.
-    This triggers cloud providers to download placeholder files.
+@functools.lru_cache(maxsize=1024)
+def compile_name_pattern(pattern: str) -> NameMatcher:
+    """Return a function that tells whether a file name matches the glob pattern.
+
+    Like glob.glob(), names starting with a period only match patterns that
+    start with a period.
     """
-    try:
-        with open(path, "rb") as f:
-            f.read(1)
-        return True
-    except Exception:
-        return False
+    regex = re.compile(fnmatch.translate(os.path.normcase(pattern)))
+    include_hidden = pattern.startswith(".")
+
+    def matches(name: str) -> bool:
+        if name.startswith(".") and not include_hidden:
+            return False
+        return regex.match(os.path.normcase(name)) is not None
+
+    return matches
+
+
+def match_names(directory: pathlib.Path, pattern: str) -> typing.List[pathlib.Path]:
+    """Return the sorted paths in the directory whose name matches the glob pattern."""
+    matches = compile_name_pattern(pattern)
+    return [directory / name for name in _list_directory(directory) if matches(name)]
+
+
+def _walk_files(directory: pathlib.Path) -> typing.Iterator[pathlib.Path]:
+    """Recursively yield the files in the directory.
+
+    Like Path.rglob(), symlinked directories are not descended into.
+    """
+    listing = fscache.listdir(directory) or {}
+    for name in sorted(listing):
+        entry = listing[name]
+        try:
+            if entry.is_file():
+                yield directory / name
+            elif entry.is_dir() and not entry.is_symlink():
+                yield from _walk_files(directory / name)
+        except OSError:
+            pass
 
 
 def expand_sequence(path: pathlib.Path) -> typing.Iterator[pathlib.Path]:
@@ -96,36 +143,35 @@ def expand_sequence(path: pathlib.Path) -> typing.Iterator[pathlib.Path]:
         path = path.with_name(path.name.replace("<UDIM>", "*"))
 
     if "*" in str(path):  # assume it is a glob
-        import glob
-
         log.debug("expanding glob %s", path)
 
-        # Prime the parent directory to trigger cloud sync before globbing
         parent = path.parent
-        if parent.is_dir():
-            _prime_cloud_directory(parent)
+        if "**" not in path.name and not glob.has_magic(str(parent)):
+            # Only the file name is a pattern; match it against the listing.
+            yield from match_names(parent, path.name)
+            return
+
+        # Prime the parent directory to trigger cloud sync before globbing
+        if fscache.is_dir(parent):
+            fscache.prime_once(parent, _prime_cloud_directory)
 
         for fname in sorted(glob.glob(str(path), recursive=True)):
             yield pathlib.Path(fname)
         return
 
     # Check if it's a directory first - directories need different handling
-    if path.is_dir():
+    if fscache.is_dir(path):
         # Explode directory paths into separate files (recursively).
         log.debug("expanding directory %s", path)
-        _prime_cloud_directory(path)
-        for subpath in path.rglob("*"):
-            if subpath.is_file():
-                yield subpath
+        fscache.prime_once(path, _prime_cloud_directory)
+        yield from _walk_files(path)
         return
 
     # For non-glob paths, try to open the file first (triggers cloud sync)
     # before falling back to exists() check
-    if _try_open_file(path):
+    if fscache.probe(path) is None:
         log.debug("expanding file sequence %s", path)
 
-        import string
-
         stem_no_digits = path.stem.rstrip(string.digits)
         if stem_no_digits == path.stem:
             # Just a single file, no digits here.
@@ -135,13 +181,12 @@ def expand_sequence(path: pathlib.Path) -> typing.Iterator[pathlib.Path]:
         # Return everything start starts with 'stem_no_digits' and ends with the
         # same suffix as the first file. This may result in more files than used
         # by Blender, but at least it shouldn't miss any.
-        pattern = "%s*%s" % (stem_no_digits, path.suffix)
-        _prime_cloud_directory(path.parent)
-        yield from sorted(path.parent.glob(pattern))
+        pattern = "%s*%s" % (glob.escape(stem_no_digits), glob.escape(path.suffix))
+        yield from match_names(path.parent, pattern)
         return
 
     # File doesn't exist or can't be opened
-    if not path.exists():
+    if not fscache.exists(path):
         raise DoesNotExist(path)
 
     # Path exists but couldn't be opened (permissions, locked file, etc.)
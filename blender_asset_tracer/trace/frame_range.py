@@ -0,0 +1,374 @@
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# ***** END GPL LICENCE BLOCK *****
+"""Narrow file sequences down to the files used by a range of frames.
+
+Sequences and caches are reported with all their files, while rendering a
+few frames only reads some of them. For data blocks that determine which
+file is read for a scene frame, block_frame_mapping() describes that
+relation as a FrameMapping, and select_files() uses it to split the files
+of a sequence into the needed and the unneeded ones.
+
+This errs on the side of keeping files. Files without a frame number are
+always kept, and when a needed frame has no file of its own, the nearest
+files before and after it are kept, as Blender clamps or interpolates
+between those.
+"""
+
+import bisect
+import dataclasses
+import logging
+import math
+import pathlib
+import re
+import typing
+
+from .. import blendfile, cdefs
+from ..blendfile import iterators
+
+log = logging.getLogger(__name__)
+
+# Frames around every rendered frame that are also considered used, for
+# motion blur and sub-frame interpolation.
+DEFAULT_MARGIN = 2
+
+# See VolumeSequenceMode in DNA_volume_types.h
+VOLUME_SEQUENCE_CLIP = 0
+VOLUME_SEQUENCE_EXTEND = 1
+VOLUME_SEQUENCE_REPEAT = 2
+VOLUME_SEQUENCE_PING_PONG = 3
+
+_last_number = re.compile(r"(\d+)\D*$")
+_point_cache_number = re.compile(r"_(\d+)_\d+$")
+
+
+def scene_frames(
+    frames: typing.Iterable[int], margin: int = DEFAULT_MARGIN
+) -> typing.Set[int]:
+    """Return the rendered frames, widened by the margin on both sides."""
+    widened = set()  # type: typing.Set[int]
+    for frame in frames:
+        widened.update(range(frame - margin, frame + margin + 1))
+    return widened
+
+
+def _strip_extension(name: str) -> str:
+    return name.rsplit(".", 1)[0] if "." in name else name
+
+
+@dataclasses.dataclass(frozen=True)
+class FrameMapping:
+    """How scene frames map to the frame numbers of the files of a sequence."""
+
+    local_users_only = False
+    """When True, the mapping is only complete if the data block is local to
+    the blend file that is rendered, as users in other files are unknown."""
+
+    def file_frames(self, frame: int) -> typing.Iterable[int]:
+        """Return the file frame numbers read for this scene frame."""
+        raise NotImplementedError()
+
+    def always(self) -> typing.Iterable[int]:
+        """Return the file frame numbers that are read regardless of the frame.
+
+        Unlike the frames of file_frames(), these do not have to exist.
+        """
+        return ()
+
+    def frame_number(self, filename: str) -> typing.Optional[int]:
+        """Return the frame number of the file, or None if it has none.
+
+        Like Blender, this takes the last number before the file extension.
+        """
+        match = _last_number.search(_strip_extension(filename))
+        return int(match.group(1)) if match else None
+
+
+def _clamp(frame: int, start: int, end: int) -> int:
+    return max(start, min(frame, end))
+
+
+@dataclasses.dataclass(frozen=True)
+class VolumeFrames(FrameMapping):
+    """See volume_sequence_frame() in volume.cc"""
+
+    frame_start: int
+    frame_offset: int
+    frame_duration: int
+    sequence_mode: int
+
+    def file_frames(self, frame: int) -> typing.Iterable[int]:
+        duration = self.frame_duration
+        if duration <= 0:
+            return ()
+
+        frame = frame - self.frame_start + 1
+        mode = self.sequence_mode
+        if mode == VOLUME_SEQUENCE_CLIP:
+            if frame < 1 or frame > duration:
+                return ()
+        elif mode == VOLUME_SEQUENCE_EXTEND:
+            frame = _clamp(frame, 1, duration)
+        elif mode == VOLUME_SEQUENCE_REPEAT:
+            frame = frame % duration or duration
+        elif mode == VOLUME_SEQUENCE_PING_PONG:
+            pingpong = duration * 2 - 2
+            if pingpong <= 0:
+                frame = 1
+            else:
+                frame = frame % pingpong or pingpong
+                if frame > duration:
+                    frame = duration * 2 - frame
+        else:
+            raise ValueError("unknown volume sequence mode %d" % mode)
+        return (frame + self.frame_offset,)
+
+
+@dataclasses.dataclass(frozen=True)
+class ImageUserFrames(FrameMapping):
+    """Union of the frames of all the ImageUsers of an image sequence.
+
+    See BKE_image_user_frame_get() in image.cc
+    """
+
+    users: typing.Tuple[typing.Tuple[int, int, int, bool], ...]
+    """(frames, sfra, offset, cycl) of each ImageUser."""
+
+    local_users_only = True
+
+    def file_frames(self, frame: int) -> typing.Iterable[int]:
+        found = set()
+        for length, start, offset, cyclic in self.users:
+            if length == 0:
+                found.add(0)
+                continue
+            user_frame = frame - start + 1
+            if cyclic:
+                user_frame = user_frame % length or length
+            user_frame = _clamp(user_frame, 0, length)
+            found.add(user_frame + offset)
+        return found
+
+
+@dataclasses.dataclass(frozen=True)
+class ClampedFrames(FrameMapping):
+    """Caches that are read at the scene frame, clamped to their range."""
+
+    start: int
+    end: int
+    offsets: typing.Tuple[int, ...] = (0,)
+    """Offsets subtracted from the scene frame."""
+
+    def file_frames(self, frame: int) -> typing.Iterable[int]:
+        return {_clamp(frame - offset, self.start, self.end) for offset in self.offsets}
+
+
+@dataclasses.dataclass(frozen=True)
+class PointCacheFrames(ClampedFrames):
+    """Point caches; see ptcache_filepath() in pointcache.cc"""
+
+    def always(self) -> typing.Iterable[int]:
+        # Frame 0 holds the cache info.
+        return (0,)
+
+    def frame_number(self, filename: str) -> typing.Optional[int]:
+        # The file names are {name}_{frame:06}_{index:02}{extension}.
+        match = _point_cache_number.search(_strip_extension(filename))
+        return int(match.group(1)) if match else None
+
+
+@dataclasses.dataclass(frozen=True)
+class FixedFrames(FrameMapping):
+    """Sequences that are always read at the same frames."""
+
+    frames: typing.Tuple[int, ...]
+
+    def file_frames(self, frame: int) -> typing.Iterable[int]:
+        return self.frames
+
+
+def block_frame_mapping(
+    block: blendfile.BlendFileBlock,
+) -> typing.Optional[FrameMapping]:
+    """Return how scene frames map to the files of the block's sequence.
+
+    :returns: the mapping, or None when it is not known for this block.
+    """
+    try:
+        func = _mappings_for_type[block.dna_type_name]
+    except KeyError:
+        return None
+    try:
+        return func(block)
+    except (KeyError, blendfile.exceptions.SegmentationFault) as ex:
+        log.debug("Unable to determine the frames of %r: %s", block, ex)
+        return None
+
+
+def _volume(block: blendfile.BlendFileBlock) -> typing.Optional[FrameMapping]:
+    return VolumeFrames(
+        frame_start=block[b"frame_start"],
+        frame_offset=block[b"frame_offset"],
+        frame_duration=block[b"frame_duration"],
+        sequence_mode=block[b"sequence_mode"],
+    )
+
+
+def _point_cache(block: blendfile.BlendFileBlock) -> typing.Optional[FrameMapping]:
+    return PointCacheFrames(start=block[b"startframe"], end=block[b"endframe"])
+
+
+def _fluid_domain(block: blendfile.BlendFileBlock) -> typing.Optional[FrameMapping]:
+    offset = block[b"cache_frame_offset"]
+    return ClampedFrames(
+        start=block[b"cache_frame_start"],
+        end=block[b"cache_frame_end"],
+        # Either direction, to not depend on the sign convention.
+        offsets=(offset, -offset) if offset else (0,),
+    )
+
+
+def _ocean_modifier(block: blendfile.BlendFileBlock) -> typing.Optional[FrameMapping]:
+    return ClampedFrames(start=block[b"bakestart"], end=block[b"bakeend"])
+
+
+def _cache_file(block: blendfile.BlendFileBlock) -> typing.Optional[FrameMapping]:
+    if not block[b"override_frame"]:
+        return ClampedFrames(start=-(2**31), end=2**31 - 1)
+    frame = block[b"frame"]
+    return FixedFrames(frames=tuple(sorted({math.floor(frame), math.ceil(frame)})))
+
+
+def _image(block: blendfile.BlendFileBlock) -> typing.Optional[FrameMapping]:
+    if block.get(b"source", default=cdefs.IMA_SRC_FILE) != cdefs.IMA_SRC_SEQUENCE:
+        # Movies are single files, and UDIM tiles are not frames.
+        return None
+    users = _image_users(block)
+    if not users:
+        return None
+    return ImageUserFrames(users=tuple(sorted(set(users))))
+
+
+_mappings_for_type = {
+    "Volume": _volume,
+    "PointCache": _point_cache,
+    "FluidDomainSettings": _fluid_domain,
+    "OceanModifierData": _ocean_modifier,
+    "CacheFile": _cache_file,
+    "Image": _image,
+}  # type: typing.Dict[str, typing.Callable[[blendfile.BlendFileBlock], typing.Optional[FrameMapping]]]
+
+
+def _image_user(
+    block: blendfile.BlendFileBlock, path: typing.Tuple[bytes, ...] = ()
+) -> typing.Tuple[int, int, int, bool]:
+    return (
+        block[path + (b"frames",)],
+        block[path + (b"sfra",)],
+        block[path + (b"offset",)],
+        bool(block[path + (b"cycl",)]),
+    )
+
+
+def _node_trees(bfile: blendfile.BlendFile) -> typing.Iterator[blendfile.BlendFileBlock]:
+    """Yield the node trees of the file, including those embedded in IDs."""
+    yield from bfile.find_blocks_from_code(b"NT")
+    for code in (b"MA", b"WO", b"LA", b"SC", b"TE", b"LS"):
+        for block in bfile.find_blocks_from_code(code):
+            ntree = block.get_pointer(b"nodetree", default=None)
+            if ntree is not None and ntree.code == b"DATA":
+                yield ntree
+
+
+def _image_users(
+    image: blendfile.BlendFileBlock,
+) -> typing.Optional[typing.List[typing.Tuple[int, int, int, bool]]]:
+    """Return the ImageUser settings of all users of the image in its file.
+
+    :returns: None when the image is used in a way that has no ImageUser,
+        such as a node socket value, so its frames are not known.
+    """
+    bfile = image.bfile
+    addr = image.addr_old
+    users = []
+
+    for texture in bfile.find_blocks_from_code(b"TE"):
+        if texture.get(b"ima", default=0) == addr:
+            users.append(_image_user(texture, (b"iuser",)))
+
+    for ntree in _node_trees(bfile):
+        for node in iterators.listbase(ntree.get_pointer((b"nodes", b"first"))):
+            if node[b"id"] == addr:
+                storage = node.get_pointer(b"storage")
+                if storage is None:
+                    return None
+                if storage.dna_type_name == "ImageUser":
+                    users.append(_image_user(storage))
+                elif storage.dna_type.has_field(b"iuser"):
+                    users.append(_image_user(storage, (b"iuser",)))
+                else:
+                    return None
+
+            inputs = node.get_pointer((b"inputs", b"first"))
+            for socket in iterators.listbase(inputs):
+                if socket[b"type"] != cdefs.SOCK_IMAGE:
+                    continue
+                value = socket.get_pointer(b"default_value")
+                if value is not None and value[b"value"] == addr:
+                    return None
+
+    return users
+
+
+def select_files(
+    mapping: FrameMapping,
+    frames: typing.Iterable[int],
+    paths: typing.Iterable[pathlib.Path],
+) -> typing.Tuple[typing.List[pathlib.Path], typing.List[pathlib.Path]]:
+    """Split the files of a sequence into needed and unneeded ones.
+
+    :param frames: the scene frames that are rendered, see scene_frames().
+    :returns: (needed, unneeded) files, both in the order of paths.
+    """
+    paths = list(paths)
+    numbers = [mapping.frame_number(path.name) for path in paths]
+    available = sorted({number for number in numbers if number is not None})
+
+    wanted = set()  # type: typing.Set[int]
+    for frame in frames:
+        wanted.update(mapping.file_frames(frame))
+
+    needed_numbers = set(mapping.always())
+    for number in wanted:
+        index = bisect.bisect_left(available, number)
+        if index < len(available) and available[index] == number:
+            needed_numbers.add(number)
+            continue
+        # No file for this frame; keep its neighbours.
+        if index > 0:
+            needed_numbers.add(available[index - 1])
+        if index < len(available):
+            needed_numbers.add(available[index])
+
+    needed = []
+    unneeded = []
+    for path, path_number in zip(paths, numbers):
+        if path_number is None or path_number in needed_numbers:
+            needed.append(path)
+        else:
+            unneeded.append(path)
+    return needed, unneeded
@@ -23,13 +23,44 @@ import pathlib
 import typing
 from typing import Optional
 
-from .. import blendfile, bpathlib
+from .. import blendfile, bpathlib, fscache
 from ..blendfile import dna
-from . import file_sequence
+from . import file_sequence, frame_range
 
 log = logging.getLogger(__name__)
 
 
+class UsageBlendFile(typing.Protocol):
+    """The parts of a blend file that a BlockUsage uses."""
+
+    @property
+    def filepath(self) -> pathlib.Path: ...
+
+    def abspath(self, relpath: bpathlib.BlendPath) -> bpathlib.BlendPath: ...
+
+
+class UsageBlock(typing.Protocol):
+    """The parts of a block that a BlockUsage uses.
+
+    Implemented by blendfile.BlendFileBlock, and by the stand-in blocks of
+    usages replayed from the trace cache.
+    """
+
+    @property
+    def bfile(self) -> UsageBlendFile: ...
+
+    @property
+    def code(self) -> bytes: ...
+
+    @property
+    def addr_old(self) -> int: ...
+
+    @property
+    def dna_type_name(self) -> str: ...
+
+    def __lt__(self, other: typing.Any) -> bool: ...
+
+
 @functools.total_ordering
 class BlockUsage:
     """Represents the use of an asset by a data block.
@@ -91,7 +122,7 @@ class BlockUsage:
         if isinstance(asset_path, bytes):
             asset_path = bpathlib.BlendPath(asset_path)
 
-        self.block = block
+        self.block = block  # type: UsageBlock
         self.asset_path = asset_path
         self.is_sequence = bool(is_sequence)
         self.path_full_field = path_full_field
@@ -148,27 +179,34 @@ class BlockUsage:
         if not self.is_sequence:
             # Try to open the file first - this triggers cloud sync for
             # placeholder files that might not pass exists() check
-            try:
-                with open(path, "rb") as f:
-                    f.read(1)
+            error = fscache.probe(path)
+            if error is None:
                 yield path
                 return
-            except FileNotFoundError:
+            if isinstance(error, FileNotFoundError) or not fscache.exists(path):
+                # Other errors (permission, etc.) only count as missing
+                # when the file does not exist.
                 log.debug("Path %s does not exist for %s", path, self)
                 return
-            except Exception:
-                # Other errors (permission, etc.) - check if file exists
-                if not path.exists():
-                    log.debug("Path %s does not exist for %s", path, self)
-                    return
-                yield path
-                return
+            yield path
+            return
 
         try:
             yield from file_sequence.expand_sequence(path)
         except file_sequence.DoesNotExist:
             log.debug("Path %s does not exist for %s", path, self)
 
+    def frame_mapping(self) -> Optional[frame_range.FrameMapping]:
+        """Determine which files of the sequence are read at which frames.
+
+        :returns: the mapping, or None if this is not a sequence or its
+            files cannot be related to frames.
+        """
+        if not self.is_sequence:
+            return None
+        assert isinstance(self.block, blendfile.BlendFileBlock)
+        return frame_range.block_frame_mapping(self.block)
+
     def __fspath__(self) -> pathlib.Path:
         """Determine the absolute path of the asset on the filesystem."""
         if self._abspath is None:
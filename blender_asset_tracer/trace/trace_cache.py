@@ -0,0 +1,538 @@
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# ***** END GPL LICENCE BLOCK *****
+"""Persistent cache of dependency traces.
+
+Tracing a blend file means visiting its blocks, and then the linked-in blocks
+of its libraries. The result of visiting one blend file only depends on the
+file itself and on which of its ID blocks are requested, so it can be stored
+on disk, and reused as long as the file does not change. When a shot file is
+edited, only that file has to be parsed again; the visits of its unchanged
+libraries are replayed from the cache.
+
+A visit is stored as the addresses of the visited blocks, the asset usages of
+those blocks, and the ID blocks requested from other libraries. Replayed
+usages are CachedBlockUsage objects; they support everything that is needed
+to list dependencies and to narrow sequences to frames, but they do not give access to the blend file data.
+Code that needs real blocks, such as the Packer, should not use this cache.
+"""
+
+import dataclasses
+import hashlib
+import logging
+import os
+import pathlib
+import pickle
+import tempfile
+import typing
+
+from .. import blendfile, bpathlib
+from . import file2blocks, frame_range, result
+
+log = logging.getLogger(__name__)
+
+# Bump this whenever the tracer or the stored records change in a way that
+# makes earlier cache entries incorrect.
+CACHE_FORMAT_VERSION = 3
+
+# Number of bytes of the file header included in the file signature.
+HEADER_SIZE = 17
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+FileSignature = typing.Tuple[str, int, int, bytes]
+"""(absolute path, size, modification time in nanoseconds, file header)."""
+
+UsageRecord = typing.Tuple[
+    bytes,
+    int,
+    str,
+    bytes,
+    bytes,
+    bool,
+    bool,
+    str,
+    typing.Optional[frame_range.FrameMapping],
+]
+"""(block code, block address, DNA type name, block name, asset path,
+is_sequence, is_optional, field name, frame mapping)."""
+
+
+@dataclasses.dataclass
+class FileVisit:
+    """The result of visiting the blocks of one blend file."""
+
+    blocks: typing.List[typing.Tuple[int, typing.List[UsageRecord]]] = (
+        dataclasses.field(default_factory=list)
+    )
+    """Address and asset usages of each visited block, in visiting order."""
+    libraries: typing.List[typing.Tuple[bytes, typing.List[bytes]]] = (
+        dataclasses.field(default_factory=list)
+    )
+    """Absolute library path and requested ID names, in visiting order."""
+    packed_images: typing.List[bytes] = dataclasses.field(default_factory=list)
+    """ID names of the images packed into this blend file."""
+
+
+@dataclasses.dataclass
+class TraceCacheStats:
+    hits: int = 0
+    """Number of blend file visits replayed from the cache."""
+    misses: int = 0
+    """Number of blend file visits that required parsing the file."""
+    stored: int = 0
+    evicted: int = 0
+
+    def as_dict(self) -> typing.Dict[str, int]:
+        return dataclasses.asdict(self)
+
+
+class TraceCache:
+    """On-disk cache of blend file visits, limited in total size.
+
+    When the cache grows beyond max_bytes, the least recently used entries are
+    removed by prune().
+    """
+
+    def __init__(
+        self, directory: pathlib.Path, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = TraceCacheStats()
+        # Visits used during this session, by absolute file path.
+        self._visits = {}  # type: typing.Dict[pathlib.Path, FileVisit]
+
+    @staticmethod
+    def signature(path: pathlib.Path) -> typing.Optional[FileSignature]:
+        """Return the signature of the file, or None if it cannot be read."""
+        try:
+            with path.open("rb") as infile:
+                stat = os.fstat(infile.fileno())
+                header = infile.read(HEADER_SIZE)
+        except OSError as ex:
+            log.debug("Not caching trace of %s: %s", path, ex)
+            return None
+        return str(path), stat.st_size, stat.st_mtime_ns, header
+
+    def lookup(
+        self,
+        signature: FileSignature,
+        names: typing.Optional[typing.Collection[bytes]],
+    ) -> typing.Optional[FileVisit]:
+        """Return the stored visit of the file, or None.
+
+        :param names: the requested ID names, or None if all blocks of the
+            file are visited.
+        """
+        key = _entry_key(signature, names)
+        path = self._entry_path(key)
+        try:
+            with path.open("rb") as infile:
+                stored_key, visit = pickle.load(infile)
+        except FileNotFoundError:
+            visit = None
+        except Exception as ex:
+            log.warning("Ignoring unreadable trace cache file %s: %s", path, ex)
+            visit = None
+        else:
+            if stored_key != key or not isinstance(visit, FileVisit):
+                log.warning("Ignoring trace cache file %s for another file", path)
+                visit = None
+
+        if visit is None:
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        self._visits[pathlib.Path(signature[0])] = visit
+        try:
+            # Mark the entry as recently used, for prune().
+            os.utime(str(path))
+        except OSError:
+            pass
+        return visit
+
+    def contains(
+        self,
+        signature: FileSignature,
+        names: typing.Optional[typing.Collection[bytes]],
+    ) -> bool:
+        """Return whether there is an entry for the file, without loading it."""
+        return self._entry_path(_entry_key(signature, names)).exists()
+
+    def store(
+        self,
+        signature: FileSignature,
+        names: typing.Optional[typing.Collection[bytes]],
+        visit: FileVisit,
+    ) -> None:
+        self._visits[pathlib.Path(signature[0])] = visit
+
+        key = _entry_key(signature, names)
+        path = self._entry_path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first, so that concurrent readers never
+            # see a partially written entry.
+            fd, tmpname = tempfile.mkstemp(
+                prefix=path.stem + "-", suffix=".tmp", dir=str(self.directory)
+            )
+            try:
+                with os.fdopen(fd, "wb") as outfile:
+                    pickle.dump((key, visit), outfile, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmpname, str(path))
+            except BaseException:
+                os.unlink(tmpname)
+                raise
+        except OSError as ex:
+            log.warning("Unable to write trace cache file %s: %s", path, ex)
+            return
+        self.stats.stored += 1
+
+    def packed_images(self, path: pathlib.Path) -> typing.Optional[typing.List[bytes]]:
+        """Return the packed image names of a file visited in this session.
+
+        Returns None when the file was not visited through this cache.
+        """
+        visit = self._visits.get(bpathlib.make_absolute(path))
+        if visit is None:
+            return None
+        return visit.packed_images
+
+    def prune(self) -> None:
+        """Remove the least recently used entries until the cache fits."""
+        try:
+            entries = []
+            for entry in os.scandir(str(self.directory)):
+                if not entry.name.endswith(".pickle"):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        except FileNotFoundError:
+            return
+        except OSError as ex:
+            log.warning("Unable to inspect trace cache %s: %s", self.directory, ex)
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as ex:
+                log.warning("Unable to remove trace cache file %s: %s", path, ex)
+                continue
+            total -= size
+            self.stats.evicted += 1
+
+    def _entry_path(self, key: tuple) -> pathlib.Path:
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=20).hexdigest()
+        return self.directory / ("trace-v%d-%s.pickle" % (CACHE_FORMAT_VERSION, digest))
+
+
+def _entry_key(
+    signature: FileSignature, names: typing.Optional[typing.Collection[bytes]]
+) -> tuple:
+    sorted_names = None if names is None else tuple(sorted(names))
+    return CACHE_FORMAT_VERSION, signature, sorted_names
+
+
+class CachedBlendFile:
+    """Stand-in for the BlendFile of replayed usages."""
+
+    def __init__(self, filepath: pathlib.Path) -> None:
+        self.filepath = filepath
+
+    def abspath(self, relpath: bpathlib.BlendPath) -> bpathlib.BlendPath:
+        """Construct an absolute path from a blendfile-relative path."""
+        if relpath.is_absolute():
+            return relpath
+        root = bpathlib.BlendPath(self.filepath.absolute().parent)
+        return relpath.absolute(root)
+
+    def __repr__(self) -> str:
+        return "<%s %r>" % (self.__class__.__qualname__, self.filepath)
+
+
+class CachedBlock:
+    """Stand-in for the BlendFileBlock of replayed usages."""
+
+    __slots__ = ("bfile", "code", "addr_old", "dna_type_name")
+
+    def __init__(
+        self, bfile: CachedBlendFile, code: bytes, addr_old: int, dna_type_name: str
+    ) -> None:
+        self.bfile = bfile
+        self.code = code
+        self.addr_old = addr_old
+        self.dna_type_name = dna_type_name
+
+    def __repr__(self) -> str:
+        return "<%s.%s (%s) at %s>" % (
+            self.__class__.__name__,
+            self.dna_type_name,
+            self.code.decode(),
+            hex(self.addr_old),
+        )
+
+    # Hash and compare like BlendFileBlock, so that replayed usages are
+    # deduplicated against freshly traced ones.
+    def __hash__(self) -> int:
+        return hash((self.code, self.addr_old, self.bfile.filepath))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (CachedBlock, blendfile.BlendFileBlock)):
+            return False
+        return (
+            self.code == other.code
+            and self.addr_old == other.addr_old
+            and self.bfile.filepath == other.bfile.filepath
+        )
+
+    def __lt__(self, other: object) -> bool:
+        """Order blocks by file path and address, for predictable sorting."""
+        if not isinstance(other, CachedBlock):
+            return NotImplemented
+        my_key = self.bfile.filepath, self.addr_old
+        other_key = other.bfile.filepath, other.addr_old
+        return my_key < other_key
+
+
+class CachedBlockUsage(result.BlockUsage):
+    """Asset usage replayed from the trace cache.
+
+    The path fields are not available, so this cannot be used to rewrite
+    paths in the blend file.
+    """
+
+    # noinspection PyMissingConstructor
+    def __init__(self, bfile: CachedBlendFile, record: UsageRecord) -> None:
+        (
+            code,
+            addr_old,
+            dna_type_name,
+            block_name,
+            asset_path,
+            is_sequence,
+            is_optional,
+            field_name,
+            frame_mapping,
+        ) = record
+        self.block = CachedBlock(bfile, code, addr_old, dna_type_name)
+        self.block_name = block_name
+        self.asset_path = bpathlib.BlendPath(asset_path)
+        self.is_sequence = is_sequence
+        self.is_optional = is_optional
+        self.path_full_field = None
+        self.path_dir_field = None
+        self.path_base_field = None
+        self.field_name = field_name
+        self._frame_mapping = frame_mapping
+        self._abspath = None  # type: typing.Optional[pathlib.Path]
+
+    def frame_mapping(self) -> typing.Optional[frame_range.FrameMapping]:
+        return self._frame_mapping
+
+    def __repr__(self):
+        return "<CachedBlockUsage name=%r type=%r field=%r asset=%r%s>" % (
+            self.block_name,
+            self.block.dna_type_name,
+            self.field_name,
+            self.asset_path,
+            " sequence" if self.is_sequence else "",
+        )
+
+
+def _usage_record(usage: result.BlockUsage) -> UsageRecord:
+    if usage.path_full_field is not None:
+        field_name = usage.path_full_field.name.name_full.decode()
+    elif usage.path_dir_field is not None and usage.path_base_field is not None:
+        field_name = (
+            usage.path_dir_field.name.name_full.decode()
+            + "/"
+            + usage.path_base_field.name.name_full.decode()
+        )
+    else:
+        field_name = ""
+    block = usage.block
+    return (
+        block.code,
+        block.addr_old,
+        block.dna_type_name,
+        usage.block_name,
+        bytes(usage.asset_path),
+        usage.is_sequence,
+        usage.is_optional,
+        field_name,
+        usage.frame_mapping(),
+    )
+
+
+def _packed_images(bfile: blendfile.BlendFile) -> typing.List[bytes]:
+    names = []
+    for block in bfile.code_index[b"IM"]:
+        try:
+            if block.get(b"packedfile", default=False):
+                names.append(block.id_name or b"")
+        except Exception as ex:
+            log.debug("Unable to inspect %r for packed data: %s", block, ex)
+    return names
+
+
+class CachingTracer:
+    """Visit blend files like BlockIterator does, through a TraceCache.
+
+    Visits of unchanged files are replayed from the cache, and the others
+    are performed by the BlockIterator and stored in the cache.
+    """
+
+    def __init__(
+        self,
+        bi: file2blocks.BlockIterator,
+        cache: TraceCache,
+        block_usages: typing.Callable[
+            [blendfile.BlendFileBlock], typing.Iterable[result.BlockUsage]
+        ],
+    ) -> None:
+        """
+        :param block_usages: function that returns the asset usages of a
+            visited block.
+        """
+        self.bi = bi
+        self.cache = cache
+        self.block_usages = block_usages
+        # Absolute paths of blend files that have been visited. A visit is
+        # only independent of the rest of the trace, and thus cachable, when
+        # none of the blocks of the file have been visited before.
+        self._visited = set()  # type: typing.Set[pathlib.Path]
+        self._signatures = (
+            {}
+        )  # type: typing.Dict[pathlib.Path, typing.Optional[FileSignature]]
+
+    def usages(
+        self,
+        bfilepath: pathlib.Path,
+        root_names: typing.Optional[typing.Collection[bytes]] = None,
+    ) -> typing.Iterator[result.BlockUsage]:
+        """Generator, yield the asset usages of this file and its libraries.
+
+        :param root_names: when given, only the blocks that can be reached
+            from these blocks are visited, like
+            BlockIterator.iter_reachable_blocks() does.
+        """
+        yield from self._visit(bfilepath, root_names, self.bi.open_blendfile)
+
+    def _signature(self, bpath: pathlib.Path) -> typing.Optional[FileSignature]:
+        try:
+            return self._signatures[bpath]
+        except KeyError:
+            pass
+        signature = self.cache.signature(bpath)
+        self._signatures[bpath] = signature
+        return signature
+
+    def _visit(
+        self,
+        filepath: pathlib.Path,
+        names: typing.Optional[typing.Collection[bytes]],
+        open_blendfile: typing.Callable[[pathlib.Path], blendfile.BlendFile],
+    ) -> typing.Iterator[result.BlockUsage]:
+        bpath = bpathlib.make_absolute(filepath)
+        visit = None
+        signature = None
+        if bpath not in self._visited:
+            signature = self._signature(bpath)
+            if signature is not None:
+                visit = self.cache.lookup(signature, names)
+
+        if visit is not None:
+            log.info("replaying: %s", filepath)
+            self.bi.progress_cb.trace_blendfile(filepath)
+            self._visited.add(bpath)
+
+            bfile = CachedBlendFile(filepath)
+            for addr_old, records in visit.blocks:
+                self.bi.blocks_yielded.add((bpath, addr_old))
+                for record in records:
+                    yield CachedBlockUsage(bfile, record)
+            libraries = visit.libraries
+        else:
+            visit = FileVisit()
+            yield from self._visit_file(open_blendfile(filepath), names, visit)
+            self._visited.add(bpath)
+            libraries = visit.libraries
+            if signature is not None:
+                self.cache.store(signature, names, visit)
+
+        yield from self._visit_libraries(libraries)
+
+    def _visit_file(
+        self,
+        bfile: blendfile.BlendFile,
+        names: typing.Optional[typing.Collection[bytes]],
+        visit: FileVisit,
+    ) -> typing.Iterator[result.BlockUsage]:
+        bi = self.bi
+        log.info("inspecting: %s", bfile.filepath)
+        if names is None:
+            bi._queue_all_blocks(bfile)
+        else:
+            bi._queue_blocks_by_name(bfile, names)
+
+        visiting = bi._visit_blocks(bfile, names)
+        while True:
+            try:
+                block = next(visiting)
+            except StopIteration as stop:
+                blocks_per_lib = stop.value
+                break
+            usages = list(self.block_usages(block))
+            visit.blocks.append((block.addr_old, [_usage_record(u) for u in usages]))
+            yield from usages
+
+        visit.packed_images = _packed_images(bfile)
+        for lib_bpath, idblocks in blocks_per_lib.items():
+            id_names = sorted({idblock[b"name"] for idblock in idblocks})
+            visit.libraries.append((bytes(lib_bpath), id_names))
+
+    def _visit_libraries(
+        self, libraries: typing.List[typing.Tuple[bytes, typing.List[bytes]]]
+    ) -> typing.Iterator[result.BlockUsage]:
+        # Mirrors BlockIterator._visit_linked_blocks().
+        to_visit = []
+        for lib_bpath, id_names in libraries:
+            lib_path = bpathlib.make_absolute(bpathlib.BlendPath(lib_bpath).to_path())
+            if not lib_path.exists():
+                log.warning("Library %s does not exist", lib_path)
+                continue
+            to_visit.append((lib_path, id_names))
+
+        # Only the libraries that have to be parsed are worth opening ahead.
+        to_parse = []
+        for lib_path, id_names in to_visit:
+            signature = self._signature(lib_path)
+            if signature is None or not self.cache.contains(signature, id_names):
+                to_parse.append(lib_path)
+        self.bi._prefetch_libraries(to_parse)
+
+        for lib_path, id_names in to_visit:
+            log.debug("Expanding %d blocks in %s", len(id_names), lib_path)
+            yield from self._visit(lib_path, id_names, self.bi._open_library)
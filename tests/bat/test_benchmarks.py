@@ -0,0 +1,632 @@
+"""
+Timing comparisons of the different ways BlendFile can access its data.
+
+These are marked as slow, and only log their timings. They do assert that the
+compared code paths produce identical results, so that a faster code path can
+never silently become a wrong one.
+
+They are skipped unless the BAT_BENCHMARK environment variable is set, e.g.
+``BAT_BENCHMARK=1 python -m pytest tests/bat/test_benchmarks.py``.
+"""
+
+import dataclasses
+import gc
+import logging
+import os
+import pathlib
+import queue
+import tempfile
+import time
+import tracemalloc
+import typing
+from unittest import mock
+
+import pytest
+
+from blender_asset_tracer import blendfile, fscache, trace
+from blender_asset_tracer.blendfile import exceptions
+from blender_asset_tracer.trace import expanders, file2blocks
+from tests.bat.abstract_test import AbstractBlendFileTest
+
+log = logging.getLogger(__name__)
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("BAT_BENCHMARK"), reason="set BAT_BENCHMARK=1 to run benchmarks"
+)
+
+LARGE_BLENDFILES = (
+    "meshcache-source.blend",
+    "alembic-source.blend",
+    "alembic-sequence-source.blend",
+    "basic_file_large_bhead8.blend",
+    "multires_external.blend",
+    "basic_file_compressed.blend",
+    "basic_file_compressed_zstd.blend",
+)
+
+
+def _read_all_fields(bf: blendfile.BlendFile) -> list:
+    """Read every top-level field of every block with a known DNA type."""
+    values = []
+    for block in bf.blocks:
+        if block.code == b"DATA" or block.sdna_index == 0:
+            continue
+        for field in block.dna_type.fields:
+            try:
+                value = block.get(field.name.name_only, as_str=False)
+            except exceptions.NoReaderImplemented:
+                continue
+            values.append(value)
+    return values
+
+
+@pytest.mark.slow
+class MmapBenchmarkTest(AbstractBlendFileTest):
+    rounds = 3
+
+    def setUp(self):
+        super().setUp()
+        # Compare mapping and reading the same decompressed file.
+        blendfile.set_seekable_zstd_mode(False)
+
+    def tearDown(self):
+        blendfile.set_mmap_mode(True)
+        blendfile.set_seekable_zstd_mode(True)
+        super().tearDown()
+
+    def _time_mode(self, path, use_mmap: bool):
+        blendfile.set_mmap_mode(use_mmap)
+        best = float("inf")
+        values = None
+        for _ in range(self.rounds):
+            with blendfile.BlendFile(path) as bf:
+                self.assertEqual(use_mmap, bf.mapping is not None)
+                start = time.perf_counter()
+                values = _read_all_fields(bf)
+                best = min(best, time.perf_counter() - start)
+        return best, values
+
+    def test_mmap_vs_fileobj(self):
+        for name in LARGE_BLENDFILES:
+            path = self.blendfiles / name
+            if not path.exists():
+                continue
+            if name.endswith("_zstd.blend"):
+                pytest.importorskip("zstandard")
+
+            with self.subTest(name):
+                fileobj_time, fileobj_values = self._time_mode(path, False)
+                mmap_time, mmap_values = self._time_mode(path, True)
+
+                self.assertEqual(fileobj_values, mmap_values)
+                log.info(
+                    "%s: %d values, fileobj %.1f ms, mmap %.1f ms (%.1fx)",
+                    name,
+                    len(mmap_values),
+                    fileobj_time * 1000,
+                    mmap_time * 1000,
+                    fileobj_time / mmap_time if mmap_time else float("inf"),
+                )
+
+
+def write_blendfile_with_extra_blocks(
+    source: pathlib.Path,
+    target: pathlib.Path,
+    make_blocks: typing.Callable[[blendfile.BlendFile, int], typing.Iterable],
+) -> None:
+    """Copy a blend file, inserting extra blocks before ENDB.
+
+    :param make_blocks: called with the opened source file and the first free
+        address; yields (code, addr_old, sdna_index, count, data) tuples.
+    """
+    with blendfile.BlendFile(source) as bf:
+        header_struct = bf.block_header_struct
+        names = [f.name for f in dataclasses.fields(bf.block_header_fields)]
+        table = bf.block_table
+        endb_offset = table.file_offset[-1] + table.size[-1]
+        base_addr = max(table.addr_old) + 0x1000
+        extra_blocks = list(make_blocks(bf, base_addr))
+
+    source_data = source.read_bytes()
+    with target.open("wb") as outfile:
+        outfile.write(source_data[:endb_offset])
+        chunk = []
+        for code, addr_old, sdna_index, count, data in extra_blocks:
+            values = {
+                "code": code,
+                "len": len(data),
+                "old": addr_old,
+                "SDNAnr": sdna_index,
+                "nr": count,
+            }
+            chunk.append(header_struct.pack(*(values[name] for name in names)))
+            chunk.append(data)
+            if len(chunk) >= 20000:
+                outfile.write(b"".join(chunk))
+                chunk.clear()
+        outfile.write(b"".join(chunk))
+        outfile.write(source_data[endb_offset:])
+
+
+def write_synthetic_blendfile(
+    source: pathlib.Path, target: pathlib.Path, data_blocks: int
+) -> None:
+    """Copy a blend file, inserting many small DATA blocks before ENDB.
+
+    The DATA blocks have unique addresses and are not referenced by anything,
+    which mimics the block count of heavy geometry files.
+    """
+
+    def make_blocks(_bf, base_addr: int):
+        payload = b"\0" * 8
+        for index in range(data_blocks):
+            yield b"DATA", base_addr + index * 16, 0, 1, payload
+
+    write_blendfile_with_extra_blocks(source, target, make_blocks)
+
+
+def write_id_library(
+    source: pathlib.Path, target: pathlib.Path, code: bytes, copies: int
+) -> typing.List[bytes]:
+    """Copy a blend file, adding copies of its first ID block with this code.
+
+    The copies are named like b'MA00042'; their data is that of the original
+    block, so they point to the same sub-blocks.
+
+    :returns: the ID names of the copies.
+    """
+    id_names = ["%s%05d" % (code.decode(), index) for index in range(copies)]
+
+    def make_blocks(bf: blendfile.BlendFile, base_addr: int):
+        original = bf.code_index[code][0]
+        data = original.raw_data()
+        name_offset, name_len = original.abs_offset((b"id", b"name"))
+        name_offset -= original.file_offset
+        for index, id_name in enumerate(id_names):
+            name = id_name.encode().ljust(name_len, b"\0")
+            copy = data[:name_offset] + name + data[name_offset + name_len :]
+            yield code, base_addr + index * 16, original.sdna_index, 1, copy
+
+    write_blendfile_with_extra_blocks(source, target, make_blocks)
+    return [name.encode() for name in id_names]
+
+
+@pytest.mark.slow
+class BlockTableBenchmarkTest(AbstractBlendFileTest):
+    # Set BAT_BENCHMARK_BLOCKS=1000000 to measure production-size files.
+    data_blocks = int(os.environ.get("BAT_BENCHMARK_BLOCKS", "100000"))
+
+    def setUp(self):
+        super().setUp()
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.tempdir.name) / "synthetic.blend"
+        write_synthetic_blendfile(
+            self.blendfiles / "basic_file.blend", self.path, self.data_blocks
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        self.tempdir.cleanup()
+
+    def _load(self, materialize: bool) -> int:
+        bf = blendfile.BlendFile(self.path)
+        if materialize:
+            # This is what loading the file used to do for every block.
+            all_blocks = list(bf.blocks)
+            by_addr = {block.addr_old: block for block in all_blocks}
+            self.assertEqual(len(all_blocks), len(bf.blocks))
+            self.assertIn(all_blocks[-1].addr_old, by_addr)
+        ob = bf.code_index[b"OB"][0]
+        mesh = bf.dereference_pointer(ob.get(b"data"))
+        self.assertEqual(b"ME", mesh.code)
+        num_blocks = len(bf.blocks)
+        bf.close()
+        return num_blocks
+
+    def _measure(self, materialize: bool):
+        gc.collect()
+        start = time.perf_counter()
+        num_blocks = self._load(materialize)
+        duration = time.perf_counter() - start
+
+        # Measure memory separately, as tracing allocations is slow.
+        gc.collect()
+        tracemalloc.start()
+        self._load(materialize)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return duration, peak, num_blocks
+
+    def test_lazy_vs_materialized(self):
+        lazy_time, lazy_peak, num_blocks = self._measure(materialize=False)
+        full_time, full_peak, _ = self._measure(materialize=True)
+
+        self.assertGreaterEqual(num_blocks, self.data_blocks)
+        self.assertLess(lazy_peak, full_peak)
+        log.info(
+            "%d blocks: block table %.2f s, %.1f MiB peak; "
+            "all blocks created %.2f s, %.1f MiB peak",
+            num_blocks,
+            lazy_time,
+            lazy_peak / 2**20,
+            full_time,
+            full_peak / 2**20,
+        )
+
+
+def _expand_all(bfiles: typing.List[blendfile.BlendFile]) -> list:
+    """The expander hot loop of the tracer, without the queueing."""
+    expanded = []
+    for bf in bfiles:
+        for code in bf.code_index:
+            if code == b"DATA":
+                continue
+            for block in bf.code_index[code]:
+                for dep in expanders.expand_block(block):
+                    expanded.append((dep.code, dep.addr_old))
+    return expanded
+
+
+@pytest.mark.slow
+class ExpanderBenchmarkTest(AbstractBlendFileTest):
+    rounds = 20
+
+    def tearDown(self):
+        blendfile.set_mmap_mode(True)
+        super().tearDown()
+
+    def _time_mode(self, paths, use_mmap: bool):
+        blendfile.set_mmap_mode(use_mmap)
+        bfiles = [blendfile.BlendFile(path) for path in paths]
+        try:
+            # The first round compiles the field accessors.
+            expanded = _expand_all(bfiles)
+            start = time.perf_counter()
+            for _ in range(self.rounds):
+                self.assertEqual(expanded, _expand_all(bfiles))
+            duration = (time.perf_counter() - start) / self.rounds
+        finally:
+            for bf in bfiles:
+                bf.close()
+        return duration, expanded
+
+    def test_compiled_accessors_vs_fileobj(self):
+        paths = [
+            path
+            for path in sorted(self.blendfiles.glob("*.blend"))
+            if not path.name.startswith("corrupt") and "zstd" not in path.name
+        ]
+
+        fileobj_time, fileobj_expanded = self._time_mode(paths, False)
+        mmap_time, mmap_expanded = self._time_mode(paths, True)
+
+        self.assertEqual(fileobj_expanded, mmap_expanded)
+        log.info(
+            "expanding %d files, %d dependencies: field_get %.1f ms, "
+            "compiled accessors %.1f ms (%.1fx)",
+            len(paths),
+            len(mmap_expanded),
+            fileobj_time * 1000,
+            mmap_time * 1000,
+            fileobj_time / mmap_time if mmap_time else float("inf"),
+        )
+
+
+class _LinkedID:
+    """Stand-in for the ID block with which a shot links an asset."""
+
+    code = b"ID"
+
+    def __init__(self, id_name: bytes) -> None:
+        self.id_name = id_name
+
+    def __getitem__(self, key):
+        assert key == b"name"
+        return self.id_name
+
+
+@pytest.mark.slow
+class NamedBlockBenchmarkTest(AbstractBlendFileTest):
+    library_ids = 5000
+    shots = 200
+    ids_per_shot = 50
+
+    def setUp(self):
+        super().setUp()
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.tempdir.name) / "library.blend"
+        self.id_names = write_id_library(
+            self.blendfiles / "basic_file.blend",
+            self.path,
+            b"MA",
+            self.library_ids,
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        self.tempdir.cleanup()
+
+    def _requests(self):
+        """Names linked by each shot; every shot links a different subset."""
+        for shot in range(self.shots):
+            start = (shot * 97) % (self.library_ids - self.ids_per_shot)
+            names = self.id_names[start : start + self.ids_per_shot]
+            yield {_LinkedID(name) for name in names}
+
+    def _linear_scan(self, bf: blendfile.BlendFile, limit_to) -> set:
+        """How BlockIterator used to find linked blocks."""
+        found = set()
+        for to_find in limit_to:
+            name_to_find = to_find[b"name"]
+            for block in bf.find_blocks_from_code(name_to_find[:2]):
+                if block.id_name == name_to_find:
+                    found.add(block)
+        return found
+
+    def _indexed(self, bf: blendfile.BlendFile, limit_to) -> set:
+        bi = file2blocks.BlockIterator()
+        bi._queue_named_blocks(bf, limit_to)
+        found = set()
+        while not bi.to_visit.empty():
+            found.add(bi.to_visit.get())
+        return found
+
+    def test_index_vs_linear_scan(self):
+        bf = blendfile.open_cached(self.path)
+        requests = list(self._requests())
+
+        start = time.perf_counter()
+        expect = [self._linear_scan(bf, limit_to) for limit_to in requests]
+        linear_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = [self._indexed(bf, limit_to) for limit_to in requests]
+        indexed_time = time.perf_counter() - start
+
+        self.assertEqual(expect, found)
+        self.assertEqual(self.ids_per_shot, len(found[-1]))
+        log.info(
+            "%d shots linking %d of %d IDs: linear scan %.2f s, name index %.3f s",
+            self.shots,
+            self.ids_per_shot,
+            self.library_ids,
+            linear_time,
+            indexed_time,
+        )
+
+
+@pytest.mark.slow
+class SeekableZstdBenchmarkTest(AbstractBlendFileTest):
+    """Open a Blender-style multi-frame zstd file with big DATA blocks."""
+
+    big_blocks = 32
+    block_size = 2 * 1024 * 1024
+    frame_size = 1024 * 1024
+
+    def setUp(self):
+        super().setUp()
+        zstandard = pytest.importorskip("zstandard")
+        from tests.bat.test_blendfile_zstd_seekable import compress_frames
+
+        self.tempdir = tempfile.TemporaryDirectory()
+        plain_path = pathlib.Path(self.tempdir.name) / "plain.blend"
+
+        def make_blocks(_bf, base_addr: int):
+            payload = bytes(range(256)) * (self.block_size // 256)
+            for index in range(self.big_blocks):
+                yield b"DATA", base_addr + index * 16, 0, 1, payload
+
+        write_blendfile_with_extra_blocks(
+            self.blendfiles / "basic_file.blend", plain_path, make_blocks
+        )
+
+        # Like Blender, write big blocks as frames of their own, and start
+        # a new frame once the buffered small blocks fill a frame.
+        with blendfile.BlendFile(plain_path) as bf:
+            table = bf.block_table
+            blocks = list(zip(table.file_offset, table.size))
+        data = plain_path.read_bytes()
+        cuts = []
+        frame_start = 0
+        for offset, size in blocks:
+            if size >= self.frame_size:
+                cuts += [offset, offset + size]
+                frame_start = offset + size
+            elif offset + size - frame_start >= self.frame_size:
+                cuts.append(offset + size)
+                frame_start = offset + size
+        bounds = [0] + cuts + [len(data)]
+        chunks = [data[a:b] for a, b in zip(bounds, bounds[1:]) if b > a]
+        self.assertGreater(len(chunks), self.big_blocks)
+
+        self.path = pathlib.Path(self.tempdir.name) / "zstd.blend"
+        self.path.write_bytes(compress_frames(chunks))
+        del zstandard
+
+    def tearDown(self):
+        blendfile.set_seekable_zstd_mode(True)
+        super().tearDown()
+        self.tempdir.cleanup()
+
+    def _open(self, seekable: bool):
+        blendfile.set_seekable_zstd_mode(seekable)
+        start = time.perf_counter()
+        with blendfile.BlendFile(self.path) as bf:
+            ob = bf.code_index[b"OB"][0]
+            mesh = bf.dereference_pointer(ob.get(b"data"))
+            names = (ob.id_name, mesh.id_name, len(bf.blocks))
+        return time.perf_counter() - start, names
+
+    def test_seekable_vs_decompress(self):
+        full_time, expect = self._open(False)
+        seekable_time, found = self._open(True)
+
+        self.assertEqual(expect, found)
+        log.info(
+            "%d MiB zstd file: full decompression %.1f ms, on demand %.1f ms (%.1fx)",
+            self.big_blocks * self.block_size // 2**20,
+            full_time * 1000,
+            seekable_time * 1000,
+            full_time / seekable_time if seekable_time else float("inf"),
+        )
+
+
+class _PriorityBlockQueue(queue.PriorityQueue):
+    """How BlockIterator used to queue blocks: locked, and without dedup."""
+
+    def _put(self, item: blendfile.BlendFileBlock):
+        super()._put((item.bfile.filepath, item.file_offset, item))
+
+    def _get(self) -> blendfile.BlendFileBlock:
+        _, _, item = super()._get()
+        return item
+
+
+@pytest.mark.slow
+class NodeGroupFrontierBenchmarkTest(AbstractBlendFileTest):
+    """Trace a file with deeply nested, widely shared node groups.
+
+    There is no blend file with such a node graph among the test files, so
+    the graph is laid over the DATA blocks of a real file: every node group
+    uses every node group of the next nesting level, and all ID blocks use
+    every node group of the first level.
+    """
+
+    depth = 24
+    width = 48
+
+    def setUp(self):
+        super().setUp()
+        self.path = self.blendfiles / "ies-lamp/ies_scene.blend"
+        bf = blendfile.open_cached(self.path)
+        groups = bf.code_index[b"DATA"][: self.depth * self.width]
+        self.assertEqual(self.depth * self.width, len(groups))
+        self.levels = [
+            groups[level * self.width : (level + 1) * self.width]
+            for level in range(self.depth)
+        ]
+        self.level_of = {
+            block.addr_old: level
+            for level, blocks in enumerate(self.levels)
+            for block in blocks
+        }
+
+    def _expand_block(self, block: blendfile.BlendFileBlock):
+        if block.code != b"DATA":
+            return iter(self.levels[0])
+        level = self.level_of.get(block.addr_old, self.depth) + 1
+        if level >= self.depth:
+            return iter(())
+        return iter(self.levels[level])
+
+    def _trace(self, queue_class) -> typing.Tuple[float, list, int]:
+        puts = 0
+        queues = set()
+        put = queue_class.put
+
+        def counting_put(queue, block, *args):
+            nonlocal puts
+            puts += 1
+            queues.add(queue)
+            return put(queue, block, *args)
+
+        with mock.patch.object(
+            file2blocks.expanders, "expand_block", self._expand_block
+        ), mock.patch.object(file2blocks, "BlockQueue", queue_class), mock.patch.object(
+            queue_class, "put", counting_put
+        ):
+            start = time.perf_counter()
+            found = [(dep.block.addr_old, dep.asset_path) for dep in trace.deps(self.path)]
+            duration = time.perf_counter() - start
+        queued = puts - sum(getattr(queue, "duplicates", 0) for queue in queues)
+        return duration, found, queued
+
+    def test_frontier_vs_priority_queue(self):
+        # Warm up the blendfile cache and field accessors.
+        self._trace(file2blocks.BlockQueue)
+
+        old_time, old_found, old_queued = self._trace(_PriorityBlockQueue)
+        new_time, new_found, new_queued = self._trace(file2blocks.BlockQueue)
+
+        self.assertEqual(old_found, new_found)
+        log.info(
+            "tracing %d nested node groups: PriorityQueue %.1f ms for %d queued "
+            "blocks, deduplicating frontier %.1f ms for %d queued blocks (%.1fx)",
+            self.depth * self.width,
+            old_time * 1000,
+            old_queued,
+            new_time * 1000,
+            new_queued,
+            old_time / new_time if new_time else float("inf"),
+        )
+
+
+@pytest.mark.slow
+class FilesystemCacheBenchmarkTest(AbstractBlendFileTest):
+    """Count the filesystem calls the submit pipeline makes per dependency.
+
+    Every file of the test file tree is inspected the way tracing, packing
+    and building the manifest do: trace checks whether it is a directory and
+    records its size, packing checks it again and reads its first byte, and
+    the manifest sums the sizes.
+    """
+
+    def _inspect(self, paths: typing.List[pathlib.Path]) -> list:
+        found = []
+        for path in paths:
+            # Trace
+            is_dir = fscache.is_dir(path)
+            size = fscache.getsize(path)
+            # Pack
+            fscache.is_dir(path)
+            error = fscache.probe(path)
+            fscache.is_dir(path)
+            # Manifest
+            size += fscache.getsize(path)
+            found.append((is_dir, size, error))
+        return found
+
+    def _count_calls(self, paths: typing.List[pathlib.Path]) -> typing.Tuple[int, list]:
+        calls = 0
+        real_stat, real_scandir, real_open = os.stat, os.scandir, open
+
+        def counting(func):
+            def wrapper(*args, **kwargs):
+                nonlocal calls
+                calls += 1
+                return func(*args, **kwargs)
+
+            return wrapper
+
+        with mock.patch("os.stat", counting(real_stat)), mock.patch(
+            "os.scandir", counting(real_scandir)
+        ), mock.patch("builtins.open", counting(real_open)):
+            found = self._inspect(paths)
+        return calls, found
+
+    def test_cached_vs_uncached(self):
+        paths = sorted(p for p in self.blendfiles.rglob("*") if p.is_file())
+
+        uncached_calls, uncached_found = self._count_calls(paths)
+        cache = fscache.enable()
+        try:
+            cached_calls, cached_found = self._count_calls(paths)
+        finally:
+            fscache.disable()
+
+        self.assertEqual(uncached_found, cached_found)
+        # DirEntry.stat() does not go through os.stat(), so take the count of
+        # the cache itself, which includes those.
+        self.assertLessEqual(cached_calls, cache.stats.syscalls)
+        cached_calls = cache.stats.syscalls
+        self.assertLess(cached_calls, uncached_calls)
+        log.info(
+            "inspecting %d files in %d directories: %d filesystem calls uncached, "
+            "%d with the shared cache (%.1fx fewer, %d lookups answered)",
+            len(paths),
+            cache.stats.scandir_calls,
+            uncached_calls,
+            cached_calls,
+            uncached_calls / cached_calls if cached_calls else float("inf"),
+            cache.stats.lookups,
+        )
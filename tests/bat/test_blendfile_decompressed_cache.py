@@ -0,0 +1,84 @@
+import os
+import pathlib
+import shutil
+import tempfile
+
+from blender_asset_tracer import blendfile
+from blender_asset_tracer.blendfile import decompressed_cache
+from tests.bat.abstract_test import AbstractBlendFileTest
+
+
+class DecompressedCacheTest(AbstractBlendFileTest):
+    def setUp(self):
+        super().setUp()
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.cache_dir = pathlib.Path(self._tempdir.name) / "decompressed"
+        blendfile.set_decompressed_cache_dir(self.cache_dir)
+        # ZStandard files would be read on demand, without decompressing them.
+        blendfile.set_seekable_zstd_mode(False)
+        decompressed_cache.reset_stats()
+
+    def tearDown(self):
+        blendfile.set_decompressed_cache_dir(None)
+        blendfile.set_seekable_zstd_mode(True)
+        decompressed_cache.reset_stats()
+        super().tearDown()
+        self._tempdir.cleanup()
+
+    def _read_loc(self, path: pathlib.Path, mode="rb"):
+        with blendfile.BlendFile(path, mode) as bf:
+            self.assertTrue(bf.is_compressed)
+            raw_filepath = bf.raw_filepath
+            loc = bf.code_index[b"OB"][0].get(b"loc")
+        return raw_filepath, loc
+
+    def test_reuse(self):
+        for name in ("basic_file_compressed.blend", "basic_file_compressed_zstd.blend"):
+            with self.subTest(name):
+                decompressed_cache.reset_stats()
+                path = self.blendfiles / name
+                raw1, loc1 = self._read_loc(path)
+                raw2, loc2 = self._read_loc(path)
+
+                self.assertEqual(self.cache_dir, raw1.parent)
+                self.assertEqual(raw1, raw2)
+                self.assertEqual(loc1, loc2)
+                self.assertEqual(
+                    {"hits": 1, "misses": 1, "evicted": 0}, decompressed_cache.stats
+                )
+                # The cached copy outlives the BlendFile.
+                self.assertTrue(raw1.exists())
+
+    def test_uncompressed_not_cached(self):
+        with blendfile.BlendFile(self.blendfiles / "basic_file.blend") as bf:
+            self.assertFalse(bf.is_compressed)
+        self.assertFalse(self.cache_dir.exists())
+
+    def test_writable_not_cached(self):
+        copy = pathlib.Path(self._tempdir.name) / "compressed.blend"
+        shutil.copy(str(self.blendfiles / "basic_file_compressed.blend"), str(copy))
+        raw_filepath, _ = self._read_loc(copy, mode="r+b")
+        self.assertNotEqual(self.cache_dir, raw_filepath.parent)
+        self.assertEqual(0, decompressed_cache.stats["misses"])
+
+    def test_changed_source(self):
+        copy = pathlib.Path(self._tempdir.name) / "compressed.blend"
+        shutil.copy(str(self.blendfiles / "basic_file_compressed.blend"), str(copy))
+        raw1, _ = self._read_loc(copy)
+
+        stat = copy.stat()
+        os.utime(str(copy), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        raw2, _ = self._read_loc(copy)
+
+        self.assertNotEqual(raw1, raw2)
+        self.assertEqual(2, decompressed_cache.stats["misses"])
+
+    def test_eviction(self):
+        # Room for just one decompressed file.
+        blendfile.set_decompressed_cache_dir(self.cache_dir, max_bytes=1)
+        raw1, _ = self._read_loc(self.blendfiles / "basic_file_compressed.blend")
+        raw2, _ = self._read_loc(self.blendfiles / "basic_file_compressed_zstd.blend")
+
+        self.assertFalse(raw1.exists())
+        self.assertTrue(raw2.exists())
+        self.assertEqual(1, decompressed_cache.stats["evicted"])
@@ -282,6 +282,52 @@ class StructTest(unittest.TestCase):
         self.assertEqual("my_name", val)
         fileobj.seek.assert_called_with(4194, os.SEEK_CUR)
 
+    def test_field_accessor(self):
+        header = self.FakeHeader()
+        accessor = self.s.field_accessor(header, b"numbah")
+        self.assertIs(accessor, self.s.field_accessor(header, b"numbah"))
+        self.assertIs(self.f_number, accessor.field)
+        self.assertEqual(4136, accessor.offset)
+
+        data = b"\0" * 10 + b"\x01\x02\x03\x04\xff\xfe\xfd\xfa"
+        self.assertEqual(0x1020304FFFEFDFA, accessor.decode(data, 10))
+
+        # Different decoding options get their own accessor.
+        as_bytes = self.s.field_accessor(header, b"path", as_str=False)
+        as_str = self.s.field_accessor(header, b"path", as_str=True)
+        self.assertIsNot(as_bytes, as_str)
+        data = b"\xf0\x9f\xa6\x87\x00dummy".ljust(4096, b"\0")
+        self.assertEqual(b"\xf0\x9f\xa6\x87", as_bytes.decode(data, 0))
+        self.assertEqual("🦇", as_str.decode(data, 0))
+
+    def test_field_accessor_nonexistant(self):
+        with self.assertRaises(KeyError) as first:
+            self.s.field_accessor(self.FakeHeader(), b"nonexistant")
+        with mock.patch.object(self.s, "field_from_path") as field_from_path:
+            with self.assertRaises(KeyError) as second:
+                self.s.field_accessor(self.FakeHeader(), b"nonexistant")
+        field_from_path.assert_not_called()
+        self.assertEqual(first.exception.args, second.exception.args)
+
+    def test_field_unpack(self):
+        header = self.FakeHeader()
+        data = bytearray(4200)
+        data[4144:4152] = b"@333@2\x8f\\"
+        data[4112:4120] = b"\xf0\x9f\xa6\x87\x00dum"
+
+        _, val = self.s.field_unpack(header, data, 0, b"floaty")
+        self.assertAlmostEqual(2.8, val[0])
+        self.assertAlmostEqual(2.79, val[1])
+        _, val = self.s.field_unpack(header, data, 0, (b"floaty", 1))
+        self.assertAlmostEqual(2.79, val)
+        _, val = self.s.field_unpack(header, data, 0, b"ptr")
+        self.assertEqual(0xF09FA6870064756D, val)
+        _, val = self.s.field_unpack(header, data, 0, b"nonexistant", default=47)
+        self.assertEqual(47, val)
+
+        with self.assertRaises(NotImplementedError):
+            self.s.field_unpack(header, data, 0, b"bignum")
+
     def test_char_field_set(self):
         fileobj = mock.MagicMock(io.BufferedReader)
         value = 255
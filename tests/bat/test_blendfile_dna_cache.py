@@ -0,0 +1,66 @@
+import pathlib
+import tempfile
+
+from blender_asset_tracer import blendfile
+from blender_asset_tracer.blendfile import dna_cache
+from tests.bat.abstract_test import AbstractBlendFileTest
+
+
+class DNACacheTest(AbstractBlendFileTest):
+    def setUp(self):
+        super().setUp()
+        dna_cache.clear()
+
+    def tearDown(self):
+        blendfile.set_dna_cache_dir(None)
+        dna_cache.clear()
+        super().tearDown()
+
+    def _open(self, name: str) -> blendfile.BlendFile:
+        return blendfile.open_cached(self.blendfiles / name)
+
+    def test_shared_between_files(self):
+        bf1 = self._open("basic_file.blend")
+        bf2 = self._open("basic_file_compressed.blend")
+        self.assertEqual({"hits": 1, "disk_hits": 0, "misses": 1}, dna_cache.stats)
+
+        self.assertEqual(bf1.structs, bf2.structs)
+        self.assertIsNot(bf1.structs, bf2.structs)
+        self.assertIs(bf1.struct(b"Object"), bf2.struct(b"Object"))
+        self.assertEqual(bf1.sdna_index_from_id, bf2.sdna_index_from_id)
+
+        ob1 = bf1.code_index[b"OB"][0]
+        ob2 = bf2.code_index[b"OB"][0]
+        self.assertEqual(ob1.get(b"loc"), ob2.get(b"loc"))
+
+    def test_different_dna(self):
+        bf1 = self._open("basic_file.blend")
+        bf2 = self._open("basic_file_large_bhead8.blend")
+        self.assertEqual(2, dna_cache.stats["misses"])
+        self.assertIsNot(bf1.struct(b"Object"), bf2.struct(b"Object"))
+
+    def test_on_disk(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            cache_dir = pathlib.Path(tempdir) / "dna"
+            blendfile.set_dna_cache_dir(cache_dir)
+
+            bf = self._open("basic_file.blend")
+            expect_loc = bf.code_index[b"OB"][0].get(b"loc")
+            bf.close()
+            cache_files = list(cache_dir.glob("dna-v*.pickle"))
+            self.assertEqual(1, len(cache_files))
+
+            # Simulate another process by forgetting the in-memory catalogs.
+            dna_cache.clear()
+            bf = self._open("basic_file.blend")
+            self.assertEqual({"hits": 0, "disk_hits": 1, "misses": 0}, dna_cache.stats)
+            self.assertEqual(expect_loc, bf.code_index[b"OB"][0].get(b"loc"))
+            bf.close()
+
+            # Broken cache files are ignored.
+            cache_files[0].write_bytes(b"not a pickle")
+            dna_cache.clear()
+            bf = self._open("basic_file.blend")
+            self.assertEqual(1, dna_cache.stats["misses"])
+            self.assertEqual(expect_loc, bf.code_index[b"OB"][0].get(b"loc"))
+            bf.close()
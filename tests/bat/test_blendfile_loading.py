@@ -1,9 +1,15 @@
 import os
 import pathlib
+import shutil
 import tempfile
 
 from blender_asset_tracer import blendfile
-from blender_asset_tracer.blendfile import iterators, exceptions, magic_compression
+from blender_asset_tracer.blendfile import (
+    iterators,
+    exceptions,
+    magic_compression,
+    zstd_seekable,
+)
 from tests.bat.abstract_test import AbstractBlendFileTest
 
 
@@ -178,6 +184,110 @@ class BlendFileLargeBhead8Test(AbstractBlendFileTest):
         self.assertEqual([2.0, 3.0, 5.0], loc)
 
 
+class BlockTableTest(AbstractBlendFileTest):
+    def setUp(self):
+        self.bf = blendfile.BlendFile(self.blendfiles / "basic_file.blend")
+
+    def test_blocks_created_on_access(self):
+        table = self.bf.block_table
+        self.assertEqual(len(table), len(self.bf.blocks))
+        # Only the GLOB and DNA1 blocks are needed for loading the file.
+        self.assertEqual(2, len(self.bf._blocks_by_row))
+
+        block = self.bf.blocks[10]
+        self.assertIs(block, self.bf.blocks[10])
+        self.assertIs(self.bf.blocks[-1], self.bf.blocks[len(table) - 1])
+        self.assertEqual(table.code(10), block.code)
+        self.assertEqual(table.file_offset[10], block.file_offset)
+        self.assertIn(10, self.bf._blocks_by_row)
+        self.assertLessEqual(len(self.bf._blocks_by_row), 4)
+
+    def test_code_index(self):
+        obs = self.bf.code_index[b"OB"]
+        self.assertIs(obs, self.bf.code_index[b"OB"])
+        self.assertEqual([b"OB"], [ob.code for ob in obs])
+        self.assertIn(b"DATA", self.bf.code_index)
+        self.assertNotIn(b"XX", self.bf.code_index)
+        self.assertEqual([], self.bf.code_index[b"XX"])
+        self.assertNotIn(b"ENDB", self.bf.code_index)
+
+        codes_in_order = [block.code for block in self.bf.blocks]
+        for code in self.bf.code_index:
+            self.assertEqual(codes_in_order.count(code), len(self.bf.code_index[code]))
+
+    def test_find_blocks_from_id_name(self):
+        ob = self.bf.code_index[b"OB"][0]
+        self.assertEqual([ob], self.bf.find_blocks_from_id_name(b"OB", ob.id_name))
+        self.assertEqual([], self.bf.find_blocks_from_id_name(b"OB", b"OBnonexistant"))
+        self.assertEqual([], self.bf.find_blocks_from_id_name(b"XX", b"XXsomething"))
+
+    def test_block_from_addr(self):
+        expect = {}
+        for block in self.bf.blocks:
+            expect[block.addr_old] = block
+
+        self.assertEqual(len(expect), len(self.bf.block_from_addr))
+        for addr, block in expect.items():
+            self.assertIs(block, self.bf.block_from_addr[addr])
+        self.assertNotIn(0xDEADBEEF, self.bf.block_from_addr)
+
+        ob = self.bf.code_index[b"OB"][0]
+        del self.bf.block_from_addr[ob.addr_old]
+        self.assertNotIn(ob.addr_old, self.bf.block_from_addr)
+        with self.assertRaises(KeyError):
+            del self.bf.block_from_addr[ob.addr_old]
+
+
+class MmapModeTest(AbstractBlendFileTest):
+    def tearDown(self):
+        blendfile.set_mmap_mode(True)
+        super().tearDown()
+
+    def _read_object(self, bf: blendfile.BlendFile):
+        ob = bf.code_index[b"OB"][0]
+        mesh = bf.block_from_addr[ob.get(b"data")]
+        return (
+            ob.get((b"id", b"name"), as_str=True),
+            ob.get(b"loc"),
+            ob.get((b"loc", 2)),
+            ob.get(b"data"),
+            list(mesh.iter_fixed_array_of_pointers(b"mat")),
+            ob.raw_data(),
+        )
+
+    def test_read_only_is_mapped(self):
+        self.bf = blendfile.BlendFile(self.blendfiles / "basic_file.blend")
+        self.assertIsNotNone(self.bf.mapping)
+
+        mapping = self.bf.mapping
+        self.bf.close()
+        self.assertIsNone(self.bf.mapping)
+        self.assertTrue(mapping.closed)
+
+    def test_writable_is_not_mapped(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            copy = pathlib.Path(tempdir) / "basic_file.blend"
+            copy.write_bytes((self.blendfiles / "basic_file.blend").read_bytes())
+            with blendfile.BlendFile(copy, "rb+") as bf:
+                self.assertIsNone(bf.mapping)
+
+    def test_same_values(self):
+        for name in ("basic_file.blend", "basic_file_compressed.blend"):
+            with self.subTest(name):
+                blendfile.set_mmap_mode(True)
+                with blendfile.BlendFile(self.blendfiles / name) as bf:
+                    self.assertIsNotNone(bf.mapping)
+                    mapped = self._read_object(bf)
+
+                blendfile.set_mmap_mode(False)
+                with blendfile.BlendFile(self.blendfiles / name) as bf:
+                    self.assertIsNone(bf.mapping)
+                    unmapped = self._read_object(bf)
+
+                self.assertEqual(unmapped, mapped)
+                self.assertEqual("OBümlaut", mapped[0])
+
+
 class PointerTest(AbstractBlendFileTest):
     def setUp(self):
         self.bf = blendfile.BlendFile(self.blendfiles / "with_sequencer.blend")
@@ -396,7 +506,12 @@ class LoadZStdCompressedTest(AbstractBlendFileTest):
         name = ob.get((b"id", b"name"), as_str=True)
         self.assertEqual("OBümlaut", name)
 
+    def tearDown(self):
+        blendfile.set_seekable_zstd_mode(True)
+        super().tearDown()
+
     def test_as_context(self):
+        blendfile.set_seekable_zstd_mode(False)
         zstd_bfile_path = self.blendfiles / "basic_file_compressed_zstd.blend"
         with blendfile.BlendFile(zstd_bfile_path) as bf:
             filepath = bf.filepath
@@ -406,6 +521,27 @@ class LoadZStdCompressedTest(AbstractBlendFileTest):
         self.assertTrue(filepath.exists())
         self.assertFalse(raw_filepath.exists())
 
+    def test_seekable(self):
+        zstd_bfile_path = self.blendfiles / "basic_file_compressed_zstd.blend"
+        with blendfile.BlendFile(zstd_bfile_path) as bf:
+            self.assertIsInstance(bf.fileobj, zstd_seekable.SeekableZstdReader)
+            self.assertEqual(zstd_bfile_path, bf.raw_filepath)
+            self.assertIsNone(bf.mapping)
+            seekable_name = bf.code_index[b"OB"][0].get((b"id", b"name"))
+
+        self.assertTrue(bf.fileobj.closed)
+        blendfile.set_seekable_zstd_mode(False)
+        with blendfile.BlendFile(zstd_bfile_path) as bf:
+            self.assertNotIsInstance(bf.fileobj, zstd_seekable.SeekableZstdReader)
+            self.assertEqual(seekable_name, bf.code_index[b"OB"][0].get((b"id", b"name")))
+
+    def test_seekable_writable(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            copy = pathlib.Path(tempdir) / "compressed.blend"
+            shutil.copy(str(self.blendfiles / "basic_file_compressed_zstd.blend"), str(copy))
+            with blendfile.BlendFile(copy, "r+b") as bf:
+                self.assertNotIsInstance(bf.fileobj, zstd_seekable.SeekableZstdReader)
+
 
 class LoadNonBlendfileTest(AbstractBlendFileTest):
     def test_loading(self):
@@ -521,6 +657,111 @@ class BlendFileCacheTest(AbstractBlendFileTest):
         self.assertEqual(str(bf.raw_filepath), bf.fileobj.name)
 
 
+class OpenFileLimitTest(AbstractBlendFileTest):
+    def setUp(self):
+        super().setUp()
+        blendfile.set_max_open_files(2)
+        for name in blendfile.open_file_stats:
+            blendfile.open_file_stats[name] = 0
+
+    def tearDown(self):
+        blendfile.set_max_open_files(blendfile.DEFAULT_MAX_OPEN_FILES)
+        super().tearDown()
+
+    def test_least_recently_used_is_closed(self):
+        bf1 = blendfile.open_cached(self.blendfiles / "basic_file.blend")
+        bf2 = blendfile.open_cached(self.blendfiles / "linked_cube.blend")
+        # Using the first file again makes the second one the oldest.
+        self.assertIs(bf1, blendfile.open_cached(self.blendfiles / "basic_file.blend"))
+        bf3 = blendfile.open_cached(self.blendfiles / "multiple_materials.blend")
+
+        self.assertFalse(bf1.fileobj.closed)
+        self.assertTrue(bf2.fileobj.closed)
+        self.assertFalse(bf3.fileobj.closed)
+        self.assertEqual(1, blendfile.open_file_stats["suspended"])
+        # Closed files stay in the cache.
+        self.assertTrue(blendfile.is_cached(self.blendfiles / "linked_cube.blend"))
+
+    def test_untracked_files_do_not_evict(self):
+        bf1 = blendfile.open_cached(self.blendfiles / "basic_file.blend")
+        bf2 = blendfile.open_cached(self.blendfiles / "linked_cube.blend")
+        bf3 = blendfile.open_cached(
+            self.blendfiles / "multiple_materials.blend", track_open=False
+        )
+        self.assertFalse(bf1.fileobj.closed)
+        self.assertFalse(bf2.fileobj.closed)
+        self.assertEqual(0, blendfile.open_file_stats["suspended"])
+
+        # Evicting is left to the thread that marks the file as used.
+        blendfile.mark_used(bf3)
+        self.assertTrue(bf1.fileobj.closed)
+        self.assertFalse(bf3.fileobj.closed)
+
+    def test_blocks_stay_valid(self):
+        for name in ("basic_file.blend", "basic_file_compressed.blend"):
+            with self.subTest(name):
+                bf = blendfile.open_cached(self.blendfiles / name)
+                ob = bf.code_index[b"OB"][0]
+                expect_loc = ob.get(b"loc")
+
+                bf._suspend()
+                self.assertTrue(bf.fileobj.closed)
+                self.assertIsNone(bf.mapping)
+
+                self.assertEqual(expect_loc, ob.get(b"loc"))
+                self.assertEqual("OBümlaut", ob.id_name.decode())
+                self.assertFalse(bf.fileobj.closed)
+                blendfile.close_all_cached()
+
+    def test_reopening_evicts_others(self):
+        bf1 = blendfile.open_cached(self.blendfiles / "basic_file.blend")
+        ob = bf1.code_index[b"OB"][0]
+        bf2 = blendfile.open_cached(self.blendfiles / "linked_cube.blend")
+        bf3 = blendfile.open_cached(self.blendfiles / "multiple_materials.blend")
+        self.assertTrue(bf1.fileobj.closed)
+
+        ob.get(b"loc")
+        self.assertEqual(1, blendfile.open_file_stats["reopened"])
+        self.assertFalse(bf1.fileobj.closed)
+        self.assertTrue(bf2.fileobj.closed)
+        self.assertFalse(bf3.fileobj.closed)
+
+    def test_writable_files_stay_open(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            copy = pathlib.Path(tempdir) / "linked_cube.blend"
+            shutil.copy(str(self.blendfiles / "linked_cube.blend"), str(copy))
+            writable = blendfile.open_cached(copy, mode="r+b")
+            blendfile.open_cached(self.blendfiles / "basic_file.blend")
+            blendfile.open_cached(self.blendfiles / "multiple_materials.blend")
+            self.assertFalse(writable.fileobj.closed)
+            blendfile.close_all_cached()
+
+    def test_close_suspended(self):
+        bf = blendfile.open_cached(self.blendfiles / "basic_file.blend")
+        ob = bf.code_index[b"OB"][0]
+        bf._suspend()
+        bf.close()
+
+        self.assertTrue(bf.fileobj.closed)
+        self.assertFalse(blendfile.is_cached(self.blendfiles / "basic_file.blend"))
+        with self.assertRaises(ValueError):
+            ob.get(b"loc")
+
+    def test_changed_file(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            copy = pathlib.Path(tempdir) / "basic_file.blend"
+            shutil.copy(str(self.blendfiles / "basic_file.blend"), str(copy))
+            bf = blendfile.open_cached(copy)
+            ob = bf.code_index[b"OB"][0]
+            bf._suspend()
+
+            stat = copy.stat()
+            os.utime(str(copy), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            with self.assertRaises(exceptions.BlendFileError):
+                ob.get(b"loc")
+            blendfile.close_all_cached()
+
+
 class BlendFileSubVersionTest(AbstractBlendFileTest):
     def test_file_subversion(self) -> None:
         self.bf = blendfile.BlendFile(self.blendfiles / "multiple_materials.blend")
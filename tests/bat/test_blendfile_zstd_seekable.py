@@ -0,0 +1,108 @@
+import io
+import struct
+
+import zstandard
+
+from blender_asset_tracer.blendfile import magic_compression, zstd_seekable
+from tests.bat.abstract_test import AbstractBlendFileTest
+
+
+def compress_frames(chunks, seek_table: bool = True) -> bytes:
+    """Compress each chunk into its own frame, like Blender does."""
+    cctx = zstandard.ZstdCompressor(write_content_size=True)
+    frames = [cctx.compress(chunk) for chunk in chunks]
+    data = b"".join(frames)
+    if not seek_table:
+        return data
+
+    entries = b"".join(
+        struct.pack("<II", len(frame), len(chunk)) for frame, chunk in zip(frames, chunks)
+    )
+    footer = struct.pack("<IBI", len(frames), 0, zstd_seekable.SEEKABLE_FOOTER_MAGIC)
+    skippable = struct.pack(
+        "<II", zstd_seekable.SEEK_TABLE_MAGIC, len(entries) + len(footer)
+    )
+    return data + skippable + entries + footer
+
+
+class SeekableZstdTest(AbstractBlendFileTest):
+    def setUp(self):
+        super().setUp()
+        self.chunks = [bytes([i]) * (1000 + i) for i in range(10)]
+        self.plain = b"".join(self.chunks)
+
+    def _reader(self, data: bytes, **kwargs) -> zstd_seekable.SeekableZstdReader:
+        reader = zstd_seekable.open_seekable(io.BytesIO(data), **kwargs)
+        self.assertIsNotNone(reader)
+        return reader
+
+    def test_frame_index(self):
+        for seek_table in (True, False):
+            with self.subTest(seek_table=seek_table):
+                data = compress_frames(self.chunks, seek_table)
+                frames = zstd_seekable.read_frame_index(io.BytesIO(data))
+                expect_offsets = [sum(map(len, self.chunks[:i])) for i in range(10)]
+                self.assertEqual(
+                    expect_offsets, [frame.offset for frame in frames if frame.size]
+                )
+
+    def test_random_access(self):
+        reader = self._reader(compress_frames(self.chunks))
+        self.assertEqual(10, reader.frame_count)
+
+        reader.seek(5500)
+        self.assertEqual(self.plain[5500:5510], reader.read(10))
+        self.assertEqual(1, reader.frames_decompressed)
+        self.assertEqual(5510, reader.tell())
+
+        # Reads spanning multiple frames, and past the end.
+        reader.seek(900)
+        self.assertEqual(self.plain[900:3500], reader.read(2600))
+        reader.seek(-5, io.SEEK_END)
+        self.assertEqual(self.plain[-5:], reader.read(100))
+        self.assertEqual(b"", reader.read(1))
+
+        reader.seek(0)
+        self.assertEqual(self.plain, reader.read())
+
+    def test_frame_cache_is_bounded(self):
+        reader = self._reader(compress_frames(self.chunks), cache_bytes=2500)
+        for _ in range(2):
+            reader.seek(0)
+            reader.read()
+        # Only two frames fit in the cache, so everything is decoded twice.
+        self.assertEqual(20, reader.frames_decompressed)
+
+        reader.seek(9000)
+        reader.read(1)
+        reader.seek(9000)
+        reader.read(1)
+        self.assertEqual(20, reader.frames_decompressed)
+
+    def test_single_frame_fallback(self):
+        data = compress_frames([self.plain])
+        self.assertIsNone(zstd_seekable.open_seekable(io.BytesIO(data)))
+
+    def test_unindexable_fallback(self):
+        # Streamed frames don't record their decompressed size.
+        cctx = zstandard.ZstdCompressor()
+        stream = io.BytesIO()
+        with cctx.stream_writer(stream, closefd=False) as writer:
+            writer.write(self.plain)
+        self.assertIsNone(zstd_seekable.read_frame_index(io.BytesIO(stream.getvalue())))
+
+    def test_blendfile(self):
+        path = self.blendfiles / "basic_file_compressed_zstd.blend"
+        info = magic_compression.open(path, "rb", 8192, seekable=True)
+        try:
+            self.assertIsInstance(info.fileobj, zstd_seekable.SeekableZstdReader)
+            seekable_data = info.fileobj.read()
+        finally:
+            info.fileobj.close()
+
+        info = magic_compression.open(path, "rb", 8192)
+        try:
+            info.fileobj.seek(0)
+            self.assertEqual(info.fileobj.read(), seekable_data)
+        finally:
+            info.fileobj.close()
@@ -0,0 +1,39 @@
+import os
+import unittest
+from unittest import mock
+
+from blender_asset_tracer import envvars
+
+ENV = "BAT_TEST_ENVVARS"
+
+
+class EnvVarsTest(unittest.TestCase):
+    def _env(self, value):
+        return mock.patch.dict(os.environ, {ENV: value})
+
+    def test_unset_gives_default(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop(ENV, None)
+            self.assertEqual(3, envvars.env_int(ENV, 3))
+            self.assertEqual(1.5, envvars.env_float(ENV, 1.5))
+            self.assertTrue(envvars.env_bool(ENV, True))
+
+    def test_values(self):
+        with self._env(" 12 "):
+            self.assertEqual(12, envvars.env_int(ENV, 3))
+            self.assertEqual(12.0, envvars.env_float(ENV, 1.5))
+        for value in ("1", "TRUE", "yes", "on"):
+            with self._env(value):
+                self.assertTrue(envvars.env_bool(ENV))
+        for value in ("0", "False", "no", "off"):
+            with self._env(value):
+                self.assertFalse(envvars.env_bool(ENV, True))
+
+    def test_invalid_gives_default(self):
+        with self._env("lots"):
+            with self.assertLogs(envvars.log, "WARNING"):
+                self.assertEqual(3, envvars.env_int(ENV, 3))
+            with self.assertLogs(envvars.log, "WARNING"):
+                self.assertEqual(1.5, envvars.env_float(ENV, 1.5))
+            with self.assertLogs(envvars.log, "WARNING"):
+                self.assertTrue(envvars.env_bool(ENV, True))
@@ -0,0 +1,111 @@
+import pathlib
+
+from blender_asset_tracer import trace
+from blender_asset_tracer.trace import frame_range
+from tests.bat.abstract_test import AbstractBlendFileTest
+
+
+def _paths(*names: str) -> list:
+    return [pathlib.Path("/cache") / name for name in names]
+
+
+class FrameMappingTest(AbstractBlendFileTest):
+    def test_scene_frames(self):
+        self.assertEqual({8, 9, 10, 11, 12}, frame_range.scene_frames([10]))
+        self.assertEqual({10, 20}, frame_range.scene_frames([10, 20], margin=0))
+
+    def test_volume_clip(self):
+        mapping = frame_range.VolumeFrames(
+            frame_start=10, frame_offset=0, frame_duration=5, sequence_mode=0
+        )
+        self.assertEqual((), mapping.file_frames(9))
+        self.assertEqual((1,), mapping.file_frames(10))
+        self.assertEqual((5,), mapping.file_frames(14))
+        self.assertEqual((), mapping.file_frames(15))
+
+    def test_volume_extend_with_offset(self):
+        mapping = frame_range.VolumeFrames(
+            frame_start=1, frame_offset=100, frame_duration=5, sequence_mode=1
+        )
+        self.assertEqual((101,), mapping.file_frames(-3))
+        self.assertEqual((103,), mapping.file_frames(3))
+        self.assertEqual((105,), mapping.file_frames(50))
+
+    def test_volume_repeat_and_ping_pong(self):
+        repeat = frame_range.VolumeFrames(
+            frame_start=1, frame_offset=0, frame_duration=4, sequence_mode=2
+        )
+        self.assertEqual([1, 2, 3, 4, 1, 2], [repeat.file_frames(f)[0] for f in range(1, 7)])
+        ping_pong = frame_range.VolumeFrames(
+            frame_start=1, frame_offset=0, frame_duration=3, sequence_mode=3
+        )
+        self.assertEqual(
+            [1, 2, 3, 2, 1, 2], [ping_pong.file_frames(f)[0] for f in range(1, 7)]
+        )
+
+    def test_image_users(self):
+        mapping = frame_range.ImageUserFrames(
+            users=((10, 1, 0, False), (4, 1, 20, True))
+        )
+        self.assertEqual({3, 23}, mapping.file_frames(3))
+        self.assertEqual({10, 21}, mapping.file_frames(13))
+
+    def test_point_cache_frame_number(self):
+        mapping = frame_range.PointCacheFrames(start=1, end=250)
+        self.assertEqual(11, mapping.frame_number("43756265_000011_01.bphys"))
+        self.assertEqual(7, mapping.frame_number("Smoke_000007_00.vdb"))
+        self.assertIsNone(mapping.frame_number("readme.txt"))
+
+    def test_select_exact_frames(self):
+        mapping = frame_range.ClampedFrames(start=1, end=100)
+        paths = _paths(*("fluid_%04d.vdb" % frame for frame in range(1, 11)), "config.uni")
+        needed, unneeded = frame_range.select_files(mapping, {4, 5}, paths)
+        self.assertEqual(_paths("fluid_0004.vdb", "fluid_0005.vdb", "config.uni"), needed)
+        self.assertEqual(8, len(unneeded))
+
+    def test_select_keeps_neighbours(self):
+        mapping = frame_range.ClampedFrames(start=1, end=100)
+        paths = _paths("disp_0001.exr", "disp_0010.exr", "disp_0020.exr")
+        needed, unneeded = frame_range.select_files(mapping, {15}, paths)
+        self.assertEqual(_paths("disp_0010.exr", "disp_0020.exr"), needed)
+        self.assertEqual(_paths("disp_0001.exr"), unneeded)
+
+    def test_select_always_does_not_need_neighbours(self):
+        mapping = frame_range.PointCacheFrames(start=1, end=10)
+        paths = _paths(*("Smoke_%06d_00.bphys" % frame for frame in range(1, 11)))
+        needed, _ = frame_range.select_files(mapping, {10}, paths)
+        self.assertEqual(_paths("Smoke_000010_00.bphys"), needed)
+
+
+class BlockFrameMappingTest(AbstractBlendFileTest):
+    def _sequence_usages(self, relpath: str) -> list:
+        return [u for u in trace.deps(self.blendfiles / relpath) if u.is_sequence]
+
+    def test_point_cache(self):
+        usages = self._sequence_usages("T55542-smoke/smoke_cache.blend")
+        self.assertEqual(1, len(usages))
+        mapping = usages[0].frame_mapping()
+        self.assertEqual(frame_range.PointCacheFrames(start=1, end=10), mapping)
+
+        files = list(usages[0].files())
+        needed, unneeded = frame_range.select_files(mapping, {3, 4}, files)
+        self.assertEqual(["000003", "000004"], [p.name.split("_")[1] for p in needed])
+        self.assertEqual(8, len(unneeded))
+
+    def test_sparse_point_cache(self):
+        # This cache only has every 10th frame, plus the info file at frame 0.
+        (usage,) = self._sequence_usages("T55539-particles/particle.blend")
+        needed, _ = frame_range.select_files(
+            usage.frame_mapping(), frame_range.scene_frames([35]), usage.files()
+        )
+        self.assertEqual(
+            ["43756265_000000_01.bphys", "43756265_000031_01.bphys", "43756265_000041_01.bphys"],
+            [p.name for p in needed],
+        )
+
+    def test_unknown_mapping(self):
+        # Sequencer strips are not mapped to frames, so all files are kept.
+        usages = self._sequence_usages("image_sequencer.blend")
+        self.assertTrue(usages)
+        for usage in usages:
+            self.assertIsNone(usage.frame_mapping())
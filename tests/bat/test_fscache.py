@@ -0,0 +1,82 @@
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from blender_asset_tracer import fscache
+
+
+class FilesystemCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tempdir.name)
+        (self.root / "textures").mkdir()
+        for name in ("wood.png", "metal.png"):
+            (self.root / "textures" / name).write_bytes(b"png" * 10)
+        self.cache = fscache.FilesystemCache()
+
+    def tearDown(self):
+        fscache.disable()
+        self._tempdir.cleanup()
+
+    def test_one_listing_per_directory(self):
+        textures = self.root / "textures"
+        with mock.patch("os.scandir", wraps=os.scandir) as scandir:
+            self.assertTrue(self.cache.is_dir(textures))
+            self.assertTrue(self.cache.is_file(textures / "wood.png"))
+            self.assertTrue(self.cache.is_file(textures / "metal.png"))
+            self.assertEqual(30, self.cache.getsize(textures / "wood.png"))
+            self.assertFalse(self.cache.exists(textures / "stone.png"))
+        self.assertEqual(2, scandir.call_count)
+        self.assertEqual(2, self.cache.stats.scandir_calls)
+        self.assertEqual(5, self.cache.stats.lookups)
+
+    def test_stat_is_memoized(self):
+        path = self.root / "textures" / "wood.png"
+        self.assertEqual(30, self.cache.getsize(path))
+        self.assertEqual(30, self.cache.getsize(str(path)))
+        self.assertEqual(1, self.cache.stats.stat_calls)
+
+    def test_unlisted_path_is_stated(self):
+        path = self.root / "textures" / "late.png"
+        self.cache.listdir(path.parent)
+        # Not in the listing, e.g. a cloud placeholder that appears later.
+        path.write_bytes(b"late")
+        self.assertEqual(4, self.cache.getsize(path))
+        self.assertTrue(self.cache.is_file(path))
+
+    def test_missing_file(self):
+        path = self.root / "missing.png"
+        self.assertFalse(self.cache.is_dir(path))
+        self.assertFalse(self.cache.is_file(path))
+        self.assertIsNone(self.cache.stat(path))
+        with self.assertRaises(FileNotFoundError):
+            self.cache.getsize(path)
+        self.assertIsInstance(self.cache.probe(path), FileNotFoundError)
+
+    def test_probe(self):
+        path = self.root / "textures" / "wood.png"
+        self.assertIsNone(self.cache.probe(path))
+        self.assertIsNone(self.cache.probe(path))
+        self.assertEqual(1, self.cache.stats.open_calls)
+
+        # A first-byte probe does not answer a full read, but the reverse does.
+        self.assertIsNone(self.cache.probe(path, read_all=True))
+        self.assertIsNone(self.cache.probe(path))
+        self.assertEqual(2, self.cache.stats.open_calls)
+
+    def test_module_functions(self):
+        path = self.root / "textures" / "wood.png"
+        self.assertIsNone(fscache.current())
+        self.assertTrue(fscache.is_file(path))
+        self.assertEqual(30, fscache.getsize(path))
+
+        cache = fscache.enable()
+        self.assertIs(cache, fscache.current())
+        self.assertTrue(fscache.is_file(path))
+        self.assertEqual(30, fscache.getsize(path))
+        self.assertIsNone(fscache.probe(path))
+        self.assertIs(cache, fscache.disable())
+        self.assertIsNone(fscache.current())
+        self.assertEqual(3, cache.stats.lookups)
@@ -0,0 +1,145 @@
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from blender_asset_tracer import fscache, missing_cache
+
+OFFLINE_ROOT = "/mnt/sulu-test-offline-share"
+
+
+class PathRootTest(unittest.TestCase):
+    def test_roots(self):
+        self.assertEqual("//server/share", missing_cache.path_root(r"\\server\share\tex\a.png"))
+        self.assertEqual("//server/share", missing_cache.path_root("//server/share/a.png"))
+        self.assertEqual("C:/", missing_cache.path_root("c:\\textures\\a.png"))
+        self.assertEqual("/Volumes/Assets", missing_cache.path_root("/Volumes/Assets/a.png"))
+        self.assertEqual("/media/me/usb", missing_cache.path_root("/media/me/usb/a.png"))
+        self.assertEqual("/mnt/nas", missing_cache.path_root("/mnt/nas/a.png"))
+
+    def test_no_root(self):
+        self.assertIsNone(missing_cache.path_root("/home/me/a.png"))
+        self.assertIsNone(missing_cache.path_root("/mnt/nas"))
+        self.assertIsNone(missing_cache.path_root("//server"))
+
+
+class MissingPathCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self._tempdir.name)
+        (self.root / "textures").mkdir()
+        self.missing_path = self.root / "textures" / "gone.png"
+        self.cache_file = self.root / "cache" / "missing.json"
+        self.missing = missing_cache.MissingPathCache(self.cache_file)
+
+    def tearDown(self):
+        self._tempdir.cleanup()
+
+    def _probe(self, path, missing=None):
+        cache = fscache.FilesystemCache(missing or self.missing)
+        return cache, cache.probe(path)
+
+    def test_known_missing_is_not_opened(self):
+        cache, error = self._probe(self.missing_path)
+        self.assertIsInstance(error, FileNotFoundError)
+        self.assertEqual(1, cache.stats.open_calls)
+        self.assertEqual(1, self.missing.stats.recorded)
+
+        cache, error = self._probe(self.missing_path)
+        self.assertIsInstance(error, FileNotFoundError)
+        self.assertEqual(0, cache.stats.open_calls)
+        self.assertIsNone(cache.stat(self.missing_path))
+        self.assertEqual(2, self.missing.stats.hits)
+
+    def test_revalidated_when_directory_changes(self):
+        self._probe(self.missing_path)
+        self.missing_path.write_bytes(b"png")
+        # Make sure the modification time differs on coarse filesystems.
+        textures = self.root / "textures"
+        mtime = os.stat(textures).st_mtime_ns + 1_000_000_000
+        os.utime(textures, ns=(mtime, mtime))
+
+        cache, error = self._probe(self.missing_path)
+        self.assertIsNone(error)
+        self.assertEqual(1, cache.stats.open_calls)
+        self.assertEqual(1, self.missing.stats.invalidated)
+
+    def test_persisted(self):
+        self._probe(self.missing_path)
+        self.missing.save()
+
+        loaded = missing_cache.MissingPathCache(self.cache_file)
+        cache, error = self._probe(self.missing_path, loaded)
+        self.assertIsInstance(error, FileNotFoundError)
+        self.assertEqual(0, cache.stats.open_calls)
+
+    def test_refresh(self):
+        self._probe(self.missing_path)
+        self.missing.save()
+
+        refreshed = missing_cache.MissingPathCache(self.cache_file, refresh=True)
+        cache, _ = self._probe(self.missing_path, refreshed)
+        self.assertEqual(1, cache.stats.open_calls)
+
+    def test_expires(self):
+        self._probe(self.missing_path)
+        later = missing_cache.time.time() + missing_cache.DEFAULT_TTL + 1
+        with mock.patch.object(missing_cache.time, "time", return_value=later):
+            cache, _ = self._probe(self.missing_path)
+        self.assertEqual(1, cache.stats.open_calls)
+
+    def test_broken_file_is_ignored(self):
+        self.cache_file.parent.mkdir()
+        self.cache_file.write_text("{not json")
+        with self.assertLogs(missing_cache.log, "WARNING"):
+            loaded = missing_cache.MissingPathCache(self.cache_file)
+        cache, _ = self._probe(self.missing_path, loaded)
+        self.assertEqual(1, cache.stats.open_calls)
+
+    def test_unreachable_root(self):
+        self.assertFalse(os.path.exists(OFFLINE_ROOT))
+        first = "%s/shots/010/plate.exr" % OFFLINE_ROOT
+        self._probe(first)
+        self.assertEqual(1, self.missing.stats.recorded_roots)
+
+        # Everything else on that share is missing after checking the share
+        # itself once.
+        other = "%s/assets/tree.blend" % OFFLINE_ROOT
+        cache = fscache.FilesystemCache(self.missing)
+        with mock.patch("os.scandir") as scandir, mock.patch(
+            "os.stat", side_effect=FileNotFoundError
+        ) as stat:
+            self.assertFalse(cache.is_file(other))
+            self.assertIsInstance(cache.probe(other), FileNotFoundError)
+        scandir.assert_not_called()
+        stat.assert_called_once_with(OFFLINE_ROOT)
+        self.assertEqual(1, cache.stats.syscalls)
+
+    def test_reconnected_root(self):
+        self._probe("%s/shots/010/plate.exr" % OFFLINE_ROOT)
+        self.assertEqual(1, self.missing.stats.recorded_roots)
+
+        # The share is reachable again, so its files are probed again.
+        cache = fscache.FilesystemCache(self.missing)
+        with mock.patch.object(cache, "_root_reachable", return_value=True):
+            self.assertIsInstance(
+                cache.probe("%s/assets/tree.blend" % OFFLINE_ROOT), FileNotFoundError
+            )
+        self.assertEqual(1, cache.stats.open_calls)
+        self.assertEqual(1, self.missing.stats.reconnected_roots)
+        self.assertIsNone(self.missing.unreachable_root(OFFLINE_ROOT + "/a.png"))
+
+    def test_module_functions(self):
+        fscache.enable(missing=self.missing)
+        try:
+            self.assertIsInstance(fscache.probe(self.missing_path), FileNotFoundError)
+        finally:
+            fscache.disable()
+        fscache.enable(missing=self.missing)
+        try:
+            self.assertFalse(fscache.exists(self.missing_path))
+            self.assertIsInstance(fscache.probe(self.missing_path), FileNotFoundError)
+            self.assertEqual(0, fscache.current().stats.open_calls)
+        finally:
+            fscache.disable()
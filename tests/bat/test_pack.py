@@ -381,6 +381,17 @@ class PackTest(AbstractPackTest):
         self.assertTrue((self.tpath / "cube_UDIM.color.1002.png").exists())
         self.assertTrue((self.tpath / "cube_UDIM.color.1003.png").exists())
 
+    def test_udim_tiles_by_numeric_token(self):
+        ppath = self.blendfiles / "udim"
+        infile = ppath / "v01_UDIM_BAT_debugging.blend"
+        tiles = [ppath / ("cube_UDIM.color.%d.png" % tile) for tile in (1001, 1002, 1003)]
+
+        with pack.Packer(infile, ppath, self.tpath) as packer:
+            self.assertEqual(tiles, packer._find_udim_tiles(tiles[1]))
+            self.assertEqual([], packer._find_udim_tiles(ppath / "cube_UDIM.rough.1001.png"))
+            # One listing serves every tileset in the directory.
+            self.assertEqual([ppath], list(packer._udim_tilesets_by_dir))
+
     def test_noop(self):
         ppath = self.blendfiles / "subdir"
         infile = ppath / "doubly_linked_up.blend"
@@ -0,0 +1,141 @@
+import os
+import pathlib
+import shutil
+import tempfile
+
+from blender_asset_tracer import blendfile, trace
+from blender_asset_tracer.trace import frame_range, trace_cache
+from tests.bat.abstract_test import AbstractBlendFileTest
+
+
+class TraceCacheTest(AbstractBlendFileTest):
+    def setUp(self):
+        super().setUp()
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.cache_dir = pathlib.Path(self._tempdir.name) / "trace-cache"
+
+    def tearDown(self):
+        super().tearDown()
+        self._tempdir.cleanup()
+
+    @staticmethod
+    def _trace(bfilepath, **kwargs) -> list:
+        found = [
+            (
+                str(dep.block.bfile.filepath),
+                dep.block.code,
+                dep.block.dna_type_name,
+                dep.block_name,
+                bytes(dep.asset_path),
+                dep.is_sequence,
+                dep.is_optional,
+                dep.abspath,
+                hash(dep),
+            )
+            for dep in trace.deps(bfilepath, **kwargs)
+        ]
+        blendfile.close_all_cached()
+        return found
+
+    def _cache(self, **kwargs) -> trace_cache.TraceCache:
+        return trace_cache.TraceCache(self.cache_dir, **kwargs)
+
+    def test_same_results(self):
+        for name in (
+            "doubly_linked.blend",
+            "linked_cube.blend",
+            "image_sequencer.blend",
+            "recursive_dependency_1.blend",
+        ):
+            with self.subTest(name):
+                bfilepath = self.blendfiles / name
+                expect = self._trace(bfilepath)
+
+                shutil.rmtree(str(self.cache_dir), ignore_errors=True)
+                cold = self._cache()
+                self.assertEqual(expect, self._trace(bfilepath, cache=cold))
+                self.assertEqual(0, cold.stats.hits)
+                self.assertGreater(cold.stats.stored, 0)
+
+                warm = self._cache()
+                self.assertEqual(expect, self._trace(bfilepath, cache=warm))
+                self.assertEqual(cold.stats.stored, warm.stats.hits)
+                self.assertEqual(0, warm.stats.misses)
+
+    def test_replayed_usages(self):
+        bfilepath = self.blendfiles / "doubly_linked.blend"
+        self._trace(bfilepath, cache=self._cache())
+
+        deps = list(trace.deps(bfilepath, cache=self._cache()))
+        self.assertTrue(deps)
+        for dep in deps:
+            self.assertIsInstance(dep, trace_cache.CachedBlockUsage)
+            self.assertIn("CachedBlockUsage", repr(dep))
+        # Nothing had to be parsed.
+        self.assertFalse(blendfile.is_cached(bfilepath))
+
+    def test_replayed_frame_mapping(self):
+        bfilepath = self.blendfiles / "T55542-smoke/smoke_cache.blend"
+        self._trace(bfilepath, cache=self._cache())
+
+        (dep,) = [dep for dep in trace.deps(bfilepath, cache=self._cache())]
+        self.assertIsInstance(dep, trace_cache.CachedBlockUsage)
+        self.assertEqual(
+            frame_range.PointCacheFrames(start=1, end=10), dep.frame_mapping()
+        )
+
+    def test_modified_file_is_parsed_again(self):
+        workdir = pathlib.Path(self._tempdir.name) / "project"
+        workdir.mkdir()
+        for name in ("linked_cube.blend", "basic_file.blend"):
+            shutil.copy(str(self.blendfiles / name), str(workdir / name))
+        shot = workdir / "linked_cube.blend"
+        expect = self._trace(shot)
+
+        self._trace(shot, cache=self._cache())
+        stat = shot.stat()
+        os.utime(str(shot), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        cache = self._cache()
+        self.assertEqual(expect, self._trace(shot, cache=cache))
+        # The shot is parsed again, the unchanged library is replayed.
+        self.assertEqual(1, cache.stats.misses)
+        self.assertEqual(1, cache.stats.hits)
+        self.assertEqual(1, cache.stats.stored)
+
+    def test_eviction(self):
+        bfilepath = self.blendfiles / "doubly_linked.blend"
+        cache = self._cache(max_bytes=0)
+        self._trace(bfilepath, cache=cache)
+        self.assertGreater(cache.stats.stored, 0)
+        self.assertEqual(cache.stats.stored, cache.stats.evicted)
+        self.assertEqual([], list(self.cache_dir.glob("*.pickle")))
+
+    def test_broken_entries_are_ignored(self):
+        bfilepath = self.blendfiles / "linked_cube.blend"
+        expect = self._trace(bfilepath, cache=self._cache())
+        for path in self.cache_dir.glob("*.pickle"):
+            path.write_bytes(b"not a pickle")
+
+        cache = self._cache()
+        self.assertEqual(expect, self._trace(bfilepath, cache=cache))
+        self.assertEqual(0, cache.stats.hits)
+
+    def test_render_only(self):
+        bfilepath = self.blendfiles / "movieclip.blend"
+        full = self._trace(bfilepath, cache=self._cache())
+        self.assertEqual(1, len(full))
+
+        # The cache entry of the full visit is not used for the render-only one.
+        self.assertEqual([], self._trace(bfilepath, cache=self._cache(), render_only=True))
+        cache = self._cache()
+        self.assertEqual([], self._trace(bfilepath, cache=cache, render_only=True))
+        self.assertEqual(1, cache.stats.hits)
+        self.assertEqual(full, self._trace(bfilepath, cache=self._cache()))
+
+    def test_packed_images(self):
+        bfilepath = self.blendfiles / "basic_file.blend"
+        cache = self._cache()
+        self.assertIsNone(cache.packed_images(bfilepath))
+        self._trace(bfilepath, cache=cache)
+        self.assertEqual([], cache.packed_images(bfilepath))
@@ -1,12 +1,16 @@
 import collections
 import functools
 import logging
+import pathlib
 import sys
+import tempfile
 import typing
 import unittest
 from typing import Optional
+from unittest import mock
 
-from blender_asset_tracer import trace, blendfile
+from blender_asset_tracer import trace, blendfile, fscache, missing_cache
+from blender_asset_tracer.trace import file2blocks
 from blender_asset_tracer.blendfile import dna
 from tests.bat.abstract_test import AbstractBlendFileTest
 
@@ -619,3 +623,162 @@ class DepsTest(AbstractTracerTest):
                 pass
         finally:
             sys.setrecursionlimit(reclim)
+
+
+class LibraryWorkersTest(AbstractTracerTest):
+    @staticmethod
+    def _trace(bfilepath, **kwargs) -> list:
+        found = [
+            (
+                dep.block.bfile.filepath,
+                dep.block_name,
+                bytes(dep.asset_path),
+                dep.is_sequence,
+            )
+            for dep in trace.deps(bfilepath, **kwargs)
+        ]
+        blendfile.close_all_cached()
+        return found
+
+    def test_same_results(self):
+        for name in (
+            "doubly_linked.blend",
+            "linked_cube.blend",
+            "recursive_dependency_1.blend",
+        ):
+            with self.subTest(name):
+                bfilepath = self.blendfiles / name
+                expect = self._trace(bfilepath)
+
+                stats = file2blocks.LibraryStats()
+                actual = self._trace(bfilepath, library_workers=4, library_stats=stats)
+
+                self.assertEqual(expect, actual)
+                self.assertEqual(4, stats.workers)
+                self.assertGreater(stats.libraries, 0)
+                self.assertGreaterEqual(stats.open_seconds, 0.0)
+
+    def test_open_file_limit(self):
+        bfilepath = self.blendfiles / "doubly_linked.blend"
+        expect = self._trace(bfilepath)
+        blendfile.set_max_open_files(1)
+        try:
+            actual = self._trace(bfilepath, library_workers=4)
+        finally:
+            blendfile.set_max_open_files(blendfile.DEFAULT_MAX_OPEN_FILES)
+        self.assertEqual(expect, actual)
+
+    def test_sequential_stats(self):
+        stats = file2blocks.LibraryStats()
+        self._trace(self.blendfiles / "doubly_linked.blend", library_stats=stats)
+        self.assertEqual(0, stats.workers)
+        self.assertGreater(stats.libraries, 0)
+        self.assertEqual(0.0, stats.saved_seconds)
+
+    def test_libraries_counted_once(self):
+        bi = file2blocks.BlockIterator()
+        stats = bi.library_stats
+        lib_path = self.blendfiles / "linked_cube.blend"
+        bi._open_library(lib_path)
+        bi._open_library(lib_path)
+        self.assertEqual(1, stats.libraries)
+        self.assertEqual(1, stats.as_dict()["libraries"])
+
+    def test_workers_are_bounded(self):
+        bi = file2blocks.BlockIterator(library_workers=1000)
+        self.assertEqual(file2blocks.MAX_LIBRARY_WORKERS, bi.library_workers)
+        bi.close()
+
+
+class RenderOnlyTest(AbstractTracerTest):
+    @staticmethod
+    def _trace(bfilepath, **kwargs) -> list:
+        found = [
+            (dep.block.bfile.filepath, dep.block_name, bytes(dep.asset_path))
+            for dep in trace.deps(bfilepath, **kwargs)
+        ]
+        blendfile.close_all_cached()
+        return found
+
+    def test_same_results(self):
+        for name in (
+            "doubly_linked.blend",
+            "image_sequencer.blend",
+            "compositor_nodes/compositor_nodes_blender500_workfile.blend",
+            "geometry-nodes/file_to_pack.blend",
+            "udim/v01_UDIM_BAT_debugging.blend",
+        ):
+            with self.subTest(name):
+                bfilepath = self.blendfiles / name
+                expect = self._trace(bfilepath)
+
+                unreachable = []
+                actual = self._trace(
+                    bfilepath, render_only=True, unreachable=unreachable
+                )
+                self.assertEqual(expect, actual)
+                self.assertEqual([], unreachable)
+
+    def test_unreachable(self):
+        # The movie clip is not used by the scene.
+        bfilepath = self.blendfiles / "movieclip.blend"
+        self.assertEqual(1, len(self._trace(bfilepath)))
+
+        unreachable = []
+        self.assertEqual(
+            [], self._trace(bfilepath, render_only=True, unreachable=unreachable)
+        )
+        self.assertEqual([b"MCvideo.mov"], [dep.block_name for dep in unreachable])
+
+    def test_scene_names(self):
+        bf = blendfile.open_cached(self.blendfiles / "basic_file.blend")
+        self.assertEqual([b"SCScene"], file2blocks.render_scene_names(bf))
+        self.assertEqual([b"SCScene"], file2blocks.render_scene_names(bf, ["Scene"]))
+        self.assertEqual([], file2blocks.render_scene_names(bf, ["Nope"]))
+
+    def test_unknown_scene_traces_everything(self):
+        bfilepath = self.blendfiles / "movieclip.blend"
+        expect = self._trace(bfilepath)
+        self.assertEqual(
+            expect, self._trace(bfilepath, render_only=True, scenes=["Nope"])
+        )
+
+
+class FilesystemCacheTest(AbstractTracerTest):
+    def setUp(self):
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.missing = missing_cache.MissingPathCache(
+            pathlib.Path(self._tempdir.name) / "missing.json"
+        )
+
+    def tearDown(self):
+        fscache.disable()
+        blendfile.close_all_cached()
+        self._tempdir.cleanup()
+
+    def _files(self) -> typing.Tuple[fscache.FilesystemCache, list]:
+        cache = fscache.enable(missing=self.missing)
+        try:
+            files = [
+                path
+                for dep in trace.deps(self.blendfiles / "missing_textures.blend")
+                for path in dep.files()
+            ]
+        finally:
+            fscache.disable()
+        return cache, files
+
+    def test_files_probe_through_cache(self):
+        cache, files = self._files()
+        self.assertEqual([], files)
+        self.assertGreater(cache.stats.open_calls, 0)
+        self.assertGreater(self.missing.stats.recorded, 0)
+
+        # Known-missing files are not opened again.
+        with mock.patch("builtins.open", wraps=open) as opened:
+            cache, files = self._files()
+        self.assertEqual([], files)
+        self.assertEqual(0, cache.stats.open_calls)
+        self.assertEqual(self.missing.stats.recorded, self.missing.stats.hits)
+        for call in opened.call_args_list:
+            self.assertNotIn(".png", str(call.args[0]))
@@ -34,3 +34,32 @@ class File2BlocksTest(AbstractTracerTest):
         self.assertIn(b"MAMaterial", blocks)
         self.assertIn(b"OBCube", blocks)
         self.assertIn(b"MECube", blocks)
+
+
+class BlockQueueTest(AbstractTracerTest):
+    def test_order_and_duplicates(self):
+        bf = blendfile.open_cached(self.blendfiles / "basic_file.blend")
+        # Blocks are deduplicated by address, so pick one block per address.
+        by_addr = {block.addr_old: block for block in bf.code_index[b"OB"]}
+        by_addr.update((block.addr_old, block) for block in bf.code_index[b"ME"])
+        blocks = sorted(by_addr.values(), key=lambda block: block.file_offset)
+        self.assertGreater(len(blocks), 1)
+
+        queue = file2blocks.BlockQueue()
+        for block in reversed(blocks):
+            queue.put(block)
+        for block in blocks:
+            queue.put(block)
+        self.assertEqual(len(blocks), queue.qsize())
+        self.assertEqual(len(blocks), queue.duplicates)
+
+        popped = []
+        while not queue.empty():
+            popped.append(queue.get())
+        self.assertEqual(blocks, popped)
+
+        # Once the queue ran empty, blocks can be queued again.
+        queue.put(blocks[0])
+        self.assertIs(blocks[0], queue.get())
+        with self.assertRaises(IndexError):
+            queue.get()
@@ -1,5 +1,9 @@
+import os
+from unittest import mock
+
 from tests.bat.abstract_test import AbstractBlendFileTest
 
+from blender_asset_tracer import fscache
 from blender_asset_tracer.trace import file_sequence
 
 
@@ -41,3 +45,31 @@ class ExpandFileSequenceTest(AbstractBlendFileTest):
         path = self.blendfiles / "imgseq/LICENSE.txt"
         actual = list(file_sequence.expand_sequence(path))
         self.assertEqual([path], actual)
+
+    def test_directory(self):
+        path = self.blendfiles / "imgseq"
+        actual = list(file_sequence.expand_sequence(path))
+        expect = sorted(p for p in path.rglob("*") if p.is_file())
+        self.assertEqual(expect, actual)
+
+    def test_hidden_files_need_explicit_pattern(self):
+        matches = file_sequence.compile_name_pattern("*.png")
+        self.assertTrue(matches("000210.png"))
+        self.assertFalse(matches("._000210.png"))
+        self.assertTrue(file_sequence.compile_name_pattern(".*.png")("._000210.png"))
+
+    def test_directory_listed_once(self):
+        udim = [self.blendfiles / "udim/cube_UDIM.color.<UDIM>.png"] * 3
+        cache = fscache.enable()
+        try:
+            with mock.patch("os.scandir", wraps=os.scandir) as scandir:
+                for path in self.imgseq + udim:
+                    self.assertTrue(list(file_sequence.expand_sequence(path)))
+        finally:
+            fscache.disable()
+
+        # Priming and listing each of the two directories, plus the listing of
+        # imgseq made to check whether its first file is a directory, which
+        # priming replaces.
+        self.assertEqual(5, scandir.call_count)
+        self.assertEqual(2, cache.stats.primed_directories)
@@ -2,9 +2,15 @@
 
 from __future__ import annotations
 
+import importlib
 import os
+import sys
+import tempfile
+import types
 import unicodedata
-from typing import List, Tuple
+import unittest
+from pathlib import Path
+from typing import Any, List, Tuple
 
 # Path logic under test must be the production implementation so the suite
 # exercises the exact code the workers run.
@@ -19,6 +25,12 @@ from utils.worker_utils import (
 
 norm_path = norm_abs_for_detection
 
+_tests_dir = Path(__file__).parent
+_addon_dir = _tests_dir.parent
+_pkg_name = _addon_dir.name.replace("-", "_")
+
+BLENDFILES_DIR = _tests_dir / "bat" / "blendfiles"
+
 __all__ = [
     "get_drive",
     "is_win_drive_path",
@@ -33,6 +45,9 @@ __all__ = [
     "validate_s3_key",
     "is_s3_safe",
     "is_absolute_path",
+    "BLENDFILES_DIR",
+    "addon_module",
+    "TraceTestCase",
 ]
 
 
@@ -133,3 +148,51 @@ def is_absolute_path(path: str) -> bool:
     if ":" in path and not path.startswith("http"):
         return True
     return False
+
+
+def addon_module(name: str) -> types.ModuleType:
+    """Import an addon module under the package name Blender gives the addon.
+
+    The addon modules use relative imports, so they cannot be imported as
+    top-level ``utils`` modules.
+    """
+    if str(_addon_dir.parent) not in sys.path:
+        sys.path.insert(0, str(_addon_dir.parent))
+    if _pkg_name not in sys.modules:
+        pkg = types.ModuleType(_pkg_name)
+        pkg.__path__ = [str(_addon_dir)]
+        sys.modules[_pkg_name] = pkg
+    return importlib.import_module(f"{_pkg_name}.{name}")
+
+
+class TraceTestCase(unittest.TestCase):
+    """Traces one of the BAT test blend files with trace_dependencies().
+
+    Subclasses set ``blend_file``, relative to BLENDFILES_DIR.
+    """
+
+    blend_file = "doubly_linked.blend"
+
+    def setUp(self):
+        self.bat_utils = addon_module("utils.bat_utils")
+        self.blendfile = addon_module("blender_asset_tracer.blendfile")
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmpdir.name)
+        self.blend_path = BLENDFILES_DIR / self.blend_file
+
+    def tearDown(self):
+        self.blendfile.close_all_cached()
+        self._tmpdir.cleanup()
+
+    def _report(self) -> Any:
+        diagnostic_report = addon_module("utils.diagnostic_report")
+        return diagnostic_report.DiagnosticReport(
+            reports_dir=self.tmp_path / "reports",
+            job_id=self.id().rsplit(".", 1)[-1],
+            blend_name=self.blend_path.stem,
+        )
+
+    def _trace(self, **kwargs) -> Any:
+        result = self.bat_utils.trace_dependencies(self.blend_path, **kwargs)
+        self.blendfile.close_all_cached()
+        return result
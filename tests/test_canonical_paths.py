@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import importlib
+import sys
+import logging
+import time
+import types
+import unittest
+from pathlib import Path
+
+
+_tests_dir = Path(__file__).parent
+_addon_dir = _tests_dir.parent
+_pkg_name = _addon_dir.name.replace("-", "_")
+
+if str(_addon_dir.parent) not in sys.path:
+    sys.path.insert(0, str(_addon_dir.parent))
+
+pkg = sys.modules.get(_pkg_name)
+if pkg is None:
+    pkg = types.ModuleType(_pkg_name)
+    pkg.__path__ = [str(_addon_dir)]
+    sys.modules[_pkg_name] = pkg
+
+worker_utils = importlib.import_module(f"{_pkg_name}.utils.worker_utils")
+
+log = logging.getLogger(__name__)
+
+
+class TestCanonicalPath(unittest.TestCase):
+    def tearDown(self):
+        worker_utils.memoize_canonical_paths(False)
+
+    def test_helpers(self):
+        for enabled in (False, True):
+            worker_utils.memoize_canonical_paths(enabled)
+            with self.subTest(memoized=enabled):
+                self.assertEqual("C:/proj/tex.png", worker_utils.norm_abs_for_detection("C:\\proj\\tex.png"))
+                self.assertEqual("/a/c", worker_utils.norm_abs_for_detection("/a/b/../c"))
+                self.assertEqual("C:", worker_utils.get_drive("c:/proj"))
+                self.assertEqual("UNC", worker_utils.get_drive("//server/share"))
+                self.assertEqual("/mnt/data", worker_utils.get_drive("/mnt/data/x.png"))
+                self.assertEqual("a/b", worker_utils.s3key_clean("//a//./b"))
+                self.assertEqual("", worker_utils.s3key_clean("."))
+                self.assertEqual("tex/a.png", worker_utils.relpath_safe("/p/tex/a.png", "/p"))
+                self.assertEqual("../q/a.png", worker_utils.relpath_safe("/p/../q/a.png", "/p"))
+                self.assertEqual("a.png", worker_utils.relpath_safe("/a.png", "/"))
+                self.assertTrue(worker_utils.samepath("/p/./tex/a.png", "/p/tex/a.png"))
+                self.assertFalse(worker_utils.samepath("/p/a.png", "/p/b.png"))
+
+    def test_forms(self):
+        canonical = worker_utils.CanonicalPath("/p/tex/../Cafe\u0301.png")
+        self.assertEqual("/p/Cafe\u0301.png", canonical.absolute)
+        self.assertEqual("/p/Caf\u00e9.png", canonical.nfc)
+        self.assertEqual("/", canonical.drive)
+        self.assertEqual("p/Cafe\u0301.png", canonical.s3key)
+
+    def test_memoized_per_submission(self):
+        self.assertIsNot(
+            worker_utils.canonical_path("/p/a.png"), worker_utils.canonical_path("/p/a.png")
+        )
+        worker_utils.memoize_canonical_paths()
+        first = worker_utils.canonical_path(Path("/p/a.png"))
+        self.assertIs(first, worker_utils.canonical_path("/p/a.png"))
+
+        # A new submission starts with an empty memo.
+        worker_utils.memoize_canonical_paths()
+        self.assertIsNot(first, worker_utils.canonical_path("/p/a.png"))
+
+
+class TestCanonicalPathBenchmark(unittest.TestCase):
+    """Normalize 100k dependencies the way trace, project root and manifest do."""
+
+    count = 100_000
+
+    def tearDown(self):
+        worker_utils.memoize_canonical_paths(False)
+
+    def _submit(self, deps, blend, root) -> list:
+        # compute_project_root(): the excluded sets, then each dependency.
+        excluded = {worker_utils.norm_abs_for_detection(d) for d in deps[::10]}
+        blend_drive = worker_utils.get_drive(worker_utils.norm_abs_for_detection(blend))
+        same_drive = []
+        for dep in deps:
+            dep_norm = worker_utils.norm_abs_for_detection(dep)
+            if dep_norm not in excluded and worker_utils.get_drive(dep_norm) == blend_drive:
+                same_drive.append(dep)
+
+        # The manifest loop.
+        abs_blend = worker_utils.norm_abs_for_detection(blend)
+        manifest = []
+        for dep in same_drive:
+            src = dep.replace("\\", "/")
+            if worker_utils.samepath(src, abs_blend):
+                continue
+            manifest.append(worker_utils.s3key_clean(worker_utils.relpath_safe(src, root)))
+        return manifest
+
+    def _time(self, enabled: bool, deps, blend, root):
+        worker_utils.memoize_canonical_paths(enabled)
+        start = time.perf_counter()
+        manifest = self._submit(deps, blend, root)
+        return time.perf_counter() - start, manifest
+
+    def test_memoized_vs_uncached(self):
+        root = "/projects/shot"
+        blend = f"{root}/shot.blend"
+        # Sequences: many files share directories, and every dependency is
+        # referenced twice, as happens with shared libraries.
+        unique = [
+            f"{root}/textures/set_{i // 1000:03d}/tile_{i % 1000:04d}.exr"
+            for i in range(self.count // 2)
+        ]
+        deps = unique + unique
+
+        self._time(False, deps[:1000], blend, root)  # warm up
+
+        old_time, old_manifest = self._time(False, deps, blend, root)
+        new_time, new_manifest = self._time(True, deps, blend, root)
+
+        self.assertEqual(old_manifest, new_manifest)
+        log.info(
+            "normalizing %d dependencies: %.0f ms uncached, %.0f ms memoized (%.1fx)",
+            len(deps),
+            old_time * 1000,
+            new_time * 1000,
+            old_time / new_time if new_time else float("inf"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+_tests_dir = Path(__file__).parent
+_addon_dir = _tests_dir.parent
+_pkg_name = _addon_dir.name.replace("-", "_")
+
+if str(_addon_dir.parent) not in sys.path:
+    sys.path.insert(0, str(_addon_dir.parent))
+
+pkg = sys.modules.get(_pkg_name)
+if pkg is None:
+    pkg = types.ModuleType(_pkg_name)
+    pkg.__path__ = [str(_addon_dir)]
+    sys.modules[_pkg_name] = pkg
+
+bat_utils = importlib.import_module(f"{_pkg_name}.utils.bat_utils")
+blendfile = importlib.import_module(f"{_pkg_name}.blender_asset_tracer.blendfile")
+diagnostic_report = importlib.import_module(f"{_pkg_name}.utils.diagnostic_report")
+
+cloud_files = importlib.import_module(f"{_pkg_name}.utils.cloud_files")
+diagnostic_report = importlib.import_module(f"{_pkg_name}.utils.diagnostic_report")
+
+BLENDFILES_DIR = _tests_dir / "bat" / "blendfiles"
+
+
+class TestHydrationScheduler(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmpdir.name)
+        self.files = []
+        for name, size in (("small.exr", 10), ("large.exr", 3000), ("medium.exr", 200)):
+            path = self.tmp_path / name
+            path.write_bytes(b"x" * size)
+            self.files.append(path)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_largest_first(self):
+        events = []
+        scheduler = cloud_files.HydrationScheduler(1, progress=events.append)
+        missing = self.tmp_path / "missing.exr"
+        results = scheduler.run(self.files + [missing, self.tmp_path])
+
+        self.assertEqual((True, None), results[self.files[0]])
+        self.assertEqual((False, "File not found"), results[missing])
+        self.assertEqual((False, "is a directory"), results[self.tmp_path])
+
+        done = [e.path.name for e in events if e.status == "hydrated"]
+        self.assertEqual(["large.exr", "medium.exr", "small.exr"], done)
+        self.assertEqual((3, 3, 3210, 3210), (
+            events[-1].files_done,
+            events[-1].files_total,
+            events[-1].total_bytes_done,
+            events[-1].total_bytes,
+        ))
+        self.assertEqual(3, scheduler.stats.files)
+        self.assertEqual(3210, scheduler.stats.bytes)
+        self.assertEqual(0, scheduler.stats.failed)
+
+    def test_concurrent(self):
+        scheduler = cloud_files.HydrationScheduler(3)
+        results = scheduler.run(self.files)
+        self.assertTrue(all(ok for ok, _ in results.values()))
+        self.assertEqual(3, scheduler.stats.workers)
+
+    def test_timeouts_are_retried(self):
+        events = []
+        # Every file times out after its first chunk.
+        scheduler = cloud_files.HydrationScheduler(
+            2, timeout=1e-9, retries=2, progress=events.append
+        )
+        results = scheduler.run(self.files)
+
+        for ok, error in results.values():
+            self.assertFalse(ok)
+            self.assertIn("not read after", error)
+        self.assertEqual(6, scheduler.stats.retries)
+        self.assertEqual(3, scheduler.stats.failed)
+        retried = [e.path.name for e in events if e.status == "retrying"]
+        self.assertEqual(6, len(retried))
+        self.assertEqual(0, events[-1].total_bytes_done - sum(
+            e.bytes_done for e in events if e.status == "failed"
+        ))
+
+    def test_byte_rate(self):
+        limiter = cloud_files._ByteRateLimiter(1000)
+        with mock.patch.object(cloud_files.time, "sleep") as sleep:
+            limiter.consume(500)
+            limiter.consume(500)
+        # The second read waits until the first half second has passed.
+        self.assertEqual(1, sleep.call_count)
+        self.assertAlmostEqual(0.5, sleep.call_args[0][0], places=1)
+
+
+class TestTraceHydration(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmpdir.name)
+        # Has missing, found, and sequence dependencies.
+        self.blend_path = BLENDFILES_DIR / "doubly_linked.blend"
+
+    def tearDown(self):
+        blendfile.close_all_cached()
+        self._tmpdir.cleanup()
+
+    def _trace(self, **kwargs):
+        result = bat_utils.trace_dependencies(self.blend_path, **kwargs)
+        blendfile.close_all_cached()
+        return result
+
+    def test_same_classification(self):
+        expect = self._trace(hydrate=False)
+        logger = mock.Mock(spec=["trace_entry", "hydration_progress"])
+        report = diagnostic_report.DiagnosticReport(
+            reports_dir=self.tmp_path / "reports",
+            job_id="hydration-test",
+            blend_name="doubly_linked",
+        )
+        with mock.patch.dict(os.environ, {bat_utils.HYDRATION_WORKERS_ENV: "3"}):
+            actual = self._trace(hydrate=True, logger=logger, diagnostic_report=report)
+
+        self.assertEqual(expect[0], actual[0])
+        self.assertEqual(expect[1], actual[1])
+        self.assertEqual(expect[2], actual[2])
+
+        stats = report._data["metadata"]["trace_hydration"]
+        self.assertEqual(3, stats["workers"])
+        self.assertEqual(len(set(actual[0]) - actual[1]), stats["files"])
+        last = logger.hydration_progress.call_args.kwargs
+        self.assertEqual(last["files_total"], last["files_done"])
+
+    def test_failures_are_unreadable(self):
+        deps, missing, _unreadable, _raw, _optional = self._trace(hydrate=False)
+        found = next(path for path in deps if path not in missing)
+
+        def failing_read(path, size, final):
+            return path, OSError(5, "Input/output error")
+
+        with mock.patch.object(
+            cloud_files.HydrationScheduler, "_hydrate", side_effect=failing_read
+        ):
+            _deps, missing, unreadable, _raw, _optional = self._trace(hydrate=True)
+        self.assertNotIn(found, missing)
+        self.assertIn("Input/output error", unreadable[found])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import importlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+_tests_dir = Path(__file__).parent
+_addon_dir = _tests_dir.parent
+_pkg_name = _addon_dir.name.replace("-", "_")
+
+if str(_addon_dir.parent) not in sys.path:
+    sys.path.insert(0, str(_addon_dir.parent))
+
+pkg = sys.modules.get(_pkg_name)
+if pkg is None:
+    pkg = types.ModuleType(_pkg_name)
+    pkg.__path__ = [str(_addon_dir)]
+    sys.modules[_pkg_name] = pkg
+
+content_store = importlib.import_module(f"{_pkg_name}.utils.content_store")
+envvars = importlib.import_module(f"{_pkg_name}.blender_asset_tracer.envvars")
+
+
+def materialize(store_root: Path, keys, project_dir: Path) -> None:
+    """Rebuild the project files from a copy of the content store, as the farm does."""
+    for rel, key in keys.items():
+        target = project_dir / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(store_root / key, target)
+
+
+class TestContentStore(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmpdir.name)
+        self.library = self.tmp_path / "library"
+        self.library.mkdir()
+        (self.library / "wood.png").write_bytes(b"wood" * 1000)
+        (self.library / "metal.png").write_bytes(b"metal" * 1000)
+        # The same texture, copied into the project under another name.
+        (self.library / "wood_copy.png").write_bytes(b"wood" * 1000)
+        self.sources = {
+            "tex/wood.png": str(self.library / "wood.png"),
+            "tex/metal.png": str(self.library / "metal.png"),
+            "other/wood.png": str(self.library / "wood_copy.png"),
+        }
+        self.cache_file = self.tmp_path / "cache" / "content_hashes.json"
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _hash_all(self, cache=None):
+        hasher = content_store.BackgroundHasher(cache, workers=2)
+        try:
+            for source in self.sources.values():
+                hasher.submit(source)
+            hashes = {rel: hasher.result(source) for rel, source in self.sources.items()}
+        finally:
+            hasher.close()
+        return hasher, hashes
+
+    def test_identical_files_share_a_key(self):
+        _hasher, hashes = self._hash_all()
+        self.assertEqual(hashes["tex/wood.png"], hashes["other/wood.png"])
+        self.assertNotEqual(hashes["tex/wood.png"], hashes["tex/metal.png"])
+        self.assertEqual(
+            content_store.file_digest(self.sources["tex/metal.png"]), hashes["tex/metal.png"]
+        )
+        key = content_store.content_key(hashes["tex/wood.png"])
+        self.assertTrue(key.startswith("content/" + hashes["tex/wood.png"][:2] + "/"))
+
+    def test_hash_cache(self):
+        hasher, first = self._hash_all(content_store.HashCache(self.cache_file))
+        self.assertEqual(0, hasher.stats.cache_hits)
+        self.assertTrue(self.cache_file.exists())
+
+        hasher, second = self._hash_all(content_store.HashCache(self.cache_file))
+        self.assertEqual(first, second)
+        self.assertEqual(3, hasher.stats.cache_hits)
+        self.assertEqual(0, hasher.stats.hashed_bytes)
+
+        # A changed file is hashed again.
+        metal = Path(self.sources["tex/metal.png"])
+        metal.write_bytes(b"rusty metal")
+        hasher, third = self._hash_all(content_store.HashCache(self.cache_file))
+        self.assertEqual(2, hasher.stats.cache_hits)
+        self.assertNotEqual(first["tex/metal.png"], third["tex/metal.png"])
+
+    def test_unreadable_file(self):
+        hasher = content_store.BackgroundHasher()
+        try:
+            self.assertIsNone(hasher.result(str(self.tmp_path / "gone.png")))
+        finally:
+            hasher.close()
+        self.assertEqual(1, hasher.stats.errors)
+
+    def test_stage_and_materialize(self):
+        _hasher, hashes = self._hash_all()
+        staging = self.tmp_path / "staging"
+        files = {rel: (self.sources[rel], hashes[rel]) for rel in self.sources}
+        staged, failed = content_store.stage_content(files, staging)
+        self.assertEqual([], failed)
+        self.assertEqual(2, len(content_store.unique_keys(staged.values())))
+
+        manifest = self.tmp_path / "job.content.json"
+        content_store.write_content_manifest(manifest, staged)
+        keys = content_store.read_content_manifest(manifest)
+        self.assertEqual(staged, keys)
+
+        project = self.tmp_path / "farm" / "project"
+        materialize(staging, keys, project)
+        for rel, source in self.sources.items():
+            self.assertEqual(Path(source).read_bytes(), (project / rel).read_bytes())
+
+    def test_changed_files_are_not_staged(self):
+        hasher, hashes = self._hash_all()
+        metal = Path(self.sources["tex/metal.png"])
+        metal.write_bytes(b"rusty metal")
+        stat = metal.stat()
+        os.utime(metal, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        staging = self.tmp_path / "staging"
+        files = {rel: (self.sources[rel], hashes[rel]) for rel in self.sources}
+        staged, failed = content_store.stage_content(files, staging, hasher.unchanged)
+        self.assertEqual(["tex/metal.png"], failed)
+        self.assertEqual({"tex/wood.png", "other/wood.png"}, set(staged))
+        self.assertEqual(1, hasher.stats.changed)
+        self.assertFalse(hasher.unchanged(str(self.tmp_path / "never-hashed.png")))
+
+    @unittest.skipUnless(shutil.which("rclone"), "rclone is not installed")
+    def test_rclone_uploads_each_content_once(self):
+        _hasher, hashes = self._hash_all()
+        staging = self.tmp_path / "staging"
+        files = {rel: (self.sources[rel], hashes[rel]) for rel in self.sources}
+        staged, _failed = content_store.stage_content(files, staging)
+        keylist = self.tmp_path / "keys.txt"
+        keylist.write_text("\n".join(content_store.unique_keys(staged.values())) + "\n")
+
+        bucket = self.tmp_path / "bucket"
+        for _ in range(2):
+            subprocess.run(
+                [
+                    "rclone", "copy", str(staging), str(bucket),
+                    "--files-from", str(keylist), "--copy-links", "--ignore-existing",
+                ],
+                check=True,
+            )
+        stored = [p for p in bucket.rglob("*") if p.is_file()]
+        self.assertEqual(2, len(stored))
+
+        project = self.tmp_path / "farm" / "project"
+        materialize(bucket, staged, project)
+        self.assertEqual(b"wood" * 1000, (project / "other/wood.png").read_bytes())
+
+    def test_disabled_by_default(self):
+        with mock.patch.dict(os.environ, {content_store.CONTENT_ADDRESSED_ENV: ""}):
+            self.assertIsNone(content_store.start_hasher(self.cache_file))
+
+    def test_environment(self):
+        env = {
+            content_store.CONTENT_ADDRESSED_ENV: "1",
+            content_store.CONTENT_HASH_WORKERS_ENV: "x",
+        }
+        with mock.patch.dict(os.environ, env):
+            with self.assertLogs(envvars.log, "WARNING"):
+                hasher = content_store.start_hasher(self.cache_file)
+        try:
+            self.assertIsNotNone(hasher)
+        finally:
+            hasher.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
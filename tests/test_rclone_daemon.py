@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+_tests_dir = Path(__file__).parent
+_addon_dir = _tests_dir.parent
+_pkg_name = _addon_dir.name.replace("-", "_")
+
+if str(_addon_dir.parent) not in sys.path:
+    sys.path.insert(0, str(_addon_dir.parent))
+
+pkg = sys.modules.get(_pkg_name)
+if pkg is None:
+    pkg = types.ModuleType(_pkg_name)
+    pkg.__path__ = [str(_addon_dir)]
+    sys.modules[_pkg_name] = pkg
+
+rclone_utils = importlib.import_module(f"{_pkg_name}.transfers.rclone_utils")
+
+UPLOAD_SETTINGS = [
+    "--transfers", "4",
+    "--checkers", "4",
+    "--s3-chunk-size", "64M",
+    "--s3-upload-concurrency", "4",
+    "--buffer-size", "64M",
+    "--retries", "20",
+    "--retries-sleep", "5s",
+    "--timeout", "5m",
+    "--no-traverse",
+]
+
+
+class _FakeDaemon:
+    """Answers rc calls for jobs that finish after a number of polls."""
+
+    def __init__(self, polls=2, errors=()):
+        self.calls = []
+        self.polls = polls
+        self.errors = list(errors)
+        self._status_calls = 0
+
+    def alive(self):
+        return True
+
+    def call(self, method, params=None, timeout=60.0):
+        self.calls.append((method, params))
+        if method in ("sync/copy", "operations/copyfile", "operations/movefile"):
+            self._status_calls = 0
+            return {"jobid": len(self.calls)}
+        if method == "job/status":
+            self._status_calls += 1
+            finished = self._status_calls >= self.polls
+            error = self.errors.pop(0) if finished and self.errors else ""
+            return {"finished": finished, "success": finished and not error, "error": error}
+        if method == "core/stats":
+            done = 1000 if self._status_calls >= self.polls else 400
+            return {
+                "bytes": done,
+                "totalBytes": 1000,
+                "checks": 0,
+                "transfers": 1 if done == 1000 else 0,
+                "errors": 0,
+                "elapsedTime": 1.0,
+                "transferring": [{"name": "a.png"}] if done < 1000 else [],
+            }
+        if method == "operations/list":
+            return {"list": [{"Path": "0001.png"}, {"Path": "0002.png"}]}
+        return {}
+
+
+class _Logger:
+    def __init__(self):
+        self.calls = []
+
+    def transfer_progress(self, current, total):
+        self.calls.append((current, total, ""))
+
+    def transfer_progress_ext(self, current, total, *, status="", current_file="", checks=0, transfers=0):
+        self.calls.append((current, total, status))
+
+
+class TestRcRequest(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmpdir.name)
+        self.blend = self.tmp_path / "shot.blend"
+        self.blend.write_bytes(b"BLENDER")
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_directory_copy(self):
+        method, params, attempts, sleep = rclone_utils._rc_request(
+            "copy",
+            str(self.tmp_path),
+            ":s3:bucket/project/",
+            ["--files-from-raw", "/tmp/list.txt", *UPLOAD_SETTINGS, "--no-check-dest"],
+        )
+        self.assertEqual("sync/copy", method)
+        self.assertEqual(str(self.tmp_path), params["srcFs"])
+        self.assertEqual(
+            ":s3,chunk_size=64M,upload_concurrency=4:bucket/project/", params["dstFs"]
+        )
+        self.assertEqual(
+            {
+                "Transfers": 4,
+                "Checkers": 4,
+                "BufferSize": "64M",
+                "Timeout": "5m",
+                "NoTraverse": True,
+                "NoCheckDest": True,
+            },
+            params["_config"],
+        )
+        self.assertEqual({"FilesFromRaw": ["/tmp/list.txt"]}, params["_filter"])
+        self.assertEqual((20, 5.0), (attempts, sleep))
+
+    def test_single_files(self):
+        blend = str(self.blend).replace("\\", "/")
+        method, params, _, _ = rclone_utils._rc_request(
+            "copyto", blend, ":s3:bucket/project/shots/shot.blend", []
+        )
+        self.assertEqual("operations/copyfile", method)
+        self.assertEqual(
+            (str(self.tmp_path).replace("\\", "/"), "shot.blend"),
+            (params["srcFs"], params["srcRemote"]),
+        )
+        self.assertEqual(
+            (":s3:bucket/project/shots", "shot.blend"),
+            (params["dstFs"], params["dstRemote"]),
+        )
+
+        method, params, _, _ = rclone_utils._rc_request("move", blend, ":s3:bucket/project/", [])
+        self.assertEqual("operations/movefile", method)
+        self.assertEqual((":s3:bucket/project/", "shot.blend"), (params["dstFs"], params["dstRemote"]))
+
+    def test_local_options_are_quoted(self):
+        _, params, _, _ = rclone_utils._rc_request(
+            "copy",
+            ":s3:bucket/job/output/",
+            "/tmp/out/",
+            ["--local-encoding", "Slash,LtGt,Colon", "--size-only"],
+        )
+        self.assertEqual(":local,encoding='Slash,LtGt,Colon':/tmp/out/", params["dstFs"])
+        self.assertEqual({"SizeOnly": True}, params["_config"])
+
+    def test_unknown_flags_and_verbs_run_as_process(self):
+        self.assertIsNone(rclone_utils._rc_request("copy", "/a", ":s3:b/", ["--checksum"]))
+        self.assertIsNone(rclone_utils._rc_request("lsf", ":s3:b/", "", []))
+        self.assertIsNone(rclone_utils._rc_request("copy", "/a", ":s3:b/", ["--transfers"]))
+
+    def test_bwlimit_runs_as_process(self):
+        with self.assertLogs(rclone_utils._log, "DEBUG") as logs:
+            self.assertIsNone(
+                rclone_utils._rc_request("copy", "/a", ":s3:b/", ["--bwlimit", "1024K"])
+            )
+        self.assertIn("bandwidth limit", logs.output[0])
+
+
+class TestRunRcloneDaemon(unittest.TestCase):
+    def _run(self, daemon, *args, **kwargs):
+        with mock.patch.dict(os.environ, {rclone_utils.RCLONE_DAEMON_ENV: "1"}), mock.patch.object(
+            rclone_utils, "get_daemon", return_value=daemon
+        ), mock.patch.object(
+            rclone_utils, "_rclone_supports_flag", return_value=False
+        ), mock.patch.object(
+            rclone_utils.subprocess, "Popen", side_effect=AssertionError("no process")
+        ), mock.patch.object(rclone_utils, "_RC_POLL_INTERVAL", 0):
+            return rclone_utils.run_rclone(["rclone"], *args, **kwargs)
+
+    def test_upload_through_daemon(self):
+        daemon = _FakeDaemon(polls=3)
+        logger = _Logger()
+        result = self._run(
+            daemon, "copy", "/tmp/project", ":s3:bucket/project/",
+            extra=UPLOAD_SETTINGS, logger=logger, total_bytes=1000,
+        )
+        self.assertEqual(1000, result["bytes_transferred"])
+        self.assertEqual(1, result["transfers"])
+        self.assertIn((400, 1000, "transferring"), logger.calls)
+        self.assertEqual((1000, 1000, "complete"), logger.calls[-1])
+        methods = [method for method, _params in daemon.calls]
+        self.assertEqual("sync/copy", methods[0])
+        self.assertTrue(daemon.calls[0][1]["_async"])
+        self.assertIn("core/stats-delete", methods)
+
+    def test_failed_job_is_retried_then_classified(self):
+        daemon = _FakeDaemon(polls=1, errors=["connection reset by peer"] * 2)
+        with self.assertRaises(rclone_utils.RcloneError) as ctx:
+            self._run(daemon, "copy", "/tmp/p", ":s3:b/", extra=["--retries", "2"], logger=_Logger())
+        self.assertEqual("network_error", ctx.exception.category)
+        self.assertEqual(2, [m for m, _ in daemon.calls].count("sync/copy"))
+
+        daemon = _FakeDaemon(polls=1, errors=["connection reset by peer"])
+        result = self._run(daemon, "copy", "/tmp/p", ":s3:b/", extra=["--retries", "2"], logger=_Logger())
+        self.assertEqual(1000, result["bytes_transferred"])
+
+    def test_list_files(self):
+        daemon = _FakeDaemon()
+        with mock.patch.object(rclone_utils, "get_daemon", return_value=daemon):
+            files = rclone_utils.list_files(["rclone"], ":s3:b/job/output/", exclude=["thumbnails/**"])
+        self.assertEqual(["0001.png", "0002.png"], files)
+        params = daemon.calls[0][1]
+        self.assertEqual({"ExcludeRule": ["thumbnails/**"]}, params["_filter"])
+
+    def test_disabled_by_default(self):
+        with mock.patch.dict(os.environ, {rclone_utils.RCLONE_DAEMON_ENV: ""}):
+            self.assertIsNone(rclone_utils.get_daemon(["rclone"]))
+            self.assertIsNone(rclone_utils.list_files(["rclone"], ":s3:b/"))
+
+
+@unittest.skipUnless(shutil.which("rclone"), "rclone is not installed")
+class TestRealDaemon(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmpdir.name)
+        self.src = self.tmp_path / "src"
+        (self.src / "tex").mkdir(parents=True)
+        (self.src / "tex" / "a.png").write_bytes(b"a" * 100)
+        (self.src / "shot.blend").write_bytes(b"BLENDER")
+
+    def tearDown(self):
+        rclone_utils.shutdown_daemons()
+        self._tmpdir.cleanup()
+
+    def test_one_daemon_for_all_steps(self):
+        base = [shutil.which("rclone")]
+        dst = str(self.tmp_path / "dst")
+        with mock.patch.dict(os.environ, {rclone_utils.RCLONE_DAEMON_ENV: "1"}):
+            rclone_utils.run_rclone(base, "copy", str(self.src / "tex"), dst + "/tex", logger=_Logger())
+            rclone_utils.run_rclone(base, "copyto", str(self.src / "shot.blend"), dst + "/s.blend", logger=_Logger())
+            files = rclone_utils.list_files(base, dst)
+            self.assertEqual(1, len(rclone_utils._DAEMONS))
+        self.assertEqual(["s.blend", "tex/a.png"], sorted(files))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+import unittest
+from unittest import mock
+
+from tests.helpers import TraceTestCase, addon_module
+
+bat_utils = addon_module("utils.bat_utils")
+blendfile = addon_module("blender_asset_tracer.blendfile")
+
+
+class TestTraceDependencyCache(TraceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = self.tmp_path / "trace-cache"
+
+    def test_same_classification(self):
+        expect = self._trace()
+        cold_report = self._report()
+        self._trace(trace_cache_dir=self.cache_dir, diagnostic_report=cold_report)
+        warm_report = self._report()
+        actual = self._trace(
+            trace_cache_dir=self.cache_dir, diagnostic_report=warm_report
+        )
+
+        dep_paths, missing, unreadable, _raw_usages, optional = actual
+        self.assertEqual(expect[0], dep_paths)
+        self.assertEqual(expect[1], missing)
+        self.assertEqual(expect[2], unreadable)
+        self.assertEqual(expect[4], optional)
+
+        cold = cold_report._data["metadata"]["trace_cache"]
+        warm = warm_report._data["metadata"]["trace_cache"]
+        self.assertEqual(0, cold["hits"])
+        self.assertGreater(cold["stored"], 0)
+        self.assertEqual(cold["stored"], warm["hits"])
+        self.assertEqual(0, warm["misses"])
+
+    def test_disabled_by_default(self):
+        report = self._report()
+        self._trace(diagnostic_report=report)
+        self.assertNotIn("trace_cache", report._data["metadata"])
+        self.assertFalse(self.cache_dir.exists())
+
+    def test_enabled_from_environment(self):
+        with mock.patch.dict(os.environ, {bat_utils.TRACE_CACHE_ENV: ""}):
+            self.assertTrue(bat_utils.trace_cache_enabled())
+        for value in ("0", "off", "False"):
+            with mock.patch.dict(os.environ, {bat_utils.TRACE_CACHE_ENV: value}):
+                self.assertFalse(bat_utils.trace_cache_enabled())
+
+
+class TestDecompressedBlendCache(TraceTestCase):
+    blend_file = "basic_file_compressed.blend"
+
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = self.tmp_path / "decompressed"
+
+    def tearDown(self):
+        blendfile.set_decompressed_cache_dir(None)
+        super().tearDown()
+
+    def _configure(self, value: str) -> bool:
+        env = {bat_utils.DECOMPRESSED_CACHE_MB_ENV: value}
+        with mock.patch.dict(os.environ, env):
+            return bat_utils.configure_decompressed_cache(self.cache_dir)
+
+    def test_hits_reported(self):
+        self.assertTrue(self._configure("64"))
+        for _ in range(2):
+            report = self._report()
+            self._trace(diagnostic_report=report)
+
+        stats = report._data["metadata"]["decompressed_cache"]
+        self.assertEqual(1, stats["hits"])
+        self.assertEqual(1, stats["misses"])
+        self.assertTrue(list(self.cache_dir.glob("*.blend")))
+
+    def test_disabled_by_default(self):
+        self.assertFalse(self._configure(""))
+        self.assertFalse(self._configure("lots"))
+        report = self._report()
+        bat_utils.trace_dependencies(self.blend_path, diagnostic_report=report)
+        self.assertNotIn("decompressed_cache", report._data["metadata"])
+        self.assertFalse(self.cache_dir.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import os
+import unittest
+from unittest import mock
+
+from tests.helpers import TraceTestCase, addon_module
+
+bat_utils = addon_module("utils.bat_utils")
+
+
+class TestTraceFrameRange(TraceTestCase):
+    # A point cache of frames 1-10.
+    blend_file = "T55542-smoke/smoke_cache.blend"
+
+    def test_all_files_without_frames(self):
+        self.assertEqual(10, len(self._trace()[0]))
+
+    def test_sequence_narrowed_to_frames(self):
+        report = self._report()
+        stats = bat_utils.FrameRangeStats()
+        dep_paths = self._trace(frames=[5], frame_stats=stats, diagnostic_report=report)[0]
+
+        # Frame 5, with a margin of 2 frames on either side.
+        self.assertEqual(
+            ["%06d" % frame for frame in range(3, 8)],
+            [path.name.split("_")[1] for path in dep_paths],
+        )
+        self.assertEqual(1, stats.sequences)
+        self.assertEqual(5, stats.skipped_files)
+        self.assertGreater(stats.skipped_bytes, 0)
+
+        metadata = report._data["metadata"]["trace_frame_range"]
+        self.assertEqual(stats.skipped_bytes, metadata["skipped_bytes"])
+
+        report.complete_stage("trace")
+        summary = report._data["stages"]["trace"]["summary"]
+        self.assertEqual(5, summary["ok"])
+        self.assertEqual(5, summary["out_of_range"])
+        self.assertEqual(stats.skipped_bytes, summary["out_of_range_size_bytes"])
+
+    def test_narrowed_from_trace_cache(self):
+        cache_dir = self.tmp_path / "trace-cache"
+        cold = self._trace(frames=[1], trace_cache_dir=cache_dir)[0]
+        warm = self._trace(frames=[1], trace_cache_dir=cache_dir)[0]
+        self.assertEqual(3, len(cold))
+        self.assertEqual(cold, warm)
+
+    def test_opt_in_from_environment(self):
+        with mock.patch.dict(os.environ, {bat_utils.TRACE_FRAME_RANGE_ENV: "1"}):
+            self.assertTrue(bat_utils.trace_frame_range_enabled())
+        with mock.patch.dict(os.environ, {bat_utils.TRACE_FRAME_RANGE_ENV: ""}):
+            self.assertFalse(bat_utils.trace_frame_range_enabled())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import os
+import unittest
+from unittest import mock
+
+from tests.helpers import TraceTestCase, addon_module
+
+bat_utils = addon_module("utils.bat_utils")
+
+
+class TestTraceLibraryWorkers(TraceTestCase):
+    def test_same_classification(self):
+        expect = self._trace(library_workers=0)
+        report = self._report()
+        actual = self._trace(library_workers=3, diagnostic_report=report)
+
+        dep_paths, missing, unreadable, _raw_usages, optional = actual
+        self.assertEqual(expect[0], dep_paths)
+        self.assertEqual(expect[1], missing)
+        self.assertEqual(expect[2], unreadable)
+        self.assertEqual(expect[4], optional)
+
+        stats = report._data["metadata"]["trace_libraries"]
+        self.assertEqual(3, stats["workers"])
+        self.assertGreater(stats["libraries"], 0)
+        self.assertGreaterEqual(stats["saved_seconds"], 0.0)
+
+    def test_opt_in_from_environment(self):
+        report = self._report()
+        with mock.patch.dict(os.environ, {bat_utils.TRACE_LIBRARY_WORKERS_ENV: "2"}):
+            self._trace(diagnostic_report=report)
+        self.assertEqual(2, report._data["metadata"]["trace_libraries"]["workers"])
+
+    def test_disabled_by_default(self):
+        report = self._report()
+        with mock.patch.dict(os.environ, {bat_utils.TRACE_LIBRARY_WORKERS_ENV: ""}):
+            self._trace(diagnostic_report=report)
+        self.assertNotIn("trace_libraries", report._data["metadata"])
+
+    def test_invalid_environment_value(self):
+        with mock.patch.dict(
+            os.environ, {bat_utils.TRACE_LIBRARY_WORKERS_ENV: "lots"}
+        ):
+            self.assertEqual(0, bat_utils._trace_library_workers())
+
+
+if __name__ == "__main__":
+    unittest.main()
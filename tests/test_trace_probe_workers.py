@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+import unittest
+from unittest import mock
+
+from tests.helpers import TraceTestCase, addon_module
+
+bat_utils = addon_module("utils.bat_utils")
+trace_result = addon_module("blender_asset_tracer.trace.result")
+
+
+class TestTraceProbeWorkers(TraceTestCase):
+    # Has missing, found, and sequence dependencies.
+    blend_file = "doubly_linked.blend"
+
+    @staticmethod
+    def _entries(report):
+        return [
+            (e["resolved_path"], e["status"], e.get("error_message"))
+            for e in report._data["stages"]["trace"]["entries"]
+        ]
+
+    def test_same_classification(self):
+        expect_report = self._report()
+        expect = self._trace(probe_workers=0, diagnostic_report=expect_report)
+        report = self._report()
+        actual = self._trace(probe_workers=4, diagnostic_report=report)
+
+        dep_paths, missing, unreadable, _raw_usages, optional = actual
+        self.assertEqual(expect[0], dep_paths)
+        self.assertEqual(expect[1], missing)
+        self.assertEqual(list(expect[2].items()), list(unreadable.items()))
+        self.assertEqual(expect[4], optional)
+        self.assertEqual(self._entries(expect_report), self._entries(report))
+
+        stats = report._data["metadata"]["trace_probes"]
+        self.assertEqual(4, stats["workers"])
+        self.assertEqual(len(set(dep_paths)), stats["files"])
+        self.assertGreaterEqual(stats["probe_seconds"], 0.0)
+        self.assertGreaterEqual(stats["wall_seconds"], 0.0)
+
+    def test_each_file_is_probed_once(self):
+        probed = []
+        read_file = bat_utils.cloud_files.read_file_with_hydration
+
+        def recording_read(path, hydrate=True):
+            probed.append(path)
+            return read_file(path, hydrate=hydrate)
+
+        with mock.patch.object(
+            bat_utils.cloud_files, "read_file_with_hydration", recording_read
+        ):
+            dep_paths = self._trace(probe_workers=4)[0]
+        self.assertEqual(sorted(set(map(str, dep_paths))), sorted(probed))
+
+    def test_single_files_are_read_by_workers(self):
+        files = trace_result.BlockUsage.files
+        expanded = []
+
+        def recording_files(usage):
+            expanded.append(usage)
+            return files(usage)
+
+        with mock.patch.object(trace_result.BlockUsage, "files", recording_files):
+            self._trace(probe_workers=4)
+        # Only sequences are expanded on the tracing thread; the prober
+        # reads everything else.
+        self.assertTrue(all(usage.is_sequence for usage in expanded))
+
+    def test_workers_from_environment(self):
+        report = self._report()
+        with mock.patch.dict(os.environ, {bat_utils.TRACE_PROBE_WORKERS_ENV: "2"}):
+            self._trace(diagnostic_report=report)
+        self.assertEqual(2, report._data["metadata"]["trace_probes"]["workers"])
+
+        with mock.patch.dict(os.environ, {bat_utils.TRACE_PROBE_WORKERS_ENV: "1"}):
+            self._trace(diagnostic_report=report)
+        self.assertEqual(0, report._data["metadata"]["trace_probes"]["workers"])
+
+    def test_invalid_environment_value(self):
+        with mock.patch.dict(os.environ, {bat_utils.TRACE_PROBE_WORKERS_ENV: "lots"}):
+            self.assertEqual(
+                bat_utils.DEFAULT_TRACE_PROBE_WORKERS, bat_utils._trace_probe_workers()
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import os
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from tests.helpers import TraceTestCase, addon_module
+
+bat_utils = addon_module("utils.bat_utils")
+
+
+class TestTraceRenderOnly(TraceTestCase):
+    # The movie clip in this file is not used by its scene.
+    blend_file = "movieclip.blend"
+
+    def test_unreachable_assets_are_reported(self):
+        report = self._report()
+        dep_paths, missing, _unreadable, raw_usages, _optional = self._trace(
+            render_only=True, diagnostic_report=report
+        )
+        self.assertEqual([], dep_paths)
+        self.assertEqual(set(), missing)
+        self.assertEqual([], raw_usages)
+
+        entries = report._data["stages"]["trace"]["entries"]
+        unreachable = [e for e in entries if e["status"] == "unreachable"]
+        self.assertEqual(1, len(unreachable))
+        self.assertEqual("video.mov", Path(unreachable[0]["resolved_path"]).name)
+        self.assertEqual(
+            1, report._data["metadata"]["trace_render_only"]["unreachable_assets"]
+        )
+
+        report.complete_stage("trace")
+        self.assertEqual(1, report._data["stages"]["trace"]["summary"]["unreachable"])
+
+    def test_opt_in_from_environment(self):
+        with mock.patch.dict(os.environ, {bat_utils.TRACE_RENDER_ONLY_ENV: "1"}):
+            self.assertEqual([], self._trace()[0])
+        with mock.patch.dict(os.environ, {bat_utils.TRACE_RENDER_ONLY_ENV: ""}):
+            self.assertEqual(1, len(self._trace()[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
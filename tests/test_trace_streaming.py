@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import gc
+import importlib
+import logging
+import sys
+import tempfile
+import tracemalloc
+import types
+import unittest
+from pathlib import Path
+
+
+_tests_dir = Path(__file__).parent
+_addon_dir = _tests_dir.parent
+_pkg_name = _addon_dir.name.replace("-", "_")
+
+if str(_addon_dir.parent) not in sys.path:
+    sys.path.insert(0, str(_addon_dir.parent))
+
+pkg = sys.modules.get(_pkg_name)
+if pkg is None:
+    pkg = types.ModuleType(_pkg_name)
+    pkg.__path__ = [str(_addon_dir)]
+    sys.modules[_pkg_name] = pkg
+
+bat_utils = importlib.import_module(f"{_pkg_name}.utils.bat_utils")
+blendfile = importlib.import_module(f"{_pkg_name}.blender_asset_tracer.blendfile")
+diagnostic_report = importlib.import_module(f"{_pkg_name}.utils.diagnostic_report")
+
+BLENDFILES_DIR = _tests_dir / "bat" / "blendfiles"
+
+log = logging.getLogger(__name__)
+
+FIXTURES = (
+    "doubly_linked.blend",
+    "missing_textures.blend",
+    "absolute_path.blend",
+    "image_sequencer.blend",
+    "74871-packed-libraries.blend",
+    "ies-lamp/ies_scene.blend",
+    "lamp_textures.blend",
+    "alembic-sequence-user.blend",
+    "multires_external.blend",
+)
+
+
+def _collect(deps):
+    """Consume iter_dependencies() the way the PROJECT submission does."""
+    dep_paths, missing, unreadable, optional = [], set(), {}, set()
+    absolute = {}
+    for dep in deps:
+        dep_paths.append(dep.path)
+        if dep.optional:
+            optional.add(dep.path)
+        if dep.status == "missing":
+            missing.add(dep.path)
+        elif dep.status == "unreadable":
+            unreadable[dep.path] = dep.error
+        if dep.absolute_path is not None:
+            absolute[dep.absolute_path] = None
+    return dep_paths, missing, unreadable, optional, list(absolute)
+
+
+class TestTraceStreaming(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmpdir.name)
+
+    def tearDown(self):
+        blendfile.close_all_cached()
+        self._tmpdir.cleanup()
+
+    def _report(self, name):
+        return diagnostic_report.DiagnosticReport(
+            reports_dir=self.tmp_path / "reports",
+            job_id="streaming-test",
+            blend_name=name,
+        )
+
+    @staticmethod
+    def _entries(report):
+        return [
+            (e["resolved_path"], e["status"], e.get("error_message"), e.get("file_size"))
+            for e in report._data["stages"]["trace"]["entries"]
+        ]
+
+    def test_same_results_as_trace_dependencies(self):
+        for name in FIXTURES:
+            blend_path = BLENDFILES_DIR / name
+            if not blend_path.exists():
+                continue
+            with self.subTest(name):
+                expect_report = self._report(name)
+                expect = bat_utils.trace_dependencies(
+                    blend_path, diagnostic_report=expect_report
+                )
+                blendfile.close_all_cached()
+
+                report = self._report(name)
+                actual = _collect(
+                    bat_utils.iter_dependencies(blend_path, diagnostic_report=report)
+                )
+
+                self.assertEqual(expect[0], actual[0])
+                self.assertEqual(expect[1], actual[1])
+                self.assertEqual(expect[2], actual[2])
+                self.assertEqual(expect[4], actual[3])
+                self.assertEqual(self._entries(expect_report), self._entries(report))
+
+    def test_absolute_paths(self):
+        blend_path = BLENDFILES_DIR / "absolute_path.blend"
+        absolute = _collect(bat_utils.iter_dependencies(blend_path))[4]
+        self.assertTrue(absolute)
+        self.assertTrue(all(p.is_absolute() for p in absolute))
+
+    def test_blend_files_released(self):
+        blend_path = BLENDFILES_DIR / "doubly_linked.blend"
+        usages = []
+        list(bat_utils.iter_dependencies(blend_path, usages_out=usages))
+        self.assertTrue(usages)
+        self.assertTrue(blendfile.is_cached(blend_path))
+
+        blendfile.close_all_cached()
+        list(bat_utils.iter_dependencies(blend_path))
+        self.assertFalse(blendfile.is_cached(blend_path))
+
+    def test_callers_blend_files_kept_open(self):
+        other_path = BLENDFILES_DIR / "basic_file.blend"
+        blendfile.open_cached(other_path)
+        list(bat_utils.iter_dependencies(BLENDFILES_DIR / "doubly_linked.blend"))
+        self.assertTrue(blendfile.is_cached(other_path))
+        self.assertFalse(blendfile.is_cached(BLENDFILES_DIR / "doubly_linked.blend"))
+
+
+class TestTraceStreamingMemory(unittest.TestCase):
+    """Peak memory of tracing the fixtures, keeping usages versus streaming."""
+
+    def tearDown(self):
+        blendfile.close_all_cached()
+
+    @staticmethod
+    def _fixtures():
+        return [
+            BLENDFILES_DIR / name
+            for name in FIXTURES
+            if (BLENDFILES_DIR / name).exists()
+        ]
+
+    def _measure(self, trace):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            results = [trace(path) for path in self._fixtures()]
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            blendfile.close_all_cached()
+        return peak, results
+
+    def test_peak_memory(self):
+        def keep_usages(path):
+            # What the PROJECT submission did before: keep the usages and
+            # the open blend files, and copy the paths into extra sets.
+            dep_paths, missing, unreadable, raw_usages, optional = (
+                bat_utils.trace_dependencies(path)
+            )
+            ok_files_set = set(
+                p for p in dep_paths if p not in missing and p not in unreadable
+            )
+            ok_files_cache = set(str(p).replace("\\", "/") for p in ok_files_set)
+            self.assertEqual(len(ok_files_set), len(ok_files_cache))
+            return raw_usages, (dep_paths, missing, unreadable, optional)
+
+        def stream(path):
+            return None, _collect(bat_utils.iter_dependencies(path))[:4]
+
+        old_peak, old_results = self._measure(keep_usages)
+        new_peak, new_results = self._measure(stream)
+
+        self.assertEqual([r[1] for r in old_results], [r[1] for r in new_results])
+        log.info(
+            "tracing %d fixtures: peak %.0f KiB keeping usages, %.0f KiB streaming",
+            len(old_results),
+            old_peak / 1024,
+            new_peak / 1024,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
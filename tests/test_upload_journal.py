@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+_tests_dir = Path(__file__).parent
+_addon_dir = _tests_dir.parent
+_pkg_name = _addon_dir.name.replace("-", "_")
+
+if str(_addon_dir.parent) not in sys.path:
+    sys.path.insert(0, str(_addon_dir.parent))
+
+pkg = sys.modules.get(_pkg_name)
+if pkg is None:
+    pkg = types.ModuleType(_pkg_name)
+    pkg.__path__ = [str(_addon_dir)]
+    sys.modules[_pkg_name] = pkg
+
+upload_journal = importlib.import_module(f"{_pkg_name}.utils.upload_journal")
+
+
+class TestUploadJournal(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self._tmpdir.name)
+        self.project = self.tmp_path / "project"
+        (self.project / "tex").mkdir(parents=True)
+        self.rels = ["tex/wood.png", "tex/metal.png", "tex/stone.png"]
+        for rel in self.rels:
+            (self.project / rel).write_bytes(rel.encode())
+        self.journal_file = self.tmp_path / "cache" / "upload_journal.json"
+        self.credentials = upload_journal.credentials_fingerprint(
+            "r2.invalid", "bucket", {"access_key_id": "key-1"}
+        )
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _entries(self):
+        return [(rel, str(self.project / rel)) for rel in self.rels]
+
+    def _open(self, credentials=None, **kwargs):
+        return upload_journal.UploadJournal(
+            self.journal_file,
+            "bucket/project",
+            credentials or self.credentials,
+            **kwargs,
+        )
+
+    def _upload_all(self):
+        journal = self._open()
+        _unchanged, delta = journal.split(self._entries())
+        journal.record_uploaded(delta)
+        journal.save(reconciled=journal.full_reconcile)
+        return journal
+
+    def test_first_upload_is_a_full_reconcile(self):
+        journal = self._upload_all()
+        self.assertTrue(journal.full_reconcile)
+        self.assertEqual("new", journal.stats.reconcile_reason)
+        self.assertEqual(3, journal.stats.delta_files)
+        self.assertEqual(3, journal.stats.recorded_files)
+
+    def test_unchanged_files_are_skipped(self):
+        self._upload_all()
+        stone = self.project / "tex" / "stone.png"
+        stone.write_bytes(b"changed content")
+
+        journal = self._open()
+        unchanged, delta = journal.split(self._entries())
+        self.assertFalse(journal.full_reconcile)
+        self.assertEqual(["tex/wood.png", "tex/metal.png"], unchanged)
+        self.assertEqual(["tex/stone.png"], delta)
+        self.assertEqual(len(b"changed content"), journal.stats.delta_bytes)
+
+    def test_moved_source_is_uploaded(self):
+        self._upload_all()
+        other = self.tmp_path / "other.png"
+        other.write_bytes(b"tex/wood.png")
+        os.utime(other, ns=(0, os.stat(self.project / "tex/wood.png").st_mtime_ns))
+
+        journal = self._open()
+        _unchanged, delta = journal.split([("tex/wood.png", str(other))])
+        self.assertEqual(["tex/wood.png"], delta)
+
+    def test_hash_mismatch_is_uploaded(self):
+        journal = self._open()
+        journal.split(self._entries(), hashes={"tex/wood.png": "aaa"})
+        journal.record_uploaded(self.rels)
+        journal.save(reconciled=True)
+
+        journal = self._open()
+        _unchanged, delta = journal.split(self._entries(), hashes={"tex/wood.png": "bbb"})
+        self.assertEqual(["tex/wood.png"], delta)
+
+    def test_reconcile_reasons(self):
+        self._upload_all()
+        other = upload_journal.credentials_fingerprint(
+            "r2.invalid", "bucket", {"access_key_id": "key-2"}
+        )
+        self.assertEqual("credentials_changed", self._open(other).stats.reconcile_reason)
+        self.assertEqual("expired", self._open(reconcile_after=0).stats.reconcile_reason)
+        self.assertEqual("forced", self._open(force_reconcile=True).stats.reconcile_reason)
+
+        journal = self._open(force_reconcile=True)
+        unchanged, delta = journal.split(self._entries())
+        self.assertEqual([], unchanged)
+        self.assertEqual(self.rels, delta)
+
+    def test_failed_reconcile_is_not_stored(self):
+        self._upload_all()
+        journal = self._open(force_reconcile=True)
+        journal.split(self._entries())
+        journal.save(reconciled=False)
+
+        # The earlier reconcile still stands.
+        self.assertFalse(self._open().full_reconcile)
+
+    def test_delta_upload_keeps_reconcile_time(self):
+        self._upload_all()
+        journal = self._open()
+        _unchanged, delta = journal.split(self._entries())
+        journal.record_uploaded(delta)
+        journal.save()
+
+        with mock.patch.object(
+            upload_journal.time, "time", return_value=upload_journal.time.time() + 25 * 3600
+        ):
+            self.assertEqual("expired", self._open().stats.reconcile_reason)
+
+    def test_disabled_by_default(self):
+        with mock.patch.dict(os.environ, {upload_journal.UPLOAD_JOURNAL_ENV: ""}):
+            self.assertIsNone(
+                upload_journal.open_journal(self.journal_file, "b/p", self.credentials)
+            )
+
+    def test_environment(self):
+        env = {
+            upload_journal.UPLOAD_JOURNAL_ENV: "1",
+            upload_journal.UPLOAD_JOURNAL_RECONCILE_ENV: "yes",
+            upload_journal.UPLOAD_JOURNAL_RECONCILE_HOURS_ENV: "2",
+        }
+        with mock.patch.dict(os.environ, env):
+            journal = upload_journal.open_journal(self.journal_file, "b/p", self.credentials)
+        self.assertEqual("forced", journal.stats.reconcile_reason)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,9 +18,11 @@ import importlib
 import importlib.util
 import io
 import json
+import os
 import sys
 import tempfile
 import threading
+import time
 import types
 import unittest
 import zipfile
@@ -1301,6 +1303,17 @@ class TestUploadStepWarnings(unittest.TestCase):
         }, expected_bytes=None)
         self.assertNotIn("warning", step)
 
+    def test_substeps_of_one_step(self):
+        """The rclone runs of one step are told apart by their substep."""
+        self.report.start_stage("upload")
+        self.report.start_upload_step(2, 3, "content", substep="content")
+        self.report.complete_upload_step(bytes_transferred=10)
+        self.report.start_upload_step(2, 3, "path", substep="path")
+        self.report.complete_upload_step(bytes_transferred=20)
+        steps = self.report._data["stages"]["upload"]["steps"]
+        self.assertEqual([2, 2], [step["step"] for step in steps])
+        self.assertEqual(["content", "path"], [step["substep"] for step in steps])
+
 
 # _redact_cmd
 
@@ -2233,6 +2246,157 @@ class TestReportSplitGroups(unittest.TestCase):
             self.assertEqual(groups[0]["bytes_transferred"], 1234)
 
 
+class TestConcurrentUploadSteps(unittest.TestCase):
+    """Independent PROJECT upload steps run together under one budget."""
+
+    def _ctx(self, report):
+        base_logger = mock.MagicMock()
+        progress = _submit_logger.ParallelUploadProgress(base_logger)
+        ctx = _submit_worker._SubmitContext(
+            data={},
+            mods={},
+            t_start=0.0,
+            proj={},
+            logger=mock.MagicMock(parallel_uploads=mock.MagicMock(return_value=progress)),
+            session=mock.MagicMock(),
+        )
+        ctx.report = report
+        return ctx, base_logger
+
+    def _report(self, d):
+        report = _diagnostic_report.DiagnosticReport(
+            reports_dir=Path(d), job_id="concurrent", blend_name="test",
+        )
+        report.start_stage("upload")
+        return report
+
+    def test_steps_run_together_and_keep_their_stats(self):
+        barrier = threading.Barrier(2, timeout=5)
+        seen = {}
+
+        def make_step(title, size):
+            def run(logger, report, step, rclone_settings):
+                seen[title] = rclone_settings
+                logger.upload_step(step, 3, title)
+                report.start_upload_step(step, 3, title, expected_bytes=size)
+                logger.transfer_progress_ext(size // 2, size, status="transferring")
+                # Both steps are in flight before either completes.
+                barrier.wait()
+                logger.transfer_progress_ext(size, size, status="complete")
+                logger.upload_complete(f"{title} done")
+                report.complete_upload_step(
+                    bytes_transferred=size,
+                    rclone_stats={"checks": 1, "transfers": 1, "errors": 0},
+                )
+            return run
+
+        settings = _submit_worker._build_rclone_upload_settings()
+        with tempfile.TemporaryDirectory() as d:
+            report = self._report(d)
+            ctx, base_logger = self._ctx(report)
+            _submit_worker._run_concurrent_upload_steps(
+                ctx,
+                [
+                    _submit_worker._ConcurrentUploadStep(
+                        make_step("blend", 3000), 3000, single_file=True
+                    ),
+                    _submit_worker._ConcurrentUploadStep(make_step("deps", 1000), 1000),
+                ],
+                3,
+                settings,
+                bwlimit=4 * 1024 * 1024,
+            )
+
+            steps = {s["title"]: s for s in report._data["stages"]["upload"]["steps"]}
+            self.assertEqual(3000, steps["blend"]["bytes_transferred"])
+            self.assertEqual(1000, steps["deps"]["bytes_transferred"])
+            self.assertTrue(all(s["completed_at"] for s in steps.values()))
+
+        self.assertEqual("1", _settings_by_flag(seen["blend"])["--transfers"])
+        self.assertEqual("3", _settings_by_flag(seen["deps"])["--transfers"])
+        self.assertEqual("3072K", _settings_by_flag(seen["blend"])["--bwlimit"])
+        self.assertEqual("1024K", _settings_by_flag(seen["deps"])["--bwlimit"])
+
+        totals = {call.args[1] for call in base_logger.transfer_progress_ext.call_args_list}
+        self.assertIn(4000, totals)
+        self.assertEqual(2, base_logger.upload_complete.call_count)
+
+    def test_first_error_is_raised_after_all_steps(self):
+        finished = []
+
+        def failing(logger, report, step, rclone_settings):
+            raise RuntimeError("blend failed")
+
+        def slow(logger, report, step, rclone_settings):
+            time.sleep(0.05)
+            finished.append(step)
+
+        with tempfile.TemporaryDirectory() as d:
+            ctx, _ = self._ctx(self._report(d))
+            with self.assertRaisesRegex(RuntimeError, "blend failed"):
+                _submit_worker._run_concurrent_upload_steps(
+                    ctx,
+                    [
+                        _submit_worker._ConcurrentUploadStep(failing, 1, single_file=True),
+                        _submit_worker._ConcurrentUploadStep(slow, 1),
+                    ],
+                    3,
+                    [],
+                    bwlimit=0,
+                )
+        self.assertEqual([2], finished)
+
+    def test_split_groups_share_the_settings(self):
+        settings = _submit_worker._with_bwlimit(
+            _submit_worker._build_rclone_upload_settings(), 4 * 1024 * 1024
+        )
+        shared = _settings_by_flag(_submit_worker._share_upload_settings(settings, 0.25))
+        self.assertEqual("1", shared["--transfers"])
+        self.assertEqual("1024K", shared["--bwlimit"])
+        self.assertEqual(settings, _submit_worker._share_upload_settings(settings, 1))
+
+        # A group holding most of the bytes keeps most of the budget.
+        large = _settings_by_flag(_submit_worker._share_upload_settings(settings, 0.95))
+        self.assertEqual("4", large["--transfers"])
+        self.assertEqual("3891K", large["--bwlimit"])
+        small = _settings_by_flag(_submit_worker._share_upload_settings(settings, 0.01))
+        self.assertEqual("1", small["--transfers"])
+        self.assertEqual("64K", small["--bwlimit"])
+
+    def test_split_group_size_uses_traced_sizes(self):
+        sizes = {"tex/wood.png": 10, "tex/sub/metal.png": 20, "root.png": 5}
+        with mock.patch("os.path.getsize") as getsize:
+            self.assertEqual(
+                30,
+                _submit_worker._split_group_size(sizes, "tex", ["wood.png", "sub/metal.png"]),
+            )
+            self.assertEqual(5, _submit_worker._split_group_size(sizes, "", ["root.png"]))
+            self.assertEqual(0, _submit_worker._split_group_size(sizes, "hdri", ["gone.exr"]))
+        getsize.assert_not_called()
+
+    def test_channels_split_into_groups(self):
+        base_logger = mock.MagicMock()
+        step = _submit_logger.ParallelUploadProgress(base_logger).channel()
+        groups = step.parallel_uploads()
+        tex, hdri = groups.channel(1000), groups.channel(3000)
+
+        tex.transfer_progress_ext(500, 1000, status="transferring")
+        # The group that has not reported yet counts toward the total.
+        self.assertEqual((500, 4000), base_logger.transfer_progress_ext.call_args.args)
+        hdri.transfer_progress_ext(3000, 3000, status="complete")
+        self.assertEqual((3500, 4000), base_logger.transfer_progress_ext.call_args.args)
+        self.assertEqual((3500, 4000), (step._transfer_cur, step._transfer_total))
+
+    def test_bandwidth_limit_parsing(self):
+        cases = {"": 0, "2048": 2048, "10M": 10 * 1024**2, "1.5GiB": int(1.5 * 1024**3)}
+        for value, expected in cases.items():
+            with mock.patch.dict(os.environ, {_submit_worker._UPLOAD_BWLIMIT_ENV: value}):
+                self.assertEqual(expected, _submit_worker._upload_bandwidth_limit())
+        with mock.patch.dict(os.environ, {_submit_worker._UPLOAD_BWLIMIT_ENV: "fast"}), \
+                mock.patch.object(_submit_worker, "_LOG"):
+            self.assertEqual(0, _submit_worker._upload_bandwidth_limit())
+
+
 # Report v3.0: pack dependency size
 
 
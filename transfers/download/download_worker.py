@@ -59,6 +59,7 @@ def _bootstrap_addon_modules(data: Dict[str, object]) -> Dict[str, object]:
     rclone = importlib.import_module(f"{pkg_name}.transfers.rclone_utils")
     run_rclone = rclone.run_rclone
     ensure_rclone = rclone.ensure_rclone
+    list_files = getattr(rclone, "list_files", None)
     NOT_FOUND_MARKERS = getattr(rclone, "NOT_FOUND_MARKERS", ())
     AUTH_MARKERS = getattr(rclone, "AUTH_MARKERS", ())
     worker_utils = importlib.import_module(f"{pkg_name}.utils.worker_utils")
@@ -79,6 +80,7 @@ def _bootstrap_addon_modules(data: Dict[str, object]) -> Dict[str, object]:
         "pkg_name": pkg_name,
         "run_rclone": run_rclone,
         "ensure_rclone": ensure_rclone,
+        "list_files": list_files,
         "NOT_FOUND_MARKERS": NOT_FOUND_MARKERS,
         "AUTH_MARKERS": AUTH_MARKERS,
         "clear_console": clear_console,
@@ -109,6 +111,7 @@ sarfis_token: Optional[str]
 logger: DownloadLogger
 run_rclone: Any
 ensure_rclone: Any
+list_rclone_files: Any = None
 NOT_FOUND_MARKERS: Tuple[str, ...] = ()
 AUTH_MARKERS: Tuple[str, ...] = ()
 open_folder: Any
@@ -398,6 +401,12 @@ def _rclone_list_output_files(remote: str) -> Tuple[List[str], List[Tuple[str, s
     same path. The worker copies from an explicit, pre-filtered files list so
     one malformed object cannot abort the whole download.
     """
+    if list_rclone_files is not None:
+        # Lists through the rclone daemon when one runs.
+        listed = list_rclone_files(base_cmd, remote, exclude=("thumbnails/**",))
+        if listed is not None:
+            return _filter_downloadable_output_files(listed)
+
     cmd = [
         str(base_cmd[0]),
         "lsf",
@@ -1216,7 +1225,7 @@ def run_download(
     global rclone_bin, s3info, bucket, base_cmd
     global download_type, sarfis_url, sarfis_token
     global logger
-    global run_rclone, ensure_rclone, NOT_FOUND_MARKERS, AUTH_MARKERS
+    global run_rclone, ensure_rclone, list_rclone_files, NOT_FOUND_MARKERS, AUTH_MARKERS
     global open_folder, fetch_project_storage, _build_base
     global requests_retry_session, CLOUDFLARE_R2_DOMAIN
     global TerminalKeyReader, _download_actions
@@ -1226,6 +1235,7 @@ def run_download(
     mods = _bootstrap_addon_modules(data)
     run_rclone = mods["run_rclone"]
     ensure_rclone = mods["ensure_rclone"]
+    list_rclone_files = mods.get("list_files")
     NOT_FOUND_MARKERS = mods["NOT_FOUND_MARKERS"]
     AUTH_MARKERS = mods["AUTH_MARKERS"]
     open_folder = mods["open_folder"]
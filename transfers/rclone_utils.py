@@ -9,8 +9,16 @@ Design goal: integrate cleanly with Sulu Submitter's scrolling transcript UI.
 Public API (used by submit_worker):
 - ensure_rclone(logger=None) -> Path
 - run_rclone(base, verb, src, dst, extra=None, logger=None, file_count=None)
+- list_files(base, remote, exclude=()) -> Optional[List[str]]
+- shutdown_daemons()
+
+With SULU_RCLONE_DAEMON=1, transfers go to one ``rclone rcd`` process per
+worker over its local HTTP API instead of starting rclone for every step.
+Anything the daemon cannot run falls back to a separate rclone process.
 """
 
+import atexit
+import logging
 import platform
 from pathlib import Path
 import tempfile
@@ -24,11 +32,20 @@ import re
 import shutil
 import time
 import hashlib
+import base64
+import secrets
+import socket
+import threading
+import urllib.error
+import urllib.request
 from collections import deque
-from typing import List, Optional, Tuple, Any
+from typing import Any, Dict, List, Optional, Tuple
 
+from ..blender_asset_tracer.envvars import env_bool
 from ..utils.worker_utils import format_size, requests_retry_session
 
+_log = logging.getLogger(__name__)
+
 # Unicode glyphs (no emoji)
 _GLYPH_DOWN = "↓"
 _GLYPH_OK = "✓"
@@ -753,6 +770,456 @@ def _classify_failure(
     return ("unknown", f"Transfer failed. Retry, or contact support if this persists.\n\n[{tech}]")
 
 
+# -------------------------------------------------------------------
+#  Persistent rclone remote-control daemon
+# -------------------------------------------------------------------
+
+# Opt-in: run transfers through one `rclone rcd` process per worker.
+RCLONE_DAEMON_ENV = "SULU_RCLONE_DAEMON"
+
+_RC_START_TIMEOUT = 15.0
+_RC_POLL_INTERVAL = 0.1
+_RC_CREDENTIAL_ENV = ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN")
+
+# rclone flags and the rc "_config" options they set.
+_RC_CONFIG_VALUE_FLAGS = {
+    "--transfers": ("Transfers", int),
+    "--checkers": ("Checkers", int),
+    "--buffer-size": ("BufferSize", str),
+    "--low-level-retries": ("LowLevelRetries", int),
+    "--timeout": ("Timeout", str),
+    "--contimeout": ("ConnectTimeout", str),
+}
+_RC_CONFIG_BOOL_FLAGS = {
+    "--no-traverse": "NoTraverse",
+    "--no-check-dest": "NoCheckDest",
+    "--ignore-existing": "IgnoreExisting",
+    "--size-only": "SizeOnly",
+}
+# rclone flags and the rc "_filter" lists they append to.
+_RC_FILTER_FLAGS = {
+    "--files-from": "FilesFrom",
+    "--files-from-raw": "FilesFromRaw",
+    "--include": "IncludeRule",
+    "--exclude": "ExcludeRule",
+}
+# Backend flags without a value; other --s3-*/--local-* flags take one.
+_RC_BACKEND_BOOL_FLAGS = frozenset({
+    "--s3-disable-checksum",
+    "--s3-no-check-bucket",
+    "--local-unicode-normalization",
+})
+# Flags the daemon cannot apply to a single rc call, with the reason.
+_RC_PROCESS_FLAGS = {
+    # The rc _config only changes per-call options; the bandwidth limit of
+    # the daemon is shared by all its transfers.
+    "--bwlimit": "the daemon's bandwidth limit is global",
+}
+# Single-file verbs map to operations/*, directory verbs to sync/*.
+_RC_FILE_METHODS = {
+    "copy": "operations/copyfile",
+    "copyto": "operations/copyfile",
+    "move": "operations/movefile",
+    "moveto": "operations/movefile",
+}
+_RC_DIR_METHODS = {
+    "copy": "sync/copy",
+    "copyto": "sync/copy",
+    "move": "sync/move",
+    "moveto": "sync/move",
+}
+
+
+def rclone_daemon_enabled() -> bool:
+    """Return whether transfers should go through an rclone rcd daemon."""
+    return env_bool(RCLONE_DAEMON_ENV)
+
+
+class RcCallError(RuntimeError):
+    """An rc request that the daemon answered with an error, or did not answer."""
+
+
+def _quote_rc_option(value: str) -> str:
+    """Quote a connection string option value when rclone would misparse it."""
+    if any(c in value for c in ",:='\""):
+        return "'" + value.replace("'", "''") + "'"
+    return value
+
+
+def _with_backend_options(fs: str, options: Dict[str, str]) -> str:
+    """Add backend options to a path or ``:backend:`` remote as a connection string."""
+    if not options:
+        return fs
+    opts = ",".join(f"{k}={_quote_rc_option(v)}" for k, v in options.items())
+    if fs.startswith(":"):
+        name, sep, rest = fs[1:].partition(":")
+        if sep and "," not in name:
+            return f":{name},{opts}:{rest}"
+        return fs
+    return f":local,{opts}:{fs}"
+
+
+def _split_remote_file(path: str) -> Tuple[str, str]:
+    """Split a file path or remote path into (fs, remote) for operations/*."""
+    if path.startswith(":"):
+        name, _, rest = path[1:].partition(":")
+        parent, slash, leaf = rest.rpartition("/")
+        return (f":{name}:{parent}" if slash else f":{name}:"), leaf
+    parent, slash, leaf = path.rpartition("/")
+    return (parent or "/") if slash else ".", leaf
+
+
+def _rc_request(
+    verb: str, src: str, dst: str, extra: List[str]
+) -> Optional[Tuple[str, Dict[str, Any], int, float]]:
+    """Translate an rclone command line into an rc method call.
+
+    Returns (method, params, attempts, seconds between attempts), or None
+    when the command uses a verb or flag the translation does not know, in
+    which case the caller runs rclone as a separate process.
+    """
+    if verb not in _RC_DIR_METHODS:
+        _log.debug("Running rclone %s as a process: no rc method", verb)
+        return None
+
+    config: Dict[str, Any] = {}
+    filters: Dict[str, List[str]] = {}
+    s3_options: Dict[str, str] = {}
+    local_options: Dict[str, str] = {}
+    attempts = 3
+    retries_sleep = 0.0
+
+    args = []
+    for arg in extra:
+        if arg.startswith("--") and "=" in arg:
+            args.extend(arg.split("=", 1))
+        else:
+            args.append(arg)
+
+    i = 0
+    while i < len(args):
+        flag = args[i]
+        takes_value = not (
+            flag in _RC_CONFIG_BOOL_FLAGS
+            or flag in _RC_BACKEND_BOOL_FLAGS
+            or flag == "--copy-links"
+        )
+        value = args[i + 1] if takes_value and i + 1 < len(args) else None
+        if takes_value and value is None:
+            return None
+        i += 2 if takes_value else 1
+
+        if flag in _RC_CONFIG_VALUE_FLAGS:
+            name, kind = _RC_CONFIG_VALUE_FLAGS[flag]
+            try:
+                config[name] = kind(value)
+            except ValueError:
+                return None
+        elif flag in _RC_CONFIG_BOOL_FLAGS:
+            config[_RC_CONFIG_BOOL_FLAGS[flag]] = True
+        elif flag in _RC_FILTER_FLAGS:
+            filters.setdefault(_RC_FILTER_FLAGS[flag], []).append(value)
+        elif flag == "--retries":
+            try:
+                attempts = max(1, int(value))
+            except ValueError:
+                return None
+        elif flag == "--retries-sleep":
+            seconds = _parse_go_duration_seconds(value)
+            if seconds is None:
+                return None
+            retries_sleep = seconds
+        elif flag == "--copy-links":
+            local_options["copy_links"] = "true"
+        elif flag.startswith("--s3-"):
+            s3_options[flag[5:].replace("-", "_")] = value or "true"
+        elif flag.startswith("--local-"):
+            local_options[flag[8:].replace("-", "_")] = value or "true"
+        else:
+            reason = _RC_PROCESS_FLAGS.get(flag, "no rc equivalent")
+            _log.debug("Running rclone %s as a process: %s (%s)", verb, flag, reason)
+            return None
+
+    def _fs(path: str) -> str:
+        if path.startswith(":s3:"):
+            return _with_backend_options(path, s3_options)
+        if _looks_like_rclone_remote(path):
+            return path
+        return _with_backend_options(path, local_options)
+
+    params: Dict[str, Any] = {}
+    if not _looks_like_rclone_remote(src) and os.path.isfile(src):
+        method = _RC_FILE_METHODS[verb]
+        src_fs, src_remote = _split_remote_file(src)
+        if verb in ("copyto", "moveto"):
+            dst_fs, dst_remote = _split_remote_file(dst)
+        else:
+            dst_fs, dst_remote = dst, src_remote
+        params.update(
+            srcFs=_fs(src_fs),
+            srcRemote=src_remote,
+            dstFs=_fs(dst_fs),
+            dstRemote=dst_remote,
+        )
+    else:
+        method = _RC_DIR_METHODS[verb]
+        params.update(srcFs=_fs(src), dstFs=_fs(dst))
+    if config:
+        params["_config"] = config
+    if filters:
+        params["_filter"] = filters
+    return method, params, attempts, retries_sleep
+
+
+def _parse_go_duration_seconds(value: str) -> Optional[float]:
+    """Parse simple Go durations such as "5s", "1m30s" or "250ms"."""
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", str(value or ""))
+    if not parts or "".join(n + u for n, u in parts) != str(value):
+        return None
+    scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(n) * scale[u] for n, u in parts)
+
+
+class RcloneDaemon:
+    """One ``rclone rcd`` process, reachable only from this machine and user.
+
+    The daemon is started with the global flags of the base command and the
+    credentials in the environment at that time; get_daemon() replaces it
+    when either changes.
+    """
+
+    def __init__(self, base: List[str]) -> None:
+        self.base = list(base)
+        self.proc: Optional[subprocess.Popen] = None
+        self.url = ""
+        self._auth = ""
+
+    def start(self, timeout: float = _RC_START_TIMEOUT) -> None:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        user, password = "sulu", secrets.token_hex(16)
+        self.url = f"http://127.0.0.1:{port}/"
+        self._auth = "Basic " + base64.b64encode(f"{user}:{password}".encode()).decode()
+
+        env = dict(os.environ)
+        # Passed in the environment so the password is not on the command line.
+        env["RCLONE_RC_USER"] = user
+        env["RCLONE_RC_PASS"] = password
+        self.proc = subprocess.Popen(
+            [str(self.base[0]), "rcd", "--rc-addr", f"127.0.0.1:{port}", *self.base[1:]],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=env,
+        )
+
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.proc.poll() is not None:
+                raise RcCallError(f"rclone rcd exited with code {self.proc.returncode}")
+            try:
+                self.call("rc/noop", timeout=1.0)
+                return
+            except RcCallError:
+                if time.monotonic() >= deadline:
+                    self.close()
+                    raise
+                time.sleep(_RC_POLL_INTERVAL)
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def call(self, method: str, params: Optional[Dict[str, Any]] = None, timeout: float = 60.0) -> Dict[str, Any]:
+        """Call an rc method and return its JSON reply."""
+        request = urllib.request.Request(
+            self.url + method,
+            data=json.dumps(params or {}).encode("utf-8"),
+            headers={"Content-Type": "application/json", "Authorization": self._auth},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read().decode("utf-8") or "{}")
+        except urllib.error.HTTPError as exc:
+            try:
+                message = json.loads(exc.read().decode("utf-8")).get("error") or str(exc)
+            except Exception:
+                message = str(exc)
+            raise RcCallError(message) from exc
+        except (OSError, ValueError) as exc:
+            raise RcCallError(f"rclone rcd did not answer {method}: {exc}") from exc
+
+    def close(self) -> None:
+        if self.proc is None:
+            return
+        if self.proc.poll() is None:
+            try:
+                self.call("core/quit", timeout=2.0)
+                self.proc.wait(timeout=3)
+            except Exception:
+                try:
+                    self.proc.terminate()
+                    self.proc.wait(timeout=3)
+                except Exception:
+                    try:
+                        self.proc.kill()
+                    except Exception:
+                        pass
+        self.proc = None
+
+
+class _RcJob:
+    """An asynchronous rc job that looks like the rclone process run_rclone reads.
+
+    ``stdout`` yields the job's ``core/stats`` as rclone's JSON stats log
+    lines and its errors as JSON error lines, and wait() returns the exit
+    code rclone would have returned. Failed jobs are started again as rclone
+    does for ``--retries``.
+    """
+
+    def __init__(
+        self,
+        daemon: RcloneDaemon,
+        method: str,
+        params: Dict[str, Any],
+        attempts: int = 3,
+        retries_sleep: float = 0.0,
+    ) -> None:
+        self.daemon = daemon
+        self.method = method
+        self.params = params
+        self.attempts = max(1, attempts)
+        self.retries_sleep = retries_sleep
+        self.returncode: Optional[int] = None
+        self._jobid: Optional[int] = None
+
+    def __enter__(self) -> "_RcJob":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        if self.returncode is None:
+            self.terminate()
+        return False
+
+    @property
+    def stdout(self):
+        return self._lines()
+
+    def _lines(self):
+        for attempt in range(self.attempts):
+            if attempt and self.retries_sleep:
+                time.sleep(self.retries_sleep)
+            try:
+                reply = self.daemon.call(self.method, {**self.params, "_async": True})
+                self._jobid = int(reply["jobid"])
+                group = f"job/{self._jobid}"
+                while True:
+                    status = self.daemon.call("job/status", {"jobid": self._jobid})
+                    stats = self.daemon.call("core/stats", {"group": group})
+                    yield json.dumps({"stats": stats}) + "\n"
+                    if status.get("finished"):
+                        break
+                    time.sleep(_RC_POLL_INTERVAL)
+                try:
+                    self.daemon.call("core/stats-delete", {"group": group})
+                except RcCallError:
+                    pass
+            except (RcCallError, KeyError, ValueError) as exc:
+                status = {"success": False, "error": str(exc)}
+            self._jobid = None
+            if status.get("success"):
+                self.returncode = 0
+                return
+            error = str(status.get("error") or "rc job failed")
+            yield json.dumps({"level": "error", "msg": error}) + "\n"
+            if not self.daemon.alive():
+                break
+        self.returncode = 1
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        return 1 if self.returncode is None else self.returncode
+
+    def terminate(self) -> None:
+        if self._jobid is not None:
+            try:
+                self.daemon.call("job/stop", {"jobid": self._jobid}, timeout=5.0)
+            except RcCallError:
+                pass
+            self._jobid = None
+        if self.returncode is None:
+            self.returncode = 1
+
+    kill = terminate
+
+
+_DAEMONS: Dict[Tuple[str, ...], RcloneDaemon] = {}
+_DAEMONS_FAILED = set()  # rclone executables whose daemon did not start
+_DAEMONS_LOCK = threading.Lock()
+
+
+def get_daemon(base: List[str]) -> Optional[RcloneDaemon]:
+    """Return the running daemon for this base command, starting it if needed.
+
+    Returns None when daemons are disabled or the daemon cannot be started.
+    """
+    if not rclone_daemon_enabled():
+        return None
+    key = (*map(str, base), *(os.environ.get(k, "") for k in _RC_CREDENTIAL_ENV))
+    with _DAEMONS_LOCK:
+        if str(base[0]) in _DAEMONS_FAILED:
+            return None
+        daemon = _DAEMONS.get(key)
+        if daemon is not None and daemon.alive():
+            return daemon
+        # Credentials or flags changed, or the daemon died: replace it.
+        for stale in [k for k in _DAEMONS if k[0] == key[0]]:
+            _DAEMONS.pop(stale).close()
+        daemon = RcloneDaemon(list(base))
+        try:
+            daemon.start()
+        except (OSError, RcCallError):
+            _DAEMONS_FAILED.add(str(base[0]))
+            return None
+        _DAEMONS[key] = daemon
+        return daemon
+
+
+def shutdown_daemons() -> None:
+    """Stop all daemons started by this process."""
+    with _DAEMONS_LOCK:
+        while _DAEMONS:
+            _DAEMONS.popitem()[1].close()
+
+
+atexit.register(shutdown_daemons)
+
+
+def list_files(base, remote: str, exclude=()) -> Optional[List[str]]:
+    """List the files below a remote recursively through the daemon.
+
+    Returns the paths relative to ``remote``, or None when no daemon is
+    available and the caller should run ``rclone lsf`` instead.
+    Raises RcloneError when the listing fails.
+    """
+    daemon = get_daemon(base)
+    if daemon is None:
+        return None
+    params: Dict[str, Any] = {
+        "fs": str(remote).replace("\\", "/"),
+        "remote": "",
+        "opt": {"recurse": True, "filesOnly": True, "noModTime": True, "noMimeType": True},
+    }
+    if exclude:
+        params["_filter"] = {"ExcludeRule": list(exclude)}
+    try:
+        reply = daemon.call("operations/list", params, timeout=300.0)
+    except RcCallError as exc:
+        category, user_msg = _classify_failure("lsf", remote, "", 1, [str(exc)])
+        raise RcloneError(user_msg, category) from exc
+    return [str(item.get("Path", "")) for item in reply.get("list") or [] if item.get("Path")]
+
+
 # Main runner
 
 
@@ -1013,8 +1480,17 @@ def run_rclone(
                 sys.stderr.flush()
             progress_started = False
 
+    # The daemon runs the transfer as an rc job that reads like the process.
+    rc_job = None
+    rc_request = _rc_request(verb, src, dst, extra) if rclone_daemon_enabled() else None
+    if rc_request is not None:
+        daemon = get_daemon(list(base))
+        if daemon is not None:
+            method, params, attempts, retries_sleep = rc_request
+            rc_job = _RcJob(daemon, method, params, attempts, retries_sleep)
+
     process_started_at = time.perf_counter()
-    with subprocess.Popen(
+    with rc_job or subprocess.Popen(
         cmd,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
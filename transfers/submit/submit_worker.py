@@ -34,11 +34,11 @@ import time
 import types
 import zipfile
 import webbrowser
-from concurrent.futures import Future
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
 
 import requests
 
@@ -55,6 +55,13 @@ _PHASE_TIMING_PREFIX = "SULU_PHASE_TIMING "
 _ZIP_SINGLE_PUT_CUTOFF_BYTES = 100 * 1024 * 1024
 _MAX_CLOCK_DRIFT_SECONDS = 300
 _MAX_SETTINGS_SCHEMA_BYTES = 2 * 1024 * 1024
+# Opt-in: upload the main blend, dependencies and add-ons at the same time.
+_CONCURRENT_UPLOADS_ENV = "SULU_CONCURRENT_UPLOADS"
+# Upload bandwidth in bytes per second, with an optional K/M/G suffix.
+_UPLOAD_BWLIMIT_ENV = "SULU_UPLOAD_BWLIMIT"
+_SIZE_SUFFIXES = {"": 1, "B": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+# Most split groups of a filesystem-root project uploaded at the same time.
+_SPLIT_GROUP_WORKERS = 4
 
 
 def _build_rclone_upload_settings(
@@ -412,6 +419,17 @@ def _split_manifest_by_first_dir(rel_manifest):
     return groups
 
 
+def _split_group_size(
+    manifest_sizes: Mapping[str, int], group_name: str, group_entries: Iterable[str]
+) -> int:
+    """Sum the sizes of the group's files measured while tracing, in bytes."""
+    total = 0
+    for entry in group_entries:
+        rel = f"{group_name}/{entry}" if group_name else entry
+        total += manifest_sizes.get(rel, 0)
+    return total
+
+
 def _normalize_frame_step(frame_step: object) -> int:
     try:
         return max(1, abs(int(frame_step or 1)))
@@ -661,13 +679,25 @@ def _bootstrap_addon_modules(data: Dict[str, object]):
     CLOUDFLARE_R2_DOMAIN = worker_utils.CLOUDFLARE_R2_DOMAIN
     open_folder = worker_utils.open_folder
     fetch_project_storage = worker_utils.fetch_project_storage
+    memoize_canonical_paths = worker_utils.memoize_canonical_paths
 
     bat_utils = importlib.import_module(f"{pkg_name}.utils.bat_utils")
     pack_blend = bat_utils.pack_blend
     trace_dependencies = bat_utils.trace_dependencies
+    iter_dependencies = bat_utils.iter_dependencies
+    configure_decompressed_cache = bat_utils.configure_decompressed_cache
+    open_missing_cache = bat_utils.open_missing_cache
+    record_decompressed_cache_stats = bat_utils.record_decompressed_cache_stats
     compute_project_root = bat_utils.compute_project_root
+    trace_frame_range_enabled = bat_utils.trace_frame_range_enabled
+    trace_cache_enabled = bat_utils.trace_cache_enabled
+    FrameRangeStats = bat_utils.FrameRangeStats
 
     cloud_files = importlib.import_module(f"{pkg_name}.utils.cloud_files")
+    upload_journal = importlib.import_module(f"{pkg_name}.utils.upload_journal")
+    content_store = importlib.import_module(f"{pkg_name}.utils.content_store")
+    fscache = importlib.import_module(f"{pkg_name}.blender_asset_tracer.fscache")
+    envvars = importlib.import_module(f"{pkg_name}.blender_asset_tracer.envvars")
 
     submit_logger = importlib.import_module(f"{pkg_name}.utils.submit_logger")
     create_logger = submit_logger.create_logger
@@ -692,10 +722,22 @@ def _bootstrap_addon_modules(data: Dict[str, object]):
         "CLOUDFLARE_R2_DOMAIN": CLOUDFLARE_R2_DOMAIN,
         "open_folder": open_folder,
         "fetch_project_storage": fetch_project_storage,
+        "memoize_canonical_paths": memoize_canonical_paths,
         "pack_blend": pack_blend,
         "trace_dependencies": trace_dependencies,
+        "iter_dependencies": iter_dependencies,
+        "configure_decompressed_cache": configure_decompressed_cache,
+        "open_missing_cache": open_missing_cache,
+        "record_decompressed_cache_stats": record_decompressed_cache_stats,
         "compute_project_root": compute_project_root,
+        "trace_frame_range_enabled": trace_frame_range_enabled,
+        "trace_cache_enabled": trace_cache_enabled,
+        "FrameRangeStats": FrameRangeStats,
         "cloud_files": cloud_files,
+        "upload_journal": upload_journal,
+        "content_store": content_store,
+        "fscache": fscache,
+        "env_bool": envvars.env_bool,
         "create_logger": create_logger,
         "run_rclone": run_rclone,
         "ensure_rclone": ensure_rclone,
@@ -740,6 +782,9 @@ class _SubmitContext:
     common_path: str = ""
     main_blend_s3: str = ""
     project_root_str: str = ""
+    content_hasher: Any = None
+    manifest_sources: Dict[str, str] = field(default_factory=dict)
+    manifest_sizes: Dict[str, int] = field(default_factory=dict)
     phase_timings: Dict[str, Dict[str, object]] = field(default_factory=dict)
     storage_future: Optional[Future] = None
     storage_thread: Optional[threading.Thread] = None
@@ -1120,9 +1165,9 @@ def _run_test_mode_report(
         for dep in dep_paths:
             ext = dep.suffix.lower() if dep.suffix else "(no ext)"
             by_ext[ext] = by_ext.get(ext, 0) + 1
-            if dep.exists() and dep.is_file():
+            if mods["fscache"].is_file(dep):
                 try:
-                    total_size += dep.stat().st_size
+                    total_size += mods["fscache"].getsize(dep)
                 except OSError:
                     pass
 
@@ -1204,6 +1249,17 @@ def _run_test_mode_report(
         sys.exit(1)
 
 
+def _record_fs_cache_stats(ctx: _SubmitContext) -> None:
+    """Stop sharing filesystem metadata, and record how many lookups it saved."""
+    cache = ctx.mods["fscache"].disable()
+    if cache is None:
+        return
+    ctx.report.set_metadata("fs_cache", cache.stats.as_dict())
+    if cache.missing is not None:
+        cache.missing.save()
+        ctx.report.set_metadata("missing_cache", cache.missing.stats.as_dict())
+
+
 def _trace_and_pack(ctx: _SubmitContext) -> None:
     data = ctx.data
     mods = ctx.mods
@@ -1212,6 +1268,7 @@ def _trace_and_pack(ctx: _SubmitContext) -> None:
     shorten_path = mods["shorten_path"]
     pack_blend = mods["pack_blend"]
     trace_dependencies = mods["trace_dependencies"]
+    record_decompressed_cache_stats = mods["record_decompressed_cache_stats"]
     compute_project_root = mods["compute_project_root"]
     blend_path = ctx.blend_path
     use_project = ctx.use_project
@@ -1234,6 +1291,21 @@ def _trace_and_pack(ctx: _SubmitContext) -> None:
     )
     logger.trace_start(blend_path)
     report.start_stage("trace")
+    # Trace, pack and manifest share one view of the filesystem metadata.
+    # Files found missing by recent submissions are not probed again while
+    # their directory is unchanged, nor are drives that could not be reached.
+    fscache = mods["fscache"]
+    fscache.enable(
+        missing=mods["open_missing_cache"](
+            Path(data["addon_dir"]) / "cache" / "missing.json",
+            refresh=bool(data.get("refresh_missing_cache")),
+        )
+    )
+    # Each dependency path is normalized once for trace, pack and manifest.
+    mods["memoize_canonical_paths"]()
+    mods["configure_decompressed_cache"](
+        Path(data["addon_dir"]) / "cache" / "decompressed"
+    )
 
     # Pack assets
     if use_project:
@@ -1241,25 +1313,56 @@ def _trace_and_pack(ctx: _SubmitContext) -> None:
         # opens files only when they actually need transfer, so warm PROJECT
         # submissions can skip unchanged cloud placeholders without rereading
         # the entire project first.
-        dep_paths, missing_set, unreadable_dict, raw_usages, optional_set = trace_dependencies(
-            Path(blend_path), logger=logger, hydrate=False, diagnostic_report=report
-        )
+        #
+        # PROJECT mode only needs paths, so unchanged .blend files can be
+        # replayed from the persistent trace cache. ZIP mode hands the usages
+        # to the Packer, which needs real blocks, so it never uses the cache.
+        # SULU_TRACE_CACHE=0 turns the cache off.
+        trace_cache_dir: Optional[Path] = None
+        if not data.get("bypass_trace_cache") and mods["trace_cache_enabled"]():
+            trace_cache_dir = Path(data["addon_dir"]) / "cache" / "trace"
+        # Sequences and caches only need the files of the rendered frames.
+        trace_frames: Optional[List[int]] = None
+        frame_stats = None
+        if ctx.render_tasks and mods["trace_frame_range_enabled"]():
+            trace_frames = ctx.render_tasks
+            frame_stats = mods["FrameRangeStats"]()
+        # Dependencies are consumed as they are traced, keeping only their
+        # paths and sizes; the usages and blend files are released.
+        dep_paths: List[Path] = []
+        missing_set: Set[Path] = set()
+        unreadable_dict: Dict[Path, str] = {}
+        optional_set: Set[Path] = set()
+        dep_sizes: Dict[Path, int] = {}
+        absolute_candidates: Dict[Path, None] = {}
+        for dep in mods["iter_dependencies"](
+            Path(blend_path),
+            logger=logger,
+            hydrate=False,
+            diagnostic_report=report,
+            trace_cache_dir=trace_cache_dir,
+            frames=trace_frames,
+            frame_stats=frame_stats,
+        ):
+            dep_paths.append(dep.path)
+            dep_sizes.setdefault(dep.path, dep.size)
+            if dep.optional:
+                optional_set.add(dep.path)
+            if dep.status == "missing":
+                missing_set.add(dep.path)
+            elif dep.status == "unreadable":
+                unreadable_dict[dep.path] = dep.error or "Unknown error"
+            # Paths stored as absolute (not //-relative); never set for
+            # optional assets such as linked-packed libraries.
+            if dep.absolute_path is not None:
+                absolute_candidates[dep.absolute_path] = None
 
         # Detect absolute paths in the blend file (PROJECT mode requires relative paths)
-        absolute_path_deps: List[Path] = []
-        for usage in raw_usages:
-            try:
-                # Skip optional assets (e.g. linked-packed libraries) - no warnings needed
-                if getattr(usage, "is_optional", False):
-                    continue
-                # Check if the path stored in the blend file is absolute (not //-relative)
-                if not usage.asset_path.is_blendfile_relative():
-                    abs_path = usage.abspath
-                    if abs_path not in missing_set and abs_path not in unreadable_dict:
-                        if abs_path not in absolute_path_deps:
-                            absolute_path_deps.append(abs_path)
-            except Exception:
-                pass  # Skip if we can't check the path
+        absolute_path_deps: List[Path] = [
+            abs_path
+            for abs_path in absolute_candidates
+            if abs_path not in missing_set and abs_path not in unreadable_dict
+        ]
 
         # Log absolute-path dependencies as trace entries in the diagnostic report
         for abs_dep in absolute_path_deps:
@@ -1275,10 +1378,12 @@ def _trace_and_pack(ctx: _SubmitContext) -> None:
             except Exception:
                 pass
 
-        ok_files_set = set(
-            p for p in dep_paths if p not in missing_set and p not in unreadable_dict
-        )
-        ok_files_cache = set(str(p).replace("\\", "/") for p in ok_files_set)
+        # Size of each readable file, measured while tracing.
+        ok_file_sizes: Dict[Path, int] = {
+            p: size
+            for p, size in dep_sizes.items()
+            if p not in missing_set and p not in unreadable_dict
+        }
 
         # Compute project root
         custom_root = None
@@ -1433,11 +1538,17 @@ def _trace_and_pack(ctx: _SubmitContext) -> None:
             target="",
             method="PROJECT",
             project_path=common_path,
-            pre_traced_deps=list(ok_files_set),
+            pre_traced_deps=list(ok_file_sizes),
         )
 
         abs_blend = _norm_abs_for_detection(blend_path)
         rel_manifest: List[str] = []
+        # Content-addressed uploads hash the dependencies in the background
+        # from here on, while the manifest is written and the blend uploaded.
+        hasher = mods["content_store"].start_hasher(
+            Path(data["addon_dir"]) / "cache" / "content_hashes.json"
+        )
+        ctx.content_hasher = hasher
         dependency_total_size = 0  # Track dependency size separately for progress bar
 
         total_files = len(fmap)
@@ -1452,18 +1563,14 @@ def _trace_and_pack(ctx: _SubmitContext) -> None:
             if _samepath(src_str, abs_blend):
                 continue
 
-            # Use cached readability from Stage 1
-            if src_str not in ok_files_cache:
+            # Use cached readability and size from Stage 1
+            size = ok_file_sizes.get(src_path)
+            if size is None:
                 continue
 
             pack_idx += 1
             ok_count += 1
-            size = 0
-            try:
-                size = os.path.getsize(src_str)
-                dependency_total_size += size
-            except Exception:
-                pass
+            dependency_total_size += size
 
             logger.pack_entry(pack_idx, src_str, size=size, status="ok")
 
@@ -1471,7 +1578,11 @@ def _trace_and_pack(ctx: _SubmitContext) -> None:
             rel = _s3key_clean(rel)
             if rel:
                 rel_manifest.append(rel)
+                ctx.manifest_sizes[rel] = size
                 report.add_pack_entry(src_str, rel, file_size=size, status="ok")
+                if hasher is not None:
+                    hasher.submit(src_str)
+                    ctx.manifest_sources[rel] = src_str
 
         # Calculate total required storage (dependencies + main blend)
         required_storage = dependency_total_size
@@ -1507,12 +1618,24 @@ def _trace_and_pack(ctx: _SubmitContext) -> None:
         blend_rel = _relpath_safe(abs_blend, common_path)
         main_blend_s3 = _nfc(_s3key_clean(blend_rel) or os.path.basename(abs_blend))
 
+        if frame_stats is not None and frame_stats.skipped_files:
+            logger.info(
+                f"Left out {_count(frame_stats.skipped_files, 'sequence file')} "
+                f"({_format_size(frame_stats.skipped_bytes)}) not read for frames "
+                f"{min(ctx.render_tasks)}-{max(ctx.render_tasks)}"
+            )
+            report.set_pack_frame_range_savings(
+                frame_stats.skipped_files, frame_stats.skipped_bytes
+            )
+
         logger.pack_end(
             ok_count=ok_count,
             total_size=required_storage,
             title="Manifest complete",
         )
         report.set_pack_dependency_size(dependency_total_size)
+        record_decompressed_cache_stats(report)
+        _record_fs_cache_stats(ctx)
         report.complete_stage("pack")
 
     else:  # ZIP mode
@@ -1717,6 +1840,8 @@ def _trace_and_pack(ctx: _SubmitContext) -> None:
         common_path = ""
         main_blend_s3 = ""
         report.set_pack_dependency_size(_zip_dep_size)
+        record_decompressed_cache_stats(report)
+        _record_fs_cache_stats(ctx)
         report.complete_stage("pack")
 
     # NO_SUBMIT MODE
@@ -1951,6 +2076,255 @@ def _project_storage_payload(ctx: _SubmitContext) -> object:
     return payload
 
 
+def _content_hashes(ctx: _SubmitContext, rels: List[str]) -> Dict[str, str]:
+    """Wait for the content digests of the manifest; unreadable files are left out."""
+    hashes: Dict[str, str] = {}
+    for rel in rels:
+        source = ctx.manifest_sources.get(rel)
+        if source is None:
+            continue
+        digest = ctx.content_hasher.result(source)
+        if digest is not None:
+            hashes[rel] = digest
+    return hashes
+
+
+def _sources_size(ctx: _SubmitContext, rels: List[str]) -> int:
+    total = 0
+    for rel in rels:
+        try:
+            total += os.path.getsize(ctx.manifest_sources[rel])
+        except (KeyError, OSError):
+            pass
+    return total
+
+
+def _upload_content_addressed(
+    ctx: _SubmitContext,
+    logger: Any,
+    report: Any,
+    base_cmd: List[str],
+    bucket: str,
+    rclone_settings: List[str],
+    step: int,
+    total_steps: int,
+    delta: List[str],
+    unchanged: List[str],
+    hashes: Dict[str, str],
+) -> Tuple[Dict[str, str], List[str], int, bool]:
+    """Upload the hashed files of the delta once per content.
+
+    Returns the content keys of the manifest, the files that still have to
+    be uploaded under their project path, the rclone error count, and
+    whether anything was uploaded.
+    """
+    content_store = ctx.mods["content_store"]
+
+    keys = {rel: content_store.content_key(hashes[rel]) for rel in unchanged if rel in hashes}
+    files = {
+        rel: (ctx.manifest_sources[rel], hashes[rel])
+        for rel in delta
+        if rel in hashes and rel in ctx.manifest_sources
+    }
+    remaining = [rel for rel in delta if rel not in files]
+    if not files:
+        return keys, remaining, 0, False
+
+    staging_dir = Path(tempfile.mkdtemp(prefix=f"{ctx.job_id}_content_"))
+    try:
+        # Files changed since they were hashed go to the regular upload, as
+        # their key would no longer match their contents.
+        staged, failed = content_store.stage_content(
+            files, staging_dir, ctx.content_hasher.unchanged
+        )
+        remaining.extend(failed)
+        uploads = content_store.unique_keys(staged.values())
+        first_rel = {}
+        for rel, key in staged.items():
+            first_rel.setdefault(key, rel)
+        expected = _sources_size(ctx, list(first_rel.values()))
+
+        keylist = staging_dir / "keys.txt"
+        with keylist.open("w", encoding="utf-8") as fp:
+            for key in uploads:
+                fp.write(f"{key}\n")
+
+        report.start_upload_step(
+            step, total_steps, "Uploading dependencies (content-addressed)",
+            manifest_entries=len(uploads),
+            expected_bytes=expected,
+            source=str(staging_dir),
+            destination=f":s3:{bucket}/",
+            verb="copy",
+            substep="content",
+        )
+        # Objects are named by their content, so existing ones are never
+        # overwritten and need no checksum comparison.
+        rclone_result = ctx.mods["run_rclone"](
+            base_cmd,
+            "copy",
+            str(staging_dir),
+            f":s3:{bucket}/",
+            extra=["--files-from", str(keylist), "--copy-links", "--ignore-existing", *rclone_settings],
+            logger=logger,
+            total_bytes=expected,
+        )
+        errors = 0
+        if isinstance(rclone_result, dict):
+            errors = rclone_result.get("errors", 0) or 0
+        if not remaining:
+            logger.upload_complete("Dependencies uploaded")
+        _log_upload_result(rclone_result, expected_bytes=expected, label="Content: ")
+        _check_rclone_errors(rclone_result, label="Content")
+        report.complete_upload_step(
+            bytes_transferred=_rclone_bytes(rclone_result),
+            rclone_stats=_rclone_stats(rclone_result),
+        )
+        keys.update(staged)
+        stats = ctx.content_hasher.stats.as_dict()
+        stats.update(
+            unique_objects=len(uploads),
+            staged_files=len(staged),
+            staging_failed=len(failed),
+        )
+        report.set_metadata("content_store", stats)
+        return keys, remaining, errors, True
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def _upload_bandwidth_limit() -> int:
+    """Return the upload bandwidth budget in bytes per second, 0 for none."""
+    value = os.environ.get(_UPLOAD_BWLIMIT_ENV, "").strip()
+    if not value:
+        return 0
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([BKMG]?)i?B?", value, re.IGNORECASE)
+    if not match:
+        _LOG(f"Ignoring invalid {_UPLOAD_BWLIMIT_ENV}={value!r}")
+        return 0
+    return int(float(match.group(1)) * _SIZE_SUFFIXES[match.group(2).upper()])
+
+
+def _with_bwlimit(rclone_settings: List[str], bytes_per_second: int) -> List[str]:
+    if bytes_per_second <= 0:
+        return rclone_settings
+    return [*rclone_settings, "--bwlimit", f"{max(1, bytes_per_second // 1024)}K"]
+
+
+def _with_transfers(rclone_settings: List[str], transfers: int) -> List[str]:
+    settings = list(rclone_settings)
+    for flag in ("--transfers", "--checkers"):
+        if flag in settings:
+            i = settings.index(flag)
+            settings[i + 1] = str(transfers)
+    return settings
+
+
+def _settings_transfers(rclone_settings: List[str]) -> int:
+    try:
+        return int(rclone_settings[rclone_settings.index("--transfers") + 1])
+    except (ValueError, IndexError):
+        return 4
+
+
+def _share_upload_settings(rclone_settings: List[str], share: float) -> List[str]:
+    """Return the settings of an upload run at the same time as others.
+
+    It gets ``share`` (a fraction up to 1) of --transfers and of the
+    --bwlimit, if any, and at least one transfer.
+    """
+    if share >= 1:
+        return list(rclone_settings)
+    transfers = max(1, round(_settings_transfers(rclone_settings) * share))
+    settings = _with_transfers(rclone_settings, transfers)
+    if "--bwlimit" in settings:
+        i = len(settings) - 1 - settings[::-1].index("--bwlimit")
+        match = re.fullmatch(r"(\d+)K", settings[i + 1] if i + 1 < len(settings) else "")
+        if match:
+            settings[i + 1] = f"{max(64, int(int(match.group(1)) * share))}K"
+    return settings
+
+
+@dataclass
+class _ConcurrentUploadStep:
+    """An upload step function(logger, report, step, rclone_settings)."""
+
+    run: Any
+    expected_bytes: int
+    single_file: bool = False
+
+
+class _StepReport:
+    """The diagnostic report as seen by one of several concurrent upload steps."""
+
+    def __init__(self, report: Any) -> None:
+        self._report = report
+        self._step: Optional[Dict[str, Any]] = None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._report, name)
+
+    def start_upload_step(self, *args: Any, **kwargs: Any) -> None:
+        self._step = self._report.start_upload_step(*args, **kwargs)
+
+    def complete_upload_step(self, *args: Any, **kwargs: Any) -> None:
+        self._report.complete_upload_step(*args, step=self._step, **kwargs)
+
+    def add_upload_split_group(self, *args: Any, **kwargs: Any) -> None:
+        self._report.add_upload_split_group(*args, step=self._step, **kwargs)
+
+
+def _run_concurrent_upload_steps(
+    ctx: _SubmitContext,
+    steps: List[_ConcurrentUploadStep],
+    total_steps: int,
+    rclone_settings: List[str],
+    bwlimit: int,
+) -> None:
+    """Run upload steps at the same time, numbered from 1 in order.
+
+    The steps share the --transfers of ``rclone_settings``: single-file
+    steps get one transfer each and the rest go to the others. A bandwidth
+    limit is divided in proportion to the bytes each step expects to send.
+    Raises the first step's error once all steps have finished.
+    """
+    budget = _settings_transfers(rclone_settings)
+    singles = sum(1 for s in steps if s.single_file)
+    shared = max(1, budget - singles)
+    multi = max(1, len(steps) - singles)
+    total_bytes = sum(max(0, s.expected_bytes) for s in steps)
+
+    progress = ctx.logger.parallel_uploads()
+    runs = []
+    for number, upload_step in enumerate(steps, start=1):
+        transfers = 1 if upload_step.single_file else max(1, shared // multi)
+        settings = _with_transfers(rclone_settings, transfers)
+        if bwlimit > 0:
+            if total_bytes > 0:
+                share = bwlimit * max(0, upload_step.expected_bytes) // total_bytes
+            else:
+                share = bwlimit // len(steps)
+            settings = _with_bwlimit(settings, max(share, 64 * 1024))
+        runs.append((upload_step.run, progress.channel(), _StepReport(ctx.report), number, settings))
+
+    errors: List[BaseException] = []
+    threads = []
+    for run, channel, step_report, number, settings in runs:
+        def _target(run=run, channel=channel, step_report=step_report, number=number, settings=settings) -> None:
+            try:
+                run(channel, step_report, number, settings)
+            except BaseException as exc:
+                errors.append(exc)
+
+        thread = threading.Thread(target=_target, name=f"sulu-upload-{number}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
 def _upload(ctx: _SubmitContext) -> None:
     upload_started_at = time.perf_counter()
     data = ctx.data
@@ -1997,6 +2371,44 @@ def _upload(ctx: _SubmitContext) -> None:
 
     has_addons = data.get("packed_addons") and len(data["packed_addons"]) > 0
 
+    # With the upload journal, dependencies uploaded unchanged before are left
+    # out without any remote call, and the delta skips the destination checks.
+    journal = None
+    upload_manifest = rel_manifest
+    unchanged_rels: List[str] = []
+    upload_size = dependency_total_size
+    journal_settings: List[str] = []
+    # Content digests and keys by rel key, when uploading by content.
+    content_hashes: Optional[Dict[str, str]] = None
+    content_keys: Optional[Dict[str, str]] = None
+    if use_project and rel_manifest and ctx.content_hasher is not None:
+        content_hashes = _content_hashes(ctx, rel_manifest)
+    if use_project and rel_manifest:
+        upload_journal = mods["upload_journal"]
+        scope = f"{bucket}/{project_name}"
+        if content_hashes is not None:
+            scope += "#content"
+        journal = upload_journal.open_journal(
+            Path(data["addon_dir"]) / "cache" / "upload_journal.json",
+            scope,
+            upload_journal.credentials_fingerprint(CLOUDFLARE_R2_DOMAIN, bucket, s3info),
+            force_reconcile=bool(data.get("reconcile_upload_journal")),
+        )
+    if journal is not None:
+        source_root = common_path.rstrip("/")
+        unchanged_rels, upload_manifest = journal.split(
+            ((rel, f"{source_root}/{rel}") for rel in rel_manifest),
+            hashes=content_hashes,
+        )
+        upload_size = journal.stats.delta_bytes
+        if not journal.full_reconcile:
+            journal_settings = ["--no-check-dest"]
+        if _debug_enabled():
+            _LOG(
+                f"Upload journal: {len(upload_manifest)} of {len(rel_manifest)} files to upload"
+                + (f" (full reconcile: {journal.stats.reconcile_reason})" if journal.full_reconcile else "")
+            )
+
     try:
         if not use_project:
             # Zip upload
@@ -2062,7 +2474,6 @@ def _upload(ctx: _SubmitContext) -> None:
             total_steps = 3 if rel_manifest else 2
             if has_addons:
                 total_steps += 1
-            step = 1
             logger.upload_start(total_steps)
 
             blend_size = 0
@@ -2070,57 +2481,102 @@ def _upload(ctx: _SubmitContext) -> None:
                 blend_size = os.path.getsize(blend_path)
             except OSError:
                 pass
-            logger.upload_step(step, total_steps, "Uploading main blend")
-            move_to_path = _nfc(_s3key_clean(f"{project_name}/{main_blend_s3}"))
-            remote_main = f":s3:{bucket}/{move_to_path}"
-            report.start_upload_step(
-                step, total_steps, "Uploading main blend",
-                expected_bytes=blend_size,
-                source=blend_path,
-                destination=remote_main,
-                verb="copyto",
-            )
-            rclone_result = run_rclone(
-                base_cmd,
-                "copyto",
-                blend_path,
-                remote_main,
-                extra=rclone_settings,
-                logger=logger,
-                total_bytes=blend_size,
-            )
-            # Ensure completion panel shows the blend size even if rclone
-            # finished too fast to emit stats (stats_received=False).
-            if blend_size > 0 and logger._transfer_total == 0:
-                logger._transfer_total = blend_size
-            logger.upload_complete("Main blend uploaded")
-            _log_upload_result(rclone_result, expected_bytes=blend_size, label="Blend: ")
-            report.complete_upload_step(
-                bytes_transferred=_rclone_bytes(rclone_result),
-                rclone_stats=_rclone_stats(rclone_result),
-            )
-            step += 1
 
-            if rel_manifest:
+            # Each step takes the logger, report and rclone settings to use,
+            # so that independent steps can also run concurrently.
+            def _upload_main_blend(logger, report, step: int, rclone_settings: List[str]) -> None:
+                logger.upload_step(step, total_steps, "Uploading main blend")
+                move_to_path = _nfc(_s3key_clean(f"{project_name}/{main_blend_s3}"))
+                remote_main = f":s3:{bucket}/{move_to_path}"
+                report.start_upload_step(
+                    step, total_steps, "Uploading main blend",
+                    expected_bytes=blend_size,
+                    source=blend_path,
+                    destination=remote_main,
+                    verb="copyto",
+                )
+                rclone_result = run_rclone(
+                    base_cmd,
+                    "copyto",
+                    blend_path,
+                    remote_main,
+                    extra=rclone_settings,
+                    logger=logger,
+                    total_bytes=blend_size,
+                )
+                # Ensure completion panel shows the blend size even if rclone
+                # finished too fast to emit stats (stats_received=False).
+                if blend_size > 0 and logger._transfer_total == 0:
+                    logger._transfer_total = blend_size
+                logger.upload_complete("Main blend uploaded")
+                _log_upload_result(rclone_result, expected_bytes=blend_size, label="Blend: ")
+                report.complete_upload_step(
+                    bytes_transferred=_rclone_bytes(rclone_result),
+                    rclone_stats=_rclone_stats(rclone_result),
+                )
+
+            def _upload_dependencies(logger, report, step: int, rclone_settings: List[str]) -> None:
+                nonlocal upload_manifest, upload_size, content_keys
                 logger.upload_step(step, total_steps, "Uploading dependencies")
                 if _debug_enabled():
                     _LOG(f"Manifest: {len(rel_manifest)} files, {_format_size(dependency_total_size)} expected")
 
-                if _is_filesystem_root(common_path):
+                upload_errors = 0
+                journal_rels = upload_manifest
+                content_uploaded = False
+                if content_hashes is not None:
+                    content_keys, upload_manifest, upload_errors, content_uploaded = (
+                        _upload_content_addressed(
+                            ctx,
+                            logger,
+                            report,
+                            base_cmd,
+                            bucket,
+                            rclone_settings,
+                            step,
+                            total_steps,
+                            upload_manifest,
+                            unchanged_rels,
+                            content_hashes,
+                        )
+                    )
+                    # Files uploaded under their project path instead are not
+                    # in the content manifest, so the journal must not skip
+                    # them next time.
+                    journal_rels = [rel for rel in journal_rels if rel in content_keys]
+                    upload_size = _sources_size(ctx, upload_manifest)
+                # The files left after a content-addressed upload are part of
+                # the same step, reported as a substep of their own.
+                path_substep = "path" if content_uploaded else None
+
+                if not upload_manifest and not content_uploaded:
+                    # Everything is known to be uploaded already.
+                    report.start_upload_step(
+                        step, total_steps, "Uploading dependencies (unchanged)",
+                        manifest_entries=0,
+                        expected_bytes=0,
+                        source=str(common_path),
+                        destination=f":s3:{bucket}/{project_name}/",
+                        verb="copy",
+                    )
+                    logger.upload_complete("Dependencies unchanged")
+                    report.complete_upload_step(bytes_transferred=0, rclone_stats=None)
+                elif _is_filesystem_root(common_path):
                     # --- SPLIT PATH: filesystem root source ---
                     if _debug_enabled():
                         _LOG(f"Project root is a filesystem root ({common_path}), splitting upload by directory")
-                    groups = _split_manifest_by_first_dir(rel_manifest)
+                    groups = _split_manifest_by_first_dir(upload_manifest)
                     if _debug_enabled():
                         _LOG(f"Split into {len(groups)} group(s): {list(groups.keys())}")
 
                     report.start_upload_step(
                         step, total_steps, "Uploading dependencies (split)",
-                        manifest_entries=len(rel_manifest),
-                        expected_bytes=dependency_total_size,
+                        manifest_entries=len(upload_manifest),
+                        expected_bytes=upload_size,
                         source=common_path,
                         destination=f":s3:{bucket}/{project_name}/",
                         verb="copy",
+                        substep=path_substep,
                     )
 
                     agg_bytes = 0
@@ -2129,10 +2585,19 @@ def _upload(ctx: _SubmitContext) -> None:
                     agg_errors = 0
                     any_empty = False
 
-                    for group_name, group_entries in groups.items():
-                        if not group_entries:
-                            continue
-
+                    group_jobs = [(name, entries) for name, entries in groups.items() if entries]
+                    workers = max(1, min(len(group_jobs), _settings_transfers(rclone_settings), _SPLIT_GROUP_WORKERS))
+                    # The groups report to one progress bar for the step.
+                    progress = logger.parallel_uploads() if workers > 1 else None
+
+                    def _upload_group(
+                        index: int,
+                        group_name: str,
+                        group_entries: List[str],
+                        group_size: int,
+                        group_logger,
+                        group_settings: List[str],
+                    ):
                         # Build group source and dest
                         if group_name:
                             group_source = common_path.rstrip("/") + "/" + group_name
@@ -2143,7 +2608,7 @@ def _upload(ctx: _SubmitContext) -> None:
                             group_dest = f":s3:{bucket}/{project_name}/"
 
                         # Write temporary filelist for this group
-                        group_filelist = Path(tempfile.gettempdir()) / f"{job_id}_g_{hash(group_name) & 0xFFFF:04x}.txt"
+                        group_filelist = Path(tempfile.gettempdir()) / f"{job_id}_g_{index:04d}.txt"
                         with group_filelist.open("w", encoding="utf-8") as fp:
                             for entry in group_entries:
                                 fp.write(f"{entry}\n")
@@ -2160,18 +2625,62 @@ def _upload(ctx: _SubmitContext) -> None:
                         except Exception:
                             pass
 
-                        group_rclone = ["--files-from", str(group_filelist)]
-                        group_rclone.extend(rclone_settings)
-
                         if _debug_enabled():
                             _LOG(f"  Group '{group_name}': {len(group_entries)} files, source={group_source}")
-                        grp_result = run_rclone(
-                            base_cmd, "copy", group_source, group_dest,
-                            extra=group_rclone, logger=logger,
-                            total_bytes=dependency_total_size,
-                        )
+                        try:
+                            grp_result = run_rclone(
+                                base_cmd, "copy", group_source, group_dest,
+                                extra=["--files-from", str(group_filelist), *group_settings],
+                                logger=group_logger,
+                                total_bytes=group_size,
+                            )
+                        finally:
+                            # Clean up temp filelist
+                            try:
+                                group_filelist.unlink(missing_ok=True)
+                            except Exception:
+                                pass
                         _log_upload_result(grp_result, label=f"  Group '{group_name}': ")
                         _check_rclone_errors(grp_result, label=f"Group '{group_name}'")
+                        return group_source, group_dest, grp_result
+
+                    # Groups share --transfers and the --bwlimit by their size,
+                    # measured while tracing, so that one large group is not
+                    # held to an equal share while the small ones are done.
+                    group_sizes = [
+                        _split_group_size(ctx.manifest_sizes, group_name, group_entries)
+                        for group_name, group_entries in group_jobs
+                    ]
+                    sized_bytes = sum(group_sizes)
+                    # Every group counts toward the total before the first one reports.
+                    group_args = []
+                    for index, (group_name, group_entries) in enumerate(group_jobs):
+                        group_size = group_sizes[index]
+                        if workers <= 1:
+                            share = 1.0
+                        elif sized_bytes > 0:
+                            share = group_size / sized_bytes
+                        else:
+                            share = len(group_entries) / len(upload_manifest)
+                        group_settings = [*_share_upload_settings(rclone_settings, share), *journal_settings]
+                        group_logger = logger if progress is None else progress.channel(group_size)
+                        group_args.append(
+                            (index, group_name, group_entries, group_size, group_logger, group_settings)
+                        )
+                    # The largest groups start first; results stay in manifest order.
+                    group_futures: List[Optional[Future]] = [None] * len(group_args)
+                    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sulu-split") as pool:
+                        for args in sorted(group_args, key=lambda a: a[3], reverse=True):
+                            group_futures[args[0]] = pool.submit(_upload_group, *args)
+
+                    # Record the groups in manifest order once all have finished.
+                    group_error: Optional[BaseException] = None
+                    for (group_name, group_entries), future in zip(group_jobs, group_futures):
+                        try:
+                            group_source, group_dest, grp_result = future.result()
+                        except BaseException as exc:
+                            group_error = group_error or exc
+                            continue
                         report.add_upload_split_group(
                             group_name=group_name or "(root)",
                             file_count=len(group_entries),
@@ -2180,12 +2689,6 @@ def _upload(ctx: _SubmitContext) -> None:
                             rclone_stats=_rclone_stats(grp_result),
                         )
 
-                        # Clean up temp filelist
-                        try:
-                            group_filelist.unlink(missing_ok=True)
-                        except Exception:
-                            pass
-
                         # Accumulate stats
                         agg_bytes += _rclone_bytes(grp_result)
                         if isinstance(grp_result, dict):
@@ -2200,9 +2703,12 @@ def _upload(ctx: _SubmitContext) -> None:
                                 if grp_tail:
                                     for line in grp_tail[-5:]:
                                         _LOG(f"    {line}")
+                    if group_error is not None:
+                        raise group_error
 
+                    upload_errors += agg_errors
                     # Set aggregated total so upload_complete panel shows correct size
-                    logger._transfer_total = dependency_total_size
+                    logger._transfer_total = upload_size
                     logger.upload_complete("Dependencies uploaded")
                     if _debug_enabled():
                         _LOG(
@@ -2223,52 +2729,71 @@ def _upload(ctx: _SubmitContext) -> None:
                         bytes_transferred=agg_bytes,
                         rclone_stats=agg_stats,
                     )
-                    if any_empty and dependency_total_size > 0 and _debug_enabled():
+                    if any_empty and upload_size > 0 and _debug_enabled():
                         _LOG(
                             "WARNING: Some dependency groups transferred 0 files. "
                             "See diagnostic report."
                         )
                     # Post-upload transfer count validation
                     total_touched = agg_transfers + agg_checks
-                    if total_touched > 0 and total_touched < len(rel_manifest) and _debug_enabled():
+                    if total_touched > 0 and total_touched < len(upload_manifest) and _debug_enabled():
                         _LOG(
                             f"WARNING: rclone touched {total_touched} of "
-                            f"{len(rel_manifest)} manifest files — "
-                            f"{len(rel_manifest) - total_touched} file(s) may have been skipped"
+                            f"{len(upload_manifest)} manifest files — "
+                            f"{len(upload_manifest) - total_touched} file(s) may have been skipped"
                         )
                 else:
                     report.start_upload_step(
                         step, total_steps, "Uploading dependencies",
-                        manifest_entries=len(rel_manifest),
-                        expected_bytes=dependency_total_size,
+                        manifest_entries=len(upload_manifest),
+                        expected_bytes=upload_size,
                         source=str(common_path),
                         destination=f":s3:{bucket}/{project_name}/",
                         verb="copy",
+                        substep=path_substep,
                     )
-                    dependency_rclone_settings = ["--files-from", str(filelist)]
+                    # The full manifest is uploaded for the farm below; a
+                    # journal delta goes to rclone in a file of its own.
+                    upload_filelist = filelist
+                    if upload_manifest is not rel_manifest:
+                        upload_filelist = Path(tempfile.gettempdir()) / f"{job_id}_delta.txt"
+                        with upload_filelist.open("w", encoding="utf-8") as fp:
+                            for rel in upload_manifest:
+                                fp.write(f"{rel}\n")
+                    dependency_rclone_settings = ["--files-from", str(upload_filelist)]
                     dependency_rclone_settings.extend(rclone_settings)
-                    rclone_result = run_rclone(
-                        base_cmd,
-                        "copy",
-                        str(common_path),
-                        f":s3:{bucket}/{project_name}/",
-                        extra=dependency_rclone_settings,
-                        logger=logger,
-                        total_bytes=dependency_total_size,
-                    )
+                    dependency_rclone_settings.extend(journal_settings)
+                    try:
+                        rclone_result = run_rclone(
+                            base_cmd,
+                            "copy",
+                            str(common_path),
+                            f":s3:{bucket}/{project_name}/",
+                            extra=dependency_rclone_settings,
+                            logger=logger,
+                            total_bytes=upload_size,
+                        )
+                    finally:
+                        if upload_filelist != filelist:
+                            try:
+                                upload_filelist.unlink(missing_ok=True)
+                            except Exception:
+                                pass
                     logger.upload_complete("Dependencies uploaded")
-                    _log_upload_result(rclone_result, expected_bytes=dependency_total_size, label="Dependencies: ")
+                    _log_upload_result(rclone_result, expected_bytes=upload_size, label="Dependencies: ")
                     _check_rclone_errors(rclone_result, label="Dependencies")
                     stats = _rclone_stats(rclone_result)
+                    if isinstance(rclone_result, dict):
+                        upload_errors += rclone_result.get("errors", 0) or 0
                     report.complete_upload_step(
                         bytes_transferred=_rclone_bytes(rclone_result),
                         rclone_stats=stats,
                     )
-                    if _is_empty_upload(rclone_result, len(rel_manifest)) and _debug_enabled():
+                    if _is_empty_upload(rclone_result, len(upload_manifest)) and _debug_enabled():
                         tail = _get_rclone_tail(rclone_result)
                         _LOG(
-                            f"WARNING: Expected {_format_size(dependency_total_size)} "
-                            f"across {len(rel_manifest)} files, but rclone transferred 0. "
+                            f"WARNING: Expected {_format_size(upload_size)} "
+                            f"across {len(upload_manifest)} files, but rclone transferred 0. "
                             "See diagnostic report for details."
                         )
                         if tail:
@@ -2278,42 +2803,21 @@ def _upload(ctx: _SubmitContext) -> None:
                     # Post-upload transfer count validation
                     if stats and _debug_enabled():
                         total_touched = (stats.get("transfers", 0) or 0) + (stats.get("checks", 0) or 0)
-                        if total_touched > 0 and total_touched < len(rel_manifest):
+                        if total_touched > 0 and total_touched < len(upload_manifest):
                             _LOG(
                                 f"WARNING: rclone touched {total_touched} of "
-                                f"{len(rel_manifest)} manifest files — "
-                                f"{len(rel_manifest) - total_touched} file(s) may have been skipped"
+                                f"{len(upload_manifest)} manifest files — "
+                                f"{len(upload_manifest) - total_touched} file(s) may have been skipped"
                             )
-                step += 1
-
-            with filelist.open("a", encoding="utf-8") as fp:
-                fp.write(_nfc(_s3key_clean(main_blend_s3)) + "\n")
 
-            logger.upload_step(step, total_steps, "Uploading manifest")
-            report.start_upload_step(
-                step, total_steps, "Uploading manifest",
-                source=str(filelist),
-                destination=f":s3:{bucket}/{project_name}/",
-                verb="move",
-            )
-            rclone_result = run_rclone(
-                base_cmd,
-                "move",
-                str(filelist),
-                f":s3:{bucket}/{project_name}/",
-                extra=rclone_settings,
-                logger=logger,
-            )
-            logger.upload_complete("Manifest uploaded")
-            _log_upload_result(rclone_result, label="Manifest: ")
-            _check_rclone_errors(rclone_result, label="Manifest")
-            report.complete_upload_step(
-                bytes_transferred=_rclone_bytes(rclone_result),
-                rclone_stats=_rclone_stats(rclone_result),
-            )
-            step += 1
+                if journal is not None:
+                    # Files are only trusted once rclone reported no errors.
+                    if not upload_errors:
+                        journal.record_uploaded(journal_rels)
+                        journal.save(reconciled=journal.full_reconcile)
+                    report.set_metadata("upload_journal", journal.stats.as_dict())
 
-            if has_addons:
+            def _upload_addons(logger, report, step: int, rclone_settings: List[str]) -> None:
                 logger.upload_step(step, total_steps, "Uploading add-ons")
                 report.start_upload_step(
                     step, total_steps, "Uploading add-ons",
@@ -2337,6 +2841,71 @@ def _upload(ctx: _SubmitContext) -> None:
                     rclone_stats=_rclone_stats(rclone_result),
                 )
 
+            def _upload_manifest(logger, report, step: int, rclone_settings: List[str]) -> None:
+                with filelist.open("a", encoding="utf-8") as fp:
+                    fp.write(_nfc(_s3key_clean(main_blend_s3)) + "\n")
+
+                logger.upload_step(step, total_steps, "Uploading manifest")
+                report.start_upload_step(
+                    step, total_steps, "Uploading manifest",
+                    source=str(filelist),
+                    destination=f":s3:{bucket}/{project_name}/",
+                    verb="move",
+                )
+                if rel_manifest and content_hashes is not None and content_keys:
+                    # The farm reads the content keys before the manifest.
+                    content_manifest = filelist.with_suffix(".content.json")
+                    mods["content_store"].write_content_manifest(content_manifest, content_keys)
+                    content_result = run_rclone(
+                        base_cmd,
+                        "move",
+                        str(content_manifest),
+                        f":s3:{bucket}/{project_name}/",
+                        extra=rclone_settings,
+                        logger=logger,
+                    )
+                    _check_rclone_errors(content_result, label="Content manifest")
+                rclone_result = run_rclone(
+                    base_cmd,
+                    "move",
+                    str(filelist),
+                    f":s3:{bucket}/{project_name}/",
+                    extra=rclone_settings,
+                    logger=logger,
+                )
+                logger.upload_complete("Manifest uploaded")
+                _log_upload_result(rclone_result, label="Manifest: ")
+                _check_rclone_errors(rclone_result, label="Manifest")
+                report.complete_upload_step(
+                    bytes_transferred=_rclone_bytes(rclone_result),
+                    rclone_stats=_rclone_stats(rclone_result),
+                )
+
+            bwlimit = _upload_bandwidth_limit()
+            if mods["env_bool"](_CONCURRENT_UPLOADS_ENV) and (rel_manifest or has_addons):
+                # The main blend, dependencies and add-ons do not depend on
+                # each other. The manifest tells the farm the upload is
+                # complete, so it still goes last.
+                steps = [_ConcurrentUploadStep(_upload_main_blend, blend_size, single_file=True)]
+                if rel_manifest:
+                    steps.append(_ConcurrentUploadStep(_upload_dependencies, upload_size))
+                if has_addons:
+                    steps.append(_ConcurrentUploadStep(_upload_addons, 0, single_file=True))
+                _run_concurrent_upload_steps(ctx, steps, total_steps, rclone_settings, bwlimit)
+                _upload_manifest(logger, report, total_steps, _with_bwlimit(rclone_settings, bwlimit))
+            else:
+                rclone_settings = _with_bwlimit(rclone_settings, bwlimit)
+                step = 1
+                _upload_main_blend(logger, report, step, rclone_settings)
+                step += 1
+                if rel_manifest:
+                    _upload_dependencies(logger, report, step, rclone_settings)
+                    step += 1
+                _upload_manifest(logger, report, step, rclone_settings)
+                step += 1
+                if has_addons:
+                    _upload_addons(logger, report, step, rclone_settings)
+
         report.complete_stage("upload")
         _record_phase_timing(
             ctx,
@@ -2358,6 +2927,8 @@ def _upload(ctx: _SubmitContext) -> None:
         )
 
     finally:
+        if ctx.content_hasher is not None:
+            ctx.content_hasher.close()
         try:
             if "packed_addons_path" in data and data["packed_addons_path"]:
                 shutil.rmtree(data["packed_addons_path"], ignore_errors=True)
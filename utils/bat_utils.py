@@ -3,14 +3,25 @@ from __future__ import annotations
 import os
 import shutil
 import tempfile
+import threading
+import time
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Set, Tuple
+from typing import Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Any, Set, Tuple
 
-from ..blender_asset_tracer import trace, bpathlib, blendfile
+from ..blender_asset_tracer import trace, bpathlib, blendfile, fscache
+from ..blender_asset_tracer import missing_cache
+from ..blender_asset_tracer.envvars import env_bool, env_float, env_int
 from ..blender_asset_tracer.pack import Packer
 from ..blender_asset_tracer.pack import zipped
 from ..blender_asset_tracer.trace import file_sequence
+from ..blender_asset_tracer.trace import file2blocks
+from ..blender_asset_tracer.trace import frame_range
+from ..blender_asset_tracer.trace import trace_cache as bat_trace_cache
+from ..blender_asset_tracer.blendfile import decompressed_cache
 
 # Import cloud file utilities for handling OneDrive/Google Drive/iCloud placeholders
 from . import cloud_files
@@ -27,6 +38,257 @@ _log = logging.getLogger(__name__)
 
 # Lightweight dependency tracing
 
+# Opt-in: number of threads that open linked libraries ahead of the tracer.
+TRACE_LIBRARY_WORKERS_ENV = "SULU_TRACE_LIBRARY_WORKERS"
+
+
+def _trace_library_workers() -> int:
+    """Return the library worker count configured in the environment."""
+    return max(0, env_int(TRACE_LIBRARY_WORKERS_ENV, 0))
+
+
+# Opt-in: only trace what the rendered scene uses, see trace_dependencies().
+TRACE_RENDER_ONLY_ENV = "SULU_TRACE_RENDER_ONLY"
+
+
+def _trace_render_only() -> bool:
+    """Return whether render-reachability pruning is enabled in the environment."""
+    return env_bool(TRACE_RENDER_ONLY_ENV)
+
+
+# Number of threads that probe the readability of dependencies.
+TRACE_PROBE_WORKERS_ENV = "SULU_TRACE_PROBE_WORKERS"
+DEFAULT_TRACE_PROBE_WORKERS = 8
+
+
+def _trace_probe_workers() -> int:
+    """Return the probe worker count configured in the environment."""
+    return max(0, env_int(TRACE_PROBE_WORKERS_ENV, DEFAULT_TRACE_PROBE_WORKERS))
+
+
+# Opt-in: only upload the files of sequences and caches that the job's frames
+# use, see trace_dependencies().
+TRACE_FRAME_RANGE_ENV = "SULU_TRACE_FRAME_RANGE"
+
+
+def trace_frame_range_enabled() -> bool:
+    """Return whether frame-range subsetting is enabled in the environment."""
+    return env_bool(TRACE_FRAME_RANGE_ENV)
+
+
+# Hydration of cloud placeholders when tracing with hydrate=True.
+HYDRATION_WORKERS_ENV = "SULU_HYDRATION_WORKERS"
+DEFAULT_HYDRATION_WORKERS = 4
+HYDRATION_MAX_MBPS_ENV = "SULU_HYDRATION_MAX_MBPS"
+HYDRATION_TIMEOUT_ENV = "SULU_HYDRATION_TIMEOUT"
+DEFAULT_HYDRATION_TIMEOUT = 300.0
+HYDRATION_RETRIES = 2
+
+
+def _hydration_scheduler(logger: Optional[Any]) -> cloud_files.HydrationScheduler:
+    """Return a hydration scheduler configured from the environment."""
+    settings: Dict[str, float] = {
+        env: max(0.0, env_float(env, default))
+        for env, default in (
+            (HYDRATION_WORKERS_ENV, DEFAULT_HYDRATION_WORKERS),
+            (HYDRATION_MAX_MBPS_ENV, 0),
+            (HYDRATION_TIMEOUT_ENV, DEFAULT_HYDRATION_TIMEOUT),
+        )
+    }
+
+    progress = None
+    report_progress = getattr(logger, "hydration_progress", None)
+    if report_progress is not None:
+
+        def progress(p: cloud_files.HydrationProgress) -> None:
+            report_progress(
+                files_done=p.files_done,
+                files_total=p.files_total,
+                current_file=p.path.name,
+                bytes_done=p.total_bytes_done,
+                bytes_total=p.total_bytes,
+                status=p.status,
+                error_msg=p.error,
+            )
+
+    return cloud_files.HydrationScheduler(
+        int(settings[HYDRATION_WORKERS_ENV]),
+        max_bytes_per_second=int(settings[HYDRATION_MAX_MBPS_ENV] * 1024 * 1024),
+        timeout=settings[HYDRATION_TIMEOUT_ENV],
+        retries=HYDRATION_RETRIES,
+        progress=progress,
+    )
+
+
+@dataclass
+class ProbeStats:
+    """Statistics about probing the readability of dependencies."""
+
+    workers: int = 0
+    """Number of threads probing files; 0 means on the tracing thread."""
+    files: int = 0
+    wall_seconds: float = 0.0
+    """Time from the first probe until all probe results were used."""
+    probe_seconds: float = 0.0
+    """Total time spent probing files, summed over all threads."""
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "files": self.files,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "probe_seconds": round(self.probe_seconds, 3),
+        }
+
+
+class _FileProber:
+    """Read dependencies with cloud_files.read_file_with_hydration() in a thread pool.
+
+    Each file is probed once; result() waits for its probe to finish. With
+    fewer than two workers, files are probed by result() on the calling thread.
+    """
+
+    def __init__(self, workers: int, hydrate: bool) -> None:
+        self.hydrate = hydrate
+        self.stats = ProbeStats(workers=workers if workers > 1 else 0)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if workers > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="sulu-probe"
+            )
+        self._results: Dict[Path, Any] = {}
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    def _probe(self, path: Path) -> Tuple[bool, Optional[str]]:
+        started = time.perf_counter()
+        try:
+            return cloud_files.read_file_with_hydration(str(path), hydrate=self.hydrate)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.stats.probe_seconds += elapsed
+
+    def submit(self, path: Path) -> None:
+        """Start probing the file, unless it was already submitted."""
+        if path in self._results:
+            return
+        if self._started is None:
+            self._started = time.perf_counter()
+        self.stats.files += 1
+        if self._executor is None:
+            self._results[path] = None
+        else:
+            self._results[path] = self._executor.submit(self._probe, path)
+
+    def result(self, path: Path) -> Tuple[bool, Optional[str]]:
+        """Return the (success, error_message) of reading the file."""
+        if path not in self._results:
+            self.submit(path)
+        pending = self._results[path]
+        if isinstance(pending, tuple):
+            return pending
+        if pending is None:
+            outcome = self._probe(path)
+        else:
+            outcome = pending.result()
+        self._results[path] = outcome
+        self._finished = time.perf_counter()
+        return outcome
+
+    def close(self) -> None:
+        """Stop the workers; probes that have not started are cancelled."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._started is not None and self._finished is not None:
+            self.stats.wall_seconds = self._finished - self._started
+
+
+@dataclass
+class FrameRangeStats:
+    """Files of sequences and caches left out for not being in the frame range."""
+
+    sequences: int = 0
+    """Number of sequences that were narrowed to fewer files."""
+    skipped_files: int = 0
+    skipped_bytes: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+# Set to 0 to trace every .blend file again instead of replaying the
+# persistent trace cache.
+TRACE_CACHE_ENV = "SULU_TRACE_CACHE"
+# Size limit of the on-disk trace cache, in MiB.
+TRACE_CACHE_MAX_MB_ENV = "SULU_TRACE_CACHE_MAX_MB"
+
+
+def trace_cache_enabled() -> bool:
+    """Return whether the persistent trace cache is enabled in the environment."""
+    return env_bool(TRACE_CACHE_ENV, default=True)
+
+
+def _trace_cache_max_bytes() -> int:
+    """Return the trace cache size limit configured in the environment."""
+    default_mb = bat_trace_cache.DEFAULT_MAX_BYTES // (1024 * 1024)
+    return max(0, env_int(TRACE_CACHE_MAX_MB_ENV, default_mb)) * 1024 * 1024
+
+
+# Opt-in: size limit of the cache of decompressed .blend files, in MiB.
+DECOMPRESSED_CACHE_MB_ENV = "SULU_DECOMPRESSED_CACHE_MB"
+
+
+def configure_decompressed_cache(cache_dir: Path) -> bool:
+    """Enable the cache of decompressed .blend files when opted in.
+
+    Compressed libraries are then only decompressed again when they changed
+    since an earlier submission. Returns whether the cache is enabled.
+    """
+    max_mb = max(0, env_int(DECOMPRESSED_CACHE_MB_ENV, 0))
+    decompressed_cache.reset_stats()
+    if not max_mb:
+        blendfile.set_decompressed_cache_dir(None)
+        return False
+    blendfile.set_decompressed_cache_dir(cache_dir, max_bytes=max_mb * 1024 * 1024)
+    return True
+
+
+def record_decompressed_cache_stats(diagnostic_report: Optional[Any]) -> None:
+    """Add the decompressed .blend cache statistics to the report, if enabled."""
+    if diagnostic_report is None or blendfile.BlendFile.decompression_cache is None:
+        return
+    diagnostic_report.set_metadata("decompressed_cache", dict(decompressed_cache.stats))
+
+
+# Seconds for which missing files and unreachable drives are remembered
+# between submissions; 0 disables the missing-file cache.
+MISSING_CACHE_TTL_ENV = "SULU_MISSING_CACHE_TTL"
+# Set to 1 to probe all dependencies again, forgetting what was missing.
+MISSING_CACHE_REFRESH_ENV = "SULU_MISSING_CACHE_REFRESH"
+
+
+def open_missing_cache(
+    cache_file: Path, refresh: bool = False
+) -> Optional[missing_cache.MissingPathCache]:
+    """Return the cache of missing files and unreachable drives, None if disabled.
+
+    Pass it to fscache.enable(), so that broken links found by an earlier
+    submission are reported again without waiting for the filesystem.
+    Entries are dropped when the directory of the file changes.
+
+    :param refresh: forget the stored entries, as does setting
+        SULU_MISSING_CACHE_REFRESH=1.
+    """
+    ttl = max(0.0, env_float(MISSING_CACHE_TTL_ENV, missing_cache.DEFAULT_TTL))
+    if not ttl:
+        return None
+
+    refresh = refresh or env_bool(MISSING_CACHE_REFRESH_ENV)
+    return missing_cache.MissingPathCache(Path(cache_file), ttl=ttl, refresh=refresh)
+
 
 def _get_block_type(usage: Any) -> str:
     """Get the DNA type name from a BlockUsage."""
@@ -59,13 +321,23 @@ def _get_source_blend_name(usage: Any) -> str:
         return "unknown.blend"
 
 
+# _make_absolute_dependency_path() of the paths of the current trace.
+_absolute_dependency_paths: Dict[Path, Path] = {}
+
+
 def _make_absolute_dependency_path(raw_path: Path) -> Path:
     """Normalize a traced dependency path the same way BAT's list output does."""
     try:
-        return bpathlib.make_absolute(raw_path)
+        return _absolute_dependency_paths[raw_path]
+    except KeyError:
+        pass
+    try:
+        abs_path = bpathlib.make_absolute(raw_path)
     except Exception as e:
         _log.debug("make_absolute failed for %s: %s", raw_path, e)
-        return Path(raw_path)
+        abs_path = Path(raw_path)
+    _absolute_dependency_paths[raw_path] = abs_path
+    return abs_path
 
 
 def _expand_dependency_file_path(raw_path: Path) -> Tuple[List[Path], Optional[str], Path]:
@@ -79,7 +351,7 @@ def _expand_dependency_file_path(raw_path: Path) -> Tuple[List[Path], Optional[s
     file_path = _make_absolute_dependency_path(raw_path)
 
     try:
-        is_dir = file_path.is_dir()
+        is_dir = fscache.is_dir(file_path)
     except OSError as e:
         return [], f"Could not inspect dependency: {e}", file_path
 
@@ -91,7 +363,7 @@ def _expand_dependency_file_path(raw_path: Path) -> Tuple[List[Path], Optional[s
             (
                 _make_absolute_dependency_path(p)
                 for p in file_sequence.expand_sequence(file_path)
-                if p.is_file()
+                if fscache.is_file(p)
             ),
             key=lambda p: str(p),
         )
@@ -113,10 +385,19 @@ def trace_dependencies(
     *,
     hydrate: bool = False,
     diagnostic_report: Optional[Any] = None,
+    library_workers: Optional[int] = None,
+    trace_cache_dir: Optional[Path] = None,
+    render_only: Optional[bool] = None,
+    frames: Optional[Iterable[int]] = None,
+    frame_stats: Optional[FrameRangeStats] = None,
+    probe_workers: Optional[int] = None,
 ) -> Tuple[List[Path], Set[Path], Dict[Path, str], List[Any], Set[Path]]:
     """
     Lightweight dependency trace using BAT's trace.deps().
 
+    Collects the results of iter_dependencies(), which callers that do not
+    need the usages can consume directly to keep memory use bounded.
+
     Args:
         blend_path: Path to the .blend file to trace
         logger: Optional SubmitLogger instance for rich logging.
@@ -125,6 +406,36 @@ def trace_dependencies(
                  (OneDrive, Google Drive, iCloud, etc.) to fully download
                  "dehydrated" placeholder files. Keep False when the next
                  consumer (such as rclone) can hydrate only changed files.
+                 Files are downloaded by a cloud_files.HydrationScheduler,
+                 largest first, configured by SULU_HYDRATION_WORKERS
+                 (default 4), SULU_HYDRATION_MAX_MBPS (default unlimited)
+                 and SULU_HYDRATION_TIMEOUT (seconds, default 300). Progress
+                 is reported to logger.hydration_progress().
+        library_workers: Number of threads opening linked libraries in
+                 parallel with tracing. None uses SULU_TRACE_LIBRARY_WORKERS,
+                 which defaults to 0 (open libraries one after another).
+        trace_cache_dir: Directory of the persistent trace cache. Unchanged
+                 .blend files are then not parsed again; their usages are
+                 replayed from the cache. None disables the cache. Replayed
+                 usages cannot be passed to the Packer.
+        render_only: Only trace the data blocks that the active scene of the
+                 main file uses for rendering (its objects, view layers,
+                 compositor and sequencer), skipping orphaned and unused data.
+                 The skipped assets are listed in the diagnostic report with
+                 status "unreachable". None uses SULU_TRACE_RENDER_ONLY, which
+                 defaults to tracing everything.
+        frames: The frames that are rendered. Sequences and caches (image
+                 sequences, VDB, point, fluid and Alembic caches) are then
+                 narrowed to the files read for those frames, give or take a
+                 margin for motion blur. The skipped files are listed in the
+                 diagnostic report with status "out_of_range". None keeps all
+                 files.
+        frame_stats: Receives the number of files and bytes skipped for
+                 being outside the frames.
+        probe_workers: Number of threads reading dependencies to check that
+                 they are readable. None uses SULU_TRACE_PROBE_WORKERS, which
+                 defaults to 8; 0 or 1 reads them one after another. The
+                 results are reported in the same order either way.
 
     Returns:
         (dependency_paths, missing_files, unreadable_files, raw_usages, optional_paths)
@@ -143,179 +454,502 @@ def trace_dependencies(
     raw_usages: List[Any] = []
     optional: Set[Path] = set()
 
-    for usage in trace.deps(blend_path):
-        is_optional = getattr(usage, "is_optional", False)
-        raw_usages.append(usage)
-
-        # Get source info for logging (needed for both logger and diagnostic_report)
-        needs_block_info = logger or diagnostic_report
-        source_blend = _get_source_blend_name(usage) if needs_block_info else ""
-        block_type = _get_block_type(usage) if needs_block_info else ""
-        block_name = _get_block_name(usage) if needs_block_info else ""
-
-        # Use usage.files() to properly expand sequences (UDIM, image sequences, etc.)
-        # This handles glob patterns and returns actual file paths.
-        # For non-sequences, it yields the single file path.
-        expanded_files: List[Path] = []
-        files_error: Optional[str] = None
-        try:
-            expanded_files = list(usage.files())
-        except FileNotFoundError as e:
-            # Expected for missing directories - not an error, just means file doesn't exist
-            files_error = str(e)
-            _log.debug("files() raised FileNotFoundError for %s: %s", usage.asset_path, e)
-        except Exception as e:
-            # Unexpected error - log it for debugging
-            files_error = str(e)
-            _log.warning("files() raised unexpected exception for %s: %s", usage.asset_path, e)
-
-        def record_trace_result(
-            file_path: Path,
-            status: str,
-            error_msg: Optional[str],
-            issue_type: Optional[str] = None,
-        ) -> None:
-            if logger is not None:
-                logger.trace_entry(
-                    source_blend=source_blend,
-                    block_type=block_type,
-                    block_name=block_name,
-                    found_file=file_path.name,
-                    status=status,
-                    error_msg=error_msg,
-                )
+    for dep in iter_dependencies(
+        blend_path,
+        logger,
+        hydrate=hydrate,
+        diagnostic_report=diagnostic_report,
+        library_workers=library_workers,
+        trace_cache_dir=trace_cache_dir,
+        render_only=render_only,
+        frames=frames,
+        frame_stats=frame_stats,
+        probe_workers=probe_workers,
+        usages_out=raw_usages,
+    ):
+        deps.append(dep.path)
+        if dep.optional:
+            optional.add(dep.path)
+        if dep.status == "missing":
+            missing.add(dep.path)
+        elif dep.status == "unreadable":
+            unreadable[dep.path] = dep.error or "Unknown error"
 
-            if diagnostic_report is not None:
-                # Get file size if file exists and is readable
-                file_size = 0
-                if status == "ok":
-                    try:
-                        file_size = file_path.stat().st_size
-                    except Exception:
-                        pass
-                diagnostic_report.add_trace_entry(
-                    source_blend=source_blend,
-                    block_type=block_type,
-                    block_name=block_name,
-                    resolved_path=str(file_path),
-                    status=status,
-                    error_msg=error_msg,
-                    file_size=file_size,
-                    issue_type=issue_type,
-                )
+    return deps, missing, unreadable, raw_usages, optional
 
-        if not expanded_files:
-            # No files found - either pattern didn't match or file doesn't exist.
-            # Use the original absolute path so the common classification below
-            # can report it as missing/unreadable with consistent normalization.
-            try:
-                expanded_files = [usage.abspath]
-            except Exception as e:
-                fallback_path = Path(str(getattr(usage, "asset_path", "")))
-                deps.append(fallback_path)
-                if is_optional:
-                    optional.add(fallback_path)
-                    continue
-                missing.add(fallback_path)
-                record_trace_result(
-                    fallback_path,
-                    "missing",
-                    files_error or str(e),
-                )
-                continue
-
-        # Check each expanded file. Some BAT usages can still yield a directory
-        # here, especially cache-directory fields. Expand those to concrete
-        # files before they reach the Project upload manifest.
-        for raw_file_path in expanded_files:
-            file_paths, directory_error, normalized_path = _expand_dependency_file_path(
-                raw_file_path
-            )
 
-            if not file_paths:
-                deps.append(normalized_path)
-                if is_optional:
-                    optional.add(normalized_path)
-                    continue
-                issue_type = (
-                    "empty_directory_dependency"
-                    if directory_error == "Directory contains no files"
-                    else None
-                )
-                unreadable[normalized_path] = (
-                    directory_error or files_error or "No uploadable files found"
-                )
-                record_trace_result(
-                    normalized_path,
-                    "unreadable",
-                    unreadable[normalized_path],
-                    issue_type=issue_type,
-                )
-                continue
+class TracedDependency(NamedTuple):
+    """A file found by iter_dependencies(), without the blend data it came from."""
 
-            for file_path in file_paths:
-                deps.append(file_path)
-                if is_optional:
-                    optional.add(file_path)
+    path: Path
+    status: str
+    """"ok", "missing", "unreadable", or "optional" for an optional
+    dependency that is not available and not reported."""
+    optional: bool
+    """Whether the dependency is optional, e.g. a linked-packed library."""
+    error: Optional[str] = None
+    size: int = 0
+    """Size in bytes of a readable file."""
+    source_blend: str = ""
+    block_type: str = ""
+    block_name: str = ""
+    """Where the dependency was found; only filled in for a logger or report."""
+    absolute_path: Optional[Path] = None
+    """The path of the asset when the blend file stores it as an absolute path."""
 
-                # Try to read the file (and hydrate if on cloud drive)
-                ok, err = cloud_files.read_file_with_hydration(
-                    str(file_path),
-                    hydrate=hydrate,
-                )
 
-                if ok:
-                    status = "ok"
-                    error_msg = None
-                elif err == "File not found":
-                    if is_optional:
-                        # Optional missing files are expected - skip logging
-                        continue
-                    missing.add(file_path)
-                    status = "missing"
-                    error_msg = None
-                else:
-                    unreadable[file_path] = err or "Unknown error"
-                    status = "unreadable"
-                    error_msg = err
+# Number of usages expanded ahead of their classification, so that their
+# files are probed in the background without keeping every usage in memory.
+TRACE_LOOKAHEAD = 256
 
-                record_trace_result(file_path, status, error_msg)
+
+def iter_dependencies(
+    blend_path: Path,
+    logger: Optional[Any] = None,
+    *,
+    hydrate: bool = False,
+    diagnostic_report: Optional[Any] = None,
+    library_workers: Optional[int] = None,
+    trace_cache_dir: Optional[Path] = None,
+    render_only: Optional[bool] = None,
+    frames: Optional[Iterable[int]] = None,
+    frame_stats: Optional[FrameRangeStats] = None,
+    probe_workers: Optional[int] = None,
+    usages_out: Optional[List[Any]] = None,
+) -> Iterator[TracedDependency]:
+    """Trace dependencies like trace_dependencies(), one file at a time.
+
+    Each file is logged, added to the diagnostic report and yielded as soon
+    as it is classified. Only compact TracedDependency records are kept, so
+    the blend blocks of a usage can be freed once its files are expanded;
+    at most TRACE_LOOKAHEAD usages are held at once (all of them when
+    hydrating, as the largest files are downloaded first).
+
+    Args:
+        usages_out: Receives the BlockUsage objects, for the Packer. When
+                 None, the usages are dropped and the blend files this trace
+                 opened are closed once all dependencies are yielded.
+
+    The other arguments are those of trace_dependencies(). The report
+    metadata is set once the last dependency has been consumed.
+    """
+    _absolute_dependency_paths.clear()
+    # Blend files the caller had open already are left open.
+    open_before = blendfile.cached_paths()
+
+    if library_workers is None:
+        library_workers = _trace_library_workers()
+    library_stats: Optional[file2blocks.LibraryStats] = None
+    cache: Optional[bat_trace_cache.TraceCache] = None
+    deps_kwargs: Dict[str, Any] = {}
+    if library_workers > 0:
+        library_stats = file2blocks.LibraryStats()
+        deps_kwargs["library_workers"] = library_workers
+        deps_kwargs["library_stats"] = library_stats
+    if trace_cache_dir is not None:
+        cache = bat_trace_cache.TraceCache(
+            Path(trace_cache_dir), max_bytes=_trace_cache_max_bytes()
+        )
+        deps_kwargs["cache"] = cache
+    if render_only is None:
+        render_only = _trace_render_only()
+    unreachable: Optional[List[Any]] = None
+    if render_only:
+        unreachable = []
+        deps_kwargs["render_only"] = True
+        deps_kwargs["unreachable"] = unreachable
+    usages = iter(trace.deps(blend_path, **deps_kwargs))
+
+    used_frames: Optional[Set[int]] = None
+    if frames is not None:
+        used_frames = frame_range.scene_frames(frames)
+        if frame_stats is None:
+            frame_stats = FrameRangeStats()
+    main_blend = _make_absolute_dependency_path(Path(blend_path))
+
+    if probe_workers is None:
+        probe_workers = _trace_probe_workers()
+    # Hydration reads the files with the scheduler below instead of probing.
+    prober = _FileProber(0 if hydrate else probe_workers, hydrate=hydrate)
+    hydration: Optional[cloud_files.HydrationScheduler] = None
+    hydrated: Dict[Path, Tuple[bool, Optional[str]]] = {}
+    describe = bool(logger or diagnostic_report)
+    visited_blends: Set[Path] = {blend_path}
+    pending: Deque[_UsageFiles] = deque()
+
+    def expand_next() -> bool:
+        usage = next(usages, None)
+        if usage is None:
+            return False
+        if usages_out is not None:
+            usages_out.append(usage)
+        try:
+            src = usage.block.bfile.filepath
+            if src is not None:
+                visited_blends.add(Path(src))
+        except Exception:
+            pass
+        pending.append(
+            _expand_usage_files(usage, prober, used_frames, main_blend, describe=describe)
+        )
+        return True
+
+    try:
+        if hydrate:
+            while expand_next():
+                pass
+            hydration = _hydration_scheduler(logger)
+            hydrated = hydration.run(
+                file_path
+                for expansion in pending
+                for file_paths, _, _ in expansion.checked
+                for file_path in file_paths
+            )
+
+        # Usages are expanded ahead, so that their files are probed in the
+        # background while the earlier ones are classified below.
+        lookahead = TRACE_LOOKAHEAD if prober.stats.workers else 1
+        while True:
+            while len(pending) < lookahead and expand_next():
+                pass
+            if not pending:
+                break
+            expansion = pending.popleft()
+            if expansion.skipped_files:
+                _record_out_of_range(
+                    expansion.skipped_files,
+                    frame_stats,
+                    diagnostic_report,
+                    source_blend=expansion.source_blend,
+                    block_type=expansion.block_type,
+                    block_name=expansion.block_name,
+                )
+            for dep in _classify_usage_files(expansion, prober, hydrated):
+                _record_trace_result(dep, logger, diagnostic_report)
+                yield dep
+    finally:
+        prober.close()
+
+    if unreachable is not None:
+        _record_unreachable(unreachable, diagnostic_report)
+
+    if diagnostic_report is not None and frame_stats is not None and used_frames is not None:
+        diagnostic_report.set_metadata(
+            "trace_frame_range",
+            {"margin": frame_range.DEFAULT_MARGIN, **frame_stats.as_dict()},
+        )
+    if diagnostic_report is not None:
+        diagnostic_report.set_metadata("trace_probes", prober.stats.as_dict())
+    if diagnostic_report is not None and hydration is not None:
+        diagnostic_report.set_metadata("trace_hydration", hydration.stats.as_dict())
+    if diagnostic_report is not None and library_stats is not None:
+        diagnostic_report.set_metadata("trace_libraries", library_stats.as_dict())
+    if diagnostic_report is not None and cache is not None:
+        diagnostic_report.set_metadata("trace_cache", cache.stats.as_dict())
+    record_decompressed_cache_stats(diagnostic_report)
 
     # Second pass: scan visited .blend files for packed images so they appear
     # in the diagnostic report (BAT's @skip_packed hides them from trace output).
     if diagnostic_report is not None:
-        visited_blends: Set[Path] = {blend_path}
-        for usage in raw_usages:
-            try:
-                src = usage.block.bfile.filepath
-                if src is not None:
-                    visited_blends.add(Path(src))
-            except Exception:
-                pass
-
         for bp in visited_blends:
             try:
-                bf = blendfile.open_cached(bp)
-                for block in bf.find_blocks_from_code(b"IM"):
-                    if block.get(b"packedfile", default=False):
-                        name = block.id_name
-                        if isinstance(name, bytes):
-                            name = name.decode("utf-8", errors="replace")
-                            # Strip type prefix (e.g. "IMtexture.png" -> "texture.png")
-                            if len(name) >= 2 and name[:2].isupper():
-                                name = name[2:]
-                        diagnostic_report.add_trace_entry(
-                            source_blend=str(bp),
-                            block_type="Image",
-                            block_name=name or "unknown",
-                            resolved_path="(packed)",
-                            status="packed",
-                            file_size=0,
-                        )
+                # Files replayed from the trace cache don't have to be opened.
+                packed_names = cache.packed_images(bp) if cache is not None else None
+                if packed_names is None:
+                    bf = blendfile.open_cached(bp)
+                    packed_names = [
+                        block.id_name
+                        for block in bf.find_blocks_from_code(b"IM")
+                        if block.get(b"packedfile", default=False)
+                    ]
+                for name in packed_names:
+                    if isinstance(name, bytes):
+                        name = name.decode("utf-8", errors="replace")
+                        # Strip type prefix (e.g. "IMtexture.png" -> "texture.png")
+                        if len(name) >= 2 and name[:2].isupper():
+                            name = name[2:]
+                    diagnostic_report.add_trace_entry(
+                        source_blend=str(bp),
+                        block_type="Image",
+                        block_name=name or "unknown",
+                        resolved_path="(packed)",
+                        status="packed",
+                        file_size=0,
+                    )
             except Exception:
                 pass  # Best effort — don't crash if blend can't be re-opened
 
-    return deps, missing, unreadable, raw_usages, optional
+    if usages_out is None:
+        blendfile.close_cached(blendfile.cached_paths() - open_before)
+
+
+@dataclass
+class _UsageFiles:
+    """The files of a usage, expanded ahead of their classification."""
+
+    checked: List[Tuple[List[Path], Optional[str], Path]]
+    """_expand_dependency_file_path() of each file of the usage."""
+    files_error: Optional[str] = None
+    """Why usage.files() failed, if it did."""
+    abspath_error: Optional[str] = None
+    """Why the path of a usage without files could not be determined."""
+    skipped_files: List[Path] = field(default_factory=list)
+    """Files outside the frame range, see _select_frame_files()."""
+    is_optional: bool = False
+    fallback_path: Optional[Path] = None
+    """The path as stored in the blend file, reported when abspath_error is set."""
+    absolute_path: Optional[Path] = None
+    """See TracedDependency.absolute_path."""
+    source_blend: str = ""
+    block_type: str = ""
+    block_name: str = ""
+
+
+def _expand_usage_files(
+    usage: Any,
+    prober: "_FileProber",
+    frames: Optional[Set[int]],
+    main_blend: Path,
+    *,
+    describe: bool = False,
+) -> _UsageFiles:
+    """Expand a usage into the files to upload, and start probing them.
+
+    The result does not refer to the usage, so that its blend data can be
+    freed. With describe=True, it names where the usage was found.
+    """
+    # Use usage.files() to properly expand sequences (UDIM, image sequences, etc.)
+    # This handles glob patterns and returns actual file paths.
+    # Non-sequences are not opened here: their path is taken as-is below,
+    # and the prober reads them, in the background when it has workers.
+    expanded_files: List[Path] = []
+    expansion = _UsageFiles(
+        checked=[], is_optional=bool(getattr(usage, "is_optional", False))
+    )
+    if describe:
+        expansion.source_blend = _get_source_blend_name(usage)
+        expansion.block_type = _get_block_type(usage)
+        expansion.block_name = _get_block_name(usage)
+    if not expansion.is_optional:
+        try:
+            # Paths stored as absolute paths cannot be resolved on the farm.
+            if not usage.asset_path.is_blendfile_relative():
+                expansion.absolute_path = usage.abspath
+        except Exception:
+            pass
+
+    try:
+        if getattr(usage, "is_sequence", False):
+            expanded_files = list(usage.files())
+    except FileNotFoundError as e:
+        # Expected for missing directories - not an error, just means file doesn't exist
+        expansion.files_error = str(e)
+        _log.debug("files() raised FileNotFoundError for %s: %s", usage.asset_path, e)
+    except Exception as e:
+        # Unexpected error - log it for debugging
+        expansion.files_error = str(e)
+        _log.warning("files() raised unexpected exception for %s: %s", usage.asset_path, e)
+
+    if frames is not None and len(expanded_files) > 1:
+        expanded_files, expansion.skipped_files = _select_frame_files(
+            usage, expanded_files, frames, main_blend
+        )
+
+    if not expanded_files:
+        # No files found - either pattern didn't match or file doesn't exist.
+        # Use the original absolute path so the common classification can
+        # report it as missing/unreadable with consistent normalization.
+        try:
+            expanded_files = [usage.abspath]
+        except Exception as e:
+            expansion.abspath_error = str(e)
+            expansion.fallback_path = Path(str(getattr(usage, "asset_path", "")))
+            return expansion
+
+    # Some BAT usages can still yield a directory here, especially
+    # cache-directory fields. Expand those to concrete files before they
+    # reach the Project upload manifest.
+    for raw_file_path in expanded_files:
+        file_paths, directory_error, normalized_path = _expand_dependency_file_path(
+            raw_file_path
+        )
+        expansion.checked.append((file_paths, directory_error, normalized_path))
+        for file_path in file_paths:
+            prober.submit(file_path)
+    return expansion
+
+
+def _classify_usage_files(
+    expansion: _UsageFiles,
+    prober: "_FileProber",
+    hydrated: Dict[Path, Tuple[bool, Optional[str]]],
+) -> Iterator[TracedDependency]:
+    """Classify the expanded files of a usage by whether they can be read."""
+    is_optional = expansion.is_optional
+    files_error = expansion.files_error
+    info = {
+        "source_blend": expansion.source_blend,
+        "block_type": expansion.block_type,
+        "block_name": expansion.block_name,
+        "absolute_path": expansion.absolute_path,
+    }
+
+    if expansion.abspath_error is not None:
+        yield TracedDependency(
+            expansion.fallback_path,
+            "optional" if is_optional else "missing",
+            is_optional,
+            error=files_error or expansion.abspath_error,
+            **info,
+        )
+        return
+
+    for file_paths, directory_error, normalized_path in expansion.checked:
+        if not file_paths:
+            yield TracedDependency(
+                normalized_path,
+                "optional" if is_optional else "unreadable",
+                is_optional,
+                error=directory_error or files_error or "No uploadable files found",
+                **info,
+            )
+            continue
+
+        for file_path in file_paths:
+            # Result of reading the file (and hydrating it if on a cloud drive)
+            ok, err = hydrated.get(file_path) or prober.result(file_path)
+
+            if ok:
+                size = 0
+                try:
+                    size = fscache.getsize(file_path)
+                except Exception:
+                    pass
+                yield TracedDependency(file_path, "ok", is_optional, size=size, **info)
+            elif err == "File not found":
+                # Optional missing files are expected - they are not reported.
+                status = "optional" if is_optional else "missing"
+                yield TracedDependency(file_path, status, is_optional, **info)
+            else:
+                yield TracedDependency(
+                    file_path, "unreadable", is_optional, error=err or "Unknown error", **info
+                )
+
+
+def _record_trace_result(
+    dep: TracedDependency, logger: Optional[Any], diagnostic_report: Optional[Any]
+) -> None:
+    """Log a classified dependency, and add it to the diagnostic report."""
+    if dep.status == "optional":
+        return
+    issue_type = None
+    if dep.status == "unreadable" and dep.error == "Directory contains no files":
+        issue_type = "empty_directory_dependency"
+
+    if logger is not None:
+        logger.trace_entry(
+            source_blend=dep.source_blend,
+            block_type=dep.block_type,
+            block_name=dep.block_name,
+            found_file=dep.path.name,
+            status=dep.status,
+            error_msg=dep.error,
+        )
+
+    if diagnostic_report is not None:
+        diagnostic_report.add_trace_entry(
+            source_blend=dep.source_blend,
+            block_type=dep.block_type,
+            block_name=dep.block_name,
+            resolved_path=str(dep.path),
+            status=dep.status,
+            error_msg=dep.error,
+            file_size=dep.size,
+            issue_type=issue_type,
+        )
+
+
+def _select_frame_files(
+    usage: Any, files: List[Path], frames: Set[int], main_blend: Path
+) -> Tuple[List[Path], List[Path]]:
+    """Split the files of a sequence into the ones read for the frames and the others."""
+    try:
+        mapping = usage.frame_mapping()
+    except Exception as e:
+        _log.debug("Unable to determine the frames of %s: %s", usage.asset_path, e)
+        return files, []
+    if mapping is None:
+        return files, []
+    if mapping.local_users_only:
+        # Users in other files may read other frames of the same sequence.
+        source = _make_absolute_dependency_path(Path(usage.block.bfile.filepath))
+        if source != main_blend:
+            return files, []
+    return frame_range.select_files(mapping, frames, files)
+
+
+def _record_out_of_range(
+    skipped_files: List[Path],
+    frame_stats: FrameRangeStats,
+    diagnostic_report: Optional[Any],
+    *,
+    source_blend: str,
+    block_type: str,
+    block_name: str,
+) -> None:
+    """Count the files skipped by frame-range subsetting, and report them."""
+    frame_stats.sequences += 1
+    for file_path in skipped_files:
+        file_size = 0
+        try:
+            file_size = fscache.getsize(file_path)
+        except OSError:
+            pass
+        frame_stats.skipped_files += 1
+        frame_stats.skipped_bytes += file_size
+        if diagnostic_report is not None:
+            diagnostic_report.add_trace_entry(
+                source_blend=source_blend,
+                block_type=block_type,
+                block_name=block_name,
+                resolved_path=str(file_path),
+                status="out_of_range",
+                file_size=file_size,
+            )
+
+
+def _record_unreachable(unreachable: List[Any], diagnostic_report: Optional[Any]) -> None:
+    """Log the assets skipped by render-reachability pruning."""
+    total_size = 0
+    for usage in unreachable:
+        try:
+            files = list(usage.files()) or [usage.abspath]
+        except Exception:
+            files = [Path(str(getattr(usage, "asset_path", "")))]
+        for file_path in files:
+            try:
+                total_size += fscache.getsize(file_path)
+            except OSError:
+                pass
+            if diagnostic_report is not None:
+                diagnostic_report.add_trace_entry(
+                    source_blend=_get_source_blend_name(usage),
+                    block_type=_get_block_type(usage),
+                    block_name=_get_block_name(usage),
+                    resolved_path=str(file_path),
+                    status="unreachable",
+                )
+
+    _log.info(
+        "Skipped %d assets (%d bytes) that the rendered scene does not use",
+        len(unreachable),
+        total_size,
+    )
+    if diagnostic_report is not None:
+        diagnostic_report.set_metadata(
+            "trace_render_only",
+            {"unreachable_assets": len(unreachable), "unreachable_bytes": total_size},
+        )
 
 
 # Project root computation
@@ -389,9 +1023,9 @@ def compute_project_root(
     # If custom project path is provided and valid, use it
     if custom_project_path is not None:
         custom_abs = Path(os.path.abspath(custom_project_path))
-        if custom_abs.is_file():
+        if fscache.is_file(custom_abs):
             custom_abs = custom_abs.parent
-        if custom_abs.is_dir():
+        if fscache.is_dir(custom_abs):
             return custom_abs, same_drive_paths, cross_drive_paths
 
     # Compute common path from blend + same-drive dependencies
@@ -407,11 +1041,11 @@ def compute_project_root(
         common_path = Path(common)
 
         # Ensure it's a directory
-        if common_path.is_file():
+        if fscache.is_file(common_path):
             common_path = common_path.parent
 
         # Verify it's actually a directory that exists
-        if common_path.is_dir():
+        if fscache.is_dir(common_path):
             return common_path, same_drive_paths, cross_drive_paths
     except (ValueError, OSError):
         # commonpath can fail if paths are on different drives (shouldn't happen
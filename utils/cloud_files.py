@@ -11,8 +11,18 @@ The approach is simple and OS-agnostic:
 """
 from __future__ import annotations
 
-import os
-from typing import Optional, Tuple
+import errno
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+try:
+    from ..blender_asset_tracer import fscache
+except ImportError:  # Imported as top-level `utils` by scripts/diagnose_cloud_files.py
+    from blender_asset_tracer import fscache
 
 
 def read_file_with_hydration(
@@ -40,34 +50,30 @@ def read_file_with_hydration(
     # Quick check for directories. A directory is not an uploadable file; callers
     # that need directory dependencies should expand them before probing.
     try:
-        if os.path.isdir(path_str):
+        if fscache.is_dir(path_str):
             return (False, "is a directory")
     except Exception:
         pass
 
     # Reading checks existence and readability and triggers hydration when needed.
-    try:
-        with open(path_str, "rb") as f:
-            if hydrate:
-                # Read the entire file in chunks to ensure it's fully available.
-                # This triggers cloud sync for dehydrated placeholders.
-                chunk_size = 1024 * 1024  # 1 MiB
-                while True:
-                    chunk = f.read(chunk_size)
-                    if not chunk:
-                        break
-            else:
-                # Just read 1 byte to verify accessibility
-                f.read(1)
+    # With hydrate=True the entire file is read, in chunks, which triggers cloud
+    # sync for dehydrated placeholders; otherwise 1 byte is read to verify
+    # accessibility. The outcome is shared with the packer through fscache.
+    e = fscache.probe(path_str, read_all=hydrate)
+    if e is None:
         return (True, None)
+    return (False, _describe_read_error(e))
+
 
-    except FileNotFoundError:
-        return (False, "File not found")
-    except IsADirectoryError:
-        return (False, "is a directory")
-    except PermissionError as e:
-        return (False, f"Permission denied: {e}")
-    except OSError as e:
+def _describe_read_error(e: Exception) -> str:
+    """Return the error message of read_file_with_hydration() for an exception."""
+    if isinstance(e, FileNotFoundError):
+        return "File not found"
+    if isinstance(e, IsADirectoryError):
+        return "is a directory"
+    if isinstance(e, PermissionError):
+        return f"Permission denied: {e}"
+    if isinstance(e, OSError):
         # OSError can indicate various issues including cloud file problems
         # Common error codes:
         # - ENOENT (2): No such file or directory
@@ -75,7 +81,234 @@ def read_file_with_hydration(
         # - EIO (5): I/O error (can happen with cloud files)
         error_code = getattr(e, 'errno', None)
         if error_code == 2:  # ENOENT
-            return (False, "File not found")
-        return (False, f"OS error: {e}")
-    except Exception as e:
-        return (False, f"{type(e).__name__}: {e}")
+            return "File not found"
+        return f"OS error: {e}"
+    return f"{type(e).__name__}: {e}"
+
+
+# Hydrating many placeholders at once
+
+HYDRATION_CHUNK_SIZE = 1024 * 1024
+
+# errno / Windows error codes of reads that gave up waiting for the provider.
+_TIMEOUT_ERRNOS = {errno.ETIMEDOUT}
+_TIMEOUT_WINERRORS = {121, 1460}  # ERROR_SEM_TIMEOUT, ERROR_TIMEOUT
+
+
+class HydrationTimeout(TimeoutError):
+    """Reading a placeholder took longer than the scheduler allows."""
+
+
+def _is_timeout(e: Exception) -> bool:
+    if isinstance(e, TimeoutError):
+        return True
+    if getattr(e, "winerror", None) in _TIMEOUT_WINERRORS:
+        return True
+    return isinstance(e, OSError) and e.errno in _TIMEOUT_ERRNOS
+
+
+class _ByteRateLimiter:
+    """Paces reads of all threads together to a number of bytes per second."""
+
+    def __init__(self, bytes_per_second: int) -> None:
+        self.bytes_per_second = bytes_per_second
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def consume(self, nbytes: int) -> None:
+        if self.bytes_per_second <= 0 or nbytes <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + nbytes / self.bytes_per_second
+        if slot > now:
+            time.sleep(slot - now)
+
+
+@dataclass
+class HydrationProgress:
+    """Progress of one file, passed to the progress callback of the scheduler."""
+
+    path: Path
+    status: str
+    """"reading", "hydrated", "retrying" or "failed"."""
+    bytes_done: int
+    size: int
+    files_done: int
+    files_total: int
+    total_bytes_done: int
+    total_bytes: int
+    error: Optional[str] = None
+
+
+@dataclass
+class HydrationStats:
+    """Statistics about hydrating placeholders with the HydrationScheduler."""
+
+    workers: int = 0
+    files: int = 0
+    bytes: int = 0
+    retries: int = 0
+    failed: int = 0
+    wall_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        stats = asdict(self)
+        stats["wall_seconds"] = round(self.wall_seconds, 3)
+        return stats
+
+
+class HydrationScheduler:
+    """Read files fully, several at a time, so that cloud drives download them.
+
+    The largest files start first, so that the slowest downloads do not end
+    up at the tail of the run. All reads together are kept under a byte rate,
+    when one is given. A file that is still not read after `timeout` seconds,
+    or whose read fails with a timeout error, is tried again after all other
+    files, up to `retries` times.
+
+    A read that blocks inside the operating system cannot be interrupted; the
+    timeout is checked between chunks.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        *,
+        max_bytes_per_second: int = 0,
+        timeout: float = 300.0,
+        retries: int = 2,
+        progress: Optional[Callable[[HydrationProgress], None]] = None,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.stats = HydrationStats(workers=self.workers)
+        self._limiter = _ByteRateLimiter(max_bytes_per_second)
+        self._progress = progress
+        self._lock = threading.Lock()
+        self._files_done = 0
+        self._files_total = 0
+        self._bytes_done = 0
+        self._bytes_total = 0
+
+    def run(self, paths: Iterable[Path]) -> Dict[Path, Tuple[bool, Optional[str]]]:
+        """Hydrate the files, and return the (success, error_message) of each.
+
+        The error messages are those of read_file_with_hydration().
+        """
+        started = time.perf_counter()
+        results: Dict[Path, Tuple[bool, Optional[str]]] = {}
+        sizes: Dict[Path, int] = {}
+        for path in dict.fromkeys(paths):
+            if fscache.is_dir(path):
+                results[path] = (False, "is a directory")
+                continue
+            try:
+                sizes[path] = fscache.getsize(path)
+            except OSError as e:
+                results[path] = (False, _describe_read_error(e))
+
+        self._files_total = len(sizes)
+        self._bytes_total = sum(sizes.values())
+        self.stats.files = len(sizes)
+
+        # Largest first; files that timed out go again after all others.
+        pending = sorted(sizes, key=lambda p: (-sizes[p], str(p)))
+        attempt = 0
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="sulu-hydrate"
+        ) as executor:
+            while pending:
+                final = attempt >= self.retries
+                outcomes = list(
+                    executor.map(lambda p: self._hydrate(p, sizes[p], final), pending)
+                )
+                pending = []
+                for path, error in outcomes:
+                    if error is not None and _is_timeout(error) and not final:
+                        pending.append(path)
+                        continue
+                    results[path] = (
+                        (True, None) if error is None else (False, _describe_read_error(error))
+                    )
+                self.stats.retries += len(pending)
+                attempt += 1
+
+        self.stats.failed = sum(1 for path in sizes if not results[path][0])
+        self.stats.wall_seconds = time.perf_counter() - started
+        return results
+
+    def _hydrate(self, path: Path, size: int, final: bool) -> Tuple[Path, Optional[Exception]]:
+        bytes_done = 0
+        started = time.monotonic()
+        try:
+            with open(path, "rb") as infile:
+                while True:
+                    chunk = infile.read(HYDRATION_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    bytes_done += len(chunk)
+                    self._limiter.consume(len(chunk))
+                    self._report(path, "reading", len(chunk), bytes_done, size)
+                    if self.timeout > 0 and time.monotonic() - started > self.timeout:
+                        raise HydrationTimeout(
+                            f"not read after {self.timeout:.0f} seconds ({bytes_done} of {size} bytes)"
+                        )
+        except Exception as e:
+            # A retry reads the file from the start again.
+            retrying = _is_timeout(e) and not final
+            self._report(
+                path,
+                "retrying" if retrying else "failed",
+                -bytes_done if retrying else 0,
+                bytes_done,
+                size,
+                error=_describe_read_error(e),
+                finished=not retrying,
+            )
+            if not retrying:
+                fscache.record_probe(path, e, read_all=True)
+            return path, e
+
+        with self._lock:
+            self.stats.bytes += bytes_done
+        self._report(path, "hydrated", 0, bytes_done, size, finished=True)
+        fscache.record_probe(path, None, read_all=True)
+        return path, None
+
+    def _report(
+        self,
+        path: Path,
+        status: str,
+        delta: int,
+        bytes_done: int,
+        size: int,
+        *,
+        error: Optional[str] = None,
+        finished: bool = False,
+    ) -> None:
+        # Progress callbacks are serialized, so they do not have to be thread-safe.
+        with self._lock:
+            self._bytes_done += delta
+            if finished:
+                self._files_done += 1
+            if self._progress is None:
+                return
+            try:
+                self._progress(
+                    HydrationProgress(
+                        path=path,
+                        status=status,
+                        bytes_done=bytes_done,
+                        size=size,
+                        files_done=self._files_done,
+                        files_total=self._files_total,
+                        total_bytes_done=self._bytes_done,
+                        total_bytes=self._bytes_total,
+                        error=error,
+                    )
+                )
+            except Exception:
+                pass
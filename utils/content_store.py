@@ -0,0 +1,313 @@
+"""
+content_store.py — Content-addressed storage of dependency uploads.
+
+The same texture library is often used by several projects, and each
+Project submission uploads it again under its own ``{project_name}/``
+prefix. In content-addressed mode every dependency is stored once under
+the SHA-256 of its contents, ``content/<2 hex digits>/<digest>``, shared
+by all projects in the bucket, and the submission uploads a content
+manifest that maps the relative paths of the project to those keys.
+
+Dependencies are hashed by a BackgroundHasher while the upload manifest
+is built. A HashCache keyed by path, size and modification time keeps
+repeat submissions from reading unchanged files again. For the upload,
+stage_content() lays the files out under their content keys as links in a
+staging directory, which rclone copies without overwriting existing keys.
+Files that changed since they were hashed are not staged, because their
+new contents would be stored under the old key for good.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from ..blender_asset_tracer.envvars import env_bool, env_int
+
+_log = logging.getLogger(__name__)
+
+# Opt-in: upload dependencies once per content. Needs farm support.
+CONTENT_ADDRESSED_ENV = "SULU_CONTENT_ADDRESSED"
+CONTENT_HASH_WORKERS_ENV = "SULU_CONTENT_HASH_WORKERS"
+
+DEFAULT_HASH_WORKERS = 4
+CONTENT_PREFIX = "content"
+CONTENT_MANIFEST_VERSION = 1
+HASH_CACHE_FORMAT_VERSION = 1
+# Cached hashes of files that were not seen for this long are dropped.
+HASH_RETENTION_SECONDS = 90 * 24 * 3600.0
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def content_addressed_enabled() -> bool:
+    """Return whether content-addressed uploads are enabled in the environment."""
+    return env_bool(CONTENT_ADDRESSED_ENV)
+
+
+def content_key(digest: str) -> str:
+    """Return the object key of the content with this SHA-256 hex digest."""
+    return f"{CONTENT_PREFIX}/{digest[:2]}/{digest}"
+
+
+def file_digest(path: str) -> str:
+    """Return the SHA-256 hex digest of the contents of the file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as infile:
+        while True:
+            chunk = infile.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class HashCache:
+    """Content hashes by path, trusted while size and mtime are unchanged."""
+
+    def __init__(self, filepath: Path) -> None:
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        # path -> [size, mtime_ns, digest, last used]
+        self._entries: Dict[str, List[Any]] = self._load()
+
+    def _load(self) -> Dict[str, List[Any]]:
+        try:
+            with self.filepath.open("r", encoding="utf-8") as infile:
+                stored = json.load(infile)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as ex:
+            _log.warning("Ignoring unreadable hash cache %s: %s", self.filepath, ex)
+            return {}
+        if not isinstance(stored, dict) or stored.get("version") != HASH_CACHE_FORMAT_VERSION:
+            return {}
+        files = stored.get("files")
+        return files if isinstance(files, dict) else {}
+
+    def get(self, path: str, st: os.stat_result) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(path)
+            if not entry or entry[:2] != [st.st_size, st.st_mtime_ns]:
+                return None
+            entry[3] = time.time()
+            return entry[2]
+
+    def put(self, path: str, st: os.stat_result, digest: str) -> None:
+        with self._lock:
+            self._entries[path] = [st.st_size, st.st_mtime_ns, digest, time.time()]
+
+    def save(self) -> None:
+        now = time.time()
+        with self._lock:
+            stored = {
+                "version": HASH_CACHE_FORMAT_VERSION,
+                "files": {
+                    path: entry
+                    for path, entry in self._entries.items()
+                    if now - entry[3] < HASH_RETENTION_SECONDS
+                },
+            }
+        directory = self.filepath.parent
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            fd, tmpname = tempfile.mkstemp(
+                prefix=self.filepath.stem + "-", suffix=".tmp", dir=str(directory)
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as outfile:
+                    json.dump(stored, outfile)
+                os.replace(tmpname, str(self.filepath))
+            except BaseException:
+                os.unlink(tmpname)
+                raise
+        except OSError as ex:
+            _log.warning("Unable to write hash cache %s: %s", self.filepath, ex)
+
+
+@dataclass
+class HashStats:
+    files: int = 0
+    cache_hits: int = 0
+    hashed_bytes: int = 0
+    hash_seconds: float = 0.0
+    """Total time spent hashing, summed over all threads."""
+    errors: int = 0
+    changed: int = 0
+    """Files found changed since they were hashed, see BackgroundHasher.unchanged()."""
+
+    def as_dict(self) -> Dict[str, Any]:
+        stats = asdict(self)
+        stats["hash_seconds"] = round(self.hash_seconds, 3)
+        return stats
+
+
+class BackgroundHasher:
+    """Hash files in a thread pool as they are submitted.
+
+    Files are hashed while the submission goes on with other work, and
+    result() waits only for the files that are not done yet.
+    """
+
+    def __init__(self, cache: Optional[HashCache] = None, workers: int = DEFAULT_HASH_WORKERS) -> None:
+        self.cache = cache
+        self.stats = HashStats()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="sulu-hash"
+        )
+        self._futures: Dict[str, Future] = {}
+        # The stat result each digest was computed for.
+        self._hashed_stats: Dict[str, os.stat_result] = {}
+
+    def submit(self, path: str) -> None:
+        """Start hashing the file, unless it was already submitted."""
+        with self._lock:
+            if path in self._futures:
+                return
+            self.stats.files += 1
+            self._futures[path] = self._executor.submit(self._hash, path)
+
+    def result(self, path: str) -> Optional[str]:
+        """Return the digest of the file, or None if it could not be read."""
+        self.submit(path)
+        return self._futures[path].result()
+
+    def _hash(self, path: str) -> Optional[str]:
+        try:
+            st = os.stat(path)
+            if self.cache is not None:
+                digest = self.cache.get(path, st)
+                if digest is not None:
+                    with self._lock:
+                        self.stats.cache_hits += 1
+                        self._hashed_stats[path] = st
+                    return digest
+            started = time.perf_counter()
+            digest = file_digest(path)
+            elapsed = time.perf_counter() - started
+        except OSError as ex:
+            _log.debug("Unable to hash %s: %s", path, ex)
+            with self._lock:
+                self.stats.errors += 1
+            return None
+
+        if self.cache is not None:
+            self.cache.put(path, st, digest)
+        with self._lock:
+            self.stats.hashed_bytes += st.st_size
+            self.stats.hash_seconds += elapsed
+            self._hashed_stats[path] = st
+        return digest
+
+    def unchanged(self, path: str) -> bool:
+        """Return whether the file still has the size and mtime it was hashed with."""
+        with self._lock:
+            hashed = self._hashed_stats.get(path)
+        if hashed is None:
+            return False
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st is not None and (st.st_size, st.st_mtime_ns) == (
+            hashed.st_size,
+            hashed.st_mtime_ns,
+        ):
+            return True
+        _log.debug("%s changed since it was hashed", path)
+        with self._lock:
+            self.stats.changed += 1
+        return False
+
+    def close(self) -> None:
+        """Stop hashing; files that have not started are not hashed."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if self.cache is not None:
+            self.cache.save()
+
+
+def start_hasher(cache_file: Path) -> Optional[BackgroundHasher]:
+    """Return a hasher when content-addressed uploads are enabled, else None."""
+    if not content_addressed_enabled():
+        return None
+    workers = max(1, env_int(CONTENT_HASH_WORKERS_ENV, DEFAULT_HASH_WORKERS))
+    return BackgroundHasher(HashCache(Path(cache_file)), workers=workers)
+
+
+def _link(source: str, target: Path) -> bool:
+    """Make target refer to source without copying it; False if impossible."""
+    for make_link in (os.link, os.symlink):
+        try:
+            make_link(source, target)
+            return True
+        except FileExistsError:
+            return True
+        except (OSError, NotImplementedError):
+            continue
+    return False
+
+
+def stage_content(
+    files: Mapping[str, Tuple[str, str]],
+    staging_dir: Path,
+    unchanged: Optional[Callable[[str], bool]] = None,
+) -> Tuple[Dict[str, str], List[str]]:
+    """Lay out files under their content keys in the staging directory.
+
+    :param files: (source path, digest) by relative path in the project.
+    :param unchanged: returns whether a source path still has the contents
+        it was hashed for, like BackgroundHasher.unchanged(). Files for
+        which it returns False are not staged.
+    :returns: the content key of each staged relative path, and the
+        relative paths that could not be staged. Identical files are staged
+        once. The staged files are hard links, or symbolic links where hard
+        links are not possible, so rclone must follow links.
+    """
+    staged: Dict[str, str] = {}
+    failed: List[str] = []
+    for rel, (source, digest) in files.items():
+        if unchanged is not None and not unchanged(source):
+            failed.append(rel)
+            continue
+        key = content_key(digest)
+        target = staging_dir / key
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if _link(source, target):
+            staged[rel] = key
+        else:
+            failed.append(rel)
+    return staged, failed
+
+
+def write_content_manifest(path: Path, keys: Mapping[str, str]) -> None:
+    """Write the content key of each relative path of the project."""
+    with path.open("w", encoding="utf-8") as outfile:
+        json.dump(
+            {"version": CONTENT_MANIFEST_VERSION, "files": dict(sorted(keys.items()))},
+            outfile,
+            indent=1,
+        )
+
+
+def read_content_manifest(path: Path) -> Dict[str, str]:
+    """Return the content key of each relative path, see write_content_manifest()."""
+    with path.open("r", encoding="utf-8") as infile:
+        stored = json.load(infile)
+    if stored.get("version") != CONTENT_MANIFEST_VERSION:
+        raise ValueError(f"Unsupported content manifest version {stored.get('version')!r}")
+    return dict(stored["files"])
+
+
+def unique_keys(keys: Iterable[str]) -> List[str]:
+    """Return each content key once, in order."""
+    return list(dict.fromkeys(keys))
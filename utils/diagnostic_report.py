@@ -262,7 +262,10 @@ class DiagnosticReport:
                     unreadable = sum(1 for e in entries if e.get("status") == "unreadable")
                     packed = sum(1 for e in entries if e.get("status") == "packed")
                     absolute_path = sum(1 for e in entries if e.get("status") == "absolute_path")
-                    total_size = sum(e.get("file_size", 0) for e in entries)
+                    unreachable = sum(1 for e in entries if e.get("status") == "unreachable")
+                    out_of_range = [e for e in entries if e.get("status") == "out_of_range"]
+                    out_of_range_size = sum(e.get("file_size", 0) for e in out_of_range)
+                    total_size = sum(e.get("file_size", 0) for e in entries) - out_of_range_size
                     self._data["stages"]["trace"]["summary"] = {
                         "total": len(entries),
                         "ok": ok,
@@ -270,6 +273,9 @@ class DiagnosticReport:
                         "unreadable": unreadable,
                         "packed": packed,
                         "absolute_path": absolute_path,
+                        "unreachable": unreachable,
+                        "out_of_range": len(out_of_range),
+                        "out_of_range_size_bytes": out_of_range_size,
                         "total_size_bytes": total_size,
                     }
 
@@ -356,7 +362,9 @@ class DiagnosticReport:
             block_type: DNA type name (e.g., "Image", "Library")
             block_name: Block name
             resolved_path: Absolute path to the resolved file
-            status: "ok", "missing", "unreadable", "packed", or "absolute_path"
+            status: "ok", "missing", "unreadable", "packed", "absolute_path",
+                "unreachable" (skipped, not used by the rendered scene), or
+                "out_of_range" (skipped, not read for the rendered frames)
             error_msg: Error message if unreadable
             file_size: File size in bytes if available
             issue_type: Optional machine-readable issue category
@@ -449,6 +457,15 @@ class DiagnosticReport:
             self._entries_since_flush += 1
             self._maybe_flush()
 
+    def set_pack_frame_range_savings(self, skipped_files: int, skipped_bytes: int) -> None:
+        """Record the sequence files left out of the manifest for the frame range."""
+        with self._lock:
+            summary = self._data["stages"]["pack"]["summary"]
+            summary["frame_range_skipped_files"] = skipped_files
+            summary["frame_range_skipped_bytes"] = skipped_bytes
+            self._entries_since_flush += 1
+            self._maybe_flush()
+
     def start_upload_step(
         self,
         step_num: int,
@@ -459,7 +476,8 @@ class DiagnosticReport:
         source: Optional[str] = None,
         destination: Optional[str] = None,
         verb: Optional[str] = None,
-    ) -> None:
+        substep: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         Start an upload step.
 
@@ -472,6 +490,13 @@ class DiagnosticReport:
             source: Local source path or file
             destination: Remote destination (S3 key / bucket path)
             verb: rclone verb (copy, move, copyto, moveto)
+            substep: Tells apart the uploads of a step that takes more than
+                one rclone run, such as "content" and "path" for
+                content-addressed dependencies.
+
+        Returns:
+            The step, to pass to complete_upload_step() and
+            add_upload_split_group() when steps run concurrently.
         """
         with self._lock:
             self._current_upload_step = {
@@ -493,14 +518,18 @@ class DiagnosticReport:
                 self._current_upload_step["destination"] = destination
             if verb is not None:
                 self._current_upload_step["verb"] = verb
+            if substep is not None:
+                self._current_upload_step["substep"] = substep
             self._data["stages"]["upload"]["steps"].append(self._current_upload_step)
             self._entries_since_flush += 1
             self._maybe_flush()
+            return self._current_upload_step
 
     def complete_upload_step(
         self,
         bytes_transferred: int = 0,
         rclone_stats: Optional[Dict[str, Any]] = None,
+        step: Optional[Dict[str, Any]] = None,
     ) -> None:
         """
         Complete the current upload step.
@@ -508,19 +537,22 @@ class DiagnosticReport:
         Args:
             bytes_transferred: Bytes transferred during this step
             rclone_stats: Full rclone stats dict from run_rclone() return value
+            step: The step returned by start_upload_step(), instead of the
+                most recently started one
         """
         with self._lock:
-            if self._current_upload_step is not None:
+            current = self._current_upload_step if step is None else step
+            if current is not None:
                 now = datetime.now()
-                self._current_upload_step["completed_at"] = now.isoformat()
-                self._current_upload_step["bytes_transferred"] = bytes_transferred
+                current["completed_at"] = now.isoformat()
+                current["bytes_transferred"] = bytes_transferred
 
                 # Compute elapsed seconds
                 try:
                     started = datetime.fromisoformat(
-                        self._current_upload_step["started_at"]
+                        current["started_at"]
                     )
-                    self._current_upload_step["elapsed_seconds"] = round(
+                    current["elapsed_seconds"] = round(
                         (now - started).total_seconds(), 3
                     )
                 except Exception:
@@ -534,13 +566,13 @@ class DiagnosticReport:
                         stats_to_store["tail_lines"] = list(tail[-_MAX_TAIL_LINES:])
                         stats_to_store["tail_lines_truncated"] = True
 
-                    self._current_upload_step["rclone_stats"] = stats_to_store
+                    current["rclone_stats"] = stats_to_store
 
                     # Generate anomaly warnings, prioritizing the most specific.
                     checks = rclone_stats.get("checks", 0) or 0
                     transfers = rclone_stats.get("transfers", 0) or 0
                     stats_received = rclone_stats.get("stats_received", True)
-                    expected = self._current_upload_step.get("expected_bytes")
+                    expected = current.get("expected_bytes")
 
                     warning = ""
 
@@ -598,8 +630,9 @@ class DiagnosticReport:
                         warning = (warning + "; " + error_warning) if warning else error_warning
 
                     if warning:
-                        self._current_upload_step["warning"] = warning
-                self._current_upload_step = None
+                        current["warning"] = warning
+                if self._current_upload_step is current:
+                    self._current_upload_step = None
             self.flush()
 
     def add_upload_split_group(
@@ -609,17 +642,20 @@ class DiagnosticReport:
         source: str,
         destination: str,
         rclone_stats: Optional[Dict[str, Any]] = None,
+        step: Optional[Dict[str, Any]] = None,
     ) -> None:
         """
         Record details of a single split-upload group within the current upload step.
 
         Call this during the split-upload loop, before complete_upload_step().
-        The groups are stored as a list inside the current upload step.
+        The groups are stored as a list inside the current upload step, or
+        inside ``step`` when given.
         """
         with self._lock:
-            if self._current_upload_step is None:
+            current = self._current_upload_step if step is None else step
+            if current is None:
                 return
-            groups = self._current_upload_step.setdefault("split_groups", [])
+            groups = current.setdefault("split_groups", [])
             entry: Dict[str, Any] = {
                 "group_name": group_name,
                 "file_count": file_count,
@@ -16,6 +16,7 @@ from __future__ import annotations
 
 import os
 import sys
+import threading
 import time
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple
@@ -174,6 +175,31 @@ class SubmitLogger(TranscriptLogger):
         )
         self._trace_entries.append(entry)
 
+    def hydration_progress(
+        self,
+        files_done: int,
+        files_total: int,
+        current_file: str,
+        bytes_done: int,
+        bytes_total: int,
+        status: str,
+        error_msg: Optional[str] = None,
+    ) -> None:
+        """Render overall progress while cloud placeholders are downloaded."""
+        if status == "retrying":
+            self.warning(f"Timed out downloading {current_file}, trying again later")
+        elif status == "failed":
+            self.warning(f"Could not download {current_file}: {error_msg}")
+
+        self.transfer_progress_ext(
+            bytes_done,
+            bytes_total,
+            status="hydrating",
+            current_file=f"[{files_done}/{files_total}] {current_file}",
+        )
+        if files_done >= files_total:
+            self._stop_live_progress()
+
     def _render_trace_table(self) -> None:
         """Render the accumulated trace entries as a proper Rich table."""
         if not self._trace_entries:
@@ -610,7 +636,7 @@ class SubmitLogger(TranscriptLogger):
         status: str,
         current_file: str,
     ) -> str:
-        if status == "packing":
+        if status in ("packing", "hydrating"):
             return current_file
         return super()._progress_status_text(
             checks, transfers, status, current_file
@@ -961,6 +987,10 @@ class SubmitLogger(TranscriptLogger):
             sys.stderr.flush()
             self._log_fn(f"  {GLYPH_OK} {title}")
 
+    def parallel_uploads(self) -> "ParallelUploadProgress":
+        """Return a combiner for upload steps that run at the same time."""
+        return ParallelUploadProgress(self)
+
     # General messages
 
     def report_info(self, report_path: str) -> None:
@@ -1556,6 +1586,113 @@ class SubmitLogger(TranscriptLogger):
                 self._log_fn(f"  {line}")
 
 
+# Concurrent upload steps
+
+
+class ParallelUploadProgress:
+    """
+    One progress bar for upload steps that run concurrently.
+
+    Each step reports to its own channel(), which stands in for the logger
+    in run_rclone() and the submit worker. The channels show the sum of
+    all steps, and a step's completion panel shows that step's size.
+    A channel can itself be split with parallel_uploads().
+    """
+
+    def __init__(self, logger: Any) -> None:
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._channels: List["_UploadChannel"] = []
+
+    def channel(self, expected_bytes: int = 0) -> "_UploadChannel":
+        """Return a channel; ``expected_bytes`` counts toward the total until it reports."""
+        with self._lock:
+            channel = _UploadChannel(self)
+            channel._transfer_total = max(0, expected_bytes)
+            self._channels.append(channel)
+            return channel
+
+    def _update(self, current_file: str = "") -> None:
+        with self._lock:
+            channels = list(self._channels)
+            cur = sum(c._transfer_cur for c in channels)
+            total = sum(c._transfer_total for c in channels)
+            checks = sum(c._checks for c in channels)
+            transfers = sum(c._transfers for c in channels)
+            statuses = [c._status for c in channels if not c._done]
+            if "transferring" in statuses:
+                status = "transferring"
+            elif statuses and all(st == "finalizing" for st in statuses):
+                status = "finalizing"
+            elif "checking" in statuses:
+                status = "checking"
+            else:
+                status = ""
+            self.logger.transfer_progress_ext(
+                cur,
+                total,
+                checks=checks,
+                transfers=transfers,
+                status=status,
+                current_file=current_file,
+            )
+
+    def _upload_step(self, step: int, total_steps: int, title: str, detail: str = "") -> None:
+        with self._lock:
+            self.logger.upload_step(step, total_steps, title, detail)
+
+    def _upload_complete(self, channel: "_UploadChannel", title: str) -> None:
+        with self._lock:
+            channel._done = True
+            self.logger._transfer_total = channel._transfer_total
+            self.logger.upload_complete(title)
+
+
+class _UploadChannel:
+    """The logger of one concurrent upload step; see ParallelUploadProgress."""
+
+    def __init__(self, parent: ParallelUploadProgress) -> None:
+        self._parent = parent
+        self._transfer_cur = 0
+        self._transfer_total = 0
+        self._checks = 0
+        self._transfers = 0
+        self._status = ""
+        self._done = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._parent.logger, name)
+
+    def parallel_uploads(self) -> ParallelUploadProgress:
+        """Return a combiner whose sum is reported as this channel's progress."""
+        return ParallelUploadProgress(self)
+
+    def upload_step(self, step: int, total_steps: int, title: str, detail: str = "") -> None:
+        self._parent._upload_step(step, total_steps, title, detail)
+
+    def upload_complete(self, title: str) -> None:
+        self._parent._upload_complete(self, title)
+
+    def transfer_progress(self, cur: int, total: int) -> None:
+        self.transfer_progress_ext(cur, total)
+
+    def transfer_progress_ext(
+        self,
+        cur: int,
+        total: int,
+        checks: int = 0,
+        transfers: int = 0,
+        status: str = "",
+        current_file: str = "",
+    ) -> None:
+        self._transfer_cur = cur
+        self._transfer_total = total
+        self._checks = checks
+        self._transfers = transfers
+        self._status = status
+        self._parent._update(current_file)
+
+
 # Factory
 
 
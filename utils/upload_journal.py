@@ -0,0 +1,263 @@
+"""
+upload_journal.py — Local record of the dependencies already uploaded.
+
+A Project submission copies every dependency in its manifest with
+``rclone copy``, which checks each destination object with a HEAD request
+before it transfers the few files that changed. The journal remembers,
+per bucket and project prefix, which source files were uploaded
+successfully and what their size and modification time were. Files that
+are unchanged since then are left out of the upload without any remote
+call, and the remaining delta is uploaded without checking the
+destination.
+
+The journal cannot see changes made on the farm side, so every scope is
+fully reconciled (uploaded with destination checks, as without a journal)
+when it is first used, when its credentials or bucket change, when the
+last reconcile is older than the configured interval, or on request.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from ..blender_asset_tracer.envvars import env_bool, env_float
+
+_log = logging.getLogger(__name__)
+
+# Bump this whenever the stored entries change meaning.
+JOURNAL_FORMAT_VERSION = 1
+
+# Opt-in: skip dependencies that were uploaded unchanged before.
+UPLOAD_JOURNAL_ENV = "SULU_UPLOAD_JOURNAL"
+# Hours between full reconciles of a project with the bucket.
+UPLOAD_JOURNAL_RECONCILE_HOURS_ENV = "SULU_UPLOAD_JOURNAL_RECONCILE_HOURS"
+# Set to 1 to reconcile on the next submission.
+UPLOAD_JOURNAL_RECONCILE_ENV = "SULU_UPLOAD_JOURNAL_RECONCILE"
+
+DEFAULT_RECONCILE_HOURS = 24.0
+# Scopes that were not reconciled for this long are dropped from the file.
+SCOPE_RETENTION_SECONDS = 30 * 24 * 3600.0
+
+# (source path, size, mtime in nanoseconds, content hash or None, uploaded at)
+_Entry = Tuple[str, int, int, Optional[str], float]
+
+
+def credentials_fingerprint(endpoint: str, bucket: str, s3info: Mapping[str, Any]) -> str:
+    """Identify the storage the journal describes, without storing secrets."""
+    ident = "\0".join([endpoint, bucket, str(s3info.get("access_key_id", ""))])
+    return hashlib.sha256(ident.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class JournalStats:
+    full_reconcile: bool = False
+    reconcile_reason: str = ""
+    unchanged_files: int = 0
+    """Files left out of the upload because the journal knew them."""
+    unchanged_bytes: int = 0
+    delta_files: int = 0
+    delta_bytes: int = 0
+    recorded_files: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class UploadJournal:
+    """The uploaded files of one bucket and project prefix, stored as JSON."""
+
+    def __init__(
+        self,
+        filepath: Path,
+        scope: str,
+        credentials: str,
+        *,
+        reconcile_after: float = DEFAULT_RECONCILE_HOURS * 3600.0,
+        force_reconcile: bool = False,
+    ) -> None:
+        """
+        :param scope: the bucket and project prefix, e.g. "bucket/project".
+        :param credentials: credentials_fingerprint() of the storage.
+        :param reconcile_after: seconds after which a full reconcile is due.
+        """
+        self.filepath = filepath
+        self.scope = scope
+        self.credentials = credentials
+        self.stats = JournalStats()
+        self._lock = threading.Lock()
+        self._scopes: Dict[str, Dict[str, Any]] = self._load()
+        # rel key -> entry measured by split(), recorded once uploaded.
+        self._measured: Dict[str, _Entry] = {}
+
+        stored = self._scopes.get(scope)
+        reason = ""
+        if force_reconcile:
+            reason = "forced"
+        elif not stored or not stored.get("files"):
+            reason = "new"
+        elif stored.get("credentials") != credentials:
+            reason = "credentials_changed"
+        elif time.time() - float(stored.get("reconciled_at", 0)) >= reconcile_after:
+            reason = "expired"
+        self.stats.full_reconcile = bool(reason)
+        self.stats.reconcile_reason = reason
+        if reason:
+            # Whatever was recorded is replaced by what this upload uploads.
+            self._files: Dict[str, List[Any]] = {}
+        else:
+            self._files = stored["files"]
+
+    @property
+    def full_reconcile(self) -> bool:
+        return self.stats.full_reconcile
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with self.filepath.open("r", encoding="utf-8") as infile:
+                stored = json.load(infile)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as ex:
+            _log.warning("Ignoring unreadable upload journal %s: %s", self.filepath, ex)
+            return {}
+        if not isinstance(stored, dict) or stored.get("version") != JOURNAL_FORMAT_VERSION:
+            return {}
+        scopes = stored.get("scopes")
+        return scopes if isinstance(scopes, dict) else {}
+
+    def split(
+        self,
+        entries: Iterable[Tuple[str, str]],
+        hashes: Optional[Mapping[str, str]] = None,
+    ) -> Tuple[List[str], List[str]]:
+        """Split (rel key, source path) pairs into unchanged and delta rel keys.
+
+        A file is unchanged when it was uploaded from the same source path,
+        with the same size and modification time, and the same content hash
+        if both the journal and ``hashes`` (by rel key) have one. During a
+        full reconcile every file is in the delta.
+        """
+        unchanged: List[str] = []
+        delta: List[str] = []
+        for rel, source in entries:
+            try:
+                st = os.stat(source)
+            except OSError:
+                delta.append(rel)
+                self.stats.delta_files += 1
+                continue
+            content_hash = hashes.get(rel) if hashes else None
+            entry: _Entry = (source, st.st_size, st.st_mtime_ns, content_hash, 0.0)
+            self._measured[rel] = entry
+
+            known = self._files.get(rel)
+            if known is not None and self._is_unchanged(known, entry):
+                unchanged.append(rel)
+                self.stats.unchanged_files += 1
+                self.stats.unchanged_bytes += st.st_size
+            else:
+                delta.append(rel)
+                self.stats.delta_files += 1
+                self.stats.delta_bytes += st.st_size
+        return unchanged, delta
+
+    @staticmethod
+    def _is_unchanged(known: List[Any], entry: _Entry) -> bool:
+        try:
+            source, size, mtime_ns, content_hash = known[:4]
+        except (TypeError, ValueError):
+            return False
+        if (source, size, mtime_ns) != entry[:3]:
+            return False
+        return content_hash is None or entry[3] is None or content_hash == entry[3]
+
+    def record_uploaded(self, rels: Iterable[str]) -> None:
+        """Remember that these files, as measured by split(), were uploaded."""
+        now = time.time()
+        with self._lock:
+            for rel in rels:
+                entry = self._measured.get(rel)
+                if entry is None:
+                    continue
+                self._files[rel] = [*entry[:4], now]
+                self.stats.recorded_files += 1
+
+    def save(self, reconciled: bool = False) -> None:
+        """Store the journal.
+
+        :param reconciled: the whole manifest was uploaded with destination
+            checks, which restarts the reconcile interval.
+        """
+        now = time.time()
+        with self._lock:
+            scope = dict(self._scopes.get(self.scope) or {})
+            if self.full_reconcile and not reconciled:
+                # Nothing is trusted until a reconcile completes.
+                return
+            scope["credentials"] = self.credentials
+            scope["files"] = self._files
+            if reconciled:
+                scope["reconciled_at"] = now
+            self._scopes[self.scope] = scope
+            stored = {
+                "version": JOURNAL_FORMAT_VERSION,
+                "scopes": {
+                    name: value
+                    for name, value in self._scopes.items()
+                    if now - float(value.get("reconciled_at", 0)) < SCOPE_RETENTION_SECONDS
+                },
+            }
+
+        directory = self.filepath.parent
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            fd, tmpname = tempfile.mkstemp(
+                prefix=self.filepath.stem + "-", suffix=".tmp", dir=str(directory)
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as outfile:
+                    json.dump(stored, outfile)
+                os.replace(tmpname, str(self.filepath))
+            except BaseException:
+                os.unlink(tmpname)
+                raise
+        except OSError as ex:
+            _log.warning("Unable to write upload journal %s: %s", self.filepath, ex)
+
+
+def journal_enabled() -> bool:
+    """Return whether the upload journal is enabled in the environment."""
+    return env_bool(UPLOAD_JOURNAL_ENV)
+
+
+def open_journal(
+    filepath: Path,
+    scope: str,
+    credentials: str,
+    force_reconcile: bool = False,
+) -> Optional[UploadJournal]:
+    """Return the journal of the scope when enabled, configured from the environment.
+
+    :param force_reconcile: upload the whole manifest with destination
+        checks, as does setting SULU_UPLOAD_JOURNAL_RECONCILE=1.
+    """
+    if not journal_enabled():
+        return None
+
+    hours = max(0.0, env_float(UPLOAD_JOURNAL_RECONCILE_HOURS_ENV, DEFAULT_RECONCILE_HOURS))
+    return UploadJournal(
+        Path(filepath),
+        scope,
+        credentials,
+        reconcile_after=hours * 3600.0,
+        force_reconcile=force_reconcile or env_bool(UPLOAD_JOURNAL_RECONCILE_ENV),
+    )
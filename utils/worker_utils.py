@@ -25,7 +25,7 @@ import tempfile
 import time
 import unicodedata
 from pathlib import Path
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 # third-party
@@ -635,25 +635,14 @@ def is_win_drive_path(p: str) -> bool:
     return bool(_WIN_DRIVE_RE.match(str(p)))
 
 
-def norm_abs_for_detection(path: str) -> str:
-    """Normalize a path for comparison but keep Windows-looking/UNC paths intact on POSIX."""
+def _norm_abs_for_detection(path: str) -> str:
     p = str(path).replace("\\", "/")
     if is_win_drive_path(p) or p.startswith("//") or p.startswith("\\\\"):
         return p
     return os.path.normpath(os.path.abspath(p)).replace("\\", "/")
 
 
-def get_drive(path: str) -> str:
-    """
-    Return a drive token representing the path's root device for cross-drive checks.
-
-    Returns:
-    - Windows letters: "C:", "D:", ...
-    - UNC: "UNC"
-    - macOS volumes: "/Volumes/NAME"
-    - Linux removable/media: "/media/USER/NAME" or "/mnt/NAME"
-    - Otherwise POSIX root "/"
-    """
+def _get_drive(path: str) -> str:
     p = str(path).replace("\\", "/")
     if is_win_drive_path(p):
         return (p[:2]).upper()  # "C:"
@@ -686,9 +675,159 @@ def get_drive(path: str) -> str:
     return "/"
 
 
+def _s3key_clean(key: str) -> str:
+    k = str(key).replace("\\", "/")
+    k = re.sub(r"/+", "/", k)  # collapse duplicate slashes
+    k = k.lstrip("/")  # forbid leading slash
+    k = os.path.normpath(k).replace("\\", "/")
+    if k == ".":
+        return ""  # do not allow '.' as a key
+    return k
+
+
+class _computed_once:
+    """Like functools.cached_property, without its per-lookup lock (Python < 3.12).
+
+    Computing a form twice from two threads is harmless, the results are equal.
+    """
+
+    def __init__(self, func: Callable[[Any], str]) -> None:
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance: Any, owner: Any = None) -> Any:
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = self.func(instance)
+        return value
+
+
+class CanonicalPath:
+    """A path string with its normalized forms, each computed on first use.
+
+    Get these with canonical_path(), which returns the same object for the
+    same string while memoize_canonical_paths() is in effect.
+    """
+
+    def __init__(self, raw: str) -> None:
+        self.raw = raw
+
+    def __repr__(self) -> str:
+        return f"CanonicalPath({self.raw!r})"
+
+    @_computed_once
+    def absolute(self) -> str:
+        """See norm_abs_for_detection()."""
+        return _norm_abs_for_detection(self.raw)
+
+    @_computed_once
+    def drive(self) -> str:
+        """See get_drive()."""
+        return _get_drive(self.raw)
+
+    @_computed_once
+    def nfc(self) -> str:
+        """The absolute form, normalized to NFC."""
+        return unicodedata.normalize("NFC", self.absolute)
+
+    @_computed_once
+    def s3key(self) -> str:
+        """See s3key_clean()."""
+        return _s3key_clean(self.raw)
+
+    @_computed_once
+    def comparison_key(self) -> str:
+        """Equal for paths that samepath() considers the same."""
+        return os.path.normcase(os.path.normpath(self.raw))
+
+
+# Canonical paths and relative paths of the current submission, or None when
+# they are not memoized.
+_canonical_paths: Optional[Dict[str, CanonicalPath]] = None
+_relpaths: Optional[Dict[Tuple[str, str], str]] = None
+
+
+def memoize_canonical_paths(enabled: bool = True) -> None:
+    """Start or stop memoizing canonical paths, e.g. for one submission.
+
+    Starting forgets the paths of an earlier submission. The absolute forms
+    depend on the current working directory, so the memo should not outlive
+    the submission.
+    """
+    global _canonical_paths, _relpaths
+    _canonical_paths = {} if enabled else None
+    _relpaths = {} if enabled else None
+
+
+def canonical_path(path: str) -> CanonicalPath:
+    """Return the canonical forms of the path, see memoize_canonical_paths()."""
+    raw = str(path)
+    memo = _canonical_paths
+    if memo is None:
+        return CanonicalPath(raw)
+    try:
+        return memo[raw]
+    except KeyError:
+        return memo.setdefault(raw, CanonicalPath(raw))
+
+
+def norm_abs_for_detection(path: str) -> str:
+    """Normalize a path for comparison but keep Windows-looking/UNC paths intact on POSIX."""
+    if _canonical_paths is None:
+        return _norm_abs_for_detection(path)
+    return canonical_path(path).absolute
+
+
+def get_drive(path: str) -> str:
+    """
+    Return a drive token representing the path's root device for cross-drive checks.
+
+    Returns:
+    - Windows letters: "C:", "D:", ...
+    - UNC: "UNC"
+    - macOS volumes: "/Volumes/NAME"
+    - Linux removable/media: "/media/USER/NAME" or "/mnt/NAME"
+    - Otherwise POSIX root "/"
+    """
+    if _canonical_paths is None:
+        return _get_drive(path)
+    return canonical_path(path).drive
+
+
 def relpath_safe(child: str, base: str) -> str:
     """Safe relpath with POSIX separators. Caller must ensure same 'drive'."""
-    return os.path.relpath(child, start=base).replace("\\", "/")
+    memo = _relpaths
+    if memo is None:
+        return os.path.relpath(child, start=base).replace("\\", "/")
+    key = (str(child), str(base))
+    try:
+        return memo[key]
+    except KeyError:
+        pass
+    rel = _relpath_by_prefix(child, base)
+    if rel is None:
+        rel = os.path.relpath(child, start=base).replace("\\", "/")
+    memo[key] = rel
+    return rel
+
+
+def _relpath_by_prefix(child: str, base: str) -> Optional[str]:
+    """Return the child relative to base, if it is plainly inside it.
+
+    Works on the canonical absolute forms, so it avoids os.path.relpath()
+    normalizing both paths again. Returns None when that is needed, such as
+    for paths with '.' or '..' components.
+    """
+    child_abs = canonical_path(child).absolute
+    base_abs = canonical_path(base).absolute.rstrip("/")
+    if not base_abs or not child_abs.startswith(base_abs + "/"):
+        return None
+    rel = child_abs[len(base_abs) + 1 :]
+    for part in (base_abs + "/" + rel).split("/")[1:]:
+        if part in ("", ".", ".."):
+            return None
+    return rel
 
 
 def s3key_clean(key: str) -> str:
@@ -699,18 +838,16 @@ def s3key_clean(key: str) -> str:
     - Strip any leading slash
     - Normalize '.' and '..'
     """
-    k = str(key).replace("\\", "/")
-    k = re.sub(r"/+", "/", k)  # collapse duplicate slashes
-    k = k.lstrip("/")  # forbid leading slash
-    k = os.path.normpath(k).replace("\\", "/")
-    if k == ".":
-        return ""  # do not allow '.' as a key
-    return k
+    if _canonical_paths is None:
+        return _s3key_clean(key)
+    return canonical_path(key).s3key
 
 
 def samepath(a: str, b: str) -> bool:
     """Case-insensitive, normalized equality check suitable for Windows/POSIX."""
-    return os.path.normcase(os.path.normpath(a)) == os.path.normcase(os.path.normpath(b))
+    if _canonical_paths is None:
+        return os.path.normcase(os.path.normpath(a)) == os.path.normcase(os.path.normpath(b))
+    return canonical_path(a).comparison_key == canonical_path(b).comparison_key
 
 
 def looks_like_cloud_storage_path(p: str) -> bool: